@@ -0,0 +1,497 @@
+"""Headless backtests of the live decision path.
+
+run_backtest() replays stored candles through a private TradingBot the way
+paper replay does (_on_candle_event -> _handle_closed_candle: indicators,
+ScoreEngine, v2 / MDS / SuperTrend entries and exits, simulated paper fills)
+but with no sleeps, broadcasts, checkpoints, broker or DB calls. The clock
+(utils.utc_now) is pinned to each candle's close, so market-hours gates,
+order cooldowns, min-hold and the 3:25 PM square-off see candle time, and a
+day of 5s candles replays in well under a second.
+
+Exits are evaluated on candle close only (stored candles carry no ticks).
+
+An IndicatorTape records the per-candle indicator / ScoreEngine outputs of
+one day. Indicators depend only on the candles and the bot's
+indicator_signature() (its graph nodes, HTF feed and ScoreEngine arguments),
+never on trades, so runs that differ only in entry / risk settings
+(parameter sweeps) replay the tape instead of recomputing the same series.
+
+run_backtest_range() splits an IST date range into one job per trading day,
+fetches each day's base candles from market-data-service and backtests them
+in a ProcessPoolExecutor (every worker has its own config, bot and indicator
+state, like the live bot's 9:15 AM daily reset), then merges the days.
+
+A BacktestBot reads its own settings (a snapshot of config plus the
+overrides) and keeps its own bot_state, random generator and clock, so a
+backtest never touches the live bot's config / bot_state. Only the
+trading_bot log level is process-wide; the server runs backtests in worker
+processes.
+"""
+
+import asyncio
+from collections import ChainMap
+import copy
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from itertools import repeat
+from typing import Callable, Iterable, Mapping, Optional
+
+from config import config
+from market_events import CandleEvent, candle_epoch
+from trading_bot import TradingBot
+from utils import set_clock, should_force_squareoff
+
+logger = logging.getLogger(__name__)
+
+_IST = timedelta(hours=5, minutes=30)
+
+# Forced for every run: paper fills, nothing persisted or replayed in real time
+_BACKTEST_CONFIG = {
+    'state_checkpoint_enabled': False,
+    'paper_replay_enabled': False,
+    'store_candle_data': False,
+    'mds_multi_symbol_enabled': False,
+}
+
+# Never shipped to worker processes
+_SECRET_KEYS = ('dhan_access_token', 'dhan_client_id')
+
+
+class BacktestBot(TradingBot):
+    """TradingBot on its own settings / bot_state whose trades are kept in memory instead of the DB / WebSocket."""
+
+    def __init__(self, overrides: Optional[dict] = None, seed: int = 0):
+        super().__init__(settings=ChainMap({**(overrides or {}), **_BACKTEST_CONFIG}, copy.deepcopy(config)))
+        self.state.update(mode='paper', is_running=True)
+        self.rng.seed(seed)
+        self.running = True
+        self.trades: list[dict] = []
+        self.realized_pnl = 0.0
+        self.candle_index = 0  # position of the candle being handled (IndicatorTape cursor)
+
+    def _record_trade_entry(self, trade: dict) -> None:
+        trade = {k: v for k, v in trade.items() if k != 'created_at'}
+        self.trades.append(trade)
+
+    def _record_trade_exit(self, *, trade_id: str, **exit_data) -> None:
+        for trade in reversed(self.trades):
+            if trade['trade_id'] == trade_id:
+                trade.update(exit_data)
+                break
+        self.realized_pnl += float(exit_data.get('pnl') or 0.0)
+
+    async def broadcast_state(self):
+        return None
+
+    def equity(self) -> float:
+        """Realized P&L plus the open position marked at the current option LTP."""
+        if not self.current_position:
+            return self.realized_pnl
+        qty = int(self.current_position.get('qty') or 0)
+        return self.realized_pnl + (float(self.state['current_option_ltp']) - float(self.entry_price)) * qty
+
+
+@contextmanager
+def _bot_log_level(level: int):
+    """Run with the trading_bot logger at `level` (backtests skip its per-candle INFO lines)."""
+    bot_logger = logging.getLogger('trading_bot')
+    saved_level = bot_logger.level
+    bot_logger.setLevel(level)
+    try:
+        yield
+    finally:
+        bot_logger.setLevel(saved_level)
+
+
+def indicator_key(settings: Mapping) -> tuple:
+    """indicator_signature() of a backtest bot on `settings`: equal keys give equal indicator series."""
+    with _bot_log_level(logging.ERROR):
+        return BacktestBot(settings).indicator_signature()
+
+
+class IndicatorTape:
+    """Per-candle indicator outputs of one backtest, for replay into runs with the same indicator_key().
+
+    record() fills it from a run with trading disabled (so no candle is skipped
+    after a daily max loss); run_backtest(tape=...) then installs _TapeGraph /
+    _TapeScoreEngine, which publish the recorded values on each candle in
+    place of the indicator math. A tape covers one trading day: once the daily
+    max loss stops a day, the skipped candles would no longer match the tape
+    after the next day's reset.
+    """
+
+    def __init__(self):
+        self.key: Optional[tuple] = None  # indicator_signature() of the recording bot
+        self.rows: list[tuple] = []
+
+    @classmethod
+    def record(cls, candles: list, overrides: Optional[dict] = None) -> 'IndicatorTape':
+        tape = cls()
+        run_backtest(candles, {**(overrides or {}), 'trading_enabled': False}, recorder=tape)
+        return tape
+
+    def capture(self, bot: 'BacktestBot') -> None:
+        st, macd, htf, adx = bot._st_node, bot.macd, bot._htf_node, bot._adx_node
+        engine = bot.score_engine
+        mds = None
+        if isinstance(engine, _RecordingScoreEngine) and engine.updated is not None:
+            e = engine.engine
+            mds = (engine.updated, e.score, e.slope, e.acceleration, e.stability, e.confidence,
+                   e.is_choppy, e.direction, e.ready, e.tf_scores)
+            engine.updated = None
+        self.rows.append((
+            st.value, st.signal, st.indicator.direction,
+            macd.last_macd, macd.last_signal_line, macd.last_histogram,
+            htf.value, htf.signal, htf.indicator.direction,
+            None if adx is None else (adx.value, adx.indicator.plus_di, adx.indicator.minus_di),
+            mds,
+        ))
+
+    def apply_base(self, bot: 'BacktestBot') -> None:
+        """Publish the base-timeframe nodes (SuperTrend, MACD, ADX) and ScoreEngine values of this candle."""
+        (st_value, st_signal, st_dir, macd_line, macd_signal, macd_hist,
+         _, _, _, adx, mds) = self.rows[bot.candle_index]
+        bot._st_node.value, bot._st_node.signal, bot.indicator.direction = st_value, st_signal, st_dir
+        bot.macd.last_macd, bot.macd.last_signal_line, bot.macd.last_histogram = macd_line, macd_signal, macd_hist
+        if adx is not None and bot._adx_node is not None:
+            bot._adx_node.value, bot.adx.plus_di, bot.adx.minus_di = adx
+        if isinstance(bot.score_engine, _TapeScoreEngine):
+            bot.score_engine.pending = mds
+
+    def apply_htf(self, bot: 'BacktestBot') -> None:
+        """Publish the HTF filter SuperTrend as it stood after this candle."""
+        htf_value, htf_signal, htf_dir = self.rows[bot.candle_index][6:9]
+        bot._htf_node.value, bot._htf_node.signal, bot.htf_indicator.direction = htf_value, htf_signal, htf_dir
+
+
+class _RecordingScoreEngine:
+    """ScoreEngine proxy that remembers whether the last update() published."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.updated = None
+
+    def update(self, candle) -> bool:
+        self.updated = self.engine.update(candle)
+        return self.updated
+
+    def __getattr__(self, name):
+        return getattr(self.engine, name)
+
+
+class _TapeGraph:
+    """IndicatorGraph stand-in: a candle publishes its timeframe's part of the tape's row instead of computing."""
+
+    def __init__(self, tape: IndicatorTape, bot: 'BacktestBot'):
+        self.tape = tape
+        self.bot = bot
+        self.graph = bot.graph
+        self.base_tf = bot._graph_base_tf
+        self.htf_tf = bot._htf_node.timeframe
+
+    def on_candle(self, timeframe: int, high: float, low: float, close: float) -> None:
+        if timeframe == self.base_tf:
+            self.tape.apply_base(self.bot)
+        elif timeframe == self.htf_tf:
+            self.tape.apply_htf(self.bot)
+        else:
+            raise ValueError(f"IndicatorTape has no {timeframe}s candles")
+
+    def reset(self) -> None:
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self.graph, name)
+
+
+class _TapeScoreEngine:
+    """ScoreEngine stand-in: update() publishes the values the tape recorded for this candle."""
+
+    def __init__(self):
+        self.pending = None
+        self.reset()
+
+    def reset(self) -> None:
+        self.score = self.slope = self.acceleration = self.stability = self.confidence = 0.0
+        self.is_choppy = False
+        self.direction = 'NONE'
+        self.ready = False
+        self.tf_scores = {}
+
+    def update(self, candle) -> bool:
+        if self.pending is None:
+            return False
+        (updated, self.score, self.slope, self.acceleration, self.stability, self.confidence,
+         self.is_choppy, self.direction, self.ready, self.tf_scores) = self.pending
+        self.pending = None
+        return updated
+
+
+class _CandleClock:
+    """utc_now() source for utils.set_clock(): the close of the candle being replayed."""
+
+    def __init__(self):
+        self.now = datetime.fromtimestamp(0, timezone.utc)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def _candle_event(row: dict) -> Optional[CandleEvent]:
+    """CandleEvent for an MDS / candle_data row; None when it has no timestamp or prices."""
+    ts = candle_epoch(row.get('ts') or row.get('timestamp'))
+    try:
+        close = float(row.get('close') or 0.0)
+        high = float(row.get('high') or 0.0)
+        low = float(row.get('low') or float('inf'))
+        candle_open = float(row.get('open') or close)
+    except (TypeError, ValueError):
+        return None
+    if ts is None or close <= 0:
+        return None
+    return CandleEvent(candle_open, high, low, close, ts=ts, received=time.monotonic())
+
+
+def summarize_trades(trades: list[dict], equity: list) -> dict:
+    """Trade metrics (same names as database.get_trade_analytics) plus equity-curve drawdown."""
+    closed = [t for t in trades if t.get('pnl') is not None]
+    pnls = [float(t['pnl']) for t in closed]
+    wins = [p for p in pnls if p > 0]
+    losses = [p for p in pnls if p < 0]
+    total_profit = sum(wins)
+    total_loss = abs(sum(losses))
+
+    max_drawdown = 0.0
+    peak = 0.0
+    for _, value in equity:
+        peak = max(peak, value)
+        max_drawdown = max(max_drawdown, peak - value)
+
+    return {
+        'total_trades': len(closed),
+        'total_pnl': round(sum(pnls), 2),
+        'winning_trades': len(wins),
+        'losing_trades': len(losses),
+        'win_rate': round(len(wins) / len(closed) * 100, 2) if closed else 0,
+        'avg_win': round(total_profit / len(wins), 2) if wins else 0,
+        'avg_loss': round(total_loss / len(losses), 2) if losses else 0,
+        'profit_factor': round(total_profit / total_loss, 2) if total_loss > 0 else round(total_profit, 2),
+        'max_profit': round(max(pnls, default=0), 2),
+        'max_loss': round(min(pnls, default=0), 2),
+        'avg_trade_pnl': round(sum(pnls) / len(closed), 2) if closed else 0,
+        'max_drawdown': round(max_drawdown, 2),
+    }
+
+
+async def _replay(
+    bot: BacktestBot, candles: Iterable[dict], clock: _CandleClock, recorder: Optional[IndicatorTape] = None,
+) -> tuple[int, list]:
+    interval = int(bot.config.get('candle_interval', 5) or 5)
+    equity = []
+    count = 0
+    day = None
+    for row in candles:
+        event = _candle_event(row)
+        if event is None:
+            continue
+        clock.now = datetime.fromtimestamp(event.ts + interval, timezone.utc)
+
+        # Live housekeeping: daily reset on a new IST day, square-off from 3:25 PM
+        ist = clock.now + _IST
+        if day != ist.date():
+            if day is not None:
+                bot._daily_reset()
+            day = ist.date()
+
+        bot.candle_index = count
+        await bot._on_candle_event(event)
+        if recorder is not None:
+            recorder.capture(bot)
+        if bot.current_position and should_force_squareoff(bot.config):
+            await bot.squareoff()
+
+        count += 1
+        equity.append((event.ts + interval, round(bot.equity(), 2)))
+
+    if bot.current_position:
+        await bot.squareoff()  # close out at the last candle so every trade has an exit
+        if equity:
+            equity[-1] = (equity[-1][0], round(bot.equity(), 2))
+    return count, equity
+
+
+def run_backtest(
+    candles: Iterable[dict],
+    overrides: Optional[dict] = None,
+    *,
+    seed: int = 0,
+    log_level: int = logging.ERROR,
+    tape: Optional[IndicatorTape] = None,
+    recorder: Optional[IndicatorTape] = None,
+) -> dict:
+    """Replay `candles` (oldest first; 'ts' = candle open) through a fresh BacktestBot.
+
+    `overrides` are applied on top of the current config (index, candle_interval,
+    indicator and risk settings, ...). `seed` fixes the paper option-price noise.
+    With `tape` (IndicatorTape.record() of the same candles) indicators are read
+    from the tape; it must have been recorded with the same indicator_signature().
+    Returns {'candles', 'trades', 'equity' [(epoch_s, pnl)], 'equity_low',
+    'equity_high', 'metrics', 'elapsed_ms'}.
+    """
+    clock = _CandleClock()
+    started = time.perf_counter()
+    with _bot_log_level(log_level):
+        try:
+            set_clock(clock)
+
+            bot = BacktestBot(overrides, seed)
+            if tape is not None:
+                if tape.key != bot.indicator_signature():
+                    raise ValueError("IndicatorTape was recorded with different indicator settings")
+                bot.graph = _TapeGraph(tape, bot)
+                bot.score_engine = _TapeScoreEngine()
+            elif recorder is not None:
+                recorder.key = bot.indicator_signature()
+                if bot.score_engine is not None:
+                    bot.score_engine = _RecordingScoreEngine(bot.score_engine)
+            count, equity = asyncio.run(_replay(bot, candles, clock, recorder))
+        finally:
+            set_clock(None)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    logger.info(f"[BACKTEST] {count} candles | {len(bot.trades)} trades | {elapsed_ms:.0f} ms")
+    return {
+        'candles': count,
+        'trades': bot.trades,
+        'equity': equity,
+        'equity_low': min((value for _, value in equity), default=0.0),
+        'equity_high': max((value for _, value in equity), default=0.0),
+        'metrics': summarize_trades(bot.trades, equity),
+        'elapsed_ms': round(elapsed_ms, 1),
+    }
+
+
+def ist_trading_days(start_date: str, end_date: str) -> list[str]:
+    """Weekdays from start_date to end_date inclusive ('YYYY-MM-DD', IST)."""
+    day, end = date.fromisoformat(str(start_date)), date.fromisoformat(str(end_date))
+    days = []
+    while day <= end:
+        if day.weekday() < 5:
+            days.append(day.isoformat())
+        day += timedelta(days=1)
+    return days
+
+
+def fetch_day_candles(date_ist: str, settings: dict) -> list:
+    """One IST day of settings['selected_index'] base candles from market-data-service."""
+    from mds_client import fetch_candles_for_ist_date
+
+    return asyncio.run(fetch_candles_for_ist_date(
+        base_url=str(settings.get('mds_base_url', '') or '').strip(),
+        symbol=settings['selected_index'],
+        timeframe_seconds=int(settings.get('candle_interval', 5) or 5),
+        date_ist=date_ist,
+    ))
+
+
+def backtest_day(
+    date_ist: str,
+    settings: dict,
+    seed: int = 0,
+    fetch: Callable[[str, dict], list] = fetch_day_candles,
+) -> dict:
+    """Worker job: backtest one IST day of base candles (from market-data-service by default)."""
+    try:
+        result = run_backtest(fetch(date_ist, settings), settings, seed=seed)
+    except Exception as e:
+        logger.warning(f"[BACKTEST] {date_ist} failed: {e}")
+        return {'date': date_ist, 'error': str(e)}
+    return {'date': date_ist, **result}
+
+
+def merge_backtests(days: list[dict]) -> dict:
+    """Aggregate per-day backtest results (in date order) into one report.
+
+    Max drawdown is that of the days' equity curves laid end to end, from each
+    day's own drawdown and equity range (the curves themselves are not needed).
+    """
+    trades, daily, equity = [], [], []
+    offset = peak = max_drawdown = 0.0
+    for day in days:
+        if 'error' in day:
+            daily.append({'date': day['date'], 'error': day['error']})
+            continue
+        trades.extend(day['trades'])
+        max_drawdown = max(max_drawdown, day['metrics']['max_drawdown'], peak - (offset + day['equity_low']))
+        peak = max(peak, offset + day['equity_high'])
+        offset += day['metrics']['total_pnl']
+        equity.append((day['date'], round(offset, 2)))
+        daily.append({
+            'date': day['date'],
+            'candles': day['candles'],
+            'elapsed_ms': day['elapsed_ms'],
+            **day['metrics'],
+        })
+
+    metrics = summarize_trades(trades, ())
+    metrics['max_drawdown'] = round(max_drawdown, 2)
+    traded = [d for d in daily if d.get('candles')]
+    metrics['trading_days'] = len(traded)
+    metrics['winning_days'] = sum(1 for d in traded if d['total_pnl'] > 0)
+    metrics['avg_pnl_per_day'] = round(metrics['total_pnl'] / len(traded), 2) if traded else 0
+    return {
+        'days': len(days),
+        'candles': sum(d.get('candles', 0) for d in daily),
+        'metrics': metrics,
+        'daily': daily,
+        'equity': equity,
+        'trades': trades,
+    }
+
+
+def backtest_settings(overrides: Optional[dict] = None) -> dict:
+    """Settings shipped to worker processes: the current config (credentials excluded) plus overrides."""
+    settings = {k: v for k, v in copy.deepcopy(config).items() if k not in _SECRET_KEYS}
+    settings.update(overrides or {})
+    return settings
+
+
+def run_backtest_range(
+    start_date: str,
+    end_date: str,
+    overrides: Optional[dict] = None,
+    *,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    fetch: Callable[[str, dict], list] = fetch_day_candles,
+) -> dict:
+    """Backtest every trading day in [start_date, end_date] in parallel and merge the results.
+
+    Workers start from backtest_settings(overrides); days run independently,
+    so the wall time scales with the number of workers. `fetch(date_ist,
+    settings)` loads a day's base candles in the worker (a module-level
+    function: it is pickled by name).
+    """
+    settings = backtest_settings(overrides)
+    days = ist_trading_days(start_date, end_date)
+    workers = max(1, min(int(workers or os.cpu_count() or 1), len(days) or 1))
+
+    started = time.perf_counter()
+    # spawn: never fork the server's event loop / threads into the workers
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        results = list(pool.map(backtest_day, days, repeat(settings), repeat(seed), repeat(fetch)))
+
+    report = merge_backtests(results)
+    report['workers'] = workers
+    report['elapsed_ms'] = round((time.perf_counter() - started) * 1000.0, 1)
+    logger.info(
+        f"[BACKTEST] {start_date}..{end_date} | {report['days']} days | {report['candles']} candles | "
+        f"{report['metrics']['total_trades']} trades | {workers} workers | {report['elapsed_ms']:.0f} ms"
+    )
+    return report
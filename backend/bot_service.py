@@ -1,4 +1,5 @@
 # Bot Service - Interface layer between API routes and TradingBot
+import asyncio
 import logging
 from typing import Optional
 from config import bot_state, config
@@ -9,53 +10,143 @@ logger = logging.getLogger(__name__)
 
 # Lazy import to avoid circular imports
 _trading_bot = None
+_index_bots: dict = {}  # extra indices (trade_indices) -> TradingBot with its own state
+_backtest_running = False
 
-def get_trading_bot():
-    """Get or create the trading bot instance"""
+MAX_BACKTEST_DAYS = 366
+
+def get_trading_bot(index_name: Optional[str] = None):
+    """Get or create the trading bot for `index_name` (default: the selected_index bot)"""
     global _trading_bot
-    if _trading_bot is None:
-        from trading_bot import TradingBot
-        _trading_bot = TradingBot()
-    return _trading_bot
+    from trading_bot import TradingBot
+
+    if index_name is None or index_name == config['selected_index']:
+        if _trading_bot is None:
+            _trading_bot = TradingBot()
+            _trading_bot.peers = _account_bots
+        return _trading_bot
+    if index_name not in _index_bots:
+        _index_bots[index_name] = TradingBot(index_name)
+        _index_bots[index_name].peers = _account_bots
+    return _index_bots[index_name]
+
+
+def _account_bots():
+    """Bots sharing the account's daily_max_loss (TradingBot.peers)"""
+    return get_trading_bots().values()
+
+
+def trade_indices() -> list:
+    """Extra indices traded alongside selected_index (config trade_indices, comma-separated)"""
+    available = get_available_indices()
+    names = [n.strip().upper() for n in str(config.get('trade_indices') or '').split(',') if n.strip()]
+    return [n for n in dict.fromkeys(names) if n in available and n != config['selected_index']]
+
+
+def get_trading_bots() -> dict:
+    """Every traded index -> its bot (selected_index first), plus extra bots still running"""
+    bots = {config['selected_index']: get_trading_bot()}
+    for name in trade_indices():
+        bots[name] = get_trading_bot(name)
+    for name, bot in _index_bots.items():
+        if bot.running and name not in bots:
+            bots[name] = bot
+    return bots
+
+
+def _any_bot_running() -> bool:
+    """True while the selected_index bot or any extra index bot is running (or still stopping)"""
+    primary = _trading_bot is not None and _trading_bot.running
+    return bool(bot_state['is_running'] or primary or any(bot.running for bot in _index_bots.values()))
 
 
 async def start_bot() -> dict:
-    """Start the trading bot"""
+    """Start the trading bot, then one bot per extra index (trade_indices)"""
     bot = get_trading_bot()
     result = await bot.start()
     logger.info(f"[BOT] Start requested: {result}")
+    if result.get("status") != "success":
+        return result
+
+    extra = {}
+    for name in trade_indices():
+        index_bot = get_trading_bot(name)
+        index_bot.state['mode'] = bot_state['mode']
+        extra[name] = await index_bot.start()
+        logger.info(f"[BOT] Start requested for {name}: {extra[name]}")
+    if extra:
+        result = {**result, "indices": extra}
     return result
 
 
 async def stop_bot() -> dict:
-    """Stop the trading bot"""
+    """Stop the trading bot and every extra index bot"""
     bot = get_trading_bot()
     result = await bot.stop()
     logger.info(f"[BOT] Stop requested: {result}")
+    for name, index_bot in _index_bots.items():
+        if index_bot.running:
+            await index_bot.stop()
+            logger.info(f"[BOT] Stopped {name}")
     return result
 
 
-async def squareoff_position() -> dict:
-    """Force square off current position"""
+async def squareoff_position(index_name: Optional[str] = None) -> dict:
+    """Force square off the position of `index_name`, or of every traded index"""
+    if index_name is not None:
+        bots = get_trading_bots()
+        if index_name not in bots:
+            return {"status": "error", "message": f"{index_name} is not traded"}
+        result = await bots[index_name].squareoff()
+        logger.info(f"[BOT] Squareoff requested for {index_name}: {result}")
+        return result
+
     bot = get_trading_bot()
     result = await bot.squareoff()
     logger.info(f"[BOT] Squareoff requested: {result}")
+    extra = {}
+    for name, index_bot in get_trading_bots().items():
+        if index_bot is not bot and index_bot.current_position:
+            extra[name] = await index_bot.squareoff()
+            logger.info(f"[BOT] Squareoff requested for {name}: {extra[name]}")
+    if extra:
+        result = {**result, "indices": extra}
     return result
 
 
-def get_bot_status() -> dict:
-    """Get current bot status with market hour validation"""
+def _untraded(index_name: str) -> dict:
+    return {"status": "error", "message": f"{index_name} is not traded"}
+
+
+def _index_status(bot) -> dict:
+    return {
+        "is_running": bot.state['is_running'],
+        "mode": bot.state['mode'],
+        "daily_max_loss_triggered": bot.state['daily_max_loss_triggered'],
+        "candle_interval": bot.config['candle_interval'],
+    }
+
+
+def get_bot_status(index_name: Optional[str] = None) -> dict:
+    """Get current bot status with market hour validation.
+
+    Top-level run fields are selected_index's (or `index_name`'s);
+    `indices` has them for every traded index.
+    """
     from utils import is_market_open, get_ist_time
     
+    bots = get_trading_bots()
+    if index_name is not None and index_name not in bots:
+        return _untraded(index_name)
     ist = get_ist_time()
     market_is_open = is_market_open()
     is_weekday = ist.weekday() < 5  # 0-4 = Mon-Fri, 5-6 = Sat-Sun
     
     logger.debug(f"[STATUS] Market check: Weekday={is_weekday}, Time={ist.strftime('%H:%M')}, Open={market_is_open}")
     
+    bot = bots[index_name or config['selected_index']]
     return {
-        "is_running": bot_state['is_running'],
-        "mode": bot_state['mode'],
+        **_index_status(bot),
         "market_status": "open" if market_is_open else "closed",
         "market_details": {
             "is_weekday": is_weekday,
@@ -63,64 +154,147 @@ def get_bot_status() -> dict:
             "trading_hours": "09:15 - 15:30 IST"
         },
         "connection_status": "connected" if config['dhan_access_token'] else "disconnected",
-        "daily_max_loss_triggered": bot_state['daily_max_loss_triggered'],
         "trading_enabled": bool(config.get('trading_enabled', True)),
-        "selected_index": config['selected_index'],
-        "candle_interval": config['candle_interval']
+        "selected_index": bot.config['selected_index'],
+        "trade_indices": trade_indices(),
+        "indices": {name: _index_status(b) for name, b in bots.items()},
     }
 
 
 
-def get_market_data() -> dict:
-    """Get current market data"""
+def _index_market_data(bot) -> dict:
+    state = bot.state
+    return {
+        "ltp": state['index_ltp'],
+        "supertrend_signal": state['last_supertrend_signal'],
+        "supertrend_value": state['supertrend_value'],
+        "htf_supertrend_signal": state.get('htf_supertrend_signal'),
+        "htf_supertrend_value": state.get('htf_supertrend_value', 0.0),
+        "macd_value": state['macd_value'],
+        "signal_status": state['signal_status'],
+        "htf_signal_status": state.get('htf_signal_status', 'waiting'),
+    }
+
+
+def get_market_data(index_name: Optional[str] = None) -> dict:
+    """Get current market data of selected_index (or `index_name`), plus every traded index under `indices`"""
     from datetime import datetime, timezone
     
+    bots = get_trading_bots()
+    if index_name is not None and index_name not in bots:
+        return _untraded(index_name)
+    bot = bots[index_name or config['selected_index']]
     return {
-        "ltp": bot_state['index_ltp'],
-        "supertrend_signal": bot_state['last_supertrend_signal'],
-        "supertrend_value": bot_state['supertrend_value'],
-        "htf_supertrend_signal": bot_state.get('htf_supertrend_signal'),
-        "htf_supertrend_value": bot_state.get('htf_supertrend_value', 0.0),
-        "macd_value": bot_state['macd_value'],
-        "signal_status": bot_state['signal_status'],
-        "htf_signal_status": bot_state.get('htf_signal_status', 'waiting'),
-        "selected_index": config['selected_index'],
+        **_index_market_data(bot),
+        "selected_index": bot.config['selected_index'],
+        "indices": {name: _index_market_data(b) for name, b in bots.items()},
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
 
-def get_position() -> dict:
-    """Get current position info"""
-    if not bot_state['current_position']:
+def get_instances() -> dict:
+    """Per-index state of every traded index (selected_index and trade_indices)"""
+    instances = {}
+    for name, bot in get_trading_bots().items():
+        state = bot.state
+        instances[name] = {
+            "is_running": state['is_running'],
+            "mode": state['mode'],
+            "index_ltp": state['index_ltp'],
+            "signal_status": state['signal_status'],
+            "supertrend_value": state['supertrend_value'],
+            "position": state['current_position'],
+            "entry_price": state['entry_price'],
+            "current_option_ltp": state['current_option_ltp'],
+            "trailing_sl": state['trailing_sl'],
+            "daily_trades": state['daily_trades'],
+            "daily_pnl": state['daily_pnl'],
+            "daily_max_loss_triggered": state['daily_max_loss_triggered'],
+            "mds_score": state.get('mds_score', 0.0),
+            "mds_direction": state.get('mds_direction', 'NONE'),
+        }
+    return {"selected_index": config['selected_index'], "instances": instances}
+
+
+def get_mds_history(limit: Optional[int] = None) -> dict:
+    """Recent ScoreEngine snapshots as chart-ready columns (oldest first)"""
+    engine = getattr(get_trading_bot(), 'score_engine', None)
+    if engine is None:
+        return {"timeframes": [], "count": 0}
+
+    history = engine.history(limit)
+    result = {name: col.tolist() for name, col in history.items() if name != 'tf_scores'}
+    result['is_choppy'] = [bool(v) for v in result['is_choppy']]
+    result['ready'] = [bool(v) for v in result['ready']]
+    result['tf_scores'] = {str(tf): col.tolist() for tf, col in history['tf_scores'].items()}
+    result['timeframes'] = list(engine.timeframes)
+    result['count'] = len(result['score'])
+    return result
+
+
+def get_mds_symbols() -> dict:
+    """Latest MDS scores of every index in mds_symbols (empty unless mds_multi_symbol_enabled)"""
+    bot = get_trading_bot()  # scores mds_symbols for every traded index
+    return {
+        "enabled": bool(bot.config.get('mds_multi_symbol_enabled', False)),
+        "symbols": bot.state.get('mds_symbols') or {},
+        "strongest": bot.state.get('mds_strongest'),
+    }
+
+
+def _index_position(bot) -> dict:
+    state = bot.state
+    if not state['current_position']:
         return {"has_position": False}
     
-    index_config = get_index_config(config['selected_index'])
-    qty = int(bot_state['current_position'].get('qty') or 0)
+    index_config = get_index_config(bot.config['selected_index'])
+    qty = int(state['current_position'].get('qty') or 0)
     if qty <= 0:
-        qty = config['order_qty'] * index_config['lot_size']
-    unrealized_pnl = (bot_state['current_option_ltp'] - bot_state['entry_price']) * qty
+        qty = bot.config['order_qty'] * index_config['lot_size']
+    unrealized_pnl = (state['current_option_ltp'] - state['entry_price']) * qty
     
     return {
         "has_position": True,
-        "option_type": bot_state['current_position'].get('option_type'),
-        "strike": bot_state['current_position'].get('strike'),
-        "expiry": bot_state['current_position'].get('expiry'),
-        "index_name": bot_state['current_position'].get('index_name', config['selected_index']),
-        "entry_price": bot_state['entry_price'],
-        "current_ltp": bot_state['current_option_ltp'],
+        "option_type": state['current_position'].get('option_type'),
+        "strike": state['current_position'].get('strike'),
+        "expiry": state['current_position'].get('expiry'),
+        "index_name": state['current_position'].get('index_name', bot.config['selected_index']),
+        "entry_price": state['entry_price'],
+        "current_ltp": state['current_option_ltp'],
         "unrealized_pnl": unrealized_pnl,
-        "trailing_sl": bot_state['trailing_sl'],
+        "trailing_sl": state['trailing_sl'],
         "qty": qty
     }
 
 
-def get_daily_summary() -> dict:
-    """Get daily trading summary"""
+def get_position(index_name: Optional[str] = None) -> dict:
+    """Get current position of selected_index (or `index_name`), plus every traded index under `indices`"""
+    bots = get_trading_bots()
+    if index_name is not None and index_name not in bots:
+        return _untraded(index_name)
+    return {
+        **_index_position(bots[index_name or config['selected_index']]),
+        "indices": {name: _index_position(b) for name, b in bots.items()},
+    }
+
+
+def _index_summary(bot) -> dict:
+    return {
+        "total_trades": bot.state['daily_trades'],
+        "total_pnl": bot.state['daily_pnl'],
+        "max_drawdown": bot.state['max_drawdown'],
+        "daily_stop_triggered": bot.state['daily_max_loss_triggered']
+    }
+
+
+def get_daily_summary(index_name: Optional[str] = None) -> dict:
+    """Get daily trading summary of selected_index (or `index_name`), plus every traded index under `indices`"""
+    bots = get_trading_bots()
+    if index_name is not None and index_name not in bots:
+        return _untraded(index_name)
     return {
-        "total_trades": bot_state['daily_trades'],
-        "total_pnl": bot_state['daily_pnl'],
-        "max_drawdown": bot_state['max_drawdown'],
-        "daily_stop_triggered": bot_state['daily_max_loss_triggered']
+        **_index_summary(bots[index_name or config['selected_index']]),
+        "indices": {name: _index_summary(b) for name, b in bots.items()},
     }
 
 
@@ -134,6 +308,7 @@ def get_config() -> dict:
         "mode": bot_state['mode'],
         # Index & Timeframe
         "selected_index": config['selected_index'],
+        "trade_indices": str(config.get('trade_indices', '') or ''),
         "candle_interval": config['candle_interval'],
         "lot_size": index_config['lot_size'],
         "strike_interval": index_config['strike_interval'],
@@ -256,14 +431,23 @@ async def update_config_values(updates: dict) -> dict:
         logger.info(f"[CONFIG] HTF filter enabled set to: {config['htf_filter_enabled']}")
 
     if updates.get('htf_filter_timeframe') is not None:
+        valid_htf = [60, 300, 900]  # 1m, 5m, 15m (aggregated from the base candles)
         tf = int(updates['htf_filter_timeframe'])
-        # Current implementation supports 60s HTF cleanly; keep it constrained for safety.
-        if tf != 60:
-            logger.warning(f"[CONFIG] Unsupported HTF timeframe: {tf}s. Using 60s")
-            tf = 60
-        config['htf_filter_timeframe'] = tf
-        updated_fields.append('htf_filter_timeframe')
-        logger.info(f"[CONFIG] HTF filter timeframe set to: {config['htf_filter_timeframe']}s")
+        if tf in valid_htf:
+            changed = tf != int(config.get('htf_filter_timeframe', 60) or 60)
+            config['htf_filter_timeframe'] = tf
+            updated_fields.append('htf_filter_timeframe')
+            logger.info(f"[CONFIG] HTF filter timeframe set to: {config['htf_filter_timeframe']}s")
+            if changed:
+                for bot in get_trading_bots().values():
+                    bot.reset_indicator()
+        else:
+            logger.warning(f"[CONFIG] Invalid HTF timeframe: {tf}s. Valid: {valid_htf}")
+
+    if updates.get('min_entry_confidence') is not None:
+        config['min_entry_confidence'] = max(1.0, min(100.0, float(updates['min_entry_confidence'])))
+        updated_fields.append('min_entry_confidence')
+        logger.info(f"[CONFIG] Min entry confidence set to: {config['min_entry_confidence']}")
 
     if updates.get('min_hold_seconds') is not None:
         mhs = max(0, int(updates['min_hold_seconds']))
@@ -323,14 +507,31 @@ async def update_config_values(updates: dict) -> dict:
     if updates.get('selected_index') is not None:
         new_index = updates['selected_index'].upper()
         available = get_available_indices()
-        if new_index in available:
+        if new_index not in available:
+            logger.warning(f"[CONFIG] Invalid index: {new_index}. Available: {available}")
+        elif new_index != config['selected_index'] and _any_bot_running():
+            logger.warning("[CONFIG] Stop the bot before changing selected_index")
+        else:
             config['selected_index'] = new_index
             bot_state['selected_index'] = new_index
             updated_fields.append('selected_index')
             logger.info(f"[CONFIG] Index changed to: {new_index}")
-        else:
-            logger.warning(f"[CONFIG] Invalid index: {new_index}. Available: {available}")
             
+    if updates.get('trade_indices') is not None:
+        raw = updates['trade_indices']
+        names = raw if isinstance(raw, (list, tuple)) else str(raw).split(',')
+        names = [str(n).strip().upper() for n in names if str(n).strip()]
+        available = get_available_indices()
+        invalid = [n for n in names if n not in available]
+        if invalid:
+            logger.warning(f"[CONFIG] Invalid trade indices: {invalid}. Available: {available}")
+        elif _any_bot_running():
+            logger.warning("[CONFIG] Stop the bot before changing trade_indices")
+        else:
+            config['trade_indices'] = ','.join(dict.fromkeys(names))
+            updated_fields.append('trade_indices')
+            logger.info(f"[CONFIG] Trade indices set to: {config['trade_indices'] or 'none'}")
+
     if updates.get('candle_interval') is not None:
         valid_intervals = [5, 15, 30, 60, 300, 900]  # 5s, 15s, 30s, 1m, 5m, 15m
         new_interval = int(updates['candle_interval'])
@@ -339,8 +540,8 @@ async def update_config_values(updates: dict) -> dict:
             updated_fields.append('candle_interval')
             logger.info(f"[CONFIG] Candle interval changed to: {new_interval}s")
             # Reset indicator when interval changes
-            bot = get_trading_bot()
-            bot.reset_indicator()
+            for bot in get_trading_bots().values():
+                bot.reset_indicator()
         else:
             logger.warning(f"[CONFIG] Invalid interval: {new_interval}. Valid: {valid_intervals}")
     
@@ -351,8 +552,8 @@ async def update_config_values(updates: dict) -> dict:
             updated_fields.append('indicator_type')
             logger.info(f"[CONFIG] Indicator changed to: {new_indicator}")
             # Re-initialize indicators
-            bot = get_trading_bot()
-            bot._initialize_indicator()
+            for bot in get_trading_bots().values():
+                bot._initialize_indicator()
         else:
             logger.warning(f"[CONFIG] Invalid indicator: {new_indicator}. Supported: 'supertrend', 'supertrend_macd', 'score_mds'")
 
@@ -379,6 +580,10 @@ async def update_config_values(updates: dict) -> dict:
             except (ValueError, TypeError) as e:
                 logger.warning(f"[CONFIG] Invalid value for {param}: {e}")
     
+    # Tick-level exit levels are precomputed from the risk settings
+    for bot in get_trading_bots().values():
+        bot.risk.invalidate()
+
     await save_config()
     logger.info(f"[CONFIG] Updated: {updated_fields}")
     
@@ -387,7 +592,7 @@ async def update_config_values(updates: dict) -> dict:
 
 async def set_trading_mode(mode: str) -> dict:
     """Set trading mode (paper/live)"""
-    if bot_state['current_position']:
+    if any(bot.current_position for bot in get_trading_bots().values()):
         return {"status": "error", "message": "Cannot change mode with open position"}
     
     if mode not in ['paper', 'live']:
@@ -399,6 +604,81 @@ async def set_trading_mode(mode: str) -> dict:
     return {"status": "success", "mode": mode}
 
 
+def _backtest_range(start_date: str, end_date: Optional[str], overrides: dict):
+    """Validated (start, end) dates of a backtest / optimizer request."""
+    from datetime import date
+
+    end_date = end_date or start_date
+    start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    if end < start:
+        raise ValueError("end_date must not be before start_date")
+    if (end - start).days >= MAX_BACKTEST_DAYS:
+        raise ValueError(f"Backtest range too long (max {MAX_BACKTEST_DAYS} days)")
+    if not str({**config, **overrides}.get('mds_base_url', '') or '').strip():
+        raise ValueError("Backtests need market-data-service history (mds_base_url is not set)")
+    return start, end
+
+
+async def run_backtest(start_date: str, end_date: Optional[str], overrides: dict, workers: Optional[int] = None) -> dict:
+    """Backtest the current config (plus overrides) over an IST date range in worker processes.
+
+    The live bot keeps running: every day is replayed by its own bot in a separate process.
+    """
+    global _backtest_running
+    start, end = _backtest_range(start_date, end_date, overrides)
+    if _backtest_running:
+        return {"status": "error", "message": "A backtest is already running"}
+
+    from backtest import run_backtest_range
+
+    _backtest_running = True
+    try:
+        report = await asyncio.to_thread(
+            run_backtest_range, start.isoformat(), end.isoformat(), overrides, workers=workers
+        )
+    finally:
+        _backtest_running = False
+    return {"status": "success", **report}
+
+
+async def run_optimizer(
+    start_date: str,
+    end_date: Optional[str],
+    space: dict,
+    overrides: dict,
+    *,
+    method: str = 'grid',
+    samples: int = 50,
+    objective: str = 'total_pnl',
+    top: int = 5,
+    save_name: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> dict:
+    """Sweep `space` over an IST date range (see optimizer.optimize); optionally save the winners as strategies."""
+    global _backtest_running
+    start, end = _backtest_range(start_date, end_date, overrides)
+    if _backtest_running:
+        return {"status": "error", "message": "A backtest is already running"}
+
+    from optimizer import optimize, save_top_strategies
+
+    _backtest_running = True
+    try:
+        result = await asyncio.to_thread(
+            optimize, start.isoformat(), end.isoformat(), space, overrides,
+            method=method, samples=samples, objective=objective, top=top, workers=workers,
+        )
+    finally:
+        _backtest_running = False
+
+    saved = []
+    if save_name:
+        fixed = {k: v for k, v in overrides.items() if k != 'mds_base_url'}
+        saved = await save_top_strategies(result, save_name, fixed, start_date=start.isoformat(), end_date=end.isoformat())
+        logger.info(f"[OPTIMIZE] Saved {len(saved)} strategies as '{save_name} (rank)'")
+    return {"status": "success", **result, "saved": saved}
+
+
 def get_available_indices_list() -> list:
     """Get list of available indices with their config"""
     from indices import INDICES
@@ -13,39 +13,49 @@ load_dotenv(ROOT_DIR / '.env')
 # Valid timeframe options (in seconds)
 VALID_TIMEFRAMES = [5, 15, 30, 60, 300, 900]  # 5s, 15s, 30s, 1m, 5m, 15m
 
-# Global bot state
-bot_state = {
-    "is_running": False,
-    "mode": "paper",  # paper or live (default to paper for safety)
-    "current_position": None,
-    "daily_trades": 0,
-    "daily_pnl": 0.0,
-    "daily_max_loss_triggered": False,
-    "last_supertrend_signal": None,
-    "index_ltp": 0.0,
-    "supertrend_value": 0.0,
-    "macd_value": 0.0,  # MACD line value
-    "signal_status": "waiting",  # waiting, buy (GREEN), sell (RED)
-    "trailing_sl": None,
-    "entry_price": 0.0,
-    "current_option_ltp": 0.0,
-    "max_drawdown": 0.0,
-    "selected_index": "NIFTY",  # Current selected index
-
-    # Higher timeframe (HTF) SuperTrend filter state
-    "htf_supertrend_signal": None,
-    "htf_supertrend_value": 0.0,
-    "htf_signal_status": "waiting",
-
-    # Score engine telemetry (MDS)
-    "mds_score": 0.0,
-    "mds_slope": 0.0,
-    "mds_acceleration": 0.0,
-    "mds_stability": 0.0,
-    "mds_confidence": 0.0,
-    "mds_is_choppy": False,
-    "mds_direction": "NONE",
-}
+
+# Bot state; every TradingBot for an extra index (trade_indices) keeps its own copy
+def new_bot_state() -> dict:
+    return {
+        "is_running": False,
+        "mode": "paper",  # paper or live (default to paper for safety)
+        "current_position": None,
+        "daily_trades": 0,
+        "daily_pnl": 0.0,
+        "daily_max_loss_triggered": False,
+        "last_supertrend_signal": None,
+        "index_ltp": 0.0,
+        "supertrend_value": 0.0,
+        "macd_value": 0.0,  # MACD line value
+        "signal_status": "waiting",  # waiting, buy (GREEN), sell (RED)
+        "trailing_sl": None,
+        "entry_price": 0.0,
+        "current_option_ltp": 0.0,
+        "max_drawdown": 0.0,
+        "selected_index": "NIFTY",  # Current selected index
+
+        # Higher timeframe (HTF) SuperTrend filter state
+        "htf_supertrend_signal": None,
+        "htf_supertrend_value": 0.0,
+        "htf_signal_status": "waiting",
+
+        # Score engine telemetry (MDS)
+        "mds_score": 0.0,
+        "mds_slope": 0.0,
+        "mds_acceleration": 0.0,
+        "mds_stability": 0.0,
+        "mds_confidence": 0.0,
+        "mds_is_choppy": False,
+        "mds_direction": "NONE",
+
+        # Cross-index MDS scores (mds_multi_symbol_enabled), keyed by symbol
+        "mds_symbols": {},
+        "mds_strongest": None,
+    }
+
+
+# Global bot state (the selected_index bot)
+bot_state = new_bot_state()
 
 # Configuration (can be updated from frontend)
 def _env_bool(name: str, default: bool) -> bool:
@@ -80,7 +90,7 @@ config = {
     "dhan_client_id": "",
     "order_qty": 1,  # Number of lots (will be multiplied by lot_size)
     "max_trades_per_day": 5,
-    "daily_max_loss": 2000,
+    "daily_max_loss": 2000,  # Account-wide: realized P&L of all traded indices combined (₹)
     # Stop Loss Parameters
     "initial_stoploss": 50,  # Fixed SL points below entry (0 = disabled)
     "max_loss_per_trade": 0,  # Max loss amount per trade (₹, 0 = disabled)
@@ -98,6 +108,7 @@ config = {
     ),
     "mds_base_url": (os.getenv("MDS_BASE_URL", "") or "").strip(),  # e.g. http://market-data-service:8002/v1
     "mds_poll_seconds": _env_float("MDS_POLL_SECONDS", 1.0),
+    "mds_flush_grace_seconds": _env_float("MDS_FLUSH_GRACE_SECONDS", 0.25),  # wait after a candle closes before fetching it
 
     # Market data persistence (backend SQLite)
     # Keep these off by default to prevent the backend DB from growing indefinitely.
@@ -113,6 +124,13 @@ config = {
     "max_tick_rows": _env_int("MAX_TICK_ROWS", 0),  # 0 = delete all if store_tick_data is False; else keep last N rows
     "vacuum_db_on_prune": _env_bool("VACUUM_DB_ON_PRUNE", True),
 
+    # Indicator/ScoreEngine checkpoint (data/indicator_state.json), written at most every
+    # state_checkpoint_interval_seconds of candle closes and once on stop, and restored on start
+    # so only candles after the checkpoint need to be replayed.
+    "state_checkpoint_enabled": _env_bool("STATE_CHECKPOINT_ENABLED", True),
+    "state_checkpoint_interval_seconds": _env_float("STATE_CHECKPOINT_INTERVAL_SECONDS", 60.0),  # 0 = every candle close
+    "state_checkpoint_max_age_seconds": _env_int("STATE_CHECKPOINT_MAX_AGE_SECONDS", 300),  # non-MDS only (no catch-up)
+
     # Internal backend tick collector (legacy). Prefer market-data-service instead.
     "enable_internal_market_data_service": _env_bool("ENABLE_INTERNAL_MARKET_DATA_SERVICE", False),
 
@@ -141,8 +159,22 @@ config = {
     "mds_bonus_macd_triple": 1.0,     # MACD line + signal line + histogram all same sign
     "mds_bonus_macd_momentum": 0.5,   # MACD score + HIST score both strong and aligned
     "mds_bonus_macd_cross": 0.5,      # MACD cross event bonus
+    # Score every timeframe from the selected one up to 15m (5s..900s) instead of selected + next.
+    # mds_tf_weights overrides per-timeframe weights, e.g. {"5": 1, "60": 3}; default is 1, 2, 3, ... up the chain.
+    "mds_full_chain": False,
+    "mds_tf_weights": {},
+    "mds_history_size": 720,  # Snapshots kept for /api/mds/history (720 = 1h of 5s candles)
+    # Also score these indices side by side (read-only telemetry; trading stays on selected_index)
+    "mds_multi_symbol_enabled": False,
+    "mds_symbols": ["NIFTY", "BANKNIFTY", "FINNIFTY", "SENSEX"],
+    # Score mds_symbols in one struct-of-arrays NumPy step from this many symbols up (below: one
+    # ScoreEngine per symbol, faster for a handful; same results). 0 = always vectorized.
+    "mds_vectorize_min_symbols": _env_int("MDS_VECTORIZE_MIN_SYMBOLS", 24),
     "candle_interval": 5,  # seconds (default 5s)
     "selected_index": "NIFTY",  # Default index
+    # Also trade these indices (comma-separated, e.g. "BANKNIFTY,FINNIFTY"): one TradingBot each,
+    # with its own state, behind the shared candle feed and option-quote poller
+    "trade_indices": (os.getenv("TRADE_INDICES", "") or "").strip().upper(),
     # Trade protection settings
     "min_trade_gap": 0,  # Minimum seconds between trades (0 = disabled)
     "trade_only_on_flip": True,  # Only trade on SuperTrend direction change
@@ -150,7 +182,10 @@ config = {
 
     # Multi-timeframe (MTF) filter
     "htf_filter_enabled": True,  # If True: require HTF SuperTrend direction alignment for LTF entries
-    "htf_filter_timeframe": 60,  # seconds (default 1m)
+    "htf_filter_timeframe": 60,  # seconds (default 1m; 60, 300 or 900)
+
+    # Entry gate (v2 logic, SuperTrend modes)
+    "min_entry_confidence": 65.0,  # Minimum entry confidence score (0-100) for a new entry
 
     # Exit protection
     "min_hold_seconds": 15,  # Minimum seconds to hold a new position before strategy exits (0 = disabled)
@@ -165,6 +200,9 @@ config = {
 # SQLite Database path
 DB_PATH = ROOT_DIR / 'data' / 'trading.db'
 
+# Indicator state checkpoint (see TradingBot._save_checkpoint)
+CHECKPOINT_PATH = ROOT_DIR / 'data' / 'indicator_state.json'
+
 # Ensure directories exist
 (ROOT_DIR / 'logs').mkdir(exist_ok=True)
 (ROOT_DIR / 'data').mkdir(exist_ok=True)
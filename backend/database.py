@@ -310,6 +310,7 @@ async def load_config():
                             'macd_signal',
                             'max_candle_rows',
                             'max_tick_rows',
+                            'mds_vectorize_min_symbols',
                         }
                         float_keys = {
                             'daily_max_loss',
@@ -319,6 +320,7 @@ async def load_config():
                             'trail_step',
                             'target_points',
                             'risk_per_trade',
+                            'min_entry_confidence',
                             'supertrend_multiplier',
                             'market_data_poll_seconds',
                             'tick_persist_interval_seconds',
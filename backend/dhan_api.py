@@ -252,6 +252,34 @@ class DhanAPI:
             logger.error(f"Error fetching combined quote: {e}")
         
         return index_ltp, option_ltp
+
+    def get_ltps(self, securities: dict) -> dict:
+        """LTPs of many instruments in a single API call.
+
+        `securities` maps exchange segment -> security ids; returns
+        {(segment, security_id): ltp} (0 where Dhan sent no price).
+        """
+        ltps = {}
+        try:
+            request = {segment: sorted(int(sid) for sid in ids) for segment, ids in securities.items() if ids}
+            response = self.dhan.quote_data(request)
+
+            if response and response.get('status') == 'success':
+                data = response.get('data', {})
+                if isinstance(data, dict) and 'data' in data:
+                    data = data.get('data', {})
+
+                for segment, ids in request.items():
+                    segment_data = data.get(segment, {}) or {}
+                    for sid in ids:
+                        quote = segment_data.get(str(sid), {}) or {}
+                        ltps[(segment, sid)] = float(quote.get('last_price', 0) or 0)
+                logger.debug(f"Batched quote: {len(ltps)} instruments")
+
+        except Exception as e:
+            logger.error(f"Error fetching batched quotes: {e}")
+
+        return ltps
     
     async def get_option_chain(self, index_name: str = "NIFTY", expiry: str = None, force_refresh: bool = False) -> dict:
         """Get option chain with caching"""
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from indicators import (
+    ADX, ATR, MACD, RSI, BollingerBands, DonchianChannel, KeltnerChannel, MovingAverage, Stochastic, SuperTrend,
+)
+
+
+NodeKey = Tuple[str, Tuple[Tuple[str, Any], ...], int]
+
+
+@dataclass(eq=False)
+class IndicatorNode:
+    """One shared indicator instance plus the output of its latest candle."""
+    key: NodeKey
+    indicator: Any
+    value: Any = None
+    signal: Optional[str] = None
+    subscribers: Set[str] = field(default_factory=set)
+
+    @property
+    def timeframe(self) -> int:
+        return self.key[2]
+
+
+class IndicatorGraph:
+    """Registry of shared indicator nodes keyed by (kind, params, timeframe).
+
+    Consumers subscribe() to a node instead of constructing their own
+    indicator; identical requests resolve to the same node. The candle
+    producer for a timeframe calls on_candle() once per closed candle and every
+    node on that timeframe is evaluated exactly once; consumers then read
+    node.value / node.signal (or the indicator's own attributes). Nothing is
+    computed for a (kind, params, timeframe) that no consumer subscribed to.
+    """
+
+    KINDS = {
+        'supertrend': SuperTrend,
+        'macd': MACD,
+        'adx': ADX,
+        'rsi': RSI,
+        'ema_cross': MovingAverage,
+        'bollinger': BollingerBands,
+        'stochastic': Stochastic,
+        'atr': ATR,
+        'donchian': DonchianChannel,
+        'keltner': KeltnerChannel,
+    }
+
+    def __init__(self) -> None:
+        self._nodes: Dict[NodeKey, IndicatorNode] = {}
+        self._by_tf: Dict[int, List[IndicatorNode]] = {}
+
+    @staticmethod
+    def key(kind: str, timeframe: int, **params) -> NodeKey:
+        return (str(kind), tuple(sorted(params.items())), int(timeframe))
+
+    def subscribe(self, consumer: str, kind: str, timeframe: int, **params) -> IndicatorNode:
+        """Return the shared node for (kind, params, timeframe), creating it on first use."""
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown indicator kind: {kind}")
+        key = self.key(kind, timeframe, **params)
+        node = self._nodes.get(key)
+        if node is None:
+            node = IndicatorNode(key=key, indicator=self.KINDS[kind](**params))
+            self._nodes[key] = node
+            self._by_tf.setdefault(node.timeframe, []).append(node)
+        node.subscribers.add(str(consumer))
+        return node
+
+    def release(self, consumer: str) -> None:
+        """Drop a consumer's subscriptions; nodes nobody needs any more are removed."""
+        for key, node in list(self._nodes.items()):
+            node.subscribers.discard(str(consumer))
+            if not node.subscribers:
+                del self._nodes[key]
+                self._by_tf[node.timeframe].remove(node)
+                if not self._by_tf[node.timeframe]:
+                    del self._by_tf[node.timeframe]
+
+    def nodes(self, timeframe: Optional[int] = None) -> List[IndicatorNode]:
+        if timeframe is None:
+            return list(self._nodes.values())
+        return list(self._by_tf.get(int(timeframe), ()))
+
+    def timeframes(self) -> Tuple[int, ...]:
+        return tuple(sorted(self._by_tf))
+
+    def on_candle(self, timeframe: int, high: float, low: float, close: float) -> None:
+        """Evaluate every node on `timeframe` once for this closed candle."""
+        for node in self._by_tf.get(int(timeframe), ()):
+            node.value, node.signal = node.indicator.add_candle(high, low, close)
+
+    def on_candles(self, timeframe: int, highs, lows, closes) -> Dict[NodeKey, dict]:
+        """Batch on_candle via add_candles(); returns each node's per-candle arrays.
+
+        node.value / node.signal are cleared: batch callers read the returned
+        arrays or the indicators' own state.
+        """
+        out: Dict[NodeKey, dict] = {}
+        for node in self._by_tf.get(int(timeframe), ()):
+            out[node.key] = node.indicator.add_candles(highs, lows, closes)
+            node.value, node.signal = None, None
+        return out
+
+    def get_state(self) -> List[dict]:
+        """JSON-safe snapshot of every node's indicator state."""
+        return [
+            {'kind': kind, 'params': dict(params), 'timeframe': tf, 'state': node.indicator.get_state()}
+            for (kind, params, tf), node in self._nodes.items()
+        ]
+
+    def set_state(self, state: List[dict]) -> None:
+        """Restore every subscribed node from get_state() output.
+
+        Raises ValueError (and leaves the graph untouched) unless the snapshot
+        covers every node with matching parameters.
+        """
+        by_key = {self.key(row['kind'], row['timeframe'], **row['params']): row['state'] for row in state}
+        missing = [key for key in self._nodes if key not in by_key]
+        if missing:
+            raise ValueError(f"Checkpoint has no state for nodes: {missing}")
+        # Load into scratch copies first so a bad snapshot cannot leave a half-restored graph
+        scratch = {key: self.KINDS[key[0]](**dict(key[1])) for key in self._nodes}
+        for key, indicator in scratch.items():
+            indicator.set_state(by_key[key])
+        for key, node in self._nodes.items():
+            node.indicator.set_state(by_key[key])
+            node.value, node.signal = None, None
+
+    def reset(self) -> None:
+        for node in self._nodes.values():
+            node.indicator.reset()
+            node.value, node.signal = None, None
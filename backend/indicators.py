@@ -1,140 +1,433 @@
 # Multiple Trading Indicators
 import logging
+from array import array
+from collections import deque
+from collections.abc import Sequence
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
-class SuperTrend:
-    def __init__(self, period=7, multiplier=4):
+# Batch (add_candles) outputs encode signals as int8: 1 = GREEN, -1 = RED, 0 = none
+SIGNAL_CODES = {"GREEN": 1, "RED": -1, None: 0}
+
+
+def _as_float_arrays(highs, lows, closes):
+    h = np.asarray(highs, dtype=np.float64).ravel()
+    l = np.asarray(lows, dtype=np.float64).ravel()
+    c = np.asarray(closes, dtype=np.float64).ravel()
+    if not (len(h) == len(l) == len(c)):
+        raise ValueError("add_candles: highs, lows and closes must have equal length")
+    return h, l, c
+
+
+def _prev_closes(c, prev_close):
+    prev = np.empty_like(c)
+    prev[1:] = c[:-1]
+    if len(c):
+        prev[0] = np.nan if prev_close is None else prev_close
+    return prev
+
+
+def _true_range(h, l, c, prev_close):
+    """Per-candle TR against the previous close; the very first candle uses high - low."""
+    prev = _prev_closes(c, prev_close)
+    tr = np.maximum(np.maximum(h - l, np.abs(h - prev)), np.abs(l - prev))
+    if len(c) and prev_close is None:
+        tr[0] = h[0] - l[0]
+    return tr
+
+
+def _nan_list(values, n):
+    """Left-pad `values` with NaN to length n and return a float64 array."""
+    out = np.full(n, np.nan)
+    if values:
+        out[n - len(values):] = values
+    return out
+
+
+def _dump_field(value):
+    if isinstance(value, _Stateful):
+        return value.get_state()
+    if isinstance(value, array):
+        return value.tolist()
+    if isinstance(value, (deque, list)):
+        return [list(v) if isinstance(v, tuple) else v for v in value]
+    return value
+
+
+class _Stateful:
+    """JSON-safe get_state()/set_state() for checkpointing.
+
+    Fields default to the class __slots__. `_STATE_PARAMS` are constructor
+    parameters: a state only loads into an indicator built with the same ones.
+    """
+    __slots__ = ()
+    _STATE_PARAMS = ()
+    _STATE_FIELDS = None
+
+    def _state_fields(self):
+        fields = self._STATE_FIELDS if self._STATE_FIELDS is not None else type(self).__slots__
+        return [f for f in fields if f not in self._STATE_PARAMS]
+
+    def get_state(self):
+        return {
+            'params': {name: getattr(self, name) for name in self._STATE_PARAMS},
+            'fields': {name: _dump_field(getattr(self, name)) for name in self._state_fields()},
+        }
+
+    def set_state(self, state):
+        params = {name: getattr(self, name) for name in self._STATE_PARAMS}
+        if state.get('params') != params:
+            raise ValueError(f"{type(self).__name__} state has params {state.get('params')}, expected {params}")
+        fields = state['fields']
+        for name in self._state_fields():
+            current = getattr(self, name)
+            value = fields[name]
+            if isinstance(current, _Stateful):
+                current.set_state(value)
+            elif isinstance(current, array):
+                if len(value) != len(current):
+                    raise ValueError(f"{type(self).__name__}.{name}: expected {len(current)} items")
+                current[:] = array(current.typecode, value)
+            elif isinstance(current, deque):
+                current.clear()
+                current.extend(tuple(v) if isinstance(v, list) else v for v in value)
+            elif isinstance(current, list):
+                setattr(self, name, list(value))
+            else:
+                setattr(self, name, value)
+
+
+class _EMA(_Stateful):
+    """Incremental EMA with SMA seeding: mean of the first `period` values, then alpha-weighted."""
+    __slots__ = ('period', 'alpha', 'value', '_seed_sum', '_seed_n')
+    _STATE_PARAMS = ('period',)
+
+    def __init__(self, period):
+        self.period = period
+        self.alpha = 2 / (period + 1) if period > 0 else 0.0
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self._seed_sum = 0.0
+        self._seed_n = 0
+
+    def update(self, value):
+        if self.period <= 0:
+            return None
+        if self.value is None:
+            self._seed_sum += value
+            self._seed_n += 1
+            if self._seed_n < self.period:
+                return None
+            self.value = self._seed_sum / self.period
+            return self.value
+        self.value = value * self.alpha + self.value * (1 - self.alpha)
+        return self.value
+
+
+class _BandsView(Sequence):
+    """Read-only, oldest-first view over a SuperTrend band ring (no copying).
+
+    The view is live: it always shows the most recent ``len(view)`` bands.
+    Use ``list(view)`` to take a snapshot.
+    """
+    __slots__ = ('_st', '_n')
+
+    def __init__(self, st, n):
+        self._st = st
+        self._n = n
+
+    def __len__(self):
+        return min(self._n, self._st._size)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        n = len(self)
+        if idx < 0:
+            idx += n
+        if idx < 0 or idx >= n:
+            raise IndexError('band index out of range')
+        st = self._st
+        pos = (st._head - n + idx) % st.history
+        return {
+            'upper': st._upper_ring[pos],
+            'lower': st._lower_ring[pos],
+            'value': st._value_ring[pos],
+            'direction': st._dir_ring[pos],
+        }
+
+
+class SuperTrend(_Stateful):
+    """SuperTrend with constant-size state.
+
+    Running values are plain slot scalars; the last ``history`` bands are kept
+    in preallocated ring arrays so updates never allocate or re-slice.
+    """
+    __slots__ = (
+        'period', 'multiplier', 'history', 'direction', 'value', 'atr', 'count',
+        '_prev_close', '_tr_sum', '_upper', '_lower',
+        '_upper_ring', '_lower_ring', '_value_ring', '_dir_ring', '_head', '_size',
+    )
+    _STATE_PARAMS = ('period', 'multiplier', 'history')
+
+    def __init__(self, period=7, multiplier=4, history=100):
         self.period = period
         self.multiplier = multiplier
-        self.candles = []
-        self.atr_values = []
-        self.supertrend_values = []
-        self.direction = 1  # 1 = GREEN (bullish), -1 = RED (bearish)
+        self.history = max(1, int(history))
+        self._upper_ring = array('d', bytes(8 * self.history))
+        self._lower_ring = array('d', bytes(8 * self.history))
+        self._value_ring = array('d', bytes(8 * self.history))
+        self._dir_ring = array('b', bytes(self.history))
+        self.reset()
     
     def reset(self):
         """Reset indicator state"""
-        self.candles = []
-        self.atr_values = []
-        self.supertrend_values = []
-        self.direction = 1
+        self.direction = 1  # 1 = GREEN (bullish), -1 = RED (bearish)
+        self.value = None
+        self.atr = None
+        self.count = 0
+        self._prev_close = None
+        self._tr_sum = 0.0
+        self._upper = None
+        self._lower = None
+        self._head = 0
+        self._size = 0
+
+    @property
+    def ready(self):
+        return self.count >= self.period
+
+    def bands(self, n=None):
+        """Read-only view of the last ``n`` bands (default: all retained)."""
+        return _BandsView(self, self.history if n is None else max(0, int(n)))
+
+    @property
+    def supertrend_values(self):
+        return self.bands()
     
     def add_candle(self, high, low, close):
         """Add a new candle and calculate SuperTrend"""
-        self.candles.append({'high': high, 'low': low, 'close': close})
-        
-        if len(self.candles) < self.period:
-            return None, None
-        
-        # Calculate True Range
-        tr = max(
-            high - low,
-            abs(high - self.candles[-2]['close']) if len(self.candles) > 1 else 0,
-            abs(low - self.candles[-2]['close']) if len(self.candles) > 1 else 0
-        )
-        
-        # Calculate ATR
-        if len(self.atr_values) == 0:
-            # Initial ATR is simple average of TR
-            trs = []
-            for i in range(max(0, len(self.candles) - self.period), len(self.candles)):
-                if i > 0:
-                    prev = self.candles[i-1]
-                    curr = self.candles[i]
-                    tr_val = max(
-                        curr['high'] - curr['low'],
-                        abs(curr['high'] - prev['close']),
-                        abs(curr['low'] - prev['close'])
-                    )
-                else:
-                    tr_val = self.candles[i]['high'] - self.candles[i]['low']
-                trs.append(tr_val)
-            atr = sum(trs) / len(trs) if trs else 0
+        prev_close = self._prev_close
+        if prev_close is None:
+            tr = high - low
         else:
-            atr = (self.atr_values[-1] * (self.period - 1) + tr) / self.period
-        
-        self.atr_values.append(atr)
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        self._prev_close = close
+        self.count += 1
+
+        period = self.period
+        first = self.atr is None
+        if first:
+            # Initial ATR is simple average of the first `period` TRs
+            self._tr_sum += tr
+            if self.count < period:
+                return None, None
+            atr = self._tr_sum / period if period > 0 else 0
+        else:
+            atr = (self.atr * (period - 1) + tr) / period
+        self.atr = atr
         
         # Calculate basic upper and lower bands
         hl2 = (high + low) / 2
         basic_upper = hl2 + (self.multiplier * atr)
         basic_lower = hl2 - (self.multiplier * atr)
         
-        # Final bands calculation
-        if len(self.supertrend_values) == 0:
+        # Final bands and direction
+        if first:
             final_upper = basic_upper
             final_lower = basic_lower
-        else:
-            prev = self.supertrend_values[-1]
-            prev_close = self.candles[-2]['close']
-            
-            final_lower = basic_lower if basic_lower > prev['lower'] or prev_close < prev['lower'] else prev['lower']
-            final_upper = basic_upper if basic_upper < prev['upper'] or prev_close > prev['upper'] else prev['upper']
-        
-        # Direction
-        if len(self.supertrend_values) == 0:
             direction = 1 if close > final_upper else -1
         else:
-            prev = self.supertrend_values[-1]
-            if prev['direction'] == 1:
+            prev_upper = self._upper
+            prev_lower = self._lower
+            final_lower = basic_lower if basic_lower > prev_lower or prev_close < prev_lower else prev_lower
+            final_upper = basic_upper if basic_upper < prev_upper or prev_close > prev_upper else prev_upper
+            if self.direction == 1:
                 direction = -1 if close < final_lower else 1
             else:
                 direction = 1 if close > final_upper else -1
         
         self.direction = direction
+        self._upper = final_upper
+        self._lower = final_lower
         supertrend_value = final_lower if direction == 1 else final_upper
-        
-        self.supertrend_values.append({
-            'upper': final_upper,
-            'lower': final_lower,
-            'value': supertrend_value,
-            'direction': direction
-        })
-        
-        # Keep only last 100 values
-        if len(self.candles) > 100:
-            self.candles = self.candles[-100:]
-            self.atr_values = self.atr_values[-100:]
-            self.supertrend_values = self.supertrend_values[-100:]
+        self.value = supertrend_value
+
+        i = self._head
+        self._upper_ring[i] = final_upper
+        self._lower_ring[i] = final_lower
+        self._value_ring[i] = supertrend_value
+        self._dir_ring[i] = direction
+        self._head = (i + 1) % self.history
+        if self._size < self.history:
+            self._size += 1
         
         signal = "GREEN" if direction == 1 else "RED"
         return supertrend_value, signal
 
-class RSI:
-    """Relative Strength Index Indicator"""
-    def __init__(self, period=14):
+    def add_candles(self, highs, lows, closes):
+        """Batch add_candle over arrays.
+
+        Returns per-candle arrays {'value', 'upper', 'lower', 'direction'}
+        (NaN / 0 while warming up) and leaves the indicator in exactly the
+        state the streaming path would reach.
+        """
+        h, l, c = _as_float_arrays(highs, lows, closes)
+        n = len(c)
+        tr = _true_range(h, l, c, self._prev_close).tolist()
+        hl2 = ((h + l) / 2).tolist()
+        cl = c.tolist()
+
+        period = self.period
+        mult = self.multiplier
+        count = self.count
+        atr = self.atr
+        tr_sum = self._tr_sum
+        upper = self._upper
+        lower = self._lower
+        direction = self.direction
+        prev_close = self._prev_close
+        ups, lows_, dirs = [], [], []
+
+        for i in range(n):
+            close = cl[i]
+            count += 1
+            if atr is None:
+                tr_sum += tr[i]
+                if count < period:
+                    prev_close = close
+                    continue
+                atr = tr_sum / period if period > 0 else 0
+                upper = hl2[i] + (mult * atr)
+                lower = hl2[i] - (mult * atr)
+                direction = 1 if close > upper else -1
+            else:
+                atr = (atr * (period - 1) + tr[i]) / period
+                basic_upper = hl2[i] + (mult * atr)
+                basic_lower = hl2[i] - (mult * atr)
+                lower = basic_lower if basic_lower > lower or prev_close < lower else lower
+                upper = basic_upper if basic_upper < upper or prev_close > upper else upper
+                if direction == 1:
+                    direction = -1 if close < lower else 1
+                else:
+                    direction = 1 if close > upper else -1
+            prev_close = close
+            ups.append(upper)
+            lows_.append(lower)
+            dirs.append(direction)
+
+        self.count = count
+        self.atr = atr
+        self._tr_sum = tr_sum
+        self._upper = upper
+        self._lower = lower
+        self.direction = direction
+        self._prev_close = prev_close
+
+        upper_arr = _nan_list(ups, n)
+        lower_arr = _nan_list(lows_, n)
+        dir_arr = np.zeros(n, dtype=np.int8)
+        if dirs:
+            dir_arr[n - len(dirs):] = dirs
+        value_arr = np.where(dir_arr == 1, lower_arr, upper_arr)
+        if dirs:
+            self.value = float(value_arr[-1])
+
+        # Replay only the retained tail into the band ring
+        vals = value_arr.tolist()
+        head = self._head
+        offset = n - len(dirs)
+        for j in range(max(0, len(dirs) - self.history), len(dirs)):
+            i = (head + j) % self.history
+            self._upper_ring[i] = ups[j]
+            self._lower_ring[i] = lows_[j]
+            self._value_ring[i] = vals[offset + j]
+            self._dir_ring[i] = dirs[j]
+        self._head = (head + len(dirs)) % self.history
+        self._size = min(self.history, self._size + len(dirs))
+
+        return {'value': value_arr, 'upper': upper_arr, 'lower': lower_arr, 'direction': dir_arr}
+
+
+class RSI(_Stateful):
+    """Relative Strength Index Indicator
+
+    smoothing='wilder' (default) keeps Wilder-smoothed average gain/loss in
+    O(1) state. smoothing='simple' reproduces the legacy output: a plain
+    average of the last `period` gains/losses (kept in a `period`-sized
+    window, independent of history length).
+    """
+    __slots__ = ('period', 'smoothing', 'value', 'count', '_prev_close',
+                 '_avg_gain', '_avg_loss', '_gains', '_losses')
+    _STATE_PARAMS = ('period', 'smoothing')
+
+    def __init__(self, period=14, smoothing='wilder'):
+        if smoothing not in ('wilder', 'simple'):
+            raise ValueError(f"Unsupported RSI smoothing: {smoothing}")
         self.period = period
-        self.closes = []
-        self.rsi_values = []
+        self.smoothing = smoothing
+        self._gains = deque(maxlen=max(1, period))
+        self._losses = deque(maxlen=max(1, period))
+        self.reset()
     
     def reset(self):
-        self.closes = []
-        self.rsi_values = []
+        self.value = None
+        self.count = 0
+        self._prev_close = None
+        self._avg_gain = None
+        self._avg_loss = None
+        self._gains.clear()
+        self._losses.clear()
     
     def add_candle(self, high, low, close):
         """Add candle and calculate RSI"""
-        self.closes.append(close)
-        
-        if len(self.closes) < self.period + 1:
+        prev_close = self._prev_close
+        self._prev_close = close
+        self.count += 1
+        if prev_close is None:
             return None, None
+
+        change = close - prev_close
+        gain = max(0, change)
+        loss = max(0, -change)
+        period = self.period
+
+        if self.smoothing == 'simple' or self._avg_gain is None:
+            self._gains.append(gain)
+            self._losses.append(loss)
         
-        # Calculate gains and losses
-        gains = []
-        losses = []
-        for i in range(1, len(self.closes)):
-            change = self.closes[i] - self.closes[i-1]
-            gains.append(max(0, change))
-            losses.append(max(0, -change))
-        
-        # Average gain and loss
-        avg_gain = sum(gains[-self.period:]) / self.period if self.period > 0 else 0
-        avg_loss = sum(losses[-self.period:]) / self.period if self.period > 0 else 0
-        
-        # RS and RSI
-        rs = avg_gain / avg_loss if avg_loss > 0 else 0
-        rsi = 100 - (100 / (1 + rs)) if rs > 0 else 50
+        if self.count < period + 1:
+            return None, None
+
+        if self.smoothing == 'simple':
+            avg_gain = sum(self._gains) / period if period > 0 else 0
+            avg_loss = sum(self._losses) / period if period > 0 else 0
+            # Legacy mapping: no losses (or no gains) reads as neutral 50
+            rs = avg_gain / avg_loss if avg_loss > 0 else 0
+            rsi = 100 - (100 / (1 + rs)) if rs > 0 else 50
+        else:
+            if self._avg_gain is None:
+                # Seed with simple average of the first `period` changes
+                avg_gain = sum(self._gains) / period if period > 0 else 0
+                avg_loss = sum(self._losses) / period if period > 0 else 0
+                self._gains.clear()
+                self._losses.clear()
+            else:
+                avg_gain = (self._avg_gain * (period - 1) + gain) / period
+                avg_loss = (self._avg_loss * (period - 1) + loss) / period
+            self._avg_gain = avg_gain
+            self._avg_loss = avg_loss
+
+            if avg_loss > 0:
+                rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+            else:
+                rsi = 100 if avg_gain > 0 else 50
         
-        self.rsi_values.append(rsi)
+        self.value = rsi
         
         # Signal: GREEN if RSI < 30 (oversold), RED if RSI > 70 (overbought)
         if rsi < 30:
@@ -147,186 +440,432 @@ class RSI:
         return rsi, signal
 
 
-class MACD:
-    """Moving Average Convergence Divergence"""
-    def __init__(self, fast=12, slow=26, signal=9):
-        self.fast = fast
-        self.slow = slow
-        self.signal_period = signal
-        self.closes = []
-        self.macd_values = []
+    def add_candles(self, highs, lows, closes):
+        """Batch add_candle over arrays; returns {'rsi', 'signal'} arrays.
 
-        # Latest computed values (for entry confirmation & telemetry)
-        self.last_macd = None
-        self.last_signal_line = None
-        self.last_histogram = None
-        self.last_cross = None
+        Wilder smoothing runs as a tight scalar recurrence over NumPy-computed
+        gains/losses; the legacy 'simple' mode replays add_candle.
+        """
+        h, l, c = _as_float_arrays(highs, lows, closes)
+        n = len(c)
+        if self.smoothing == 'simple':
+            rsi = np.full(n, np.nan)
+            sig = np.zeros(n, dtype=np.int8)
+            for i, (hi, lo, cl) in enumerate(zip(h.tolist(), l.tolist(), c.tolist())):
+                v, s = self.add_candle(hi, lo, cl)
+                if v is not None:
+                    rsi[i] = v
+                    sig[i] = SIGNAL_CODES[s]
+            return {'rsi': rsi, 'signal': sig}
 
-        self._fast_ema = None
-        self._slow_ema = None
-        self._signal_ema = None
+        change = c - _prev_closes(c, self._prev_close)
+        gains = np.maximum(change, 0.0).tolist()
+        losses = np.maximum(-change, 0.0).tolist()
+        period = self.period
+        count = self.count
+        avg_gain = self._avg_gain
+        avg_loss = self._avg_loss
+        out = []
 
-        self._fast_seed = []
-        self._slow_seed = []
-        self._signal_seed = []
+        for i in range(n):
+            count += 1
+            if count == 1:
+                continue  # first close ever: no change yet
+            if avg_gain is None:
+                self._gains.append(gains[i])
+                self._losses.append(losses[i])
+                if count < period + 1:
+                    continue
+                avg_gain = sum(self._gains) / period if period > 0 else 0
+                avg_loss = sum(self._losses) / period if period > 0 else 0
+                self._gains.clear()
+                self._losses.clear()
+            else:
+                avg_gain = (avg_gain * (period - 1) + gains[i]) / period
+                avg_loss = (avg_loss * (period - 1) + losses[i]) / period
+            if avg_loss > 0:
+                out.append(100 - (100 / (1 + avg_gain / avg_loss)))
+            else:
+                out.append(100 if avg_gain > 0 else 50)
 
-        self._last_relation = None  # 1 bullish (macd>=signal), -1 bearish
+        self.count = count
+        self._avg_gain = avg_gain
+        self._avg_loss = avg_loss
+        if n:
+            self._prev_close = float(c[-1])
+        rsi = _nan_list(out, n)
+        if out:
+            self.value = out[-1]
+        sig = np.zeros(n, dtype=np.int8)
+        sig[rsi < 30] = 1
+        sig[rsi > 70] = -1
+        return {'rsi': rsi, 'signal': sig}
+
+
+class MACD(_Stateful):
+    """Moving Average Convergence Divergence
+
+    Constant-size state: three SMA-seeded EMAs (fast, slow, and signal over
+    the MACD line). With history > 0 the last `history` (macd, signal,
+    histogram) triples are also kept in preallocated rings; see recent().
+    """
+    __slots__ = (
+        'fast', 'slow', 'signal_period', 'history',
+        'last_macd', 'last_signal_line', 'last_histogram', 'last_cross',
+        '_fast', '_slow', '_signal', '_last_relation',
+        '_macd_ring', '_signal_ring', '_hist_ring', '_head', '_size',
+    )
+    _STATE_PARAMS = ('fast', 'slow', 'signal_period', 'history')
+
+    def __init__(self, fast=12, slow=26, signal=9, history=0):
+        self.fast = fast
+        self.slow = slow
+        self.signal_period = signal
+        self.history = max(0, int(history))
+        self._fast = _EMA(fast)
+        self._slow = _EMA(slow)
+        self._signal = _EMA(signal)
+        self._macd_ring = array('d', bytes(8 * self.history))
+        self._signal_ring = array('d', bytes(8 * self.history))
+        self._hist_ring = array('d', bytes(8 * self.history))
+        self.reset()
     
     def reset(self):
-        self.closes = []
-        self.macd_values = []
-
+        # Latest computed values (for entry confirmation & telemetry)
         self.last_macd = None
         self.last_signal_line = None
         self.last_histogram = None
         self.last_cross = None
 
-        self._fast_ema = None
-        self._slow_ema = None
-        self._signal_ema = None
+        self._fast.reset()
+        self._slow.reset()
+        self._signal.reset()
+        self._last_relation = None  # 1 bullish (macd>=signal), -1 bearish
+        self._head = 0
+        self._size = 0
 
-        self._fast_seed = []
-        self._slow_seed = []
-        self._signal_seed = []
+    def recent(self, n=None):
+        """Oldest-first list of the last `n` {'macd', 'signal_line', 'histogram'} (history > 0 only)."""
+        n = self._size if n is None else max(0, min(int(n), self._size))
+        out = []
+        for k in range(n):
+            pos = (self._head - n + k) % self.history
+            sig = self._signal_ring[pos]
+            hist = self._hist_ring[pos]
+            out.append({
+                'macd': self._macd_ring[pos],
+                'signal_line': None if sig != sig else sig,
+                'histogram': None if hist != hist else hist,
+            })
+        return out
 
-        self._last_relation = None
-    
-    def _update_ema(self, current_ema, value, period, seed_list):
-        """Incremental EMA update with SMA seeding."""
-        if period <= 0:
-            return None
-
-        alpha = 2 / (period + 1)
-        if current_ema is None:
-            seed_list.append(value)
-            if len(seed_list) < period:
-                return None
-            if len(seed_list) == period:
-                return sum(seed_list) / period
-            # Should not normally exceed, but keep stable if it does
-            return sum(seed_list[-period:]) / period
-        return value * alpha + current_ema * (1 - alpha)
+    def _record(self, macd, signal_line, histogram):
+        i = self._head
+        self._macd_ring[i] = macd
+        self._signal_ring[i] = np.nan if signal_line is None else signal_line
+        self._hist_ring[i] = np.nan if histogram is None else histogram
+        self._head = (i + 1) % self.history
+        if self._size < self.history:
+            self._size += 1
     
     def add_candle(self, high, low, close):
         """Add candle and calculate MACD"""
-        self.closes.append(close)
+        fast_ema = self._fast.update(close)
+        slow_ema = self._slow.update(close)
 
-        # Update fast/slow EMAs
-        self._fast_ema = self._update_ema(self._fast_ema, close, self.fast, self._fast_seed)
-        self._slow_ema = self._update_ema(self._slow_ema, close, self.slow, self._slow_seed)
-
-        if self._fast_ema is None or self._slow_ema is None:
+        if fast_ema is None or slow_ema is None:
             self.last_macd = None
             self.last_signal_line = None
             self.last_histogram = None
             self.last_cross = None
             return None, None
 
-        macd = self._fast_ema - self._slow_ema
-        self.macd_values.append(macd)
+        macd = fast_ema - slow_ema
 
         # Update signal line EMA over MACD values
-        self._signal_ema = self._update_ema(self._signal_ema, macd, self.signal_period, self._signal_seed)
+        signal_ema = self._signal.update(macd)
 
         cross = None
         histogram = None
-        relation = None
 
-        if self._signal_ema is not None:
-            histogram = macd - self._signal_ema
-            relation = 1 if macd >= self._signal_ema else -1
+        if signal_ema is not None:
+            histogram = macd - signal_ema
+            relation = 1 if macd >= signal_ema else -1
             if self._last_relation is not None and relation != self._last_relation:
                 cross = "GREEN" if relation == 1 else "RED"
             self._last_relation = relation
 
         self.last_macd = macd
-        self.last_signal_line = self._signal_ema
+        self.last_signal_line = signal_ema
         self.last_histogram = histogram
         self.last_cross = cross
+        if self.history:
+            self._record(macd, signal_ema, histogram)
 
         return macd, cross
 
 
-class MovingAverage:
-    """Exponential Moving Average based entries"""
-    def __init__(self, fast_period=5, slow_period=20):
+    def add_candles(self, highs, lows, closes):
+        """Batch add_candle over arrays.
+
+        Returns {'macd', 'signal_line', 'histogram', 'cross'} arrays (NaN / 0
+        while warming up); end state matches the streaming path exactly.
+        """
+        _h, _l, c = _as_float_arrays(highs, lows, closes)
+        n = len(c)
+        cl = c.tolist()
+
+        fast, slow, sig = self._fast, self._slow, self._signal
+        a_fast, a_slow, a_sig = fast.alpha, slow.alpha, sig.alpha
+        fast_ema, slow_ema, sig_ema = fast.value, slow.value, sig.value
+        relation = self._last_relation
+        macd_out = [np.nan] * n
+        sig_out = [np.nan] * n
+        hist_out = [np.nan] * n
+        cross_out = [0] * n
+        macd = hist = cross = None
+
+        for i in range(n):
+            x = cl[i]
+            # Seeding goes through _EMA.update; seeded EMAs are updated inline (same arithmetic)
+            if fast_ema is None:
+                fast_ema = fast.update(x)
+            else:
+                fast_ema = x * a_fast + fast_ema * (1 - a_fast)
+            if slow_ema is None:
+                slow_ema = slow.update(x)
+            else:
+                slow_ema = x * a_slow + slow_ema * (1 - a_slow)
+            if fast_ema is None or slow_ema is None:
+                macd = hist = cross = None
+                continue
+
+            macd = fast_ema - slow_ema
+            if sig_ema is None:
+                sig_ema = sig.update(macd)
+            else:
+                sig_ema = macd * a_sig + sig_ema * (1 - a_sig)
+
+            cross = None
+            hist = None
+            if sig_ema is not None:
+                hist = macd - sig_ema
+                r = 1 if macd >= sig_ema else -1
+                if relation is not None and r != relation:
+                    cross = "GREEN" if r == 1 else "RED"
+                    cross_out[i] = r
+                relation = r
+                sig_out[i] = sig_ema
+                hist_out[i] = hist
+            macd_out[i] = macd
+
+        fast.value, slow.value, sig.value = fast_ema, slow_ema, sig_ema
+        self._last_relation = relation
+        if n:
+            self.last_macd = macd
+            self.last_signal_line = sig_ema if macd is not None else None
+            self.last_histogram = hist
+            self.last_cross = cross
+
+        if self.history:
+            # Once ready the MACD line stays ready: the last m candles are the recorded ones.
+            # Write only the retained tail, into the same ring slots streaming would use.
+            m = n - next((i for i in range(n) if macd_out[i] == macd_out[i]), n)
+            head = self._head
+            for j in range(max(0, m - self.history), m):
+                i = n - m + j
+                pos = (head + j) % self.history
+                self._macd_ring[pos] = macd_out[i]
+                self._signal_ring[pos] = sig_out[i]
+                self._hist_ring[pos] = hist_out[i]
+            self._head = (head + m) % self.history
+            self._size = min(self.history, self._size + m)
+
+        return {
+            'macd': np.array(macd_out, dtype=np.float64),
+            'signal_line': np.array(sig_out, dtype=np.float64),
+            'histogram': np.array(hist_out, dtype=np.float64),
+            'cross': np.array(cross_out, dtype=np.int8),
+        }
+
+
+class MovingAverage(_Stateful):
+    """Exponential Moving Average based entries
+
+    Streaming fast/slow EMA crossover. Both EMAs are SMA-seeded exactly like
+    MACD and updated in O(1). With signal_on_cross=True the signal is only
+    emitted on the candle where fast crosses slow; otherwise it follows the
+    fast/slow relation every candle. `last_cross` always records the event.
+    """
+    __slots__ = ('fast_period', 'slow_period', 'signal_on_cross', '_fast', '_slow',
+                 'fast_ema', 'slow_ema', 'last_cross', '_last_relation')
+    _STATE_PARAMS = ('fast_period', 'slow_period', 'signal_on_cross')
+
+    def __init__(self, fast_period=5, slow_period=20, signal_on_cross=False):
         self.fast_period = fast_period
         self.slow_period = slow_period
-        self.closes = []
-        self.fast_emas = []
-        self.slow_emas = []
+        self.signal_on_cross = bool(signal_on_cross)
+        self._fast = _EMA(fast_period)
+        self._slow = _EMA(slow_period)
+        self.reset()
     
     def reset(self):
-        self.closes = []
-        self.fast_emas = []
-        self.slow_emas = []
-    
-    def _ema(self, values, period):
-        """Calculate EMA"""
-        if len(values) < period:
-            return None
-        
-        alpha = 2 / (period + 1)
-        ema = sum(values[-period:]) / period
-        for val in values[-len(values)+period:]:
-            ema = val * alpha + ema * (1 - alpha)
-        return ema
+        self._fast.reset()
+        self._slow.reset()
+        self.fast_ema = None
+        self.slow_ema = None
+        self.last_cross = None
+        self._last_relation = None
     
     def add_candle(self, high, low, close):
         """Add candle and calculate moving averages"""
-        self.closes.append(close)
-        
-        if len(self.closes) < self.slow_period:
-            return None, None
-        
-        fast_ema = self._ema(self.closes, self.fast_period)
-        slow_ema = self._ema(self.closes, self.slow_period)
+        fast_ema = self._fast.update(close)
+        slow_ema = self._slow.update(close)
+        self.fast_ema = fast_ema
+        self.slow_ema = slow_ema
         
         if fast_ema is None or slow_ema is None:
+            self.last_cross = None
             return None, None
         
-        self.fast_emas.append(fast_ema)
-        self.slow_emas.append(slow_ema)
-        
         # Signal: GREEN if fast > slow (uptrend), RED if fast < slow (downtrend)
         if fast_ema > slow_ema:
-            signal = "GREEN"
+            relation = 1
         elif fast_ema < slow_ema:
-            signal = "RED"
+            relation = -1
         else:
-            signal = None
+            relation = 0
+
+        cross = None
+        if relation != 0:
+            if self._last_relation is not None and relation != self._last_relation:
+                cross = "GREEN" if relation == 1 else "RED"
+            self._last_relation = relation
+        self.last_cross = cross
+
+        if self.signal_on_cross:
+            signal = cross
+        else:
+            signal = "GREEN" if relation == 1 else ("RED" if relation == -1 else None)
         
         return fast_ema, signal
 
 
-class BollingerBands:
-    """Bollinger Bands - Volatility based indicator"""
+    def add_candles(self, highs, lows, closes):
+        """Batch add_candle over arrays; returns {'fast_ema', 'slow_ema', 'signal', 'cross'}."""
+        _h, _l, c = _as_float_arrays(highs, lows, closes)
+        n = len(c)
+        cl = c.tolist()
+        fast, slow = self._fast, self._slow
+        fv, sv = fast.value, slow.value
+        a_fast, a_slow = fast.alpha, slow.alpha
+        relation = self._last_relation
+        fast_out = [np.nan] * n
+        slow_out = [np.nan] * n
+        signal_out = [0] * n
+        cross_out = [0] * n
+        cross = None
+
+        for i in range(n):
+            x = cl[i]
+            fv = fast.update(x) if fv is None else x * a_fast + fv * (1 - a_fast)
+            sv = slow.update(x) if sv is None else x * a_slow + sv * (1 - a_slow)
+            if fv is None or sv is None:
+                cross = None
+                continue
+            fast_out[i] = fv
+            slow_out[i] = sv
+            r = 1 if fv > sv else (-1 if fv < sv else 0)
+            cross = None
+            if r != 0:
+                if relation is not None and r != relation:
+                    cross = "GREEN" if r == 1 else "RED"
+                    cross_out[i] = r
+                relation = r
+            signal_out[i] = cross_out[i] if self.signal_on_cross else r
+
+        fast.value, slow.value = fv, sv
+        self.fast_ema, self.slow_ema = fv, sv
+        self._last_relation = relation
+        if n:
+            self.last_cross = cross
+        return {
+            'fast_ema': np.array(fast_out, dtype=np.float64),
+            'slow_ema': np.array(slow_out, dtype=np.float64),
+            'signal': np.array(signal_out, dtype=np.int8),
+            'cross': np.array(cross_out, dtype=np.int8),
+        }
+
+
+class BollingerBands(_Stateful):
+    """Bollinger Bands - Volatility based indicator
+
+    Sliding-window mean/variance from running sums over a fixed deque. Sums
+    are taken relative to a shift value (avoids cancellation at index price
+    levels) and rebuilt exactly once per `period` candles, so error cannot
+    accumulate; the rebuild is amortized O(1).
+    """
+    __slots__ = ('period', 'num_std', 'value', '_window', '_shift', '_sum', '_sumsq', '_since_rebase')
+    _STATE_PARAMS = ('period', 'num_std')
+
     def __init__(self, period=20, num_std=2):
         self.period = period
         self.num_std = num_std
-        self.closes = []
-        self.bands = []
+        self._window = deque(maxlen=max(1, period))
+        self.reset()
     
     def reset(self):
-        self.closes = []
-        self.bands = []
+        self.value = None
+        self._window.clear()
+        self._shift = None
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._since_rebase = 0
+
+    def _rebase(self):
+        window = self._window
+        shift = sum(window) / len(window)
+        s = 0.0
+        sq = 0.0
+        for c in window:
+            d = c - shift
+            s += d
+            sq += d * d
+        self._shift = shift
+        self._sum = s
+        self._sumsq = sq
+        self._since_rebase = 0
     
     def add_candle(self, high, low, close):
         """Add candle and calculate Bollinger Bands"""
-        self.closes.append(close)
+        window = self._window
+        if self._shift is None:
+            self._shift = close
+        if len(window) == window.maxlen:
+            d = window[0] - self._shift
+            self._sum -= d
+            self._sumsq -= d * d
+        window.append(close)
+        d = close - self._shift
+        self._sum += d
+        self._sumsq += d * d
+        self._since_rebase += 1
+        if self._since_rebase >= window.maxlen:
+            self._rebase()
         
-        if len(self.closes) < self.period:
+        if len(window) < self.period:
             return None, None
         
-        # Calculate SMA and std dev
-        sma = sum(self.closes[-self.period:]) / self.period
-        variance = sum((c - sma) ** 2 for c in self.closes[-self.period:]) / self.period
+        # SMA and population std dev over the window
+        mean_d = self._sum / self.period
+        sma = self._shift + mean_d
+        variance = max(0.0, self._sumsq / self.period - mean_d * mean_d)
         std_dev = variance ** 0.5
         
         upper = sma + (std_dev * self.num_std)
         lower = sma - (std_dev * self.num_std)
         
-        self.bands.append({'upper': upper, 'lower': lower, 'middle': sma})
+        self.value = {'upper': upper, 'lower': lower, 'middle': sma}
         
         # Signal: GREEN if close < lower (oversold), RED if close > upper (overbought)
         if close < lower:
@@ -336,46 +875,122 @@ class BollingerBands:
         else:
             signal = None
         
-        return {'upper': upper, 'lower': lower, 'middle': sma}, signal
+        return self.value, signal
+
+
+    def add_candles(self, highs, lows, closes):
+        """Batch add_candle over arrays; returns {'upper', 'lower', 'middle', 'signal'}."""
+        _h, _l, c = _as_float_arrays(highs, lows, closes)
+        n = len(c)
+        cl = c.tolist()
+        window = self._window
+        maxlen = window.maxlen
+        period = self.period
+        num_std = self.num_std
+        shift, s, sq, since = self._shift, self._sum, self._sumsq, self._since_rebase
+        upper_out = [np.nan] * n
+        lower_out = [np.nan] * n
+        middle_out = [np.nan] * n
+        last = None
+
+        for i in range(n):
+            x = cl[i]
+            if shift is None:
+                shift = x
+            if len(window) == maxlen:
+                d = window[0] - shift
+                s -= d
+                sq -= d * d
+            window.append(x)
+            d = x - shift
+            s += d
+            sq += d * d
+            since += 1
+            if since >= maxlen:
+                self._rebase()
+                shift, s, sq, since = self._shift, self._sum, self._sumsq, 0
+            if len(window) < period:
+                continue
+            mean_d = s / period
+            sma = shift + mean_d
+            std_dev = max(0.0, sq / period - mean_d * mean_d) ** 0.5
+            upper_out[i] = sma + (std_dev * num_std)
+            lower_out[i] = sma - (std_dev * num_std)
+            middle_out[i] = sma
+            last = i
+
+        self._shift, self._sum, self._sumsq, self._since_rebase = shift, s, sq, since
+        if last is not None:
+            self.value = {'upper': upper_out[last], 'lower': lower_out[last], 'middle': middle_out[last]}
+        upper = np.array(upper_out, dtype=np.float64)
+        lower = np.array(lower_out, dtype=np.float64)
+        signal = np.zeros(n, dtype=np.int8)
+        signal[c < lower] = 1
+        signal[c > upper] = -1
+        return {'upper': upper, 'lower': lower, 'middle': np.array(middle_out, dtype=np.float64), 'signal': signal}
 
 
-class Stochastic:
-    """Stochastic Oscillator"""
+class Stochastic(_Stateful):
+    """Stochastic Oscillator
+
+    Rolling highest-high / lowest-low via monotonic deques (amortized O(1));
+    %D is the mean of a `d_period`-sized window of %K values.
+    """
+    __slots__ = ('k_period', 'd_period', 'k', 'd', 'count', '_max_q', '_min_q', '_k_window')
+    _STATE_PARAMS = ('k_period', 'd_period')
+
     def __init__(self, k_period=14, d_period=3):
         self.k_period = k_period
         self.d_period = d_period
-        self.highs = []
-        self.lows = []
-        self.closes = []
-        self.k_values = []
+        self._max_q = deque()  # (index, high), highs decreasing
+        self._min_q = deque()  # (index, low), lows increasing
+        self._k_window = deque(maxlen=max(1, d_period))
+        self.reset()
     
     def reset(self):
-        self.highs = []
-        self.lows = []
-        self.closes = []
-        self.k_values = []
+        self.k = None
+        self.d = None
+        self.count = 0
+        self._max_q.clear()
+        self._min_q.clear()
+        self._k_window.clear()
     
     def add_candle(self, high, low, close):
         """Add candle and calculate Stochastic"""
-        self.highs.append(high)
-        self.lows.append(low)
-        self.closes.append(close)
+        i = self.count
+        self.count += 1
+
+        max_q = self._max_q
+        while max_q and max_q[-1][1] <= high:
+            max_q.pop()
+        max_q.append((i, high))
+        min_q = self._min_q
+        while min_q and min_q[-1][1] >= low:
+            min_q.pop()
+        min_q.append((i, low))
+
+        oldest = i - self.k_period
+        if max_q[0][0] <= oldest:
+            max_q.popleft()
+        if min_q[0][0] <= oldest:
+            min_q.popleft()
         
-        if len(self.closes) < self.k_period:
+        if self.count < self.k_period:
             return None, None
         
         # Calculate K%
-        highest = max(self.highs[-self.k_period:])
-        lowest = min(self.lows[-self.k_period:])
+        highest = max_q[0][1]
+        lowest = min_q[0][1]
         
         k = ((close - lowest) / (highest - lowest) * 100) if (highest - lowest) > 0 else 50
-        self.k_values.append(k)
+        self.k = k
+        self._k_window.append(k)
         
         # Calculate D% (SMA of K)
-        if len(self.k_values) < self.d_period:
+        if len(self._k_window) < self.d_period:
             return k, None
         
-        d = sum(self.k_values[-self.d_period:]) / self.d_period
+        self.d = sum(self._k_window) / self.d_period
         
         # Signal: GREEN if K < 20 (oversold), RED if K > 80 (overbought)
         if k < 20:
@@ -388,60 +1003,177 @@ class Stochastic:
         return k, signal
 
 
-class ADX:
-    """Average Directional Index - Trend Strength"""
+    def add_candles(self, highs, lows, closes):
+        """Batch add_candle over arrays; returns {'k', 'd', 'signal'}.
+
+        Rolling extremes come from the monotonic deques; %K and %D are then
+        computed vectorized with the same arithmetic as the streaming path.
+        """
+        h, l, c = _as_float_arrays(highs, lows, closes)
+        n = len(c)
+        hl, ll = h.tolist(), l.tolist()
+        max_q, min_q = self._max_q, self._min_q
+        k_period = self.k_period
+        count = self.count
+        his, los = [], []
+
+        for j in range(n):
+            i = count
+            count += 1
+            high = hl[j]
+            low = ll[j]
+            while max_q and max_q[-1][1] <= high:
+                max_q.pop()
+            max_q.append((i, high))
+            while min_q and min_q[-1][1] >= low:
+                min_q.pop()
+            min_q.append((i, low))
+            oldest = i - k_period
+            if max_q[0][0] <= oldest:
+                max_q.popleft()
+            if min_q[0][0] <= oldest:
+                min_q.popleft()
+            if count >= k_period:
+                his.append(max_q[0][1])
+                los.append(min_q[0][1])
+        self.count = count
+
+        m = len(his)
+        k_new = np.empty(0)
+        if m:
+            hi = np.array(his)
+            lo = np.array(los)
+            rng = hi - lo
+            with np.errstate(divide='ignore', invalid='ignore'):
+                k_new = np.where(rng > 0, (c[n - m:] - lo) / rng * 100, 50.0)
+
+        # %D over the carried-in %K window followed by the new %K values
+        d_period = self.d_period
+        carried = list(self._k_window)
+        kk = np.concatenate([np.array(carried, dtype=np.float64), k_new])
+        d_new = np.full(m, np.nan)
+        if d_period > 0 and len(kk) >= d_period:
+            acc = np.zeros(len(kk) - d_period + 1)
+            for j in range(d_period):
+                acc = acc + kk[j:len(kk) - d_period + 1 + j]
+            d_all = acc / d_period  # d_all[t] is %D ending at kk[t + d_period - 1]
+            first = max(len(carried), d_period - 1)
+            d_new[first - len(carried):] = d_all[first - d_period + 1:]
+        self._k_window.extend(k_new.tolist())
+        if m:
+            self.k = float(k_new[-1])
+            if not np.isnan(d_new[-1]):
+                self.d = float(d_new[-1])
+
+        k_arr = np.full(n, np.nan)
+        d_arr = np.full(n, np.nan)
+        k_arr[n - m:] = k_new
+        d_arr[n - m:] = d_new
+        signal = np.zeros(n, dtype=np.int8)
+        ready = ~np.isnan(d_arr)
+        signal[ready & (k_arr < 20)] = 1
+        signal[ready & (k_arr > 80)] = -1
+        return {'k': k_arr, 'd': d_arr, 'signal': signal}
+
+
+class ADX(_Stateful):
+    """Average Directional Index - Trend Strength
+
+    Wilder's ADX: TR, +DM and -DM are Wilder-smoothed (running sums), giving
+    +DI/-DI and DX; ADX is the Wilder average of DX. Ready after 2*period
+    candles; O(1) state per update.
+    """
+    __slots__ = ('period', 'adx', 'plus_di', 'minus_di', 'dx', 'count',
+                 '_prev_high', '_prev_low', '_prev_close',
+                 '_sm_tr', '_sm_plus_dm', '_sm_minus_dm', '_dx_sum')
+    _STATE_PARAMS = ('period',)
+
     def __init__(self, period=14):
         self.period = period
-        self.highs = []
-        self.lows = []
-        self.closes = []
-        self.adx_values = []
+        self.reset()
     
     def reset(self):
-        self.highs = []
-        self.lows = []
-        self.closes = []
-        self.adx_values = []
+        self.adx = None
+        self.plus_di = None
+        self.minus_di = None
+        self.dx = None
+        self.count = 0
+        self._prev_high = None
+        self._prev_low = None
+        self._prev_close = None
+        self._sm_tr = 0.0
+        self._sm_plus_dm = 0.0
+        self._sm_minus_dm = 0.0
+        self._dx_sum = 0.0
+
+    def seed(self, candles):
+        """Bulk-feed historical (high, low, close) rows; returns the last add_candle result."""
+        rows = np.asarray(list(candles), dtype=np.float64).reshape(-1, 3)
+        if not len(rows):
+            return None, None
+        out = self.add_candles(rows[:, 0], rows[:, 1], rows[:, 2])
+        adx = out['adx'][-1]
+        if np.isnan(adx):
+            return None, None
+        return float(adx), ("GREEN" if adx > 25 else "RED")
     
     def add_candle(self, high, low, close):
         """Add candle and calculate ADX"""
-        self.highs.append(high)
-        self.lows.append(low)
-        self.closes.append(close)
-        
-        if len(self.closes) < self.period + 1:
+        prev_high = self._prev_high
+        prev_low = self._prev_low
+        prev_close = self._prev_close
+        self._prev_high = high
+        self._prev_low = low
+        self._prev_close = close
+        if prev_close is None:
             return None, None
-        
-        # Calculate directional movements
-        plus_dm = max(0, high - self.highs[-2]) if len(self.highs) > 1 else 0
-        minus_dm = max(0, self.lows[-2] - low) if len(self.lows) > 1 else 0
-        
-        if plus_dm > minus_dm:
-            minus_dm = 0
-        elif minus_dm > plus_dm:
-            plus_dm = 0
-        
-        # Calculate ATR
-        tr = max(
-            high - low,
-            abs(high - self.closes[-2]) if len(self.closes) > 1 else 0,
-            abs(low - self.closes[-2]) if len(self.closes) > 1 else 0
-        )
-        
-        # Simple ADX calculation (simplified)
-        if len(self.closes) >= self.period * 2:
-            recent_high = max(self.highs[-self.period:])
-            recent_low = min(self.lows[-self.period:])
-            adx = abs(recent_high - recent_low) / (sum([max(self.highs[i] - self.lows[i], 
-                                                              abs(self.highs[i] - self.closes[i-1]) if i > 0 else 0,
-                                                              abs(self.lows[i] - self.closes[i-1]) if i > 0 else 0) 
-                                                        for i in range(-self.period, 0)]) / self.period + 0.001) * 100
+
+        self.count += 1  # number of directional moves seen
+        period = self.period
+
+        # Directional movements
+        up = high - prev_high
+        down = prev_low - low
+        plus_dm = up if (up > down and up > 0) else 0.0
+        minus_dm = down if (down > up and down > 0) else 0.0
+        tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+        # Wilder smoothing: plain sums for the first `period` moves, then
+        # sm = sm - sm/period + current
+        if self.count <= period:
+            self._sm_tr += tr
+            self._sm_plus_dm += plus_dm
+            self._sm_minus_dm += minus_dm
+            if self.count < period:
+                return None, None
         else:
-            adx = 50  # Default middle value
-        
-        self.adx_values.append(adx)
+            self._sm_tr = self._sm_tr - self._sm_tr / period + tr
+            self._sm_plus_dm = self._sm_plus_dm - self._sm_plus_dm / period + plus_dm
+            self._sm_minus_dm = self._sm_minus_dm - self._sm_minus_dm / period + minus_dm
+
+        if self._sm_tr > 0:
+            plus_di = 100.0 * self._sm_plus_dm / self._sm_tr
+            minus_di = 100.0 * self._sm_minus_dm / self._sm_tr
+        else:
+            plus_di = minus_di = 0.0
+        di_sum = plus_di + minus_di
+        dx = 100.0 * abs(plus_di - minus_di) / di_sum if di_sum > 0 else 0.0
+        self.plus_di = plus_di
+        self.minus_di = minus_di
+        self.dx = dx
+
+        # ADX: mean of the first `period` DX values, then Wilder-smoothed
+        n_dx = self.count - period + 1
+        if n_dx < period:
+            self._dx_sum += dx
+            return None, None
+        if n_dx == period:
+            adx = (self._dx_sum + dx) / period
+        else:
+            adx = (self.adx * (period - 1) + dx) / period
+        self.adx = adx
         
-        # Signal: GREEN if ADX > 25 (strong uptrend), RED if ADX < 25 but trending down
+        # Signal: GREEN if ADX > 25 (strong trend), RED otherwise (weak trend)
         if adx > 25:
             signal = "GREEN"  # Strong trend
         else:
@@ -450,6 +1182,451 @@ class ADX:
         return adx, signal
 
 
+    def add_candles(self, highs, lows, closes):
+        """Batch add_candle over arrays; returns {'adx', 'plus_di', 'minus_di', 'signal'}.
+
+        DM/TR are computed vectorized; Wilder smoothing runs as a scalar
+        recurrence and leaves the same state as the streaming path.
+        """
+        h, l, c = _as_float_arrays(highs, lows, closes)
+        n = len(c)
+        if n == 0:
+            empty = np.empty(0)
+            return {'adx': empty, 'plus_di': empty, 'minus_di': empty, 'signal': np.empty(0, dtype=np.int8)}
+
+        skip_first = self._prev_close is None
+        prev_h = np.empty(n)
+        prev_l = np.empty(n)
+        prev_h[1:] = h[:-1]
+        prev_l[1:] = l[:-1]
+        prev_h[0] = np.nan if skip_first else self._prev_high
+        prev_l[0] = np.nan if skip_first else self._prev_low
+        up = h - prev_h
+        down = prev_l - l
+        plus_dm = np.where((up > down) & (up > 0), up, 0.0).tolist()
+        minus_dm = np.where((down > up) & (down > 0), down, 0.0).tolist()
+        tr = _true_range(h, l, c, self._prev_close).tolist()
+
+        period = self.period
+        count = self.count
+        sm_tr, sm_p, sm_m = self._sm_tr, self._sm_plus_dm, self._sm_minus_dm
+        dx_sum = self._dx_sum
+        adx = self.adx
+        plus_di = self.plus_di
+        minus_di = self.minus_di
+        dx = self.dx
+        adx_out = [np.nan] * n
+        pdi_out = [np.nan] * n
+        mdi_out = [np.nan] * n
+
+        for i in range(1 if skip_first else 0, n):
+            count += 1
+            if count <= period:
+                sm_tr += tr[i]
+                sm_p += plus_dm[i]
+                sm_m += minus_dm[i]
+                if count < period:
+                    continue
+            else:
+                sm_tr = sm_tr - sm_tr / period + tr[i]
+                sm_p = sm_p - sm_p / period + plus_dm[i]
+                sm_m = sm_m - sm_m / period + minus_dm[i]
+            if sm_tr > 0:
+                plus_di = 100.0 * sm_p / sm_tr
+                minus_di = 100.0 * sm_m / sm_tr
+            else:
+                plus_di = minus_di = 0.0
+            di_sum = plus_di + minus_di
+            dx = 100.0 * abs(plus_di - minus_di) / di_sum if di_sum > 0 else 0.0
+            pdi_out[i] = plus_di
+            mdi_out[i] = minus_di
+            n_dx = count - period + 1
+            if n_dx < period:
+                dx_sum += dx
+                continue
+            if n_dx == period:
+                adx = (dx_sum + dx) / period
+            else:
+                adx = (adx * (period - 1) + dx) / period
+            adx_out[i] = adx
+
+        self.count = count
+        self._sm_tr, self._sm_plus_dm, self._sm_minus_dm = sm_tr, sm_p, sm_m
+        self._dx_sum = dx_sum
+        self.adx, self.plus_di, self.minus_di, self.dx = adx, plus_di, minus_di, dx
+        self._prev_high, self._prev_low, self._prev_close = float(h[-1]), float(l[-1]), float(c[-1])
+
+        adx_arr = np.array(adx_out, dtype=np.float64)
+        signal = np.zeros(n, dtype=np.int8)
+        signal[adx_arr > 25] = 1
+        signal[adx_arr <= 25] = -1
+        return {
+            'adx': adx_arr,
+            'plus_di': np.array(pdi_out, dtype=np.float64),
+            'minus_di': np.array(mdi_out, dtype=np.float64),
+            'signal': signal,
+        }
+
+
+class ATR(_Stateful):
+    """Average True Range (Wilder)
+
+    The first ATR is the mean of the first `period` TRs, then Wilder-smoothed;
+    the very first candle's TR is high - low (same arithmetic as SuperTrend).
+    """
+    __slots__ = ('period', 'value', 'tr', 'count', '_prev_close', '_tr_sum')
+    _STATE_PARAMS = ('period',)
+
+    def __init__(self, period=14):
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.tr = None
+        self.count = 0
+        self._prev_close = None
+        self._tr_sum = 0.0
+
+    def add_candle(self, high, low, close):
+        """Add candle and calculate ATR (no signal)"""
+        prev_close = self._prev_close
+        if prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        self._prev_close = close
+        self.tr = tr
+        self.count += 1
+
+        period = self.period
+        if self.value is None:
+            self._tr_sum += tr
+            if self.count < period:
+                return None, None
+            self.value = self._tr_sum / period if period > 0 else 0
+        else:
+            self.value = (self.value * (period - 1) + tr) / period
+        return self.value, None
+
+    def add_candles(self, highs, lows, closes):
+        """Batch add_candle over arrays; returns {'atr', 'tr'} (ATR is NaN while warming up)."""
+        h, l, c = _as_float_arrays(highs, lows, closes)
+        n = len(c)
+        tr = _true_range(h, l, c, self._prev_close)
+        trl = tr.tolist()
+        period = self.period
+        count = self.count
+        value = self.value
+        tr_sum = self._tr_sum
+        out = [np.nan] * n
+
+        for i in range(n):
+            count += 1
+            if value is None:
+                tr_sum += trl[i]
+                if count < period:
+                    continue
+                value = tr_sum / period if period > 0 else 0
+            else:
+                value = (value * (period - 1) + trl[i]) / period
+            out[i] = value
+
+        self.count = count
+        self.value = value
+        self._tr_sum = tr_sum
+        if n:
+            self.tr = trl[-1]
+            self._prev_close = float(c[-1])
+        return {'atr': np.array(out, dtype=np.float64), 'tr': tr}
+
+
+class DonchianChannel(_Stateful):
+    """Donchian Channel - highest high / lowest low over `period` candles
+
+    Rolling extremes via monotonic deques (amortized O(1)). Signal is a
+    breakout of the previous candle's channel: GREEN when close > prior
+    upper, RED when close < prior lower.
+    """
+    __slots__ = ('period', 'value', 'upper', 'lower', 'middle', 'count', '_max_q', '_min_q')
+    _STATE_PARAMS = ('period',)
+
+    def __init__(self, period=20):
+        self.period = period
+        self._max_q = deque()  # (index, high), highs decreasing
+        self._min_q = deque()  # (index, low), lows increasing
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.upper = None
+        self.lower = None
+        self.middle = None
+        self.count = 0
+        self._max_q.clear()
+        self._min_q.clear()
+
+    def add_candle(self, high, low, close):
+        """Add candle and calculate the channel"""
+        i = self.count
+        self.count += 1
+
+        max_q = self._max_q
+        while max_q and max_q[-1][1] <= high:
+            max_q.pop()
+        max_q.append((i, high))
+        min_q = self._min_q
+        while min_q and min_q[-1][1] >= low:
+            min_q.pop()
+        min_q.append((i, low))
+
+        oldest = i - self.period
+        if max_q[0][0] <= oldest:
+            max_q.popleft()
+        if min_q[0][0] <= oldest:
+            min_q.popleft()
+
+        if self.count < self.period:
+            return None, None
+
+        prev_upper, prev_lower = self.upper, self.lower
+        upper = max_q[0][1]
+        lower = min_q[0][1]
+        middle = (upper + lower) / 2
+        self.upper, self.lower, self.middle = upper, lower, middle
+        self.value = {'upper': upper, 'lower': lower, 'middle': middle}
+
+        if prev_upper is not None and close > prev_upper:
+            signal = "GREEN"
+        elif prev_lower is not None and close < prev_lower:
+            signal = "RED"
+        else:
+            signal = None
+        return self.value, signal
+
+    def add_candles(self, highs, lows, closes):
+        """Batch add_candle over arrays; returns {'upper', 'lower', 'middle', 'signal'}."""
+        h, l, c = _as_float_arrays(highs, lows, closes)
+        n = len(c)
+        hl, ll = h.tolist(), l.tolist()
+        max_q, min_q = self._max_q, self._min_q
+        period = self.period
+        count = self.count
+        his, los = [], []
+
+        for j in range(n):
+            i = count
+            count += 1
+            high = hl[j]
+            low = ll[j]
+            while max_q and max_q[-1][1] <= high:
+                max_q.pop()
+            max_q.append((i, high))
+            while min_q and min_q[-1][1] >= low:
+                min_q.pop()
+            min_q.append((i, low))
+            oldest = i - period
+            if max_q[0][0] <= oldest:
+                max_q.popleft()
+            if min_q[0][0] <= oldest:
+                min_q.popleft()
+            if count >= period:
+                his.append(max_q[0][1])
+                los.append(min_q[0][1])
+        self.count = count
+
+        m = len(his)
+        upper = _nan_list(his, n)
+        lower = _nan_list(los, n)
+        middle = (upper + lower) / 2
+        # Breakouts are measured against the previous candle's channel
+        prev_upper = np.empty(n)
+        prev_lower = np.empty(n)
+        if n:
+            prev_upper[0] = np.nan if self.upper is None else self.upper
+            prev_lower[0] = np.nan if self.lower is None else self.lower
+            prev_upper[1:] = upper[:-1]
+            prev_lower[1:] = lower[:-1]
+        signal = np.zeros(n, dtype=np.int8)
+        ready = ~np.isnan(upper)
+        with np.errstate(invalid='ignore'):
+            up = ready & (c > prev_upper)
+            down = ready & ~up & (c < prev_lower)
+        signal[up] = 1
+        signal[down] = -1
+
+        if m:
+            self.upper, self.lower, self.middle = his[-1], los[-1], float(middle[-1])
+            self.value = {'upper': self.upper, 'lower': self.lower, 'middle': self.middle}
+        return {'upper': upper, 'lower': lower, 'middle': middle, 'signal': signal}
+
+
+class KeltnerChannel(_Stateful):
+    """Keltner Channel - EMA(close) +/- multiplier * ATR
+
+    Middle is an SMA-seeded EMA, width a Wilder ATR; both O(1). Signal is a
+    channel breakout: GREEN when close > upper, RED when close < lower.
+    """
+    __slots__ = ('period', 'atr_period', 'multiplier', 'value', 'upper', 'lower', 'middle', '_ema', '_atr')
+    _STATE_PARAMS = ('period', 'atr_period', 'multiplier')
+
+    def __init__(self, period=20, atr_period=10, multiplier=2):
+        self.period = period
+        self.atr_period = atr_period
+        self.multiplier = multiplier
+        self._ema = _EMA(period)
+        self._atr = ATR(atr_period)
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.upper = None
+        self.lower = None
+        self.middle = None
+        self._ema.reset()
+        self._atr.reset()
+
+    def add_candle(self, high, low, close):
+        """Add candle and calculate the channel"""
+        middle = self._ema.update(close)
+        atr, _ = self._atr.add_candle(high, low, close)
+        if middle is None or atr is None:
+            return None, None
+
+        width = self.multiplier * atr
+        upper = middle + width
+        lower = middle - width
+        self.upper, self.lower, self.middle = upper, lower, middle
+        self.value = {'upper': upper, 'lower': lower, 'middle': middle}
+
+        if close > upper:
+            signal = "GREEN"
+        elif close < lower:
+            signal = "RED"
+        else:
+            signal = None
+        return self.value, signal
+
+    def add_candles(self, highs, lows, closes):
+        """Batch add_candle over arrays; returns {'upper', 'lower', 'middle', 'signal'}."""
+        h, l, c = _as_float_arrays(highs, lows, closes)
+        n = len(c)
+        cl = c.tolist()
+        ema = self._ema
+        ev, alpha = ema.value, ema.alpha
+        mid = [np.nan] * n
+        for i in range(n):
+            x = cl[i]
+            ev = ema.update(x) if ev is None else x * alpha + ev * (1 - alpha)
+            if ev is not None:
+                mid[i] = ev
+        ema.value = ev
+
+        middle = np.array(mid, dtype=np.float64)
+        atr = self._atr.add_candles(h, l, c)['atr']
+        ready = ~(np.isnan(middle) | np.isnan(atr))
+        middle = np.where(ready, middle, np.nan)
+        width = self.multiplier * atr
+        upper = np.where(ready, middle + width, np.nan)
+        lower = np.where(ready, middle - width, np.nan)
+        signal = np.zeros(n, dtype=np.int8)
+        with np.errstate(invalid='ignore'):
+            signal[ready & (c > upper)] = 1
+            signal[ready & (c < lower)] = -1
+
+        if n and ready[-1]:
+            self.upper, self.lower, self.middle = float(upper[-1]), float(lower[-1]), float(middle[-1])
+            self.value = {'upper': self.upper, 'lower': self.lower, 'middle': self.middle}
+        return {'upper': upper, 'lower': lower, 'middle': middle, 'signal': signal}
+
+
+class HeikinAshi(_Stateful):
+    """Heikin-Ashi candles
+
+    HA close = (O + H + L + C) / 4, HA open = midpoint of the previous HA
+    candle's body (first candle: (O + C) / 2). Without an explicit open the
+    previous close is used. Signal: GREEN for a rising HA body, RED for a
+    falling one.
+    """
+    __slots__ = ('value', 'ha_open', 'ha_high', 'ha_low', 'ha_close', 'count', '_prev_close')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.ha_open = None
+        self.ha_high = None
+        self.ha_low = None
+        self.ha_close = None
+        self.count = 0
+        self._prev_close = None
+
+    def add_candle(self, high, low, close, open_price=None):
+        """Add candle and calculate the Heikin-Ashi candle"""
+        if open_price is None:
+            open_price = close if self._prev_close is None else self._prev_close
+        self._prev_close = close
+        self.count += 1
+
+        ha_close = (open_price + high + low + close) / 4
+        if self.ha_open is None:
+            ha_open = (open_price + close) / 2
+        else:
+            ha_open = (self.ha_open + self.ha_close) / 2
+        ha_high = max(high, ha_open, ha_close)
+        ha_low = min(low, ha_open, ha_close)
+
+        self.ha_open, self.ha_high, self.ha_low, self.ha_close = ha_open, ha_high, ha_low, ha_close
+        self.value = {'open': ha_open, 'high': ha_high, 'low': ha_low, 'close': ha_close}
+
+        if ha_close > ha_open:
+            signal = "GREEN"
+        elif ha_close < ha_open:
+            signal = "RED"
+        else:
+            signal = None
+        return self.value, signal
+
+    def add_candles(self, highs, lows, closes, opens=None):
+        """Batch add_candle over arrays; returns {'open', 'high', 'low', 'close', 'signal'}."""
+        h, l, c = _as_float_arrays(highs, lows, closes)
+        n = len(c)
+        if opens is None:
+            o = _prev_closes(c, self._prev_close)
+            if n and self._prev_close is None:
+                o[0] = c[0]
+        else:
+            o = np.asarray(opens, dtype=np.float64).ravel()
+            if len(o) != n:
+                raise ValueError("add_candles: opens must match the other arrays")
+
+        ha_close = (o + h + l + c) / 4
+        hc = ha_close.tolist()
+        ol, cl = o.tolist(), c.tolist()
+        prev_open, prev_close = self.ha_open, self.ha_close
+        ho = [0.0] * n
+        for i in range(n):
+            if prev_open is None:
+                prev_open = (ol[i] + cl[i]) / 2
+            else:
+                prev_open = (prev_open + prev_close) / 2
+            prev_close = hc[i]
+            ho[i] = prev_open
+        ha_open = np.array(ho, dtype=np.float64)
+        ha_high = np.maximum(np.maximum(h, ha_open), ha_close)
+        ha_low = np.minimum(np.minimum(l, ha_open), ha_close)
+        signal = np.sign(ha_close - ha_open).astype(np.int8)
+
+        if n:
+            self.count += n
+            self._prev_close = cl[-1]
+            self.ha_open, self.ha_close = ho[-1], hc[-1]
+            self.ha_high, self.ha_low = float(ha_high[-1]), float(ha_low[-1])
+            self.value = {'open': self.ha_open, 'high': self.ha_high, 'low': self.ha_low, 'close': self.ha_close}
+        return {'open': ha_open, 'high': ha_high, 'low': ha_low, 'close': ha_close, 'signal': signal}
+
+
 class SuperTrendMACD:
     """SuperTrend Only Strategy - Simple Entry Logic
     
@@ -475,22 +1652,14 @@ class SuperTrendMACD:
         """Add candle and generate SuperTrend signal on direction flip"""
         # Get SuperTrend value and signal
         st_value, st_signal = self.supertrend.add_candle(high, low, close)
-        
+
+        # MACD (for display/analysis only) must see every candle, including warmup
+        self.macd.add_candle(high, low, close)
+        macd_line = 0.0 if self.macd.last_macd is None else self.macd.last_macd
+
         if st_value is None or st_signal is None:
             return st_value, None, 0.0
         
-        # Get MACD value (for display/analysis only)
-        macd_line, _ = self.macd.add_candle(high, low, close)
-        
-        # Calculate MACD line value for display
-        fast_ema = self.macd._ema(self.macd.closes, self.macd.fast)
-        slow_ema = self.macd._ema(self.macd.closes, self.macd.slow)
-        
-        if fast_ema is None or slow_ema is None:
-            macd_line = 0.0
-        else:
-            macd_line = fast_ema - slow_ema
-        
         # Check if SuperTrend direction changed (flip detected)
         current_direction = self.supertrend.direction
         final_signal = None
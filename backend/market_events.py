@@ -0,0 +1,512 @@
+"""Market-data event sources for the event-driven trading loop.
+
+Sources push CandleEvent (a closed base candle) and TickEvent (fresh index /
+option quotes) onto asyncio queues; TradingBot consumes them in separate
+decision, risk and broadcast tasks. Sources sleep until their next event is
+due instead of polling on a fixed cadence, so an idle market costs close to
+no CPU.
+
+MDS candles and broker quotes come from the process-wide market_feed, so N
+bots (one per traded index) and the multi-symbol scorer share one candle
+poller and one batched quote request instead of polling N times.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from config import bot_state, config
+from indices import get_index_config
+from utils import is_market_open
+
+logger = logging.getLogger(__name__)
+
+MARKET_CLOSED_RECHECK_SECONDS = 5.0
+_MDS_FIRST_RETRY_SECONDS = 0.1
+
+_SYNTHETIC_BASE_PRICES = {
+    'NIFTY': 23500.0,
+    'BANKNIFTY': 51500.0,
+    'FINNIFTY': 22000.0,
+    'MIDCPNIFTY': 12500.0,
+}
+
+
+def parse_candle_ts(ts) -> Optional[datetime]:
+    try:
+        dt = datetime.fromisoformat(str(ts).strip().replace('Z', '+00:00'))
+    except Exception:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def candle_epoch(ts) -> Optional[float]:
+    dt = parse_candle_ts(ts) if ts else None
+    return dt.timestamp() if dt is not None else None
+
+
+@dataclass(frozen=True, slots=True)
+class CandleEvent:
+    """A closed base candle.
+
+    `ts` is the candle open (epoch seconds) when known and `ts_key` the
+    source's own timestamp string (MDS); `received` is time.monotonic() when
+    the source saw the candle, for decision-latency telemetry.
+    """
+    open: float
+    high: float
+    low: float
+    close: float
+    ts: Optional[float] = None
+    ts_key: Optional[str] = None
+    received: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class TickEvent:
+    """Latest quotes; None where the source has no new value."""
+    index_ltp: Optional[float] = None
+    option_ltp: Optional[float] = None
+    ts: float = 0.0
+
+
+def put_latest(queue: asyncio.Queue, item) -> None:
+    """put_nowait() that drops the oldest item when the queue is full (ticks only need the latest)."""
+    while True:
+        try:
+            queue.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+
+
+def market_data_provider(settings=config, state=bot_state) -> str:
+    """'mds', 'dhan' or 'synthetic' (paper mode with bypass_market_hours and no replay)."""
+    if (
+        state.get('mode') == 'paper'
+        and bool(settings.get('bypass_market_hours', False))
+        and not bool(settings.get('paper_replay_enabled', False))
+    ):
+        return 'synthetic'
+    return str(settings.get('market_data_provider', 'dhan') or 'dhan').strip().lower()
+
+
+class TickCandleBuilder:
+    """Clock-aligned base candles built from ticks.
+
+    A tick at `ts` belongs to the candle starting at ts - ts % interval; the
+    candle is emitted by the first tick of a later candle or by flush() once
+    its end has passed (deadline() tells the consumer when to call it).
+    """
+
+    def __init__(self, interval: int):
+        self.interval = max(1, int(interval))
+        self.reset()
+
+    def reset(self) -> None:
+        self.bucket: Optional[float] = None
+        self.open = self.high = self.low = self.close = 0.0
+
+    def deadline(self) -> Optional[float]:
+        return None if self.bucket is None else self.bucket + self.interval
+
+    def on_tick(self, price: float, ts: float) -> Optional[CandleEvent]:
+        closed = self.flush(ts)
+        if price > 0:
+            if self.bucket is None:
+                self.bucket = ts - ts % self.interval
+                self.open = self.high = self.low = self.close = price
+            else:
+                self.high = max(self.high, price)
+                self.low = min(self.low, price)
+                self.close = price
+        return closed
+
+    def flush(self, now: float) -> Optional[CandleEvent]:
+        if self.bucket is None or now < self.bucket + self.interval:
+            return None
+        event = CandleEvent(self.open, self.high, self.low, self.close, ts=self.bucket, received=time.monotonic())
+        self.reset()
+        return event
+
+
+class MdsCandleSource:
+    """One bot's cursor over its market-data-service candle stream.
+
+    MarketFeed fetches the latest rows of every subscribed (symbol, interval)
+    stream and offer()s them here; rows newer than the last delivered one
+    become CandleEvents on the bot's queue. A stream change (index / timeframe
+    changed while running) restarts from that stream's latest candle.
+    """
+
+    def __init__(self, queue: asyncio.Queue, settings, last_ts_key: Optional[str] = None):
+        self.queue = queue
+        self.settings = settings
+        self.last_ts_key = last_ts_key
+        self.last_ts = candle_epoch(last_ts_key)
+        self._stream = None
+
+    def stream(self) -> tuple:
+        return self.settings['selected_index'], int(self.settings.get('candle_interval', 5) or 5)
+
+    def streams(self) -> list:
+        return [self.stream()]
+
+    def _fresh(self, row: dict) -> bool:
+        key = str(row.get('ts') or '') or None
+        if key is None or key == self.last_ts_key:
+            return False
+        ts = candle_epoch(key)
+        return ts is None or self.last_ts is None or ts > self.last_ts
+
+    def offer(self, rows_by_stream: dict) -> None:
+        (stream, rows), = rows_by_stream.items()
+        if self._stream is not None and self._stream != stream:
+            self.last_ts_key = self.last_ts = None
+        self._stream = stream
+
+        if self.last_ts_key is None:
+            rows = rows[-1:]  # nothing processed yet: start from the latest candle only
+        for row in rows:
+            if not isinstance(row, dict) or not self._fresh(row):
+                continue
+            try:
+                close = float(row.get('close') or 0.0)
+                high = float(row.get('high') or 0.0)
+                low = float(row.get('low') or float('inf'))
+                candle_open = float(row.get('open') or close)
+            except Exception:
+                continue
+            if close <= 0:
+                continue
+            self.last_ts_key = str(row.get('ts'))
+            self.last_ts = candle_epoch(self.last_ts_key)
+            self.queue.put_nowait(CandleEvent(
+                candle_open, high, low, close, ts=self.last_ts, ts_key=self.last_ts_key, received=time.monotonic(),
+            ))
+
+    def due(self, grace: float) -> Optional[float]:
+        """When the candle after the last delivered one should be in MDS (None: unknown)."""
+        if self.last_ts is None or self._stream is None:
+            return None
+        return self.last_ts + 2 * self._stream[1] + grace
+
+
+class MdsSymbolsSource:
+    """Every index in a MultiScoreEngine, scored from its MDS candle streams.
+
+    Candles are aligned by MDS timestamp: a bucket is scored once every symbol
+    has it or a later candle shows up (late symbols skip that candle), then
+    `on_scored()` is called to publish the engine's results.
+    """
+
+    def __init__(self, engine, on_scored):
+        self.engine = engine
+        self.on_scored = on_scored
+        self._pending: dict = {}  # candle datetime -> {symbol: row}
+        self._last_dt: Optional[datetime] = None  # newest candle time already scored
+
+    def streams(self) -> list:
+        return [(symbol, self.engine.base_tf) for symbol in self.engine.symbols]
+
+    def offer(self, rows_by_stream: dict, wait_for_newest: bool = True) -> None:
+        for (symbol, _), rows in rows_by_stream.items():
+            for row in rows or []:
+                dt = parse_candle_ts(row.get('ts')) if isinstance(row, dict) else None
+                if dt is not None and (self._last_dt is None or dt > self._last_dt):
+                    self._pending.setdefault(dt, {})[symbol] = row
+
+        order = sorted(self._pending)
+        scored = False
+        for dt in order:
+            if wait_for_newest and dt == order[-1] and len(self._pending[dt]) < len(self.engine.symbols):
+                break
+            self._score(self._pending.pop(dt))
+            self._last_dt = dt
+            scored = True
+        if scored:
+            self.on_scored()
+
+    def _score(self, bucket: dict) -> None:
+        """One aligned base candle per symbol; symbols missing from `bucket` are skipped."""
+        n = len(self.engine.symbols)
+        highs, lows, closes = [float('nan')] * n, [float('nan')] * n, [float('nan')] * n
+        for symbol, row in bucket.items():
+            i = self.engine.symbol_index(symbol)
+            try:
+                highs[i] = float(row.get('high') or 0.0)
+                lows[i] = float(row.get('low') or 0.0)
+                closes[i] = float(row.get('close') or 0.0)
+            except Exception:
+                continue
+        self.engine.on_base_candles(highs, lows, closes)
+
+    def due(self, grace: float) -> Optional[float]:
+        if self._last_dt is None:
+            return None
+        return self._last_dt.timestamp() + 2 * self.engine.base_tf + grace
+
+
+class SyntheticTickSource:
+    """Random-walk index prices as TickEvents (paper testing outside market hours)."""
+
+    def __init__(self, queue: asyncio.Queue, settings, state):
+        self.queue = queue
+        self.settings = settings
+        self.state = state
+
+    async def run(self) -> None:
+        while True:
+            if not is_market_open():
+                await asyncio.sleep(MARKET_CLOSED_RECHECK_SECONDS)
+                continue
+            put_latest(self.queue, TickEvent(index_ltp=self._synthetic_ltp(self.settings['selected_index']), ts=time.time()))
+            poll = float(self.settings.get('market_data_poll_seconds', 1.0) or 1.0)
+            await asyncio.sleep(max(0.25, min(5.0, poll)))
+
+    def _synthetic_ltp(self, index_name: str) -> float:
+        state = self.state
+        if state.get('simulated_base_price') is None:
+            # Prefer any existing index_ltp as starting point; else fall back to a realistic base.
+            if state.get('index_ltp', 0) > 0:
+                state['simulated_base_price'] = float(state['index_ltp'])
+            else:
+                state['simulated_base_price'] = _SYNTHETIC_BASE_PRICES.get(index_name, 70000.0)  # SENSEX
+
+        state['simulated_base_price'] += random.choice([-15, -10, -5, -2, 0, 2, 5, 10, 15])
+        return round(state['simulated_base_price'], 2)
+
+
+class MarketFeed:
+    """Market data shared by every running TradingBot (one per traded index).
+
+    A bot subscribes by running candles() / quotes() (and candle_streams() for
+    multi-symbol scoring) as loop tasks. One task polls market-data-service
+    for all subscribed candle streams at once
+    (sleeping until the earliest next candle is due, then retrying with a
+    short backoff: 0.1 s doubling up to mds_poll_seconds) and one task
+    fetches every bot's index / option quotes in a single Dhan request per
+    market_data_poll_seconds. Results fan out to each bot's own queues.
+
+    Quote providers per bot:
+    - 'dhan': Dhan quotes, or the values MarketDataService already keeps in its bot_state
+    - 'mds': candles come from MDS, so quotes are only fetched while a position is
+      open; with no position anywhere the task waits for a bot's `_position_opened`.
+    """
+
+    def __init__(self):
+        self._candle_sources: dict = {}  # source (MdsCandleSource, MdsSymbolsSource) -> owning bot
+        self._quote_providers: dict = {}  # bot -> 'dhan' | 'mds'
+        self._candle_task: Optional[asyncio.Task] = None
+        self._quote_task: Optional[asyncio.Task] = None
+        self._candles_changed: Optional[asyncio.Event] = None
+        self._quotes_changed: Optional[asyncio.Event] = None
+
+    async def candles(self, bot, last_ts_key: Optional[str] = None) -> None:
+        """Deliver `bot`'s closed MDS candles to bot._candle_queue until cancelled."""
+        await self.candle_streams(MdsCandleSource(bot._candle_queue, bot.config, last_ts_key), bot)
+
+    async def candle_streams(self, source, bot=None) -> None:
+        """offer() `source` the latest rows of its streams() until cancelled."""
+        self._candle_sources[source] = bot
+        if self._candle_task is None or self._candle_task.done():
+            self._candles_changed = asyncio.Event()
+            self._candle_task = asyncio.create_task(self._run_candles())
+        self._candles_changed.set()
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            self._candle_sources.pop(source, None)
+
+    async def quotes(self, bot, provider: str) -> None:
+        """Deliver `bot`'s quotes to bot._tick_queue until cancelled."""
+        self._quote_providers[bot] = provider
+        if self._quote_task is None or self._quote_task.done():
+            self._quotes_changed = asyncio.Event()
+            self._quote_task = asyncio.create_task(self._run_quotes())
+        self._quotes_changed.set()
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            self._quote_providers.pop(bot, None)
+
+    @staticmethod
+    async def _nap(seconds: float, wake: asyncio.Event) -> None:
+        """Sleep `seconds`, or until a bot subscribes."""
+        try:
+            await asyncio.wait_for(wake.wait(), max(0.0, seconds))
+        except asyncio.TimeoutError:
+            pass
+        wake.clear()
+
+    async def _run_candles(self) -> None:
+        from mds_client import fetch_last_candles
+
+        retry = _MDS_FIRST_RETRY_SECONDS
+        while self._candle_sources:
+            if not is_market_open():
+                await self._nap(MARKET_CLOSED_RECHECK_SECONDS, self._candles_changed)
+                continue
+            self._candles_changed.clear()
+
+            sources = [(source, source.streams()) for source in list(self._candle_sources)]
+            streams = list(dict.fromkeys(stream for _, wanted in sources for stream in wanted))
+            results = await asyncio.gather(*(
+                fetch_last_candles(
+                    base_url=str(config.get('mds_base_url', '') or '').strip(),
+                    symbol=symbol,
+                    timeframe_seconds=interval,
+                    limit=2,
+                )
+                for symbol, interval in streams
+            ), return_exceptions=True)
+            rows = {}
+            for stream, result in zip(streams, results):
+                if isinstance(result, Exception):
+                    logger.debug(f"[MDS] Candle fetch failed for {stream[0]}: {result}")
+                    result = []
+                rows[stream] = result
+            for source, wanted in sources:
+                try:
+                    source.offer({stream: rows[stream] for stream in wanted})
+                except Exception as e:
+                    logger.error(f"[MDS] Candle delivery failed: {e}", exc_info=True)
+
+            poll_s = max(0.2, float(config.get('mds_poll_seconds', 1.0) or 1.0))
+            grace = max(0.0, float(config.get('mds_flush_grace_seconds', 0.25) or 0.0))
+            dues = [source.due(grace) for source, _ in sources]
+            now = time.time()
+            due = None if None in dues else min(dues)
+            if due is not None and due > now:
+                retry = _MDS_FIRST_RETRY_SECONDS
+                await self._nap(due - now, self._candles_changed)
+            else:
+                await self._nap(retry, self._candles_changed)
+                retry = min(poll_s, retry * 2)
+
+    async def _run_quotes(self) -> None:
+        while self._quote_providers:
+            if not is_market_open():
+                await self._nap(MARKET_CLOSED_RECHECK_SECONDS, self._quotes_changed)
+                continue
+            self._quotes_changed.clear()
+
+            bots = [
+                bot for bot, provider in self._quote_providers.items()
+                if provider != 'mds' or bot.state.get('current_position')
+            ]
+            if not bots:
+                await self._wait_for_position()
+                continue
+
+            try:
+                ticks = await self._quote(bots)
+            except Exception as e:
+                logger.debug(f"[MKT] Quote fetch failed: {e}")
+                ticks = {}
+            for bot, tick in ticks.items():
+                if tick is not None:
+                    put_latest(bot._tick_queue, tick)
+
+            poll = float(config.get('market_data_poll_seconds', 1.0) or 1.0)
+            await asyncio.sleep(max(0.25, min(5.0, poll)))
+
+    async def _wait_for_position(self) -> None:
+        """MDS bots without a position need no quotes: wait for an entry (or a new subscriber)."""
+        events = [bot._position_opened for bot in self._quote_providers]
+        for event in events:
+            event.clear()
+        waiters = [asyncio.ensure_future(event.wait()) for event in (*events, self._quotes_changed)]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _quote(self, bots: list) -> dict:
+        """TickEvents for `bots`; everything that needs Dhan goes out as one request."""
+        ticks, batched = {}, []
+        for bot in bots:
+            provider, state = self._quote_providers[bot], bot.state
+            security_id = str((state.get('current_position') or {}).get('security_id') or '')
+            option_id = int(security_id) if security_id.isdigit() else None
+            if provider == 'dhan' and state.get('market_data_service_active', False):
+                # MarketDataService already polls Dhan into bot_state
+                option_ltp = state.get('current_option_ltp') if option_id else None
+                ticks[bot] = TickEvent(index_ltp=state.get('index_ltp'), option_ltp=option_ltp, ts=time.time())
+            elif bot.dhan is None or (provider == 'mds' and option_id is None):
+                # MDS paper positions (SIM_*) are priced off the index the candles keep live
+                ticks[bot] = TickEvent(index_ltp=state.get('index_ltp'), ts=time.time()) if provider == 'mds' else None
+            else:
+                batched.append((bot, option_id))
+        if not batched:
+            return ticks
+
+        securities: dict = {}
+        for bot, option_id in batched:
+            index_cfg = get_index_config(bot.config['selected_index'])
+            if self._quote_providers[bot] == 'dhan':
+                securities.setdefault(index_cfg['exchange_segment'], set()).add(int(index_cfg['security_id']))
+            if option_id is not None:
+                securities.setdefault(index_cfg.get('fno_segment', 'NSE_FNO'), set()).add(option_id)
+        # Dhan SDK is sync; run in thread
+        ltps = await asyncio.to_thread(batched[0][0].dhan.get_ltps, securities)
+
+        for bot, option_id in batched:
+            index_name = bot.config['selected_index']
+            index_cfg = get_index_config(index_name)
+            index_ltp = None  # 'mds': candles (and the MDS consumer) own the index price
+            if self._quote_providers[bot] == 'dhan':
+                index_ltp = ltps.get((index_cfg['exchange_segment'], int(index_cfg['security_id'])))
+                if not index_ltp:
+                    index_ltp = await asyncio.to_thread(bot.dhan.get_index_ltp, index_name)
+            option_ltp = None
+            if option_id is not None:
+                option_ltp = ltps.get((index_cfg.get('fno_segment', 'NSE_FNO'), option_id))
+            ticks[bot] = TickEvent(index_ltp=index_ltp, option_ltp=option_ltp, ts=time.time())
+        return ticks
+
+
+# The process-wide feed every TradingBot subscribes to
+market_feed = MarketFeed()
+
+
+class ReplayCandleSource:
+    """Paper replay: stored candles pushed at `paper_replay_speed`, one after the previous is handled."""
+
+    def __init__(self, queue: asyncio.Queue, settings, candles: list, pos: int = 0):
+        self.queue = queue
+        self.settings = settings
+        self.candles = candles
+        self.pos = pos
+
+    async def run(self) -> None:
+        while self.pos < len(self.candles):
+            row = self.candles[self.pos]
+            self.pos += 1
+            try:
+                close = float(row.get('close') or 0.0)
+                event = CandleEvent(
+                    float(row.get('open') or row.get('close') or 0.0),
+                    float(row.get('high') or 0.0),
+                    float(row.get('low') or float('inf')),
+                    close,
+                    ts=candle_epoch(row.get('ts')),
+                    received=time.monotonic(),
+                )
+            except Exception:
+                event = CandleEvent(0.0, 0.0, float('inf'), 0.0, received=time.monotonic())
+            await self.queue.put(event)
+            await self.queue.join()
+
+            interval = int(self.settings.get('candle_interval', 5) or 5)
+            speed = float(self.settings.get('paper_replay_speed', 10.0) or 10.0)
+            speed = max(0.1, min(100.0, speed))
+            await asyncio.sleep(max(0.05, float(interval) / speed))
@@ -27,6 +27,26 @@ class StrategyDuplicate(BaseModel):
 class StrategiesImport(BaseModel):
     strategies: list[dict]
 
+class BacktestRequest(BaseModel):
+    start_date: str  # YYYY-MM-DD (IST)
+    end_date: Optional[str] = None  # inclusive; defaults to start_date
+    # Overrides applied on top of the current config (same keys as a strategy)
+    config: Optional[Dict[str, Any]] = None
+    workers: Optional[int] = None  # defaults to the CPU count
+
+class OptimizeRequest(BaseModel):
+    start_date: str  # YYYY-MM-DD (IST)
+    end_date: Optional[str] = None  # inclusive; defaults to start_date
+    # Swept values per config key, e.g. {"supertrend_period": [7, 10, 14]}; default search space if omitted
+    params: Optional[Dict[str, list]] = None
+    config: Optional[Dict[str, Any]] = None  # fixed overrides for every candidate
+    method: str = "grid"  # grid | random | halving
+    samples: int = 50  # candidates for random / halving
+    objective: str = "total_pnl"
+    top: int = 5
+    save_name: Optional[str] = None  # store the winners as strategies '<save_name> (rank)'
+    workers: Optional[int] = None
+
 class ConfigUpdate(BaseModel):
     dhan_access_token: Optional[str] = None
     dhan_client_id: Optional[str] = None
@@ -40,6 +60,7 @@ class ConfigUpdate(BaseModel):
     target_points: Optional[float] = None  # Target profit points for exit
     risk_per_trade: Optional[float] = None  # Risk amount per trade for position sizing
     selected_index: Optional[str] = None
+    trade_indices: Optional[str] = None  # extra indices to trade, comma-separated ("" = none)
     candle_interval: Optional[int] = None  # Timeframe in seconds
     min_trade_gap: Optional[int] = None  # Minimum seconds between trades
     trade_only_on_flip: Optional[bool] = None  # Only trade on SuperTrend flip
@@ -49,6 +70,9 @@ class ConfigUpdate(BaseModel):
     htf_filter_enabled: Optional[bool] = None
     htf_filter_timeframe: Optional[int] = None  # seconds
 
+    # Entry gate
+    min_entry_confidence: Optional[float] = None  # 0-100
+
     # Exit protection
     min_hold_seconds: Optional[int] = None  # Minimum seconds to hold before strategy exits
 
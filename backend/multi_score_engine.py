@@ -0,0 +1,827 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from indicators import MACD, SuperTrend
+from score_engine import DIRECTION_CODES, Candle, CandleAggregator, ScoreEngine
+
+_DIRECTION_NAMES = {code: name for name, code in DIRECTION_CODES.items()}
+
+_FLIP_WINDOW = 6  # same as TFIndicators.st_flip_history
+
+# Below this many symbols (default of config mds_vectorize_min_symbols) one ScoreEngine
+# per symbol is faster than the vectorized step: a step costs ~600 us of NumPy call
+# overhead at almost any width, a ScoreEngine candle ~35 us (scripts/check_multi_score.py,
+# us/step vectorized vs per-symbol: 4 symbols 530 vs 130, 16 580 vs 470, 20 about even,
+# 24 620 vs 800, 32 610 vs 960).
+VECTORIZE_MIN_SYMBOLS = 24
+
+_TF_FIELDS = ('macd_score', 'hist_score', 'st_score', 'bonus_score', 'raw_score', 'weighted_score', 'st_direction')
+
+
+class _TFArrays:
+    """SuperTrend + MACD + scoring state of one timeframe, one row per symbol.
+
+    NaN stands for None in float fields, 0 for None in direction/relation
+    fields (kept as float so updates need no casts).
+    """
+    __slots__ = (
+        'tf', 'weight',
+        'st_count', 'st_atr', 'st_tr_sum', 'st_prev_close', 'st_upper', 'st_lower', 'st_dir',
+        'fast', 'fast_sum', 'fast_n', 'slow', 'slow_sum', 'slow_n', 'sig', 'sig_sum', 'sig_n', 'relation',
+        'last_macd', 'last_signal_line', 'last_histogram',
+        'prev_macd', 'prev_hist', 'prev_st_dir', 'flip_ring', 'flip_pos', 'flip_sum',
+        'macd_score', 'hist_score', 'st_score', 'bonus_score', 'raw_score', 'weighted_score', 'st_direction',
+    )
+
+    def __init__(self, tf: int, weight: float, n: int):
+        self.tf = tf
+        self.weight = weight
+        self.flip_ring = np.zeros((n, _FLIP_WINDOW), dtype=np.int8)
+        for name in self.__slots__[2:]:
+            if name == 'flip_ring':
+                continue
+            if name in ('st_count', 'fast_n', 'slow_n', 'sig_n', 'flip_pos', 'flip_sum'):
+                setattr(self, name, np.zeros(n, dtype=np.int64))
+            elif name == 'st_direction':
+                setattr(self, name, np.zeros(n, dtype=np.int8))
+            else:
+                setattr(self, name, np.zeros(n))
+        self.reset()
+
+    def reset(self) -> None:
+        for name in ('st_count', 'fast_n', 'slow_n', 'sig_n', 'flip_pos', 'flip_sum',
+                     'relation', 'prev_st_dir', 'st_direction', 'st_tr_sum', 'fast_sum', 'slow_sum', 'sig_sum',
+                     'macd_score', 'hist_score', 'st_score', 'bonus_score', 'raw_score', 'weighted_score'):
+            getattr(self, name)[:] = 0
+        for name in ('st_atr', 'st_prev_close', 'st_upper', 'st_lower', 'fast', 'slow', 'sig',
+                     'last_macd', 'last_signal_line', 'last_histogram', 'prev_macd', 'prev_hist'):
+            getattr(self, name)[:] = np.nan
+        self.st_dir[:] = 1
+        self.flip_ring[:] = 0
+
+
+def _ema_step(value, seed_sum, seed_n, x, period, alpha, m):
+    """Vectorized _EMA.update() on rows `m`; returns the new value array (NaN = not seeded)."""
+    unseeded = m & np.isnan(value)
+    np.add(seed_sum, x, out=seed_sum, where=unseeded)
+    np.add(seed_n, 1, out=seed_n, where=unseeded)
+    live = m & ~unseeded
+    out = np.where(live, x * alpha + value * (1 - alpha), value)
+    np.copyto(out, seed_sum / period, where=unseeded & (seed_n >= period))
+    return out
+
+
+def _round(x: np.ndarray, ndigits: int) -> np.ndarray:
+    """Elementwise Python round(v, ndigits), bit for bit.
+
+    rint(x * 10**n) / 10**n already gives the double nearest the decimal
+    result; only values whose scaled fraction sits within rounding error of
+    .5 can pick the wrong integer, and those few go through round().
+    """
+    scale = 10.0 ** ndigits
+    y = x * scale
+    out = np.rint(y) / scale
+    with np.errstate(invalid='ignore'):
+        near = np.abs(y - np.floor(y) - 0.5) <= 4 * np.spacing(np.abs(y))
+    if near.any():
+        for i in zip(*np.nonzero(near)):
+            out[i] = round(float(x[i]), ndigits)
+    return out
+
+
+def _prev_valid(values: np.ndarray) -> np.ndarray:
+    """Per column, the last non-NaN value strictly before each row (NaN if none)."""
+    if not len(values):
+        return values.copy()
+    rows = np.arange(len(values))[:, None]
+    last = np.maximum.accumulate(np.where(np.isnan(values), -1, rows), axis=0)
+    prev = np.vstack((np.full((1, values.shape[1]), -1), last[:-1]))
+    return np.where(prev >= 0, np.take_along_axis(values, np.maximum(prev, 0), axis=0), np.nan)
+
+
+def _window_flips(sign: np.ndarray, w: int) -> np.ndarray:
+    """_WindowStats.flips after each push: opposite-sign neighbours among the non-zero values of the last `w` rows."""
+    n = len(sign)
+    rows = np.arange(n)[:, None]
+    # Next non-zero row after each row (n: none), and whether that pair flips
+    nz_at = np.where(sign != 0, rows, n)
+    nxt = np.vstack((np.minimum.accumulate(nz_at[::-1], axis=0)[::-1][1:], np.full((1, sign.shape[1]), n)))
+    pair = (sign != 0) & (nxt < n) & (np.take_along_axis(sign, np.minimum(nxt, n - 1), axis=0) != sign)
+    done = np.cumsum(pair, axis=0)
+    lo = np.maximum(0, np.arange(n) - w + 1)[:, None]
+    before = np.where(lo > 0, np.take_along_axis(done, np.maximum(lo - 1, 0).repeat(sign.shape[1], axis=1), axis=0), 0)
+    # The last non-zero row's pair reaches past the current row
+    last = np.maximum.accumulate(np.where(sign != 0, rows, -1), axis=0)
+    open_pair = (last >= lo) & np.take_along_axis(pair, np.maximum(last, 0), axis=0)
+    return done - before - open_pair
+
+
+class MultiScoreEngine:
+    """ScoreEngine over several symbols at once, with struct-of-arrays state.
+
+    Each indicator/scoring field is one NumPy array indexed by symbol, so a
+    base candle for every symbol is a single vectorized step per timeframe.
+    Results match one ScoreEngine per symbol exactly. A symbol whose close
+    is NaN or <= 0 in a step (missing candle) is left untouched, like
+    ScoreEngine ignores such candles; its last published values stay.
+
+    The vectorized step only pays off from VECTORIZE_MIN_SYMBOLS symbols;
+    below that (vectorize=None) the same columns come from one ScoreEngine
+    per symbol. vectorize=True / False forces either path. The bot passes
+    config mds_vectorize_min_symbols (default VECTORIZE_MIN_SYMBOLS), so with
+    the four default mds_symbols the struct-of-arrays path does not run
+    unless that setting is lowered to 4 or less.
+    """
+
+    _engines: Optional[List[ScoreEngine]] = None  # per-symbol path
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        st_period: int,
+        st_multiplier: float,
+        macd_fast: int,
+        macd_slow: int,
+        macd_signal: int,
+        base_timeframe_seconds: int = 5,
+        bonus_macd_triple: float = 1.0,
+        bonus_macd_momentum: float = 0.5,
+        bonus_macd_cross: float = 0.5,
+        full_chain: bool = False,
+        tf_weights: Optional[Dict[int, float]] = None,
+        vectorize: Optional[bool] = None,
+    ):
+        if int(st_period) <= 0 or min(int(macd_fast), int(macd_slow), int(macd_signal)) <= 0:
+            raise ValueError("MultiScoreEngine needs positive indicator periods")
+
+        # Thresholds, weights and bands come from a (never fed) single-symbol engine
+        params = dict(
+            st_period=st_period,
+            st_multiplier=st_multiplier,
+            macd_fast=macd_fast,
+            macd_slow=macd_slow,
+            macd_signal=macd_signal,
+            base_timeframe_seconds=base_timeframe_seconds,
+            bonus_macd_triple=bonus_macd_triple,
+            bonus_macd_momentum=bonus_macd_momentum,
+            bonus_macd_cross=bonus_macd_cross,
+            full_chain=full_chain,
+            tf_weights=tf_weights,
+        )
+        ref = ScoreEngine(**params)
+        symbols = tuple(str(s).strip().upper() for s in symbols)
+        if vectorize is None:
+            vectorize = len(symbols) >= VECTORIZE_MIN_SYMBOLS
+        if not vectorize:
+            self._engines = [ScoreEngine(**params) for _ in symbols]
+        self._setup(symbols, [ref] * len(symbols))
+        self.neutral_band = ref.neutral_band
+        self.st_period = int(st_period)
+        self.st_multiplier = st_multiplier
+        self.macd_periods = (int(macd_fast), int(macd_slow), int(macd_signal))
+
+    def _setup(self, symbols: Tuple[str, ...], refs: Sequence[ScoreEngine]) -> None:
+        """Allocate state for one row per label; refs[i] supplies row i's parameters and thresholds."""
+        if not symbols or len(set(symbols)) != len(symbols):
+            raise ValueError(f"{type(self).__name__} needs distinct row labels, got {symbols}")
+        ref = refs[0]
+        self.symbols = symbols
+        self.base_tf = ref.base_tf
+        self.timeframes = ref.timeframes
+        self.tf_weights = dict(ref.tf_weights)
+        self.chop_window = ref.chop_window
+
+        # Per-row parameters (every row's ScoreEngine scalars, as arrays)
+        def column(get, dtype=np.float64):
+            return np.array([get(r) for r in refs], dtype=dtype)
+
+        base = lambda r: r._tfs[r.base_tf]  # noqa: E731
+        self._st_period = column(lambda r: base(r).supertrend.period, np.int64)
+        self._st_multiplier = column(lambda r: base(r).supertrend.multiplier)
+        self._macd_fast = column(lambda r: base(r).macd.fast, np.int64)
+        self._macd_slow = column(lambda r: base(r).macd.slow, np.int64)
+        self._macd_signal = column(lambda r: base(r).macd.signal_period, np.int64)
+        self._bonus_triple = column(lambda r: r.bonus_macd_triple)
+        self._bonus_momentum = column(lambda r: r.bonus_macd_momentum)
+        self._bonus_cross = column(lambda r: r.bonus_macd_cross)
+        self._neutral_band = column(lambda r: r.neutral_band)
+        self._chop_stab_hi = column(lambda r: r._chop_stab_hi)
+        self._chop_mean_abs_mid = column(lambda r: r._chop_mean_abs_mid)
+        self._chop_mean_abs_low = column(lambda r: r._chop_mean_abs_low)
+        self._chop_stab_low = column(lambda r: r._chop_stab_low)
+
+        n = len(self.symbols)
+        self._index = {sym: i for i, sym in enumerate(self.symbols)}
+        self._tfs = [_TFArrays(tf, self.tf_weights.get(tf, 1.0), n) for tf in self.timeframes]
+        self._ratios = [hi // lo for lo, hi in zip(self.timeframes, self.timeframes[1:])]
+        levels = len(self._ratios)
+        self._agg_count = np.zeros((levels, n), dtype=np.int64)
+        self._agg_high = np.zeros((levels, n))
+        self._agg_low = np.zeros((levels, n))
+        self._agg_close = np.zeros((levels, n))
+
+        # Chop window (see score_engine._WindowStats), one row per symbol
+        w = self.chop_window
+        self._win = np.zeros((n, w))
+        self._succ_flip = np.zeros((n, w), dtype=np.int8)  # 1: next non-zero score in window has the other sign
+        self._pushed = np.zeros(n, dtype=np.int64)
+        self._win_len = np.zeros(n, dtype=np.int64)
+        self._since_rebuild = np.zeros(n, dtype=np.int64)
+        self._total = np.zeros(n)
+        self._total_sq = np.zeros(n)
+        self._total_abs = np.zeros(n)
+        self._flips = np.zeros(n, dtype=np.int64)
+        self._last_nz_pos = np.full(n, -1, dtype=np.int64)
+        self._last_nz_sign = np.zeros(n, dtype=np.int8)
+        self._prev_score = np.full(n, np.nan)
+        self._prev_slope = np.full(n, np.nan)
+
+        self._published: Dict[str, np.ndarray] = {}
+        self.reset()
+
+    @property
+    def vectorized(self) -> bool:
+        return self._engines is None
+
+    def reset(self) -> None:
+        for engine in self._engines or ():
+            engine.reset()
+        for blk in self._tfs:
+            blk.reset()
+        self._agg_count[:] = 0
+        for arr in (self._win, self._succ_flip, self._pushed, self._win_len, self._since_rebuild,
+                    self._total, self._total_sq, self._total_abs, self._flips, self._last_nz_sign):
+            arr[:] = 0
+        self._last_nz_pos[:] = -1
+        self._prev_score[:] = np.nan
+        self._prev_slope[:] = np.nan
+        n = len(self.symbols)
+        self._published = {
+            'score': np.zeros(n), 'slope': np.zeros(n), 'acceleration': np.zeros(n),
+            'stability': np.zeros(n), 'confidence': np.zeros(n),
+            'direction': np.zeros(n, dtype=np.int8), 'is_choppy': np.zeros(n, dtype=bool),
+            'ready': np.zeros(n, dtype=bool), 'updated': np.zeros(n, dtype=bool),
+        }
+
+    # ---- per-step update ----------------------------------------------------
+
+    def on_base_candles(self, highs, lows, closes) -> Dict[str, np.ndarray]:
+        """One base candle per symbol (arrays in `symbols` order); returns per-symbol columns.
+
+        Keys: 'score', 'slope', 'acceleration', 'stability', 'confidence',
+        'direction' (DIRECTION_CODES), 'is_choppy', 'ready', 'updated' (False
+        for symbols skipped this step). The arrays are fresh copies.
+        """
+        h = np.asarray(highs, dtype=np.float64).ravel()
+        l = np.asarray(lows, dtype=np.float64).ravel()
+        c = np.asarray(closes, dtype=np.float64).ravel()
+        n = len(self.symbols)
+        if not (len(h) == len(l) == len(c) == n):
+            raise ValueError(f"on_base_candles expects {n} values per array")
+        if self._engines is None:
+            self._step(h, l, c)
+        else:
+            self._step_engines(h, l, c)
+        return {k: v.copy() for k, v in self._published.items()}
+
+    def _step_engines(self, h, l, c) -> None:
+        with np.errstate(invalid='ignore'):
+            active = np.isfinite(c) & (c > 0) & np.isfinite(h) & np.isfinite(l)
+        pub = self._published
+        for i in np.flatnonzero(active).tolist():
+            engine = self._engines[i]
+            engine.update(Candle(high=float(h[i]), low=float(l[i]), close=float(c[i])))
+            pub['score'][i] = engine.score
+            pub['slope'][i] = engine.slope
+            pub['acceleration'][i] = engine.acceleration
+            pub['stability'][i] = engine.stability
+            pub['confidence'][i] = engine.confidence
+            pub['direction'][i] = DIRECTION_CODES[engine.direction]
+            pub['is_choppy'][i] = engine.is_choppy
+            pub['ready'][i] = engine.ready
+        pub['updated'] = active
+
+    def _step(self, h, l, c) -> None:
+        with np.errstate(invalid='ignore'):
+            active = np.isfinite(c) & (c > 0) & np.isfinite(h) & np.isfinite(l)
+        if not active.any():
+            self._published['updated'] = active
+            return
+        # Inactive rows never reach committed state; zero them so no warnings fire
+        h = np.where(active, h, 0.0)
+        l = np.where(active, l, 0.0)
+        c = np.where(active, c, 1.0)
+
+        self._update_tf(self._tfs[0], active, h, l, c)
+        mask = active
+        for level, ratio in enumerate(self._ratios):
+            mask, h, l, c = self._aggregate(level, ratio, mask, h, l, c)
+            if not mask.any():
+                break
+            self._update_tf(self._tfs[level + 1], mask, h, l, c)
+
+        self._publish(active)
+
+    def _aggregate(self, level, ratio, m, h, l, c):
+        count = self._agg_count[level]
+        hi, lo, cl = self._agg_high[level], self._agg_low[level], self._agg_close[level]
+        start = m & (count == 0)
+        cont = m & (count > 0)
+        hi[start] = h[start]
+        lo[start] = l[start]
+        hi[cont] = np.maximum(hi[cont], h[cont])
+        lo[cont] = np.minimum(lo[cont], l[cont])
+        cl[m] = c[m]
+        count[m] += 1
+        done = m & (count >= ratio)
+        count[done] = 0
+        return done, hi.copy(), lo.copy(), np.where(done, cl, 1.0)
+
+    def _update_tf(self, blk: _TFArrays, m, h, l, c) -> None:
+        ref = ScoreEngine  # scoring constants
+        period = self._st_period
+        where = np.where
+
+        # SuperTrend (SuperTrend.add_candle)
+        pc = blk.st_prev_close
+        tr = where(np.isnan(pc), h - l, np.maximum(np.maximum(h - l, np.abs(h - pc)), np.abs(l - pc)))
+        np.add(blk.st_count, 1, out=blk.st_count, where=m)
+        first = np.isnan(blk.st_atr)
+        np.add(blk.st_tr_sum, tr, out=blk.st_tr_sum, where=m & first)
+        st_ready = m & (~first | (blk.st_count >= period))
+        atr = where(first, blk.st_tr_sum / period, (blk.st_atr * (period - 1) + tr) / period)
+        hl2 = (h + l) / 2
+        basic_upper = hl2 + (self._st_multiplier * atr)
+        basic_lower = hl2 - (self._st_multiplier * atr)
+        pu, pl = blk.st_upper, blk.st_lower
+        lower = where(first | (basic_lower > pl) | (pc < pl), basic_lower, pl)
+        upper = where(first | (basic_upper < pu) | (pc > pu), basic_upper, pu)
+        up = where(c > upper, 1.0, -1.0)
+        direction = where(first | (blk.st_dir != 1), up, where(c < lower, -1.0, 1.0))
+        np.copyto(blk.st_atr, atr, where=st_ready)
+        np.copyto(blk.st_upper, upper, where=st_ready)
+        np.copyto(blk.st_lower, lower, where=st_ready)
+        np.copyto(blk.st_dir, direction, where=st_ready)
+        np.copyto(pc, c, where=m)
+        st_dir = where(st_ready, direction, 0.0)
+
+        # MACD (MACD.add_candle)
+        fast_p, slow_p, sig_p = self._macd_fast, self._macd_slow, self._macd_signal
+        blk.fast = _ema_step(blk.fast, blk.fast_sum, blk.fast_n, c, fast_p, 2 / (fast_p + 1), m)
+        blk.slow = _ema_step(blk.slow, blk.slow_sum, blk.slow_n, c, slow_p, 2 / (slow_p + 1), m)
+        macd_ok = m & ~(np.isnan(blk.fast) | np.isnan(blk.slow))
+        macd = where(macd_ok, blk.fast - blk.slow, 0.0)
+        blk.sig = _ema_step(blk.sig, blk.sig_sum, blk.sig_n, macd, sig_p, 2 / (sig_p + 1), macd_ok)
+        sig_ok = macd_ok & ~np.isnan(blk.sig)
+        sig = where(sig_ok, blk.sig, 0.0)
+        hist = macd - sig
+        relation = where(macd >= sig, 1.0, -1.0)
+        cross = where(sig_ok & (blk.relation != 0) & (relation != blk.relation), relation, 0.0)
+        np.copyto(blk.relation, relation, where=sig_ok)
+        np.copyto(blk.last_macd, where(macd_ok, macd, np.nan), where=m)
+        np.copyto(blk.last_signal_line, where(sig_ok, sig, np.nan), where=m)
+        np.copyto(blk.last_histogram, where(sig_ok, hist, np.nan), where=m)
+
+        # Scoring (ScoreEngine._score_components)
+        prev_dir = blk.prev_st_dir
+        flipped = (st_dir != 0) & (prev_dir != 0) & (st_dir != prev_dir)
+        ring, pos = blk.flip_ring, blk.flip_pos
+        rows = np.flatnonzero(m)
+        p = pos[rows]
+        blk.flip_sum[rows] += flipped[rows] - ring[rows, p]
+        ring[rows, p] = flipped[rows]
+        pos[rows] = (p + 1) % _FLIP_WINDOW
+        st_score = where((st_dir == 0) | (blk.flip_sum >= 2), 0.0, where(flipped, 1.0, 2.0) * st_dir)
+        np.copyto(prev_dir, st_dir, where=m & (st_dir != 0))
+
+        # Away from the flat band, |x| > t means exactly one of rising / falling holds
+        den = np.maximum(np.abs(c), ref._NORM_EPS)
+        flat_t = ref._MACD_FLAT_DIFF_NORM
+        diff_norm = where(np.isnan(blk.prev_macd), 0.0, macd - blk.prev_macd) / den
+        rising = diff_norm > flat_t
+        falling = diff_norm < -flat_t
+        macd_score = where(
+            ~macd_ok | ~(rising | falling), 0.0,
+            where(macd > 0, where(rising, 2.0, 1.0), where(macd < 0, where(falling, -2.0, -1.0), 0.0)),
+        )
+        np.copyto(blk.prev_macd, macd, where=macd_ok)
+
+        hist_norm = hist / den
+        diffh_norm = where(np.isnan(blk.prev_hist), 0.0, hist - blk.prev_hist) / den
+        expand_t = ref._HIST_EXPAND_THRESH_NORM
+        expanding = diffh_norm > expand_t
+        contracting = diffh_norm < -expand_t
+        hist_score = where(
+            ~sig_ok | (np.abs(hist_norm) <= ref._HIST_NEAR_ZERO_NORM), 0.0,
+            where(hist > 0, where(expanding, 2.0, where(contracting, 1.0, 0.0)),
+                  where(hist < 0, where(contracting, -2.0, where(expanding, -1.0, 0.0)), 0.0)),
+        )
+        np.copyto(blk.prev_hist, hist, where=sig_ok)
+
+        aligned = (
+            sig_ok
+            & (np.abs(macd / den) > flat_t)
+            & (np.abs(sig / den) > flat_t)
+            & (np.abs(hist_norm) > ref._HIST_NEAR_ZERO_NORM)
+        )
+        triple = self._bonus_triple
+        momentum = self._bonus_momentum
+        bonus = 0.0 + where(aligned & (macd > 0) & (sig > 0) & (hist > 0), triple,
+                            where(aligned & (macd < 0) & (sig < 0) & (hist < 0), -triple, 0.0))
+        bonus = bonus + where((macd_score >= 2.0) & (hist_score >= 2.0), momentum,
+                              where((macd_score <= -2.0) & (hist_score <= -2.0), -momentum, 0.0))
+        bonus = bonus + cross * self._bonus_cross
+
+        raw = macd_score + hist_score + st_score + bonus
+        np.copyto(blk.macd_score, macd_score, where=m)
+        np.copyto(blk.hist_score, hist_score, where=m)
+        np.copyto(blk.st_score, st_score, where=m)
+        np.copyto(blk.bonus_score, bonus, where=m)
+        np.copyto(blk.raw_score, raw, where=m)
+        np.copyto(blk.weighted_score, raw * blk.weight, where=m)
+        np.copyto(blk.st_direction, st_dir, where=m, casting='unsafe')
+
+    def _push_scores(self, m, total) -> None:
+        """Vectorized _WindowStats.push() on rows `m`."""
+        w = self.chop_window
+        rows = np.flatnonzero(m)
+        slot = self._pushed[rows] % w
+        x = total[rows]
+
+        evict = self._win_len[rows] >= w
+        er, es = rows[evict], slot[evict]
+        old = self._win[er, es]
+        self._total[er] -= old
+        self._total_sq[er] -= old * old
+        self._total_abs[er] -= np.abs(old)
+        self._flips[er] -= np.where(old != 0, self._succ_flip[er, es], 0)
+        self._win_len[rows[~evict]] += 1
+
+        self._win[rows, slot] = x
+        self._succ_flip[rows, slot] = 0
+        self._total[rows] += x
+        self._total_sq[rows] += x * x
+        self._total_abs[rows] += np.abs(x)
+
+        sign = np.sign(x).astype(np.int8)
+        last = self._last_nz_pos[rows]
+        pred_in = (last >= 0) & (last >= self._pushed[rows] - w + 1)
+        flip = (sign != 0) & pred_in & (sign != self._last_nz_sign[rows])
+        self._flips[rows] += flip
+        fr = rows[flip]
+        self._succ_flip[fr, last[flip] % w] = 1
+        nz = sign != 0
+        self._last_nz_pos[rows[nz]] = self._pushed[rows[nz]]
+        self._last_nz_sign[rows[nz]] = sign[nz]
+        self._pushed[rows] += 1
+
+        self._since_rebuild[rows] += 1
+        rebuild = rows[self._since_rebuild[rows] >= w]
+        if len(rebuild):
+            # Sequential oldest-first sums, exactly as sum(window) (the window starts at slot 0 here)
+            win = self._win[rebuild]
+            t = np.zeros(len(rebuild))
+            tsq = np.zeros(len(rebuild))
+            tabs = np.zeros(len(rebuild))
+            for k in range(w):
+                col = win[:, k]
+                t = t + col
+                tsq = tsq + col * col
+                tabs = tabs + np.abs(col)
+            self._total[rebuild] = t
+            self._total_sq[rebuild] = tsq
+            self._total_abs[rebuild] = tabs
+            self._since_rebuild[rebuild] = 0
+
+    def _publish(self, m) -> None:
+        total = np.zeros(len(self.symbols))
+        for blk in self._tfs:
+            total = total + blk.weighted_score
+
+        slope = np.where(np.isnan(self._prev_score), 0.0, total - self._prev_score)
+        accel = np.where(np.isnan(self._prev_slope), 0.0, slope - self._prev_slope)
+        self._prev_score[m] = total[m]
+        self._prev_slope[m] = slope[m]
+        self._push_scores(m, total)
+
+        n = len(self.symbols)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = (self._total_sq - self._total * self._total / self._win_len) / self._win_len
+            mabs = self._total_abs / np.maximum(1, self._win_len)
+            # Rounded like _WindowStats; rows not updated this step are masked out below
+            stability, mean_abs = _round(np.stack((np.sqrt(np.where(m & (var > 0), var, 0.0)), np.where(m, mabs, 0.0))), 9)
+        stability = np.where(m & (self._pushed >= 5), stability, 0.0)
+
+        choppy = (self._win_len >= 8) & (
+            (self._flips >= 4)
+            | ((stability >= self._chop_stab_hi) & (mean_abs <= self._chop_mean_abs_mid))
+            | ((mean_abs <= self._chop_mean_abs_low) & (stability >= self._chop_stab_low))
+        )
+
+        # Same operation order as ScoreEngine._confidence()
+        max_possible = 6.0 * sum(self.tf_weights.values())
+        mag = np.minimum(1.0, np.abs(total) / max(1.0, 0.70 * max_possible))
+        slp = np.minimum(1.0, np.abs(slope) / 8.0)
+        sign_total = np.sign(total)
+        total_w = 0.0
+        aligned_w = np.zeros(n)
+        for blk in self._tfs:
+            total_w += blk.weight
+            aligned = (sign_total != 0) & (np.sign(blk.weighted_score) == sign_total)
+            aligned_w = aligned_w + np.where(aligned, blk.weight, 0.0)
+        alignment = np.zeros(n) if total_w <= 0 else aligned_w / total_w
+        stability_score = 1.0 - np.minimum(1.0, stability / 10.0)
+        confidence = 0.35 * mag + 0.25 * slp + 0.25 * alignment + 0.15 * stability_score
+        confidence = np.where(choppy, 0.0, np.maximum(0.0, np.minimum(1.0, confidence)))
+
+        direction = np.zeros(n, dtype=np.int8)
+        direction[total >= self._neutral_band] = DIRECTION_CODES['CE']
+        direction[total <= -self._neutral_band] = DIRECTION_CODES['PE']
+        ready = np.ones(n, dtype=bool)
+        for blk in self._tfs:
+            ready &= (blk.st_count >= self._st_period) & ~np.isnan(blk.last_macd) & ~np.isnan(blk.last_histogram)
+
+        pub = self._published
+        rounded = _round(np.stack((total, slope, accel, stability, confidence)), 3)
+        for name, values in zip(('score', 'slope', 'acceleration', 'stability', 'confidence'), rounded):
+            np.copyto(pub[name], values, where=m)
+        pub['direction'][m] = direction[m]
+        pub['is_choppy'][m] = choppy[m]
+        pub['ready'][m] = ready[m]
+        pub['updated'] = m.copy()
+
+    # ---- read side ------------------------------------------------------------
+
+    def tf_scores(self) -> Dict[int, Dict[str, np.ndarray]]:
+        """Latest per-TF component scores, {tf: {field: per-symbol array}} (copies)."""
+        if self._engines is not None:
+            scores = [engine.tf_scores for engine in self._engines]
+            return {
+                blk.tf: {name: np.array([getattr(s[blk.tf], name) for s in scores], dtype=getattr(blk, name).dtype)
+                         for name in _TF_FIELDS}
+                for blk in self._tfs
+            }
+        return {blk.tf: {name: getattr(blk, name).copy() for name in _TF_FIELDS} for blk in self._tfs}
+
+    def scores(self) -> Dict[str, dict]:
+        """Latest published values per symbol, JSON-friendly."""
+        pub = self._published
+        out = {}
+        for i, sym in enumerate(self.symbols):
+            out[sym] = {
+                'score': float(pub['score'][i]),
+                'slope': float(pub['slope'][i]),
+                'acceleration': float(pub['acceleration'][i]),
+                'stability': float(pub['stability'][i]),
+                'confidence': float(pub['confidence'][i]),
+                'direction': _DIRECTION_NAMES[int(pub['direction'][i])],
+                'is_choppy': bool(pub['is_choppy'][i]),
+                'ready': bool(pub['ready'][i]),
+            }
+        return out
+
+    def strongest(self, min_confidence: float = 0.0) -> Optional[str]:
+        """Ready, non-choppy symbol with a CE/PE direction and the largest |score| (None if none qualifies)."""
+        pub = self._published
+        ok = pub['ready'] & ~pub['is_choppy'] & (pub['direction'] != 0) & (pub['confidence'] >= min_confidence)
+        if not ok.any():
+            return None
+        strength = np.where(ok, np.abs(pub['score']), -1.0)
+        return self.symbols[int(np.argmax(strength))]
+
+    def symbol_index(self, symbol: str) -> int:
+        return self._index[str(symbol).strip().upper()]
+
+    def ordered(self, values: Dict[str, float], default: float = np.nan) -> List[float]:
+        """Dict keyed by symbol -> list in `symbols` order (missing symbols get `default`)."""
+        return [values.get(sym, default) for sym in self.symbols]
+
+
+class ParamSweepScoreEngine(MultiScoreEngine):
+    """One instrument scored under K parameter sets at once, one row per set.
+
+    Each entry of `param_sets` holds st_period, st_multiplier, macd_fast,
+    macd_slow, macd_signal and optionally bonus_macd_triple /
+    bonus_macd_momentum / bonus_macd_cross; row i matches
+    ScoreEngine(**param_sets[i], base_timeframe_seconds=..., full_chain=...,
+    tf_weights=...) exactly. on_candle() advances every set in the same
+    NumPy step; evaluate_series() scores a whole session with the indicator
+    work shared across sets (200 sets over a 4500-candle day cost about 3-4
+    streaming ScoreEngine runs). Rows are labelled by `labels` (default
+    "0".."K-1").
+    """
+
+    REQUIRED_PARAMS = ('st_period', 'st_multiplier', 'macd_fast', 'macd_slow', 'macd_signal')
+    OPTIONAL_PARAMS = ('bonus_macd_triple', 'bonus_macd_momentum', 'bonus_macd_cross')
+
+    def __init__(
+        self,
+        param_sets: Sequence[Dict[str, float]],
+        base_timeframe_seconds: int = 5,
+        full_chain: bool = False,
+        tf_weights: Optional[Dict[int, float]] = None,
+        labels: Optional[Sequence[str]] = None,
+    ):
+        sets = tuple(dict(p) for p in param_sets)
+        refs = []
+        cache: Dict[tuple, ScoreEngine] = {}
+        for i, params in enumerate(sets):
+            missing = [k for k in self.REQUIRED_PARAMS if k not in params]
+            unknown = [k for k in params if k not in self.REQUIRED_PARAMS + self.OPTIONAL_PARAMS]
+            if missing or unknown:
+                raise ValueError(f"Parameter set {i}: missing {missing}, unknown {unknown}")
+            if int(params['st_period']) <= 0 or min(int(params[k]) for k in ('macd_fast', 'macd_slow', 'macd_signal')) <= 0:
+                raise ValueError(f"Parameter set {i}: indicator periods must be positive")
+            key = tuple(sorted(params.items()))
+            if key not in cache:
+                cache[key] = ScoreEngine(
+                    base_timeframe_seconds=base_timeframe_seconds, full_chain=full_chain, tf_weights=tf_weights, **params,
+                )
+            refs.append(cache[key])
+        if labels is None:
+            labels = [str(i) for i in range(len(sets))]
+        if len(labels) != len(sets):
+            raise ValueError("ParamSweepScoreEngine: one label per parameter set")
+        self.param_sets = sets
+        self._setup(tuple(str(x) for x in labels), refs)
+
+    def on_candle(self, high: float, low: float, close: float) -> Dict[str, np.ndarray]:
+        """Feed one base candle to every parameter set; returns per-set columns like on_base_candles()."""
+        k = len(self.symbols)
+        return self.on_base_candles(np.full(k, high), np.full(k, low), np.full(k, close))
+
+    def evaluate_series(self, highs, lows, closes) -> Dict[str, np.ndarray]:
+        """Score a session of base candles under every parameter set.
+
+        Returns (candles, K) arrays 'score', 'slope', 'acceleration',
+        'stability', 'confidence', 'direction' (DIRECTION_CODES), 'is_choppy'
+        and 'ready', equal to ScoreEngine.evaluate_series() of each set on a
+        fresh engine (candles with close <= 0 give zeros / False). The
+        streaming state behind on_candle() is not used or changed.
+
+        Work is shared across sets: the timeframe candles are aggregated once,
+        SuperTrend / MACD run once per distinct indicator parameters (batch
+        add_candles()), sets differing only in bonuses share those columns,
+        and identical sets are scored once. Only the chop-window sums remain a
+        per-candle recurrence, one NumPy step for all sets.
+        """
+        h_all = np.asarray(highs, dtype=np.float64).ravel()
+        l_all = np.asarray(lows, dtype=np.float64).ravel()
+        c_all = np.asarray(closes, dtype=np.float64).ravel()
+        if not (len(h_all) == len(l_all) == len(c_all)):
+            raise ValueError("evaluate_series: highs, lows and closes must have the same length")
+        valid = c_all > 0
+        h, l, c = h_all[valid], l_all[valid], c_all[valid]
+        n = len(c)
+
+        # Distinct sets, and their distinct SuperTrend / MACD parameters
+        per_row = list(zip(
+            self._st_period.tolist(), self._st_multiplier.tolist(),
+            self._macd_fast.tolist(), self._macd_slow.tolist(), self._macd_signal.tolist(),
+            self._bonus_triple.tolist(), self._bonus_momentum.tolist(), self._bonus_cross.tolist(),
+        ))
+        distinct = list(dict.fromkeys(per_row))
+        inverse = np.array([distinct.index(row) for row in per_row])
+        first = np.array([per_row.index(row) for row in distinct])
+        st_keys = list(dict.fromkeys(row[:2] for row in distinct))
+        macd_keys = list(dict.fromkeys(row[2:5] for row in distinct))
+        st_col = np.array([st_keys.index(row[:2]) for row in distinct])
+        macd_col = np.array([macd_keys.index(row[2:5]) for row in distinct])
+        triple, momentum, cross_w = (np.array([row[i] for row in distinct]) for i in (5, 6, 7))
+        u = len(distinct)
+
+        ref = ScoreEngine  # scoring constants
+        flat_t = ref._MACD_FLAT_DIFF_NORM
+        total = np.zeros((n, u))
+        weighted_cols, ready = [], np.ones((n, u), dtype=bool)
+        levels = [(np.arange(n), h, l, c)] + CandleAggregator(self.timeframes).push_many(h, l, c)
+        for blk, (pos, th, tl, tc) in zip(self._tfs, levels):
+            k = len(tc)
+            # SuperTrend score per distinct (period, multiplier), as in ScoreEngine._score_components
+            st_dir = np.empty((k, len(st_keys)))
+            for j, (period, mult) in enumerate(st_keys):
+                st_dir[:, j] = SuperTrend(period=period, multiplier=mult).add_candles(th, tl, tc)['direction']
+            prev_dir = np.nan_to_num(_prev_valid(np.where(st_dir != 0, st_dir, np.nan)))
+            flipped = (st_dir != 0) & (prev_dir != 0) & (st_dir != prev_dir)
+            flips = np.cumsum(flipped, axis=0)
+            flips[_FLIP_WINDOW:] -= flips[:-_FLIP_WINDOW].copy()
+            st_score = np.where((st_dir == 0) | (flips >= 2), 0.0, np.where(flipped, 1.0, 2.0) * st_dir)
+
+            # MACD / histogram scores and bonus conditions per distinct (fast, slow, signal)
+            macd, sig, hist, cross = (np.empty((k, len(macd_keys))) for _ in range(4))
+            for j, (fast, slow, signal) in enumerate(macd_keys):
+                out = MACD(fast=fast, slow=slow, signal=signal).add_candles(th, tl, tc)
+                macd[:, j], sig[:, j], hist[:, j], cross[:, j] = out['macd'], out['signal_line'], out['histogram'], out['cross']
+            den = np.maximum(np.abs(tc), ref._NORM_EPS)[:, None]
+            with np.errstate(invalid='ignore'):
+                prev_macd = _prev_valid(macd)
+                diff_norm = np.where(np.isnan(prev_macd), 0.0, macd - prev_macd) / den
+                rising = diff_norm > flat_t
+                falling = diff_norm < -flat_t
+                macd_score = np.where(
+                    np.isnan(macd) | ~(rising | falling), 0.0,
+                    np.where(macd > 0, np.where(rising, 2.0, 1.0), np.where(macd < 0, np.where(falling, -2.0, -1.0), 0.0)),
+                )
+                prev_hist = _prev_valid(hist)
+                hist_norm = hist / den
+                diffh_norm = np.where(np.isnan(prev_hist), 0.0, hist - prev_hist) / den
+                expanding = diffh_norm > ref._HIST_EXPAND_THRESH_NORM
+                contracting = diffh_norm < -ref._HIST_EXPAND_THRESH_NORM
+                hist_score = np.where(
+                    np.isnan(hist) | (np.abs(hist_norm) <= ref._HIST_NEAR_ZERO_NORM), 0.0,
+                    np.where(hist > 0, np.where(expanding, 2.0, np.where(contracting, 1.0, 0.0)),
+                             np.where(hist < 0, np.where(contracting, -2.0, np.where(expanding, -1.0, 0.0)), 0.0)),
+                )
+                aligned = (
+                    ~np.isnan(hist)
+                    & (np.abs(macd / den) > flat_t)
+                    & (np.abs(sig / den) > flat_t)
+                    & (np.abs(hist_norm) > ref._HIST_NEAR_ZERO_NORM)
+                )
+                triple_sign = np.where(aligned & (macd > 0) & (sig > 0) & (hist > 0), 1.0,
+                                       np.where(aligned & (macd < 0) & (sig < 0) & (hist < 0), -1.0, 0.0))
+            momentum_sign = np.where((macd_score >= 2.0) & (hist_score >= 2.0), 1.0,
+                                     np.where((macd_score <= -2.0) & (hist_score <= -2.0), -1.0, 0.0))
+
+            # Per distinct set; same addition order as the scalar bonus / raw score
+            ms, hs = macd_score[:, macd_col], hist_score[:, macd_col]
+            ts_, ms_ = triple_sign[:, macd_col], momentum_sign[:, macd_col]
+            bonus = 0.0 + np.where(ts_ > 0, triple, np.where(ts_ < 0, -triple, 0.0))
+            bonus = bonus + np.where(ms_ > 0, momentum, np.where(ms_ < 0, -momentum, 0.0))
+            bonus = bonus + cross[:, macd_col] * cross_w
+            weighted = (ms + hs + st_score[:, st_col] + bonus) * blk.weight
+            tf_ready = (st_dir[:, st_col] != 0) & ~np.isnan(hist[:, macd_col])
+
+            # Latest TF candle at or before each base candle (-1: none yet)
+            latest = np.full(n, -1)
+            np.maximum.at(latest, pos, np.arange(k))
+            latest = np.maximum.accumulate(latest) if n else latest
+            seen = (latest >= 0)[:, None]
+            weighted = np.where(seen, weighted[latest] if k else 0.0, 0.0 * blk.weight)
+            ready &= seen & (tf_ready[latest] if k else False)
+            weighted_cols.append(weighted)
+            total = total + weighted
+
+        slope = np.zeros((n, u))
+        accel = np.zeros((n, u))
+        slope[1:] = total[1:] - total[:-1]
+        accel[1:] = slope[1:] - slope[:-1]
+
+        # Chop-window sums: the only sequential part (same update / rebuild order as _WindowStats)
+        w = self.chop_window
+        pushed = np.stack((total, total * total, np.abs(total)), axis=1)
+        sums = np.empty_like(pushed)
+        acc = np.zeros((3, u))
+        for j in range(n):
+            if j >= w:
+                acc -= pushed[j - w]
+            acc += pushed[j]
+            if (j + 1) % w == 0:
+                acc = np.zeros((3, u))
+                for q in range(j - w + 1, j + 1):
+                    acc = acc + pushed[q]
+            sums[j] = acc
+        win_len = np.minimum(np.arange(n) + 1, w)[:, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = (sums[:, 1] - sums[:, 0] * sums[:, 0] / win_len) / win_len
+            std = _round(np.sqrt(np.where(var > 0, var, 0.0)), 9)
+            mean_abs = _round(sums[:, 2] / win_len, 9)
+        stability = np.where(win_len >= 5, std, 0.0)
+        flips = _window_flips(np.sign(total).astype(np.int8), w) if n else np.zeros((0, u))
+        pick = lambda arr: arr[first]  # noqa: E731
+        choppy = (win_len >= 8) & (
+            (flips >= 4)
+            | ((std >= pick(self._chop_stab_hi)) & (mean_abs <= pick(self._chop_mean_abs_mid)))
+            | ((mean_abs <= pick(self._chop_mean_abs_low)) & (std >= pick(self._chop_stab_low)))
+        )
+
+        # Same operation order as ScoreEngine._confidence()
+        max_possible = 6.0 * sum(self.tf_weights.values())
+        mag = np.minimum(1.0, np.abs(total) / max(1.0, 0.70 * max_possible))
+        slp = np.minimum(1.0, np.abs(slope) / 8.0)
+        sign_total = np.sign(total)
+        total_w = 0.0
+        aligned_w = np.zeros((n, u))
+        for blk, weighted in zip(self._tfs, weighted_cols):
+            total_w += blk.weight
+            aligned_w = aligned_w + np.where((sign_total != 0) & (np.sign(weighted) == sign_total), blk.weight, 0.0)
+        alignment = np.zeros((n, u)) if total_w <= 0 else aligned_w / total_w
+        stability_score = 1.0 - np.minimum(1.0, stability / 10.0)
+        confidence = 0.35 * mag + 0.25 * slp + 0.25 * alignment + 0.15 * stability_score
+        confidence = np.where(choppy, 0.0, np.maximum(0.0, np.minimum(1.0, confidence)))
+
+        direction = np.zeros((n, u), dtype=np.int8)
+        direction[total >= pick(self._neutral_band)] = DIRECTION_CODES['CE']
+        direction[total <= -pick(self._neutral_band)] = DIRECTION_CODES['PE']
+
+        columns = dict(zip(('score', 'slope', 'acceleration', 'stability', 'confidence'),
+                           _round(np.stack((total, slope, accel, stability, confidence)), 3)))
+        columns.update(direction=direction, is_choppy=choppy, ready=ready)
+        out = {}
+        for name, values in columns.items():
+            out[name] = np.zeros((len(c_all), len(self.symbols)), dtype=values.dtype)
+            out[name][valid] = values[:, inverse]
+        return out
@@ -0,0 +1,283 @@
+"""Strategy parameter sweeps over historical market-data-service candles.
+
+optimize() backtests candidate settings (grid, random sample or successive
+halving over a parameter space) across an IST date range and ranks them by
+one of the merged backtest metrics; save_top_strategies() stores the winners
+in the strategies table with their metrics.
+
+Work is split into (day, indicator group) jobs for a ProcessPoolExecutor:
+candidates that share indicator settings (backtest.indicator_key) replay one
+IndicatorTape of the day instead of recomputing the same SuperTrend / MACD /
+ScoreEngine series, and every worker keeps the days it has fetched.
+
+Successive halving first runs every candidate on a few days, keeps the best
+1/eta and repeats on eta times as many days until the survivors have run the
+whole range; a candidate's earlier days are never re-run.
+"""
+
+import logging
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Optional
+
+from backtest import (
+    IndicatorTape,
+    backtest_settings,
+    fetch_day_candles,
+    indicator_key,
+    ist_trading_days,
+    merge_backtests,
+    run_backtest,
+)
+
+logger = logging.getLogger(__name__)
+
+SEARCH_METHODS = ('grid', 'random', 'halving')
+
+# Default search space (values must be valid config values)
+DEFAULT_PARAM_SPACE = {
+    'supertrend_period': [7, 10, 14],
+    'supertrend_multiplier': [2.0, 3.0, 4.0],
+    'macd_fast': [8, 12],
+    'macd_slow': [21, 26],
+    'min_entry_confidence': [55.0, 65.0, 75.0],
+    'initial_stoploss': [15.0, 25.0, 50.0],
+    'target_points': [0.0, 20.0, 40.0],
+    'trail_start_profit': [0.0, 10.0],
+    'trail_step': [5.0],
+}
+
+# merge_backtests() metrics a sweep can rank by; _MINIMIZE ones rank smallest first
+OBJECTIVES = (
+    'total_pnl', 'win_rate', 'profit_factor', 'avg_trade_pnl', 'avg_pnl_per_day', 'winning_days',
+    'max_drawdown', 'losing_trades', 'avg_loss',
+)
+_MINIMIZE = {'max_drawdown', 'losing_trades', 'avg_loss'}
+
+# Per-worker-process cache: (date, index, interval, mds_base_url) -> candles
+_day_candles: dict = {}
+
+
+def _valid(params: dict, settings: dict) -> bool:
+    merged = {**settings, **params}
+    return int(merged.get('macd_fast', 12) or 12) < int(merged.get('macd_slow', 26) or 26)
+
+
+def grid_candidates(space: dict, settings: Optional[dict] = None) -> list[dict]:
+    """Every combination of `space` ({key: [values]}), minus invalid MACD periods."""
+    keys = list(space)
+    candidates = (dict(zip(keys, values)) for values in product(*(space[k] for k in keys)))
+    return [c for c in candidates if _valid(c, settings or {})]
+
+
+def random_candidates(space: dict, samples: int, seed: int = 0, settings: Optional[dict] = None) -> list[dict]:
+    """Up to `samples` distinct random combinations of `space`."""
+    keys = list(space)
+    total = math.prod(len(space[k]) for k in keys)
+    if total <= samples:
+        return grid_candidates(space, settings)
+    rng = random.Random(seed)
+    seen, candidates = set(), []
+    for _ in range(samples * 20):
+        values = tuple(rng.randrange(len(space[k])) for k in keys)
+        if values in seen:
+            continue
+        seen.add(values)
+        candidate = {k: space[k][i] for k, i in zip(keys, values)}
+        if _valid(candidate, settings or {}):
+            candidates.append(candidate)
+            if len(candidates) >= samples:
+                break
+    return candidates
+
+
+def _day_candles_cached(date_ist: str, settings: dict) -> list:
+    key = (date_ist, settings['selected_index'], settings.get('candle_interval'), settings.get('mds_base_url'))
+    if key not in _day_candles:
+        _day_candles[key] = fetch_day_candles(date_ist, settings)
+    return _day_candles[key]
+
+
+def _run_group(date_ist: str, settings: dict, group: list, seed: int) -> list[tuple]:
+    """Worker job: backtest candidates [(index, params)] sharing indicator settings on one day.
+
+    Returns [(index, day_result)]; day results carry no equity curve.
+    """
+    try:
+        candles = _day_candles_cached(date_ist, settings)
+        tape = None
+        if len(group) > 1:
+            tape = IndicatorTape.record(candles, {**settings, **group[0][1]})
+    except Exception as e:
+        logger.warning(f"[OPTIMIZE] {date_ist} failed: {e}")
+        return [(i, {'date': date_ist, 'error': str(e)}) for i, _ in group]
+
+    results = []
+    for i, params in group:
+        try:
+            result = run_backtest(candles, {**settings, **params}, seed=seed, tape=tape)
+            del result['equity']
+            results.append((i, {'date': date_ist, **result}))
+        except Exception as e:
+            logger.warning(f"[OPTIMIZE] {date_ist} candidate {params} failed: {e}")
+            results.append((i, {'date': date_ist, 'error': str(e)}))
+    return results
+
+
+def _rank_key(metrics: dict, objective: str):
+    value = float(metrics.get(objective) or 0.0)
+    return (-value if objective in _MINIMIZE else value, float(metrics.get('total_pnl') or 0.0))
+
+
+def _evaluate(pool, settings: dict, candidates: list, indices: list, days: list, cache: dict, seed: int) -> None:
+    """Fill cache[(index, day)] for every candidate index / day pair not run yet."""
+    groups: dict = {}
+    for i in indices:
+        key = indicator_key({**settings, **candidates[i]})
+        for day in days:
+            if (i, day) not in cache:
+                groups.setdefault((day, key), []).append((i, candidates[i]))
+    if not groups:
+        return
+    jobs = [(day, group) for (day, _), group in groups.items()]
+    for results in pool.map(
+        _run_group,
+        [day for day, _ in jobs],
+        [settings] * len(jobs),
+        [group for _, group in jobs],
+        [seed] * len(jobs),
+    ):
+        for i, result in results:
+            cache[(i, result['date'])] = result
+
+
+def _halving_rungs(n_candidates: int, n_days: int, eta: int) -> list[int]:
+    """Days per rung, growing by eta up to n_days (one rung per 1/eta cut)."""
+    rungs = max(0, math.ceil(math.log(max(n_candidates, 1), eta)) - 1)
+    counts = [max(1, math.ceil(n_days / eta ** (rungs - r))) for r in range(rungs + 1)]
+    return sorted(set(counts)) or [n_days]
+
+
+def optimize(
+    start_date: str,
+    end_date: str,
+    space: Optional[dict] = None,
+    overrides: Optional[dict] = None,
+    *,
+    method: str = 'grid',
+    samples: int = 50,
+    eta: int = 3,
+    objective: str = 'total_pnl',
+    top: int = 5,
+    workers: Optional[int] = None,
+    seed: int = 0,
+) -> dict:
+    """Sweep `space` over the trading days in [start_date, end_date] and rank the candidates.
+
+    `method` is 'grid' (every combination), 'random' (`samples` combinations)
+    or 'halving' (successive halving of a random sample, or of the whole grid
+    when it is smaller). Candidates are ranked by merged metric `objective`
+    (max_drawdown / losing_trades / avg_loss are minimized), ties by total_pnl.
+    Returns {'method', 'objective', 'days', 'candidates', 'evaluations',
+    'ranking' [{'params', 'metrics', 'days'}] (top `top` on all days),
+    'workers', 'elapsed_ms'}.
+    """
+    if method not in SEARCH_METHODS:
+        raise ValueError(f"method must be one of {', '.join(SEARCH_METHODS)}")
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {', '.join(OBJECTIVES)}")
+    space = {k: list(v) for k, v in (space or DEFAULT_PARAM_SPACE).items()}
+    if not space or any(not values for values in space.values()):
+        raise ValueError("Every swept parameter needs at least one value")
+    eta = max(2, int(eta))
+
+    settings = backtest_settings(overrides)
+    if method == 'grid':
+        candidates = grid_candidates(space, settings)
+    else:
+        candidates = random_candidates(space, max(1, int(samples)), seed, settings)
+    if not candidates:
+        raise ValueError("The parameter space has no valid combination")
+    days = ist_trading_days(start_date, end_date)
+    if not days:
+        raise ValueError("No trading days in the range")
+
+    # Halving adds days in a fixed shuffled order so early rungs sample the whole range
+    day_order = list(days)
+    random.Random(seed).shuffle(day_order)
+    rungs = _halving_rungs(len(candidates), len(days), eta) if method == 'halving' else [len(days)]
+
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    cache: dict = {}
+    survivors = list(range(len(candidates)))
+    started = time.perf_counter()
+    # spawn: never fork the server's event loop / threads into the workers
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for n_days in rungs:
+            rung_days = sorted(day_order[:n_days])
+            _evaluate(pool, settings, candidates, survivors, rung_days, cache, seed)
+            scored = sorted(
+                survivors,
+                key=lambda i: _rank_key(merge_backtests([cache[(i, d)] for d in rung_days])['metrics'], objective),
+                reverse=True,
+            )
+            if n_days < len(days):
+                survivors = scored[:max(top, math.ceil(len(scored) / eta))]
+                logger.info(f"[OPTIMIZE] {n_days} days: kept {len(survivors)} of {len(scored)} candidates")
+            else:
+                survivors = scored
+
+    ranking = []
+    for i in survivors[:max(1, int(top))]:
+        report = merge_backtests([cache[(i, d)] for d in days])
+        ranking.append({'params': candidates[i], 'metrics': report['metrics'], 'days': report['daily']})
+
+    result = {
+        'method': method,
+        'objective': objective,
+        'days': len(days),
+        'candidates': len(candidates),
+        'evaluations': len(cache),
+        'ranking': ranking,
+        'workers': workers,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000.0, 1),
+    }
+    logger.info(
+        f"[OPTIMIZE] {start_date}..{end_date} | {method} | {len(candidates)} candidates x {len(days)} days | "
+        f"{len(cache)} day runs | {workers} workers | {result['elapsed_ms']:.0f} ms"
+    )
+    return result
+
+
+async def save_top_strategies(
+    result: dict, name_prefix: str, overrides: Optional[dict] = None, *, start_date: str, end_date: str,
+) -> list[dict]:
+    """Store optimize() winners as strategies '<name_prefix> (1)', '(2)', ...
+
+    Each strategy config is `overrides` plus the candidate's params; the
+    backtest metrics ride along under 'backtest' (not a config key, so
+    applying the strategy ignores them).
+    """
+    from database import upsert_strategy
+
+    saved = []
+    for rank, entry in enumerate(result['ranking'], start=1):
+        strategy_config = {
+            **(overrides or {}),
+            **entry['params'],
+            'backtest': {
+                'start_date': start_date,
+                'end_date': end_date,
+                'objective': result['objective'],
+                'rank': rank,
+                'metrics': entry['metrics'],
+            },
+        }
+        saved.append(await upsert_strategy(f"{name_prefix} ({rank})", strategy_config))
+    return saved
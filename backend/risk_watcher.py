@@ -0,0 +1,113 @@
+"""Tick-level risk exits for the open position.
+
+RiskWatcher runs as its own task next to the candle loop. Every option LTP
+update is checked against threshold levels precomputed when the position,
+its trailing SL, the account's P&L today (every traded index) or the risk
+settings change, so a quote costs a couple of float comparisons. Only a quote
+outside the band takes TradingBot's trade lock and runs the exact
+TradingBot.check_tick_sl() logic (daily max loss, max loss per trade, target,
+trailing SL update / hit), which closes the position at once.
+"""
+
+import asyncio
+import logging
+import math
+
+from indices import get_index_config
+from market_events import put_latest
+
+logger = logging.getLogger(__name__)
+
+# Levels are widened by this much so float rounding never skips a real breach
+_LEVEL_TOLERANCE = 1e-6
+
+
+class RiskWatcher:
+    """Hard SL / trailing SL / target / daily max loss on every option quote."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._quotes: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._position = None
+        self._trailing_sl = None
+        self._daily_pnl = None
+        self._lower = math.inf  # quotes at or below this run the exit checks
+        self._upper = -math.inf  # quotes at or above this run the exit checks
+
+    def invalidate(self) -> None:
+        """Recompute the levels on the next quote (risk settings changed)."""
+        self._position = None
+
+    def on_option_ltp(self, ltp: float) -> None:
+        """Publish the latest option LTP (older unprocessed quotes are dropped)."""
+        put_latest(self._quotes, float(ltp))
+
+    async def run(self) -> None:
+        bot = self.bot
+        while True:
+            ltp = await self._quotes.get()
+            if not bot.current_position or ltp <= 0:
+                continue
+            if (
+                bot.current_position is not self._position
+                or bot.trailing_sl != self._trailing_sl
+                or bot.account_daily_pnl() != self._daily_pnl
+            ):
+                self._arm()
+            if self._lower < ltp < self._upper:
+                continue
+
+            async with bot._trade_lock:
+                exited = await bot.check_tick_sl(ltp)
+            if exited:
+                bot._on_tick_exit()
+            self._arm()
+
+    def _arm(self) -> None:
+        """Precompute the quote band inside which check_tick_sl() cannot act."""
+        bot = self.bot
+        position = bot.current_position
+        self._position = position
+        self._trailing_sl = bot.trailing_sl
+        self._daily_pnl = bot.account_daily_pnl()
+        if not position:
+            self._lower, self._upper = math.inf, -math.inf
+            return
+
+        entry = float(bot.entry_price)
+        qty = int(position.get('qty') or 0)
+        if qty <= 0:
+            qty = bot.config['order_qty'] * get_index_config(bot.config['selected_index'])['lot_size']
+
+        lower, upper = -math.inf, math.inf
+        daily_max_loss = bot.config.get('daily_max_loss', 0)
+        if daily_max_loss > 0:
+            lower = max(lower, entry + (-daily_max_loss - self._daily_pnl) / qty)
+        max_loss_per_trade = bot.config.get('max_loss_per_trade', 0)
+        if max_loss_per_trade > 0:
+            lower = max(lower, entry - max_loss_per_trade / qty)
+        if bot.trailing_sl:
+            lower = max(lower, float(bot.trailing_sl))
+
+        target_points = bot.config.get('target_points', 0)
+        if target_points > 0:
+            upper = min(upper, entry + target_points)
+        trail_start = bot.config.get('trail_start_profit', 0)
+        trail_step = bot.config.get('trail_step', 0)
+        if trail_start and trail_step:
+            if bot.config.get('initial_stoploss', 0) > 0 and bot.trailing_sl is None:
+                lower = math.inf  # the first quote sets the initial SL
+            elif bot.highest_profit < trail_start:
+                upper = min(upper, entry + trail_start)
+            else:
+                levels = int((bot.highest_profit - trail_start) / trail_step)
+                locked = max(0.0, (trail_start - trail_step) + levels * trail_step)
+                if bot.trailing_sl is None or bot.trailing_sl < entry + locked:
+                    # SL lags highest_profit (trail settings changed): any trailing quote raises it
+                    upper = min(upper, entry + trail_start)
+                else:
+                    # The trailing SL only moves once profit reaches the next step
+                    upper = min(upper, entry + trail_start + (levels + 1) * trail_step)
+
+        self._lower = lower + _LEVEL_TOLERANCE
+        self._upper = upper - _LEVEL_TOLERANCE
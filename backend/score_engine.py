@@ -1,18 +1,34 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from array import array
+from dataclasses import asdict, dataclass
 from collections import deque
+from enum import Enum
 from math import sqrt
-from typing import Deque, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from indicators import SuperTrend, MACD
 
+if TYPE_CHECKING:
+    from indicator_graph import IndicatorGraph, IndicatorNode
+
+
+# Columnar direction encoding used by ScoreEngine.evaluate_series()
+DIRECTION_CODES = {'CE': 1, 'PE': -1, 'NONE': 0}
+
+# int8 signal code -> add_candle() signal string (index -1 is RED)
+_SIGNAL_NAMES = (None, "GREEN", "RED")
+
 
 @dataclass(frozen=True)
 class Candle:
     high: float
     low: float
     close: float
+    # Bucket start in epoch seconds (MDS candle ts); None = count-based aggregation
+    ts: Optional[float] = None
 
 
 @dataclass
@@ -29,12 +45,340 @@ class TFIndicators:
     # Recent ST flips for chop/regime detection
     st_flip_history: Deque[int] = None  # 1 for flip, 0 for no flip
 
+    # Shared IndicatorGraph nodes (base TF only); evaluated by the graph owner
+    st_node: Optional["IndicatorNode"] = None
+    macd_node: Optional["IndicatorNode"] = None
+
     def __post_init__(self):
         if self.st_flip_history is None:
             self.st_flip_history = deque(maxlen=6)
 
 
-@dataclass(frozen=True)
+class CandleAggregator:
+    """Cascading candle aggregation over a timeframe chain.
+
+    Level i accumulates candles of timeframes[i] into timeframes[i + 1]; a
+    completed candle feeds the next level up, so each base candle costs
+    O(levels). Accumulators are preallocated per level. Used by ScoreEngine
+    and by the bot's HTF filter (live, seeding and replay alike); chain()
+    builds one for any set of higher timeframes.
+
+    Candles without a timestamp are grouped by count (every ratio candles).
+    Timestamped candles are grouped into clock-aligned buckets
+    (ts - ts % tf): a bucket closes when the candle covering its end arrives,
+    or early when a candle of a later bucket shows up (a gap), so missed
+    candles never shift later buckets. `floor` is the newest bucket already
+    emitted per level; candles of that bucket or older are ignored.
+    """
+    __slots__ = ('timeframes', 'ratios', 'count', 'high', 'low', 'close', 'bucket', 'floor')
+
+    def __init__(self, timeframes: Tuple[int, ...]):
+        self.timeframes = tuple(timeframes)
+        ratios = []
+        for lo, hi in zip(self.timeframes, self.timeframes[1:]):
+            if hi % lo != 0:
+                raise ValueError(f"Cannot aggregate {lo}s -> {hi}s")
+            ratios.append(hi // lo)
+        self.ratios = tuple(ratios)
+        levels = len(ratios)
+        self.count = [0] * levels
+        self.high = [0.0] * levels
+        self.low = [0.0] * levels
+        self.close = [0.0] * levels
+        self.bucket: List[Optional[float]] = [None] * levels
+        self.floor: List[Optional[float]] = [None] * levels
+
+    @classmethod
+    def chain(cls, base_tf: int, timeframes) -> "CandleAggregator":
+        """Aggregator from base_tf up through the given higher timeframes (sorted; each must divide the next)."""
+        base_tf = int(base_tf)
+        return cls((base_tf, *sorted({int(tf) for tf in timeframes if int(tf) > base_tf})))
+
+    def reset(self) -> None:
+        for i in range(len(self.ratios)):
+            self.count[i] = 0
+            self.bucket[i] = None
+            self.floor[i] = None
+
+    def push(self, high: float, low: float, close: float, ts: Optional[float] = None) -> List[Tuple[int, Candle]]:
+        """Add one base candle; returns the completed (timeframe, candle) pairs, lowest timeframe first."""
+        return self.push_at(0, high, low, close, ts)
+
+    def push_at(self, level: int, high: float, low: float, close: float, ts: Optional[float] = None) -> List[Tuple[int, Candle]]:
+        """Add one candle of timeframes[level] and cascade upwards."""
+        out = []
+        pending = [(high, low, close, ts)]
+        count, highs, lows, closes = self.count, self.high, self.low, self.close
+        for i in range(level, len(self.ratios)):
+            up = self.timeframes[i + 1]
+            done = []
+            for high, low, close, ts in pending:
+                if ts is None:
+                    if count[i] == 0:
+                        highs[i], lows[i] = high, low
+                    else:
+                        if high > highs[i]:
+                            highs[i] = high
+                        if low < lows[i]:
+                            lows[i] = low
+                    closes[i] = close
+                    count[i] += 1
+                    if count[i] >= self.ratios[i]:
+                        count[i] = 0
+                        done.append((float(highs[i]), float(lows[i]), float(closes[i]), None))
+                    continue
+
+                bucket = ts - ts % up
+                floor = self.floor[i]
+                if floor is not None and bucket <= floor:
+                    continue
+                if count[i] and self.bucket[i] is not None and bucket != self.bucket[i]:
+                    if bucket < self.bucket[i]:
+                        continue
+                    # Gap: the open bucket will get no more candles
+                    done.append((float(highs[i]), float(lows[i]), float(closes[i]), self.bucket[i]))
+                    self.floor[i] = self.bucket[i]
+                    count[i] = 0
+                if count[i] == 0:
+                    highs[i], lows[i] = high, low
+                else:
+                    if high > highs[i]:
+                        highs[i] = high
+                    if low < lows[i]:
+                        lows[i] = low
+                closes[i] = close
+                count[i] += 1
+                self.bucket[i] = bucket
+                if ts + self.timeframes[i] >= bucket + up:
+                    done.append((float(highs[i]), float(lows[i]), float(closes[i]), bucket))
+                    self.floor[i] = bucket
+                    self.bucket[i] = None
+                    count[i] = 0
+            if not done:
+                break
+            out.extend((up, Candle(high=h, low=l, close=c, ts=t)) for h, l, c, t in done)
+            pending = done
+        return out
+
+    def claim(self, level: int, ts: float) -> bool:
+        """Mark the timeframes[level + 1] bucket holding `ts` as supplied from outside (e.g. an MDS candle).
+
+        Drops any partial aggregate of that bucket or older; False when the bucket was already emitted.
+        """
+        up = self.timeframes[level + 1]
+        bucket = ts - ts % up
+        if self.floor[level] is not None and bucket <= self.floor[level]:
+            return False
+        if self.count[level] and (self.bucket[level] is None or self.bucket[level] <= bucket):
+            self.count[level] = 0
+            self.bucket[level] = None
+        self.floor[level] = bucket
+        return True
+
+    def push_many(self, highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                  timestamps: Optional[np.ndarray] = None) -> List[tuple]:
+        """Batch push(): per upper timeframe, (base index, highs, lows, closes) of its completed candles.
+
+        Leaves the accumulators exactly where pushing the candles one by one would.
+        Timestamps, when given, must be strictly increasing (ValueError otherwise).
+        """
+        if timestamps is not None:
+            return self._push_many_ts(highs, lows, closes, np.asarray(timestamps, dtype=np.float64))
+        out = []
+        pos = np.arange(len(closes))
+        h, l, c = highs, lows, closes
+        for i, ratio in enumerate(self.ratios):
+            k = len(c)
+            if not k:
+                out.append((pos, h, l, c))
+                continue
+            idx = self.count[i] + np.arange(k)
+            starts = np.flatnonzero(idx % ratio == 0)
+            if not len(starts) or starts[0] != 0:
+                starts = np.concatenate(([0], starts))
+            ends = np.append(starts[1:] - 1, k - 1)
+            gh = np.maximum.reduceat(h, starts)
+            gl = np.minimum.reduceat(l, starts)
+            gc = c[ends]
+            if self.count[i]:
+                gh[0] = max(self.high[i], gh[0])
+                gl[0] = min(self.low[i], gl[0])
+
+            done = (idx[ends] + 1) % ratio == 0
+            pending = (self.count[i] + k) % ratio
+            self.count[i] = pending
+            if pending:
+                self.high[i], self.low[i], self.close[i] = float(gh[-1]), float(gl[-1]), float(gc[-1])
+
+            pos, h, l, c = pos[ends[done]], gh[done], gl[done], gc[done]
+            out.append((pos, h, l, c))
+        return out
+
+    def _push_many_ts(self, highs, lows, closes, ts) -> List[tuple]:
+        if len(ts) > 1 and not np.all(np.diff(ts) > 0):
+            raise ValueError("push_many: timestamps must be strictly increasing")
+        out = []
+        pos = np.arange(len(closes))
+        h, l, c, t = highs, lows, closes, ts
+        for i, up in enumerate(self.timeframes[1:]):
+            bucket = t - t % up
+            # Buckets already emitted (or older than the open one) are ignored
+            keep = np.ones(len(t), dtype=bool)
+            if self.floor[i] is not None:
+                keep &= bucket > self.floor[i]
+            if self.count[i] and self.bucket[i] is not None:
+                keep &= bucket >= self.bucket[i]
+            # Candles after the one covering their bucket's end land in an emitted bucket
+            covers = t + self.timeframes[i] >= bucket + up
+            new_group = np.ones(len(t), dtype=bool)
+            new_group[1:] = bucket[1:] != bucket[:-1]
+            seen = np.cumsum(covers) - covers
+            keep &= seen - seen[np.flatnonzero(new_group)][np.cumsum(new_group) - 1] == 0
+            pos, h, l, c, t, bucket, covers = (a[keep] for a in (pos, h, l, c, t, bucket, covers))
+            k = len(c)
+            if not k:
+                out.append((pos, h, l, c))
+                continue
+
+            starts = np.flatnonzero(np.concatenate(([True], bucket[1:] != bucket[:-1])))
+            ends = np.append(starts[1:] - 1, k - 1)
+            gh = np.maximum.reduceat(h, starts)
+            gl = np.minimum.reduceat(l, starts)
+            gc = c[ends]
+            gb = bucket[starts]
+            gcount = ends - starts + 1
+            flush = None
+            if self.count[i]:
+                if self.bucket[i] is None or self.bucket[i] == gb[0]:
+                    gh[0] = max(self.high[i], gh[0])
+                    gl[0] = min(self.low[i], gl[0])
+                    gcount[0] += self.count[i]
+                else:
+                    # Open bucket from earlier candles, closed by the first new one
+                    flush = (pos[0], float(self.high[i]), float(self.low[i]), float(self.close[i]), self.bucket[i])
+
+            # A group closes on the candle covering its end, else when the next group starts
+            complete = covers[ends]
+            done = complete.copy()
+            done[:-1] = True
+            emit_pos = np.where(complete, pos[ends], np.append(pos[starts[1:]], -1))
+
+            if done[-1]:
+                self.count[i] = 0
+                self.bucket[i] = None
+            else:
+                self.count[i] = int(gcount[-1])
+                self.bucket[i] = float(gb[-1])
+                self.high[i], self.low[i], self.close[i] = float(gh[-1]), float(gl[-1]), float(gc[-1])
+
+            pos, h, l, c, t = emit_pos[done], gh[done], gl[done], gc[done], gb[done]
+            if flush is not None:
+                pos, h, l, c, t = (np.concatenate(([v], arr)) for v, arr in zip(flush, (pos, h, l, c, t)))
+            if len(t):
+                self.floor[i] = float(t[-1])
+            out.append((pos, h, l, c))
+        return out
+
+    def get_state(self) -> Dict[str, dict]:
+        """Partial candle per upper timeframe ({} when nothing is pending), plus timestamp bucketing state."""
+        out = {}
+        for i, tf in enumerate(self.timeframes[1:]):
+            state = {}
+            if self.count[i]:
+                state = {'count': self.count[i], 'high': self.high[i], 'low': self.low[i], 'close': self.close[i]}
+                if self.bucket[i] is not None:
+                    state['bucket'] = self.bucket[i]
+            if self.floor[i] is not None:
+                state['floor'] = self.floor[i]
+            out[str(tf)] = state
+        return out
+
+    def set_state(self, state: Dict[str, dict]) -> None:
+        for i, tf in enumerate(self.timeframes[1:]):
+            partial = state.get(str(tf)) or {}
+            self.count[i] = int(partial.get('count', 0))
+            if self.count[i]:
+                self.high[i] = float(partial['high'])
+                self.low[i] = float(partial['low'])
+                self.close[i] = float(partial['close'])
+            bucket, floor = partial.get('bucket'), partial.get('floor')
+            self.bucket[i] = None if bucket is None or not self.count[i] else float(bucket)
+            self.floor[i] = None if floor is None else float(floor)
+
+
+class _WindowStats:
+    """Rolling sum / sum of squares / sum of |x| and sign flips over the last `size` scores.
+
+    Sign flips count adjacent non-zero scores of opposite sign (zeros are
+    skipped), same as a full rescan of the window. All updates are O(1);
+    the sums are rebuilt from the window once per `size` pushes so float
+    drift cannot accumulate over a session. Results are rounded to 1e-9 so
+    summation order does not decide threshold ties in chop detection.
+    """
+    __slots__ = ('size', 'window', 'total', 'total_sq', 'total_abs', 'flips', '_signs', '_pushed', '_since_rebuild')
+
+    def __init__(self, size: int):
+        self.size = int(size)
+        self.window: Deque[float] = deque()
+        self._signs: Deque[Tuple[int, int]] = deque()  # (push index, sign) of non-zero scores in the window
+        self.reset()
+
+    def reset(self) -> None:
+        self.window.clear()
+        self._signs.clear()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.total_abs = 0.0
+        self.flips = 0
+        self._pushed = 0
+        self._since_rebuild = 0
+
+    def push(self, x: float) -> None:
+        window = self.window
+        if len(window) >= self.size:
+            old = window.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+            self.total_abs -= abs(old)
+            signs = self._signs
+            if signs and signs[0][0] == self._pushed - self.size:
+                _, old_sign = signs.popleft()
+                if signs and signs[0][1] != old_sign:
+                    self.flips -= 1
+
+        window.append(x)
+        self.total += x
+        self.total_sq += x * x
+        self.total_abs += abs(x)
+        sign = 1 if x > 0 else (-1 if x < 0 else 0)
+        if sign != 0:
+            if self._signs and self._signs[-1][1] != sign:
+                self.flips += 1
+            self._signs.append((self._pushed, sign))
+        self._pushed += 1
+
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.size:
+            self._rebuild_sums()
+
+    def _rebuild_sums(self) -> None:
+        self.total = sum(self.window)
+        self.total_sq = sum(x * x for x in self.window)
+        self.total_abs = sum(abs(x) for x in self.window)
+        self._since_rebuild = 0
+
+    def stddev(self) -> float:
+        n = len(self.window)
+        if not n:
+            return 0.0
+        var = (self.total_sq - self.total * self.total / n) / n
+        return round(sqrt(var), 9) if var > 0 else 0.0
+
+    def mean_abs(self) -> float:
+        return round(self.total_abs / max(1, len(self.window)), 9)
+
+
+@dataclass(frozen=True, slots=True)
 class TFScore:
     timeframe_seconds: int
     macd_score: float
@@ -46,7 +390,7 @@ class TFScore:
     st_direction: int  # 1 bullish, -1 bearish, 0 unknown
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MDSnapshot:
     score: float
     slope: float
@@ -60,18 +404,100 @@ class MDSnapshot:
     ready_timeframes: Tuple[int, ...]
 
 
+class MDSEventKind(str, Enum):
+    READY = "READY"  # ready flipped (all timeframes warmed up / not)
+    DIRECTION = "DIRECTION"  # score crossed the neutral band: CE / PE / NONE
+    CHOP = "CHOP"  # is_choppy toggled
+
+
+@dataclass(frozen=True, slots=True)
+class MDSEvent:
+    """One ScoreEngine state transition, with the published values of the candle that caused it."""
+    kind: MDSEventKind
+    old: object  # bool for READY / CHOP, 'CE' | 'PE' | 'NONE' for DIRECTION
+    new: object
+    score: float
+    slope: float
+    confidence: float
+
+
+class _SnapshotRing:
+    """Fixed-capacity history of the last `capacity` snapshots, one typed array per field.
+
+    Every value is written twice (slot i and i + capacity), so the latest n
+    values are always one contiguous oldest-first slice that view() exposes
+    as a read-only NumPy array without copying. Views are live: the next
+    record() may overwrite them.
+    """
+    FLOAT_FIELDS = ('score', 'slope', 'acceleration', 'stability', 'confidence')
+    FLAG_FIELDS = ('direction', 'is_choppy', 'ready')
+
+    __slots__ = ('capacity', 'timeframes', '_columns', '_tf_columns', '_views', '_head', '_size')
+
+    def __init__(self, capacity: int, timeframes: Tuple[int, ...]):
+        self.capacity = int(capacity)
+        self.timeframes = tuple(timeframes)
+        doubled = 2 * self.capacity
+        self._columns = {name: array('d', bytes(8 * doubled)) for name in self.FLOAT_FIELDS}
+        self._columns.update({name: array('b', bytes(doubled)) for name in self.FLAG_FIELDS})
+        self._tf_columns = {tf: array('d', bytes(8 * doubled)) for tf in self.timeframes}
+        self._views = {name: np.frombuffer(col, dtype=np.float64 if col.typecode == 'd' else np.int8)
+                       for name, col in self._columns.items()}
+        self._views.update({tf: np.frombuffer(col, dtype=np.float64) for tf, col in self._tf_columns.items()})
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        self._head = 0
+        self._size = 0
+
+    def record(self, values: Tuple, tf_weighted: Tuple[float, ...]) -> None:
+        """values follow FLOAT_FIELDS + FLAG_FIELDS; tf_weighted follows timeframes."""
+        i = self._head
+        j = i + self.capacity
+        for col, v in zip(self._columns.values(), values):
+            col[i] = v
+            col[j] = v
+        for col, v in zip(self._tf_columns.values(), tf_weighted):
+            col[i] = v
+            col[j] = v
+        self._head = (i + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def skip(self, count: int) -> None:
+        """Advance over `count` records that are about to be overwritten anyway (batch replay)."""
+        if count > 0:
+            self._head = (self._head + count) % self.capacity
+            self._size = min(self.capacity, self._size + count)
+
+    def view(self, key, n: Optional[int] = None) -> np.ndarray:
+        """Read-only oldest-first view of the last n values of a field (or a TF's weighted score)."""
+        n = self._size if n is None else max(0, min(int(n), self._size))
+        end = self._head + self.capacity
+        out = self._views[key][end - n:end]
+        out.flags.writeable = False
+        return out
+
+
 class ScoreEngine:
     """Deterministic multi-timeframe score engine.
 
     Updates on base candles matching the selected trading timeframe,
-    aggregates to the next higher timeframe (selected + next), computes:
+    aggregates to the next higher timeframe (selected + next) or, with
+    full_chain=True, to every higher timeframe in _TF_CHAIN, and computes:
     - Market Direction Score (MDS)
     - slope/acceleration
     - stability (stddev)
     - chop detection
     - confidence (0..1)
 
-    This is meant to be explainable and loggable.
+    This is meant to be explainable and loggable. With history > 0 the last
+    `history` snapshots are also kept in a fixed-size columnar ring; see
+    history().
     """
 
     _TF_CHAIN = (5, 15, 30, 60, 300, 900)
@@ -93,18 +519,28 @@ class ScoreEngine:
         bonus_macd_triple: float = 1.0,
         bonus_macd_momentum: float = 0.5,
         bonus_macd_cross: float = 0.5,
+        graph: Optional["IndicatorGraph"] = None,
+        full_chain: bool = False,
+        tf_weights: Optional[Dict[int, float]] = None,
+        history: int = 0,
     ):
         self.base_tf = int(base_timeframe_seconds)
         if self.base_tf not in self._TF_CHAIN:
             raise ValueError(f"Unsupported base_timeframe_seconds: {self.base_tf}")
 
-        self.timeframes = (self.base_tf, self._next_tf(self.base_tf))
+        if full_chain:
+            self.timeframes = tuple(tf for tf in self._TF_CHAIN if tf >= self.base_tf)
+            if len(self.timeframes) < 2:
+                raise ValueError(f"No higher timeframe available for: {self.base_tf}")
+        else:
+            self.timeframes = (self.base_tf, self._next_tf(self.base_tf))
 
-        # Weights: selected TF + next TF only
-        self.tf_weights = {
-            self.timeframes[0]: 1.0,
-            self.timeframes[1]: 2.0,
-        }
+        # Weights: default 1, 2, 3, ... up the chain (selected TF 1.0, next TF 2.0)
+        self.tf_weights = {tf: float(i + 1) for i, tf in enumerate(self.timeframes)}
+        for tf, w in (tf_weights or {}).items():
+            if int(tf) not in self.tf_weights:
+                raise ValueError(f"Weight given for timeframe {tf}s outside {self.timeframes}")
+            self.tf_weights[int(tf)] = float(w)
 
         # Bonus score knobs (added on top of the base MACD/HIST/ST scoring).
         # These are symmetric (+ for bullish alignment, - for bearish alignment).
@@ -125,15 +561,41 @@ class ScoreEngine:
 
         self._tfs: Dict[int, TFIndicators] = {}
         for tf in self.timeframes:
+            if graph is not None and tf == self.base_tf:
+                # Base-TF SuperTrend/MACD are shared with the bot: the graph owner
+                # must call graph.on_candle(base_tf, ...) before on_base_candle().
+                st_node = graph.subscribe('score_engine', 'supertrend', tf, period=st_period, multiplier=st_multiplier)
+                macd_node = graph.subscribe('score_engine', 'macd', tf, fast=macd_fast, slow=macd_slow, signal=macd_signal)
+                self._tfs[tf] = TFIndicators(
+                    timeframe_seconds=tf,
+                    supertrend=st_node.indicator,
+                    macd=macd_node.indicator,
+                    st_node=st_node,
+                    macd_node=macd_node,
+                )
+                continue
             self._tfs[tf] = TFIndicators(
                 timeframe_seconds=tf,
                 supertrend=SuperTrend(period=st_period, multiplier=st_multiplier),
                 macd=MACD(fast=macd_fast, slow=macd_slow, signal=macd_signal),
             )
 
-        self._agg_partial: Dict[int, dict] = {self.timeframes[1]: {}}
+        self._agg = CandleAggregator(self.timeframes)
         self._score_history: Deque[float] = deque(maxlen=max(60, self.chop_window * 5))
         self._slope_history: Deque[float] = deque(maxlen=max(60, self.chop_window * 5))
+        # Chop-window statistics, maintained incrementally alongside _score_history
+        self._chop_stats = _WindowStats(self.chop_window)
+
+        # Chop thresholds scale with score range (older engine assumed ~45 max score)
+        max_possible = self._max_tf_raw * sum(self.tf_weights.values())
+        scale = max(0.35, min(1.0, max_possible / 45.0))
+        self._chop_stab_hi = 7.5 * scale
+        self._chop_mean_abs_mid = 12.0 * scale
+        self._chop_mean_abs_low = 7.0 * scale
+        self._chop_stab_low = 3.5 * scale
+
+        self.history_size = max(0, int(history))
+        self._ring = _SnapshotRing(self.history_size, self.timeframes) if self.history_size else None
 
         # Persist last computed TFScore per timeframe so higher-TF contribution remains
         # stable between its candle completions.
@@ -141,6 +603,9 @@ class ScoreEngine:
         for tf in self.timeframes:
             self._last_scores[tf] = self._neutral_tf_score(tf)
 
+        self._listeners: List[Callable[[MDSEvent], None]] = []
+        self._reset_published()
+
     def _neutral_tf_score(self, tf: int) -> TFScore:
         w = self.tf_weights.get(tf, 1.0)
         return TFScore(tf, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0 * w, 0)
@@ -156,33 +621,144 @@ class ScoreEngine:
 
     def reset(self):
         for tf_state in self._tfs.values():
-            tf_state.supertrend.reset()
-            tf_state.macd.reset()
+            # Shared nodes are reset by the graph owner
+            if tf_state.st_node is None:
+                tf_state.supertrend.reset()
+            if tf_state.macd_node is None:
+                tf_state.macd.reset()
             tf_state.prev_macd = None
             tf_state.prev_hist = None
             tf_state.prev_st_dir = None
             tf_state.st_flip_history.clear()
 
-        self._agg_partial = {self.timeframes[1]: {}}
+        self._agg.reset()
         self._score_history.clear()
+        self._chop_stats.reset()
         self._slope_history.clear()
+        if self._ring is not None:
+            self._ring.clear()
         for tf in self.timeframes:
             self._last_scores[tf] = self._neutral_tf_score(tf)
+        self._reset_published()
+
+    def _reset_published(self) -> None:
+        # Latest published values (what on_base_candle() snapshots), readable without a snapshot
+        self.score = 0.0
+        self.slope = 0.0
+        self.acceleration = 0.0
+        self.stability = 0.0
+        self.confidence = 0.0
+        self.is_choppy = False
+        self.direction = "NONE"
+        self.ready = False
+
+    @property
+    def tf_scores(self) -> Dict[int, TFScore]:
+        """Latest known score of every timeframe."""
+        return {tf: self._last_tf_score(tf) for tf in sorted(self.timeframes)}
+
+    def add_listener(self, listener: Callable[[MDSEvent], None]) -> None:
+        """Call `listener(event)` on every READY / DIRECTION / CHOP transition.
+
+        Listeners run synchronously after the candle's values are published
+        (in READY, DIRECTION, CHOP order); exceptions propagate to the caller.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[MDSEvent], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _publish(self, score, slope, acceleration, stability, confidence, is_choppy, direction, ready) -> None:
+        old = (self.ready, self.direction, self.is_choppy)
+        self.score = score
+        self.slope = slope
+        self.acceleration = acceleration
+        self.stability = stability
+        self.confidence = confidence
+        self.is_choppy = is_choppy
+        self.direction = direction
+        self.ready = ready
+        if self._listeners and old != (ready, direction, is_choppy):
+            for kind, before, after in (
+                (MDSEventKind.READY, old[0], ready),
+                (MDSEventKind.DIRECTION, old[1], direction),
+                (MDSEventKind.CHOP, old[2], is_choppy),
+            ):
+                if before != after:
+                    event = MDSEvent(kind, before, after, score, slope, confidence)
+                    for listener in list(self._listeners):
+                        listener(event)
+
+    def get_state(self) -> dict:
+        """JSON-safe snapshot for checkpointing (shared graph nodes are saved by the graph)."""
+        tfs = {}
+        for tf, state in self._tfs.items():
+            tfs[str(tf)] = {
+                'supertrend': None if state.st_node is not None else state.supertrend.get_state(),
+                'macd': None if state.macd_node is not None else state.macd.get_state(),
+                'prev_macd': state.prev_macd,
+                'prev_hist': state.prev_hist,
+                'prev_st_dir': state.prev_st_dir,
+                'st_flip_history': list(state.st_flip_history),
+            }
+        return {
+            'timeframes': list(self.timeframes),
+            'tfs': tfs,
+            'agg_partial': self._agg.get_state(),
+            'score_history': list(self._score_history),
+            'slope_history': list(self._slope_history),
+            'last_scores': {str(tf): asdict(sc) for tf, sc in self._last_scores.items()},
+        }
+
+    def set_state(self, state: dict) -> None:
+        if tuple(state.get('timeframes') or ()) != self.timeframes:
+            raise ValueError(f"ScoreEngine state is for timeframes {state.get('timeframes')}, expected {self.timeframes}")
+        for tf, tf_state in self._tfs.items():
+            saved = state['tfs'][str(tf)]
+            if tf_state.st_node is None:
+                tf_state.supertrend.set_state(saved['supertrend'])
+            if tf_state.macd_node is None:
+                tf_state.macd.set_state(saved['macd'])
+            tf_state.prev_macd = saved['prev_macd']
+            tf_state.prev_hist = saved['prev_hist']
+            tf_state.prev_st_dir = saved['prev_st_dir']
+            tf_state.st_flip_history.clear()
+            tf_state.st_flip_history.extend(saved['st_flip_history'])
+        self._agg.set_state(state['agg_partial'])
+        self._score_history.clear()
+        self._score_history.extend(state['score_history'])
+        self._chop_stats.reset()
+        for score in list(self._score_history)[-self.chop_window:]:
+            self._chop_stats.push(score)
+        self._slope_history.clear()
+        self._slope_history.extend(state['slope_history'])
+        self._last_scores = {int(tf): TFScore(**sc) for tf, sc in state['last_scores'].items()}
 
     def on_base_candle(self, candle: Candle) -> MDSnapshot:
         """Consume a base candle (selected timeframe); returns latest snapshot."""
-        if candle.close <= 0:
+        if not self.update(candle):
             return self._snapshot({}, ready=False)
+        return self.snapshot()
+
+    def update(self, candle: Candle) -> bool:
+        """Consume a base candle without building a snapshot (False if it was ignored).
+
+        The published values are then available as attributes (score, slope,
+        acceleration, stability, confidence, is_choppy, direction, ready,
+        tf_scores), and listeners get any transition events.
+        """
+        if candle.close <= 0:
+            return False
 
-        base_tf, next_tf = self.timeframes
         tf_scores: Dict[int, TFScore] = {}
-        tf_scores[base_tf] = self._update_tf(base_tf, candle)
+        tf_scores[self.base_tf] = self._update_tf(self.base_tf, candle)
 
-        completed = self._aggregate(next_tf, candle)
-        if completed is not None:
-            tf_scores[next_tf] = self._update_tf(next_tf, completed)
+        # Higher timeframes only update when their candle completes
+        for tf, tf_candle in self._agg.push(candle.high, candle.low, candle.close, candle.ts):
+            tf_scores[tf] = self._update_tf(tf, tf_candle)
 
-        # Compute total score using last-known TF scores (slow TF persists between updates)
+        # Compute total score using last-known TF scores (slow TFs persist between updates)
         total_score = 0.0
         for tf in self.timeframes:
             total_score += self._last_tf_score(tf).weighted_score
@@ -194,58 +770,263 @@ class ScoreEngine:
 
         self._score_history.append(total_score)
         self._slope_history.append(slope)
+        self._chop_stats.push(total_score)
 
-        stability = self._stddev(list(self._score_history)[-self.chop_window:]) if len(self._score_history) >= 5 else 0.0
+        stability = self._chop_stats.stddev() if len(self._score_history) >= 5 else 0.0
         is_choppy = self._detect_chop()
 
         confidence = self._confidence(total_score, slope, stability, tf_scores, is_choppy)
         direction = self._direction(total_score)
+        ready = len(self._ready_timeframes()) == len(self.timeframes)
 
-        ready_tfs = tuple(sorted(self._ready_timeframes()))
-        ready = all(tf in ready_tfs for tf in self.timeframes)
-
-        # Always expose latest known TF scores for both timeframes
-        snapshot_tf_scores = {tf: self._last_tf_score(tf) for tf in self.timeframes}
+        self._publish(
+            round(total_score, 3), round(slope, 3), round(acceleration, 3), round(stability, 3), round(confidence, 3),
+            bool(is_choppy), direction, bool(ready),
+        )
+        if self._ring is not None:
+            self._ring.record(
+                (self.score, self.slope, self.acceleration, self.stability, self.confidence,
+                 DIRECTION_CODES[direction], is_choppy, ready),
+                tuple(self._last_tf_score(tf).weighted_score for tf in self.timeframes),
+            )
+        return True
 
+    def snapshot(self) -> MDSnapshot:
+        """MDSnapshot of the latest published values."""
         return MDSnapshot(
-            score=round(total_score, 3),
-            slope=round(slope, 3),
-            acceleration=round(acceleration, 3),
-            stability=round(stability, 3),
-            confidence=round(confidence, 3),
-            is_choppy=bool(is_choppy),
-            direction=direction,
-            tf_scores={k: v for k, v in sorted(snapshot_tf_scores.items())},
-            ready=bool(ready),
-            ready_timeframes=ready_tfs,
+            score=self.score,
+            slope=self.slope,
+            acceleration=self.acceleration,
+            stability=self.stability,
+            confidence=self.confidence,
+            is_choppy=self.is_choppy,
+            direction=self.direction,
+            tf_scores=self.tf_scores,
+            ready=self.ready,
+            ready_timeframes=tuple(sorted(self._ready_timeframes())),
         )
 
-    def _aggregate(self, tf: int, candle: Candle) -> Optional[Candle]:
-        if tf == self.base_tf:
-            return candle
-
-        if tf % self.base_tf != 0:
-            raise ValueError(f"Cannot aggregate {self.base_tf}s -> {tf}s")
-
-        multiple = tf // self.base_tf
-        state = self._agg_partial[tf]
-
-        if not state:
-            state["count"] = 0
-            state["high"] = candle.high
-            state["low"] = candle.low
-            state["close"] = candle.close
-
-        state["count"] += 1
-        state["high"] = max(state["high"], candle.high)
-        state["low"] = min(state["low"], candle.low)
-        state["close"] = candle.close
+    def on_htf_candle(self, tf: int, candle: Candle) -> TFScore:
+        """Consume a completed higher-timeframe candle taken directly from MDS (warmup seeding).
+
+        `candle.ts` (bucket start) is required. The bucket is then never
+        aggregated from base candles, and the candle also feeds the timeframes
+        above it. Base candles of later buckets aggregate as usual, so seeding
+        interleaves on_htf_candle() and on_base_candle() in candle-close order,
+        higher timeframes first on ties. Returns the TF's latest score (unchanged
+        when that bucket was already scored).
+        """
+        if tf not in self.timeframes[1:]:
+            raise ValueError(f"on_htf_candle: {tf}s is not a higher timeframe of {self.timeframes}")
+        if candle.ts is None:
+            raise ValueError("on_htf_candle needs a timestamped candle")
+        level = self.timeframes.index(tf)
+        if candle.close <= 0 or not self._agg.claim(level - 1, candle.ts):
+            return self._last_tf_score(tf)
+        score = self._update_tf(tf, candle)
+        for up_tf, up_candle in self._agg.push_at(level, candle.high, candle.low, candle.close, candle.ts):
+            self._update_tf(up_tf, up_candle)
+        return score
+
+    def history(self, n: Optional[int] = None) -> Dict[str, object]:
+        """Last n snapshots (default: all retained) as oldest-first, read-only NumPy views.
+
+        Keys: 'score', 'slope', 'acceleration', 'stability', 'confidence',
+        'direction' (DIRECTION_CODES), 'is_choppy', 'ready', and 'tf_scores'
+        ({tf: weighted score}). Nothing is copied; the views go stale once
+        further candles overwrite the ring, so copy anything kept longer.
+        Empty when the engine was built with history=0.
+        """
+        ring = self._ring
+        if ring is None:
+            empty = np.empty(0)
+            return {**{name: empty for name in _SnapshotRing.FLOAT_FIELDS + _SnapshotRing.FLAG_FIELDS},
+                    'tf_scores': {tf: empty for tf in self.timeframes}}
+        out: Dict[str, object] = {name: ring.view(name, n) for name in _SnapshotRing.FLOAT_FIELDS + _SnapshotRing.FLAG_FIELDS}
+        out['tf_scores'] = {tf: ring.view(tf, n) for tf in self.timeframes}
+        return out
 
-        if state["count"] >= multiple:
-            completed = Candle(high=float(state["high"]), low=float(state["low"]), close=float(state["close"]))
-            self._agg_partial[tf] = {}
-            return completed
-        return None
+    def evaluate_series(self, highs, lows, closes, timestamps=None) -> dict:
+        """Batch on_base_candle() over a session of base candles, returning columns instead of snapshots.
+
+        Returns per-candle arrays {'score', 'slope', 'acceleration', 'stability',
+        'confidence', 'direction' (DIRECTION_CODES), 'is_choppy', 'ready'} plus
+        'tf_scores': {tf: {'macd_score', 'hist_score', 'st_score', 'bonus_score',
+        'raw_score', 'weighted_score', 'st_direction', 'ready'}} holding each TF's
+        latest known score. Values equal the streaming snapshots exactly (candles
+        with close <= 0 give the empty snapshot: zeros / False) and the engine
+        ends in the same state. Needs its own indicators: raises ValueError when
+        base-TF nodes are shared through an IndicatorGraph. `timestamps` (candle
+        ts, epoch seconds, strictly increasing) match streaming Candle.ts.
+        """
+        if any(st.st_node is not None or st.macd_node is not None for st in self._tfs.values()):
+            raise ValueError("evaluate_series() needs a ScoreEngine without shared graph nodes")
+
+        h_all = np.asarray(highs, dtype=np.float64).ravel()
+        l_all = np.asarray(lows, dtype=np.float64).ravel()
+        c_all = np.asarray(closes, dtype=np.float64).ravel()
+        if not (len(h_all) == len(l_all) == len(c_all)):
+            raise ValueError("evaluate_series: highs, lows and closes must have the same length")
+        n_all = len(c_all)
+        valid = c_all > 0
+        h, l, c = h_all[valid], l_all[valid], c_all[valid]
+        n = len(c)
+        ts = None
+        if timestamps is not None:
+            ts_all = np.asarray(timestamps, dtype=np.float64).ravel()
+            if len(ts_all) != n_all:
+                raise ValueError("evaluate_series: timestamps must match the candles")
+            ts = ts_all[valid]
+
+        # Per-TF component scores at each TF candle, forward-filled onto base candles
+        ready_before = self._ready_timeframes()
+        levels = [(np.arange(n), h, l, c)] + self._agg.push_many(h, l, c, ts)
+        comp_names = ('macd_score', 'hist_score', 'st_score', 'bonus_score')
+        tf_cols: Dict[int, Dict[str, np.ndarray]] = {}
+        total = np.zeros(n)
+        for tf, (pos, th, tl, tc) in zip(self.timeframes, levels):
+            state = self._tfs[tf]
+            st_out = state.supertrend.add_candles(th, tl, tc)
+            macd_out = state.macd.add_candles(th, tl, tc)
+            k = len(tc)
+
+            comps = np.empty((k, 4))
+            dirs = np.zeros(k, dtype=np.int8)
+            closes_l = tc.tolist()
+            st_codes = st_out['direction'].tolist()
+            crosses = macd_out['cross'].tolist()
+            macds, hists, sigs = (
+                [None if v != v else v for v in macd_out[key].tolist()] for key in ('macd', 'histogram', 'signal_line')
+            )
+            for j in range(k):
+                *scores, dirs[j] = self._score_components(
+                    state, closes_l[j], _SIGNAL_NAMES[st_codes[j]], macds[j], hists[j], sigs[j], _SIGNAL_NAMES[crosses[j]],
+                )
+                comps[j] = scores
+            raw = comps[:, 0] + comps[:, 1] + comps[:, 2] + comps[:, 3]
+            weighted = raw * self.tf_weights.get(tf, 1.0)
+            tf_ready = (st_out['direction'] != 0) & ~np.isnan(macd_out['histogram'])
+
+            # Index of the latest TF candle at or before each base candle (-1: none yet)
+            latest = np.full(n, -1)
+            np.maximum.at(latest, pos, np.arange(k))  # a gap can close two candles on one base candle
+            latest = np.maximum.accumulate(latest) if n else latest
+            seen = latest >= 0
+            prev = self._last_tf_score(tf)
+            cols = {}
+            for name, values, before in (
+                ('macd_score', comps[:, 0], prev.macd_score),
+                ('hist_score', comps[:, 1], prev.hist_score),
+                ('st_score', comps[:, 2], prev.st_score),
+                ('bonus_score', comps[:, 3], prev.bonus_score),
+                ('raw_score', raw, prev.raw_score),
+                ('weighted_score', weighted, prev.weighted_score),
+            ):
+                cols[name] = np.where(seen, values[latest] if k else 0.0, before)
+            cols['st_direction'] = np.where(seen, dirs[latest] if k else 0, prev.st_direction).astype(np.int8)
+            cols['ready'] = np.where(seen, tf_ready[latest] if k else False, tf in ready_before)
+            tf_cols[tf] = cols
+            total = total + cols['weighted_score']
+
+            if k:
+                self._last_scores[tf] = self._tf_score(tf, *comps[-1].tolist(), int(dirs[-1]))
+
+        # Slope / acceleration against the existing history
+        slope = np.empty(n)
+        accel = np.empty(n)
+        if n:
+            slope[1:] = total[1:] - total[:-1]
+            slope[0] = total[0] - self._score_history[-1] if self._score_history else 0.0
+            accel[1:] = slope[1:] - slope[:-1]
+            accel[0] = slope[0] - self._slope_history[-1] if self._slope_history else 0.0
+
+        # Chop-window statistics are a running recurrence: one O(1) step per candle
+        stability = np.zeros(n)
+        choppy = np.zeros(n, dtype=bool)
+        history = len(self._score_history)
+        stats = self._chop_stats
+        for j, score in enumerate(total.tolist()):
+            stats.push(score)
+            if history + j + 1 >= 5:
+                stability[j] = stats.stddev()
+            choppy[j] = self._detect_chop()
+        self._score_history.extend(total.tolist())
+        self._slope_history.extend(slope.tolist())
+
+        # Confidence, vectorized with the same operation order as _confidence()
+        max_possible = 6.0 * sum(self.tf_weights.values())
+        mag = np.minimum(1.0, np.abs(total) / max(1.0, 0.70 * max_possible))
+        slp = np.minimum(1.0, np.abs(slope) / 8.0)
+        sign_total = np.sign(total)
+        total_w = 0.0
+        aligned_w = np.zeros(n)
+        for tf in self.timeframes:
+            w = self.tf_weights.get(tf, 1.0)
+            total_w += w
+            aligned = (sign_total != 0) & (np.sign(tf_cols[tf]['weighted_score']) == sign_total)
+            aligned_w = aligned_w + np.where(aligned, w, 0.0)
+        alignment = np.zeros(n) if total_w <= 0 else aligned_w / total_w
+        stability_score = 1.0 - np.minimum(1.0, stability / 10.0)
+        confidence = 0.35 * mag + 0.25 * slp + 0.25 * alignment + 0.15 * stability_score
+        confidence = np.where(choppy, 0.0, np.maximum(0.0, np.minimum(1.0, confidence)))
+
+        def _round3(values):
+            # Python round() to match the snapshot fields exactly
+            return np.array([round(v, 3) for v in values.tolist()], dtype=np.float64)
+
+        direction = np.zeros(n, dtype=np.int8)
+        direction[total >= self.neutral_band] = DIRECTION_CODES['CE']
+        direction[total <= -self.neutral_band] = DIRECTION_CODES['PE']
+        ready = np.ones(n, dtype=bool)
+        for cols in tf_cols.values():
+            ready &= cols['ready']
+
+        score_r, slope_r, accel_r = _round3(total), _round3(slope), _round3(accel)
+        stability_r, confidence_r = _round3(stability), _round3(confidence)
+        if self._ring is not None:
+            # Only the retained tail reaches the ring, in the slots streaming would use
+            tail = slice(max(0, n - self.history_size), n)
+            self._ring.skip(tail.start)
+            rows = zip(*(col[tail].tolist() for col in (
+                score_r, slope_r, accel_r, stability_r, confidence_r, direction, choppy, ready)))
+            tf_rows = zip(*(tf_cols[tf]['weighted_score'][tail].tolist() for tf in self.timeframes))
+            for row, tf_row in zip(rows, tf_rows):
+                self._ring.record(row, tf_row)
+
+        if n:
+            # Publish the last row; listeners still get every transition in between, in order
+            names = {code: name for name, code in DIRECTION_CODES.items()}
+            state = np.stack((ready, direction, choppy)).astype(np.int8)
+            before = np.array([[self.ready], [DIRECTION_CODES[self.direction]], [self.is_choppy]], dtype=np.int8)
+            rows = np.flatnonzero((np.diff(state, axis=1, prepend=before) != 0).any(axis=0)).tolist() if self._listeners else []
+            if not rows or rows[-1] != n - 1:
+                rows.append(n - 1)
+            for j in rows:
+                self._publish(
+                    float(score_r[j]), float(slope_r[j]), float(accel_r[j]), float(stability_r[j]),
+                    float(confidence_r[j]), bool(choppy[j]), names[int(direction[j])], bool(ready[j]),
+                )
+
+        def _column(values, dtype=np.float64):
+            # Rows with close <= 0 keep the empty-snapshot defaults
+            out = np.zeros(n_all, dtype=dtype)
+            out[valid] = values
+            return out
+
+        return {
+            'score': _column(score_r),
+            'slope': _column(slope_r),
+            'acceleration': _column(accel_r),
+            'stability': _column(stability_r),
+            'confidence': _column(confidence_r),
+            'direction': _column(direction, np.int8),
+            'is_choppy': _column(choppy, bool),
+            'ready': _column(ready, bool),
+            'tf_scores': {
+                tf: {name: _column(col, col.dtype) for name, col in cols.items()}
+                for tf, cols in sorted(tf_cols.items())
+            },
+        }
 
     def _last_tf_score(self, tf: int) -> TFScore:
         return self._last_scores.get(tf) or self._neutral_tf_score(tf)
@@ -254,9 +1035,49 @@ class ScoreEngine:
         state = self._tfs[tf]
         close = candle.close
 
-        st_value, st_signal = state.supertrend.add_candle(candle.high, candle.low, close)
-        _macd_line, _macd_cross = state.macd.add_candle(candle.high, candle.low, close)
+        if state.st_node is not None:
+            st_value, st_signal = state.st_node.value, state.st_node.signal
+        else:
+            st_value, st_signal = state.supertrend.add_candle(candle.high, candle.low, close)
+        if state.macd_node is None:
+            state.macd.add_candle(candle.high, candle.low, close)
+
+        macd = state.macd
+        components = self._score_components(
+            state, close, st_signal, macd.last_macd, macd.last_histogram, macd.last_signal_line, macd.last_cross,
+        )
+        out = self._tf_score(tf, *components)
+        self._last_scores[tf] = out
+        return out
+
+    def _tf_score(self, tf: int, macd_score: float, hist_score: float, st_score: float, bonus: float, st_dir: int) -> TFScore:
+        raw = macd_score + hist_score + st_score + bonus
+        weight = self.tf_weights.get(tf, 1.0)
+        return TFScore(
+            timeframe_seconds=tf,
+            macd_score=macd_score,
+            hist_score=hist_score,
+            st_score=st_score,
+            bonus_score=bonus,
+            raw_score=raw,
+            weighted_score=raw * weight,
+            st_direction=st_dir,
+        )
 
+    def _score_components(
+        self,
+        state: TFIndicators,
+        close: float,
+        st_signal: Optional[str],
+        macd: Optional[float],
+        hist: Optional[float],
+        signal_line: Optional[float],
+        cross: Optional[str],
+    ) -> Tuple[float, float, float, float, int]:
+        """Score one TF candle from its indicator outputs; updates the TF's prev_*/flip state.
+
+        Returns (macd_score, hist_score, st_score, bonus, st_dir).
+        """
         # SuperTrend score
         st_dir = 0
         if st_signal == "GREEN":
@@ -283,7 +1104,6 @@ class ScoreEngine:
         state.prev_st_dir = st_dir if st_dir != 0 else state.prev_st_dir
 
         # MACD line score ("slow line" in spec)
-        macd = state.macd.last_macd
         macd_score = 0.0
         if macd is not None:
             prev = state.prev_macd
@@ -309,7 +1129,6 @@ class ScoreEngine:
             state.prev_macd = macd
 
         # Histogram score
-        hist = state.macd.last_histogram
         hist_score = 0.0
         if hist is not None:
             prevh = state.prev_hist
@@ -343,7 +1162,6 @@ class ScoreEngine:
         #    - all > 0 => bullish bonus
         #    - all < 0 => bearish bonus
         # Use small normalized thresholds to avoid awarding bonus near zero.
-        signal_line = state.macd.last_signal_line
         if macd is not None and signal_line is not None and hist is not None:
             macd_norm = macd / max(abs(close), self._NORM_EPS)
             sig_norm = signal_line / max(abs(close), self._NORM_EPS)
@@ -367,70 +1185,36 @@ class ScoreEngine:
             bonus -= self.bonus_macd_momentum
 
         # 3) Cross bonus: MACD crossing signal line often marks a regime shift.
-        cross = state.macd.last_cross
         if cross == "GREEN":
             bonus += self.bonus_macd_cross
         elif cross == "RED":
             bonus -= self.bonus_macd_cross
 
-        raw = macd_score + hist_score + st_score + bonus
-        weight = self.tf_weights.get(tf, 1.0)
-        weighted = raw * weight
-
-        out = TFScore(
-            timeframe_seconds=tf,
-            macd_score=macd_score,
-            hist_score=hist_score,
-            st_score=st_score,
-            bonus_score=bonus,
-            raw_score=raw,
-            weighted_score=weighted,
-            st_direction=st_dir,
-        )
-        self._last_scores[tf] = out
-        return out
+        return macd_score, hist_score, st_score, bonus, st_dir
 
     def _ready_timeframes(self) -> set[int]:
         ready = set()
         for tf, state in self._tfs.items():
             # SuperTrend readiness is implicit via period; MACD readiness via EMAs.
-            st_ready = len(state.supertrend.candles) >= state.supertrend.period
+            st_ready = state.supertrend.ready
             macd_ready = state.macd.last_macd is not None and state.macd.last_histogram is not None
             if st_ready and macd_ready:
                 ready.add(tf)
         return ready
 
     def _detect_chop(self) -> bool:
-        window = list(self._score_history)[-self.chop_window:]
-        if len(window) < 8:
+        stats = self._chop_stats
+        if len(stats.window) < 8:
             return False
 
-        # Sign-flip frequency
-        flips = 0
-        prev_sign = 0
-        for s in window:
-            sign = 1 if s > 0 else (-1 if s < 0 else 0)
-            if prev_sign != 0 and sign != 0 and sign != prev_sign:
-                flips += 1
-            if sign != 0:
-                prev_sign = sign
-
-        stability = self._stddev(window)
-        mean_abs = sum(abs(s) for s in window) / max(1, len(window))
+        stability = stats.stddev()
+        mean_abs = stats.mean_abs()
 
-        # Scale thresholds with score range (older engine assumed ~45 max score)
-        max_possible = self._max_tf_raw * sum(self.tf_weights.values())
-        scale = max(0.35, min(1.0, max_possible / 45.0))
-        stab_hi = 7.5 * scale
-        mean_abs_mid = 12.0 * scale
-        mean_abs_low = 7.0 * scale
-        stab_low = 3.5 * scale
-
-        if flips >= 4:
+        if stats.flips >= 4:
             return True
-        if stability >= stab_hi and mean_abs <= mean_abs_mid:
+        if stability >= self._chop_stab_hi and mean_abs <= self._chop_mean_abs_mid:
             return True
-        if mean_abs <= mean_abs_low and stability >= stab_low:
+        if mean_abs <= self._chop_mean_abs_low and stability >= self._chop_stab_low:
             return True
         return False
 
@@ -469,13 +1253,6 @@ class ScoreEngine:
             return "PE"
         return "NONE"
 
-    def _stddev(self, xs: list[float]) -> float:
-        if not xs:
-            return 0.0
-        m = sum(xs) / len(xs)
-        v = sum((x - m) ** 2 for x in xs) / len(xs)
-        return sqrt(v)
-
     def _snapshot(self, tf_scores: Dict[int, TFScore], ready: bool) -> MDSnapshot:
         return MDSnapshot(
             score=0.0,
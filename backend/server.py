@@ -10,13 +10,13 @@ import asyncio
 import logging
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 
 # Local imports
 from config import ROOT_DIR, bot_state, config
 import re
 
-from models import ConfigUpdate, StrategyCreate, StrategyRename, StrategyDuplicate, StrategiesImport
+from models import BacktestRequest, ConfigUpdate, OptimizeRequest, StrategyCreate, StrategyRename, StrategyDuplicate, StrategiesImport
 from database import (
     init_db,
     load_config,
@@ -59,10 +59,12 @@ logging.getLogger("httpcore").setLevel(logging.WARNING)
 class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
+        self.connects = 0  # lets deduplicating senders resend state to new clients
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        self.connects += 1
 
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
@@ -202,6 +204,13 @@ async def lifespan(app: FastAPI):
     try:
         yield
     finally:
+        # Stop running bots so their final indicator checkpoint is written
+        if any(bot.running for bot in bot_service.get_trading_bots().values()):
+            try:
+                await bot_service.stop_bot()
+            except Exception as e:
+                logger.warning(f"[SHUTDOWN] Bot stop failed: {e}")
+
         if _market_data_service is not None:
             try:
                 await _market_data_service.stop()
@@ -283,9 +292,8 @@ def _validate_strategy_config(cfg: dict) -> None:
 
     if "htf_filter_timeframe" in cfg and cfg["htf_filter_timeframe"] is not None:
         v = int(cfg["htf_filter_timeframe"])
-        # Current backend implementation constrains this to 60s.
-        if v != 60:
-            raise ValueError("htf_filter_timeframe currently supports only 60 seconds")
+        if v not in (60, 300, 900):
+            raise ValueError("htf_filter_timeframe must be one of 60, 300, 900 seconds")
 
 
 # ==================== API Routes ====================
@@ -297,21 +305,33 @@ async def root():
 
 
 @api_router.get("/status")
-async def get_status():
-    """Get bot status"""
-    return bot_service.get_bot_status()
+async def get_status(index: Optional[str] = Query(default=None)):
+    """Get bot status (top level: selected_index or `index`; `indices`: every traded index)"""
+    return bot_service.get_bot_status(index.upper() if index else None)
 
 
 @api_router.get("/market/nifty")
-async def get_market_data():
-    """Get market data (index LTP, SuperTrend)"""
-    return bot_service.get_market_data()
+async def get_market_data(index: Optional[str] = Query(default=None)):
+    """Get market data (index LTP, SuperTrend) of selected_index or `index`, and of every traded index"""
+    return bot_service.get_market_data(index.upper() if index else None)
+
+
+@api_router.get("/mds/history")
+async def get_mds_history(limit: int = Query(default=None, ge=1, le=100000)):
+    """Get recent MDS score history (score, slope, confidence, ...) for charting"""
+    return bot_service.get_mds_history(limit)
+
+
+@api_router.get("/mds/symbols")
+async def get_mds_symbols():
+    """Get the latest MDS score of every index in mds_symbols"""
+    return bot_service.get_mds_symbols()
 
 
 @api_router.get("/position")
-async def get_position():
-    """Get current position"""
-    return bot_service.get_position()
+async def get_position(index: Optional[str] = Query(default=None)):
+    """Get current position of selected_index or `index`, and of every traded index"""
+    return bot_service.get_position(index.upper() if index else None)
 
 
 @api_router.get("/trades")
@@ -327,9 +347,9 @@ async def get_analytics():
 
 
 @api_router.get("/summary")
-async def get_summary():
-    """Get daily summary"""
-    return bot_service.get_daily_summary()
+async def get_summary(index: Optional[str] = Query(default=None)):
+    """Get daily summary of selected_index or `index`, and of every traded index"""
+    return bot_service.get_daily_summary(index.upper() if index else None)
 
 
 @api_router.get("/logs")
@@ -414,9 +434,72 @@ async def stop_bot():
 
 
 @api_router.post("/bot/squareoff")
-async def squareoff():
-    """Force square off position"""
-    return await bot_service.squareoff_position()
+async def squareoff(index: Optional[str] = Query(default=None)):
+    """Force square off the position of `index`, or of every traded index"""
+    return await bot_service.squareoff_position(index.upper() if index else None)
+
+
+@api_router.get("/instances")
+async def get_instances():
+    """State of every traded index (selected_index and trade_indices), keyed by index"""
+    return bot_service.get_instances()
+
+
+@api_router.post("/backtest")
+async def backtest(payload: BacktestRequest):
+    """Backtest the current config (plus payload.config overrides) over stored MDS candles.
+
+    Each trading day in the range runs headless in its own worker process; the
+    response carries per-day and aggregate metrics, the daily equity curve and the trades.
+    """
+    overrides = _filter_strategy_config(payload.config or {})
+    try:
+        _validate_strategy_config({**config, **overrides})
+        result = await bot_service.run_backtest(payload.start_date, payload.end_date, overrides, payload.workers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result.get('status') == 'error':
+        raise HTTPException(status_code=409, detail=result['message'])
+    return result
+
+
+@api_router.post("/optimize")
+async def optimize_strategy(payload: OptimizeRequest):
+    """Sweep strategy parameters over stored MDS candles and rank the combinations.
+
+    With save_name the top combinations are stored as strategies
+    '<save_name> (1)', '(2)', ... (their backtest metrics under 'backtest').
+    """
+    overrides = _filter_strategy_config(payload.config or {})
+    space = payload.params or None
+    try:
+        if space is not None:
+            unknown = set(space) - set(_filter_strategy_config(space))
+            if unknown:
+                raise ValueError(f"Unknown or disallowed parameters: {', '.join(sorted(unknown))}")
+        save_name = None
+        if payload.save_name:
+            save_name = _validate_strategy_name(payload.save_name)
+            if len(save_name) > 55:
+                raise ValueError("save_name too long (max 55 chars)")
+        _validate_strategy_config({**config, **overrides})
+        result = await bot_service.run_optimizer(
+            payload.start_date,
+            payload.end_date,
+            space,
+            overrides,
+            method=payload.method,
+            samples=payload.samples,
+            objective=payload.objective,
+            top=payload.top,
+            save_name=save_name,
+            workers=payload.workers,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result.get('status') == 'error':
+        raise HTTPException(status_code=409, detail=result['message'])
+    return result
 
 
 # ==================== Strategies ====================
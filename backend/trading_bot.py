@@ -3,15 +3,27 @@ Handles all trading logic, signal processing, and order execution.
 Uses structured logging with tags for easy troubleshooting.
 """
 import asyncio
+from collections import ChainMap
+import copy
 from datetime import datetime, timezone, timedelta
+import json
 import logging
+import os
 import random
+import time
+from typing import Mapping, Optional
 
-from config import bot_state, config, DB_PATH
+from config import bot_state, config, new_bot_state, DB_PATH, CHECKPOINT_PATH
 from indices import get_index_config, round_to_strike
-from utils import get_ist_time, is_market_open, can_take_new_trade, should_force_squareoff, format_timeframe
-from indicators import SuperTrend, MACD, ADX
-from score_engine import ScoreEngine, Candle
+from utils import get_ist_time, utc_now, is_market_open, can_take_new_trade, should_force_squareoff, format_timeframe
+from indicator_graph import IndicatorGraph
+from score_engine import ScoreEngine, Candle, CandleAggregator, MDSEventKind
+from multi_score_engine import VECTORIZE_MIN_SYMBOLS, MultiScoreEngine
+from risk_watcher import RiskWatcher
+from market_events import (
+    MdsSymbolsSource, ReplayCandleSource, SyntheticTickSource, TickCandleBuilder,
+    candle_epoch, market_data_provider, market_feed, parse_candle_ts,
+)
 from position_sizing import PositionSizingAgent
 from dhan_api import DhanAPI
 from database import save_trade, update_trade_exit
@@ -25,23 +37,74 @@ from cooldown_v2 import CooldownManager, CooldownReason, CooldownState
 
 logger = logging.getLogger(__name__)
 
+CHECKPOINT_VERSION = 3
+
+_TICK_QUEUE_SIZE = 16  # quotes only matter while fresh: older ones are dropped when full
+_BROADCAST_MIN_INTERVAL_SECONDS = 0.25  # coalesce state broadcasts from bursts of events
+
+# Telemetry restored with a checkpoint so the UI does not show "waiting" after a restart
+_CHECKPOINT_STATE_KEYS = (
+    'supertrend_value', 'signal_status', 'last_supertrend_signal', 'macd_value', 'macd_histogram',
+    'htf_supertrend_value', 'htf_signal_status', 'htf_supertrend_signal',
+    'adx_value', 'adx_plus_di', 'adx_minus_di',
+    'mds_score', 'mds_slope', 'mds_acceleration', 'mds_stability', 'mds_confidence', 'mds_is_choppy', 'mds_direction',
+)
+
+
+def _write_file_atomic(path, text: str) -> None:
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
 
 class TradingBot:
     """Main trading bot engine"""
     
-    def __init__(self):
+    def __init__(self, index_name: Optional[str] = None, settings: Optional[Mapping] = None):
+        # Namespaced settings / state. The selected_index bot uses the process-wide
+        # config and bot_state; a bot for an extra index (trade_indices) reads config
+        # through its own selected_index, and a bot given its own `settings` (backtests)
+        # reads those instead. Both keep their own bot_state.
+        if index_name is None and settings is None:
+            self.config, self.state = config, bot_state
+        else:
+            layer = {} if index_name is None else {'selected_index': index_name, 'mds_multi_symbol_enabled': False}
+            self.config = ChainMap(layer, config if settings is None else settings)
+            self.state = new_bot_state()
+            self.state['selected_index'] = self.config['selected_index']
+        self.checkpoint_path = (
+            CHECKPOINT_PATH if index_name is None
+            else CHECKPOINT_PATH.with_name(f"{CHECKPOINT_PATH.stem}_{index_name.lower()}{CHECKPOINT_PATH.suffix}")
+        )
         self.running = False
+        self.rng = random.Random()  # paper option-price noise (seeded by backtests)
+        self._checkpoint_enabled = False  # set by start() for live (non-replay) runs
+        self._checkpoint_pending = None  # candle time of state not checkpointed yet
+        self._checkpoint_due = 0.0  # time.monotonic() of the next checkpoint write
         self.task = None
         self.dhan = None
         self.current_position = None
         self.entry_price = 0.0
         self.trailing_sl = None
         self.highest_profit = 0.0
+        self.graph = None  # Shared indicator nodes keyed by (kind, params, timeframe)
+        self._graph_base_tf = None
+        self._st_node = None
+        self._htf_node = None
+        self._macd_node = None
+        self._adx_node = None
         self.indicator = None  # Will hold selected indicator
-        self.htf_indicator = None  # Higher-timeframe SuperTrend (e.g., 1m filter)
+        self.htf_indicator = None  # Higher-timeframe SuperTrend (htf_filter_timeframe filter)
         self.macd = None  # LTF MACD for confirmation
         self.adx = None  # Optional ADX(14) for regime detection
         self.score_engine = None  # Multi-timeframe score engine (optional)
+        self._score_engine_args = {}  # ScoreEngine constructor arguments (indicator_signature)
+        self.multi_score_engine = None  # Same scoring across mds_symbols (telemetry only)
+        self._mds_events_muted = False  # True while seeding: no transition logs for history
+        self._last_broadcast = None  # (manager.connects, state_update payload without timestamp) last sent
         self._mds_last_direction = None
         self._mds_confirm_count = 0
         self.last_exit_candle_time = None
@@ -52,12 +115,20 @@ class TradingBot:
         self.last_order_time_utc = None  # datetime for order cooldown (entry/exit pacing)
         self._paper_replay_candles = []
         self._paper_replay_pos = 0
-        self._paper_replay_htf_elapsed = 0
         self._last_mds_candle_ts = None
-        self._mds_htf_count = 0
-        self._mds_htf_high = 0.0
-        self._mds_htf_low = float('inf')
-        self._mds_htf_close = 0.0
+        # Event-driven loop (run_loop): sources feed the queues, consumers react
+        self._candle_queue: Optional[asyncio.Queue] = None
+        self._tick_queue: Optional[asyncio.Queue] = None
+        self._trade_lock = asyncio.Lock()  # candle decisions, tick exits and square-off never interleave
+        self._position_opened = asyncio.Event()  # wakes the MDS quote source
+        self._state_changed = asyncio.Event()  # wakes the broadcaster
+        self._tick_candles: Optional[TickCandleBuilder] = None  # non-MDS providers: candles from ticks
+        self._candle_number = 0
+        self._htf_candle_number = 0
+        self.last_decision_latency_ms = None
+        self.risk = RiskWatcher(self)  # tick-level SL / target / daily max loss exits
+        self.peers = None  # () -> every bot on this account (set by bot_service; daily_max_loss is account-wide)
+        self._htf_agg: Optional[CandleAggregator] = None  # base -> HTF filter candles
         self._initialize_indicator()
 
         # ═══════════════════════════════════════════════════════════════════
@@ -66,8 +137,8 @@ class TradingBot:
         
         # Market Regime Detection (Gatekeeper)
         self.regime_detector = MarketRegimeDetector(
-            use_adx=bool(config.get('use_adx_for_regime', False)),
-            adx_threshold=float(config.get('adx_threshold', 20.0))
+            use_adx=bool(self.config.get('use_adx_for_regime', False)),
+            adx_threshold=float(self.config.get('adx_threshold', 20.0))
         )
         
         # Confidence Scoring Engine
@@ -81,7 +152,7 @@ class TradingBot:
         
         # Cooldown Manager (Anti-Chop)
         self.cooldown_mgr = CooldownManager(
-            cooldown_candles=int(config.get('cooldown_candles', 3))
+            cooldown_candles=int(self.config.get('cooldown_candles', 3))
         )
         
         # Runtime confidence tracking during position hold
@@ -105,82 +176,106 @@ class TradingBot:
         logger.info("[INIT] Trading Logic v2 initialized")
         logger.info(f"[CONFIG] Regime: {self.regime_detector.use_adx and 'ADX' or 'ST Distance'} | Confidence Entry: {ConfidenceCalculator.MIN_ENTRY_CONFIDENCE} | Confidence Exit: {ConfidenceCalculator.MIN_RUNTIME_CONFIDENCE} | Cooldown: {self.cooldown_mgr.cooldown_duration} candles")
 
-    def _prefetch_candles_needed(self) -> int:
-        st_period = int(config.get('supertrend_period', 7) or 7)
-        macd_slow = int(config.get('macd_slow', 26) or 26)
-        macd_signal = int(config.get('macd_signal', 9) or 9)
-
+    def _indicator_candles_needed(self) -> int:
         # SuperTrend needs at least `period` candles; MACD needs slow EMA + signal EMA.
-        base_needed = max(st_period + 1, macd_slow + macd_signal)
+        st_period = int(self.config.get('supertrend_period', 7) or 7)
+        macd_slow = int(self.config.get('macd_slow', 26) or 26)
+        macd_signal = int(self.config.get('macd_signal', 9) or 9)
+        return max(st_period + 1, macd_slow + macd_signal)
+
+    def _prefetch_candles_needed(self) -> int:
+        st_period = int(self.config.get('supertrend_period', 7) or 7)
+        base_needed = self._indicator_candles_needed()
 
-        # If HTF filter is enabled (fixed to 60s in current code), seed enough candles
-        # so 1m SuperTrend is also ready.
-        interval = int(config.get('candle_interval', 5) or 5)
-        if bool(config.get('htf_filter_enabled', True)) and interval < 60 and (60 % max(1, interval) == 0):
-            multiple_1m = 60 // max(1, interval)
-            base_needed = max(base_needed, multiple_1m * (st_period + 1))
+        # If the HTF filter is enabled, seed enough candles so the HTF SuperTrend is also ready.
+        interval = int(self.config.get('candle_interval', 5) or 5)
+        htf_tf = self._htf_timeframe()
+        if htf_tf:
+            base_needed = max(base_needed, htf_tf // interval * (st_period + 1))
 
-        # If score engine is selected, ensure both base TF and next TF are ready.
-        if str(config.get('indicator_type', 'supertrend') or 'supertrend').strip().lower() == 'score_mds':
-            try:
-                base_tf = int(config.get('candle_interval', 5) or 5)
-                if base_tf in ScoreEngine._TF_CHAIN:
-                    chain = list(ScoreEngine._TF_CHAIN)
-                    next_tf = chain[chain.index(base_tf) + 1]
-                    multiple = int(next_tf) // max(1, base_tf)
-                    next_tf_needed = max(st_period + 1, macd_slow + macd_signal)
-                    base_needed = max(base_needed, multiple * next_tf_needed)
-            except Exception:
-                pass
+        # ScoreEngine's higher timeframes are seeded from their own MDS candles
+        # (_fetch_htf_seed_candles), so they add nothing to the base prefetch.
 
         # Small safety cushion for flip/slope computations.
         return int(max(50, base_needed + 5))
 
-    async def _seed_indicators_from_mds_history(self) -> None:
-        if str(config.get('market_data_provider', 'dhan') or 'dhan').strip().lower() != 'mds':
+    async def _seed_indicators_from_mds_history(self, checkpoint: Optional[dict] = None) -> None:
+        """Warm indicators from MDS history.
+
+        With a restored `checkpoint`, only the candles after its last_candle_ts
+        are fetched and replayed.
+        """
+        if str(self.config.get('market_data_provider', 'dhan') or 'dhan').strip().lower() != 'mds':
             return
-        if not bool(config.get('prefetch_candles_on_start', True)):
+        if not bool(self.config.get('prefetch_candles_on_start', True)):
             return
 
-        base_url = str(config.get('mds_base_url', '') or '').strip()
+        base_url = str(self.config.get('mds_base_url', '') or '').strip()
         if not base_url:
             return
 
-        index_name = str(config.get('selected_index', 'NIFTY') or 'NIFTY').strip().upper()
-        interval = int(config.get('candle_interval', 5) or 5)
+        index_name = str(self.config.get('selected_index', 'NIFTY') or 'NIFTY').strip().upper()
+        interval = int(self.config.get('candle_interval', 5) or 5)
         limit = self._prefetch_candles_needed()
+        resume_ts = str((checkpoint or {}).get('last_candle_ts') or '') or None
 
         try:
-            from mds_client import fetch_last_candles
+            from mds_client import fetch_last_candles, fetch_candles_range
 
-            candles = await fetch_last_candles(
-                base_url=base_url,
-                symbol=index_name,
-                timeframe_seconds=interval,
-                limit=limit,
-            )
+            candles = None
+            if resume_ts:
+                candles = await fetch_candles_range(
+                    base_url=base_url,
+                    symbol=index_name,
+                    timeframe_seconds=interval,
+                    start_iso=resume_ts,
+                    end_iso=datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                    limit=limit + 1,
+                )
+                # Range start is inclusive: drop the checkpointed candle itself
+                resume_dt = parse_candle_ts(resume_ts)
+                candles = [
+                    row for row in candles
+                    if isinstance(row, dict) and (
+                        resume_dt is None or (parse_candle_ts(row.get('ts')) or resume_dt) > resume_dt
+                    )
+                ]
+                if len(candles) >= limit:
+                    # Gap is at least a full warmup: reseeding from scratch is no slower
+                    logger.info(f"[CHECKPOINT] Gap of {len(candles)}+ candles since checkpoint; reseeding from history")
+                    self.reset_indicator()
+                    resume_ts = None
+                    candles = None
+            if candles is None:
+                candles = await fetch_last_candles(
+                    base_url=base_url,
+                    symbol=index_name,
+                    timeframe_seconds=interval,
+                    limit=limit,
+                )
         except Exception as e:
-            logger.warning(f"[WARMUP] Prefetch failed (MDS): {e}")
+            if resume_ts:
+                logger.warning(f"[WARMUP] Catch-up fetch failed (MDS): {e} | Continuing from checkpoint")
+            else:
+                logger.warning(f"[WARMUP] Prefetch failed (MDS): {e}")
             return
 
         if not candles:
-            logger.info("[WARMUP] No candles returned from MDS (skipping seed)")
+            if resume_ts:
+                logger.info(f"[CHECKPOINT] No new candles since checkpoint | LastCandle={resume_ts}")
+            else:
+                logger.info("[WARMUP] No candles returned from MDS (skipping seed)")
             return
 
-        # Reset any MDS-derived HTF aggregation state
-        self._mds_htf_count = 0
-        self._mds_htf_high = 0.0
-        self._mds_htf_low = float('inf')
-        self._mds_htf_close = 0.0
-
-        multiple_1m = None
-        if bool(config.get('htf_filter_enabled', True)) and interval < 60 and (60 % max(1, interval) == 0):
-            multiple_1m = 60 // max(1, interval)
+        if not resume_ts and self._htf_agg is not None:
+            # Reset any HTF aggregation state (a checkpoint carries its own)
+            self._htf_agg.reset()
 
         last_indicator_value = None
         last_signal = None
         last_mds = None
 
+        highs, lows, closes, stamps = [], [], [], []
         for row in candles:
             if not isinstance(row, dict):
                 continue
@@ -193,66 +288,87 @@ class TradingBot:
 
             if close <= 0 or high <= 0 or low == float('inf'):
                 continue
+            highs.append(high)
+            lows.append(low)
+            closes.append(close)
+            stamps.append(candle_epoch(row.get('ts')))
 
-            last_indicator_value, last_signal = self.indicator.add_candle(high, low, close)
-            if self.macd:
-                self.macd.add_candle(high, low, close)
-
-            if str(config.get('indicator_type') or '').strip().lower() == 'score_mds' and self.score_engine:
-                try:
-                    last_mds = self.score_engine.on_base_candle(Candle(high=high, low=low, close=close))
-                except Exception:
-                    last_mds = None
-
-            if multiple_1m:
-                self._mds_htf_count += 1
-                self._mds_htf_high = max(self._mds_htf_high, high)
-                self._mds_htf_low = min(self._mds_htf_low, low)
-                self._mds_htf_close = close
+        if not closes:
+            logger.info("[WARMUP] No valid candles returned from MDS (skipping seed)")
+            return
 
-                if self._mds_htf_count >= multiple_1m:
-                    htf_value, htf_signal = self.htf_indicator.add_candle(
-                        self._mds_htf_high, self._mds_htf_low, self._mds_htf_close
-                    )
-                    if htf_value:
-                        bot_state['htf_supertrend_value'] = htf_value if isinstance(htf_value, (int, float)) else str(htf_value)
-                        if htf_signal == 'GREEN':
-                            bot_state['htf_signal_status'] = 'buy'
-                        elif htf_signal == 'RED':
-                            bot_state['htf_signal_status'] = 'sell'
-                        else:
-                            bot_state['htf_signal_status'] = 'waiting'
-                        if htf_signal:
-                            bot_state['htf_supertrend_signal'] = htf_signal
-
-                    self._mds_htf_count = 0
-                    self._mds_htf_high = 0.0
-                    self._mds_htf_low = float('inf')
-                    self._mds_htf_close = 0.0
+        base_tf = self._graph_base_tf
+        if None in stamps:
+            # Aggregate by count rather than mixing clock buckets with counted candles
+            stamps = [None] * len(closes)
+        if str(self.config.get('indicator_type') or '').strip().lower() == 'score_mds' and self.score_engine:
+            # ScoreEngine reads the shared base nodes candle by candle. Its higher timeframes
+            # come straight from MDS candles of those timeframes, replayed in close order
+            # (higher TFs first on ties) so base candles only aggregate the open buckets.
+            events = [(ts + base_tf if ts is not None else 0.0, -base_tf, Candle(high=h, low=l, close=c, ts=ts))
+                      for h, l, c, ts in zip(highs, lows, closes, stamps)]
+            if not resume_ts and stamps[-1] is not None:
+                for tf, tf_candle in await self._fetch_htf_seed_candles(base_url, index_name, stamps[-1] + base_tf):
+                    events.append((tf_candle.ts + tf, -tf, tf_candle))
+                events.sort(key=lambda e: e[:2])
+            self._mds_events_muted = True
+            try:
+                for _, neg_tf, candle in events:
+                    try:
+                        if -neg_tf != base_tf:
+                            self.score_engine.on_htf_candle(-neg_tf, candle)
+                            continue
+                        self.graph.on_candle(base_tf, candle.high, candle.low, candle.close)
+                        last_mds = self.score_engine if self.score_engine.update(candle) else None
+                    except Exception:
+                        last_mds = None
+            finally:
+                self._mds_events_muted = False
+        else:
+            # Vectorized seeding: leaves each node in the same state as streaming the candles.
+            self.graph.on_candles(base_tf, highs, lows, closes)
+
+        if self.indicator.ready:
+            last_indicator_value = float(self.indicator.value)
+            last_signal = 'GREEN' if self.indicator.direction == 1 else 'RED'
+
+        if self._htf_timeframe():
+            htf_candles = []
+            for high, low, close, ts in zip(highs, lows, closes, stamps):
+                htf_candles.extend(candle for _, candle in self._htf_agg.push(high, low, close, ts))
+            if htf_candles:
+                self.graph.on_candles(
+                    self._htf_node.timeframe,
+                    [c.high for c in htf_candles], [c.low for c in htf_candles], [c.close for c in htf_candles],
+                )
+                if self.htf_indicator.ready:
+                    htf_signal = 'GREEN' if self.htf_indicator.direction == 1 else 'RED'
+                    self.state['htf_supertrend_value'] = float(self.htf_indicator.value)
+                    self.state['htf_signal_status'] = 'buy' if htf_signal == 'GREEN' else 'sell'
+                    self.state['htf_supertrend_signal'] = htf_signal
 
         # Publish last computed values to state so UI doesn't show "waiting" on startup.
         if last_indicator_value:
-            bot_state['supertrend_value'] = last_indicator_value if isinstance(last_indicator_value, (int, float)) else str(last_indicator_value)
+            self.state['supertrend_value'] = last_indicator_value if isinstance(last_indicator_value, (int, float)) else str(last_indicator_value)
             if last_signal == 'GREEN':
-                bot_state['signal_status'] = 'buy'
+                self.state['signal_status'] = 'buy'
             elif last_signal == 'RED':
-                bot_state['signal_status'] = 'sell'
+                self.state['signal_status'] = 'sell'
             else:
-                bot_state['signal_status'] = 'waiting'
+                self.state['signal_status'] = 'waiting'
             if last_signal:
-                bot_state['last_supertrend_signal'] = last_signal
+                self.state['last_supertrend_signal'] = last_signal
 
         if self.macd and self.macd.last_macd is not None:
-            bot_state['macd_value'] = float(self.macd.last_macd)
+            self.state['macd_value'] = float(self.macd.last_macd)
+
+        if self.adx:
+            self.state['adx_value'] = None if self.adx.adx is None else float(self.adx.adx)
+            self.state['adx_plus_di'] = None if self.adx.plus_di is None else float(self.adx.plus_di)
+            self.state['adx_minus_di'] = None if self.adx.minus_di is None else float(self.adx.minus_di)
 
         if last_mds is not None:
-            bot_state['mds_score'] = float(last_mds.score)
-            bot_state['mds_slope'] = float(last_mds.slope)
-            bot_state['mds_acceleration'] = float(last_mds.acceleration)
-            bot_state['mds_stability'] = float(last_mds.stability)
-            bot_state['mds_confidence'] = float(last_mds.confidence)
-            bot_state['mds_is_choppy'] = bool(last_mds.is_choppy)
-            bot_state['mds_direction'] = str(last_mds.direction)
+            self._publish_mds_state()
 
         # Prevent immediate re-processing of the last candle on first poll.
         try:
@@ -260,9 +376,158 @@ class TradingBot:
         except Exception:
             self._last_mds_candle_ts = None
 
-        logger.info(f"[WARMUP] Seeded indicators from MDS history | Candles={len(candles)} Interval={interval}s")
+        logger.info(
+            f"[WARMUP] Seeded indicators from MDS history | Candles={len(candles)} Interval={interval}s"
+            f"{' | Resumed from checkpoint' if resume_ts else ''}"
+        )
+
+    async def _fetch_htf_seed_candles(self, base_url: str, symbol: str, until_ts: float) -> list:
+        """Completed MDS candles of each ScoreEngine higher timeframe ending by `until_ts`, as (tf, Candle)."""
+        from mds_client import fetch_last_candles
 
-    async def _handle_closed_candle(
+        limit = int(max(50, self._indicator_candles_needed() + 5))
+        out = []
+        for tf in self.score_engine.timeframes[1:]:
+            try:
+                rows = await fetch_last_candles(base_url=base_url, symbol=symbol, timeframe_seconds=tf, limit=limit)
+            except Exception as e:
+                logger.warning(f"[WARMUP] {tf}s prefetch failed (MDS): {e} | It will warm up from base candles")
+                continue
+            for row in rows or []:
+                if not isinstance(row, dict):
+                    continue
+                ts = candle_epoch(row.get('ts'))
+                try:
+                    candle = Candle(high=float(row.get('high') or 0.0), low=float(row.get('low') or 0.0),
+                                    close=float(row.get('close') or 0.0), ts=ts)
+                except Exception:
+                    continue
+                # Skip the still-open bucket; base candles aggregate it
+                if ts is not None and ts + tf <= until_ts and candle.close > 0:
+                    out.append((tf, candle))
+        return out
+
+    def _checkpoint_identity(self) -> dict:
+        return {
+            'index': str(self.config.get('selected_index', 'NIFTY') or 'NIFTY').strip().upper(),
+            'candle_interval': self._graph_base_tf,
+            'htf_filter_timeframe': self._htf_node.timeframe,
+            'indicator_type': str(self.config.get('indicator_type') or '').strip().lower(),
+        }
+
+    def indicator_signature(self) -> tuple:
+        """What the per-candle indicator / ScoreEngine outputs depend on besides the candles.
+
+        Read off the built pipeline: every subscribed graph node (kind, params,
+        timeframe), the HTF timeframe actually fed and, when score_mds updates
+        it, the ScoreEngine arguments. Runs with equal signatures on the same
+        candles compute the same indicator series (backtest.IndicatorTape).
+        """
+        scored = self.config.get('indicator_type') == 'score_mds' and self.score_engine is not None
+        return (
+            str(self.config.get('selected_index')),
+            tuple(sorted(node.key for node in self.graph.nodes())),
+            self._htf_timeframe(),
+            repr(sorted(self._score_engine_args.items())) if scored else None,
+        )
+
+    async def _save_checkpoint(self, current_candle_time: datetime) -> None:
+        """Atomically write indicator/ScoreEngine state to checkpoint_path."""
+        provider = str(self.config.get('market_data_provider', 'dhan') or 'dhan').strip().lower()
+        last_candle_ts = self._last_mds_candle_ts if provider == 'mds' else None
+        try:
+            payload = {
+                'version': CHECKPOINT_VERSION,
+                **self._checkpoint_identity(),
+                'saved_at': datetime.now(timezone.utc).isoformat(),
+                'candle_time': current_candle_time.isoformat(),
+                'last_candle_ts': last_candle_ts,
+                'graph': self.graph.get_state(),
+                'score_engine': self.score_engine.get_state() if self.score_engine else None,
+                'htf_agg': self._htf_agg.get_state() if self._htf_agg is not None else {},
+                'prev_st_direction': self.prev_st_direction,
+                'prev_macd_histogram': self.prev_macd_histogram,
+                'bot_state': {k: self.state.get(k) for k in _CHECKPOINT_STATE_KEYS},
+            }
+            text = json.dumps(payload, separators=(',', ':'))
+            await asyncio.to_thread(_write_file_atomic, self.checkpoint_path, text)
+        except Exception as e:
+            logger.warning(f"[CHECKPOINT] Save failed: {e}")
+
+    def _restore_checkpoint(self) -> Optional[dict]:
+        """Load checkpoint_path into the freshly reset indicators.
+
+        Returns the checkpoint on success; None if it is missing, stale or was
+        written for a different index / interval / indicator configuration.
+        """
+        try:
+            if not self.checkpoint_path.exists():
+                return None
+            payload = json.loads(self.checkpoint_path.read_text(encoding='utf-8'))
+        except Exception as e:
+            logger.warning(f"[CHECKPOINT] Unreadable checkpoint: {e}")
+            return None
+
+        identity = self._checkpoint_identity()
+        if payload.get('version') != CHECKPOINT_VERSION or any(payload.get(k) != v for k, v in identity.items()):
+            saved = {k: payload.get(k) for k in identity}
+            logger.info(f"[CHECKPOINT] Ignoring checkpoint for a different setup | Saved={saved}")
+            return None
+
+        provider = str(self.config.get('market_data_provider', 'dhan') or 'dhan').strip().lower()
+        if provider != 'mds':
+            # No candle history to catch up from: only a recent checkpoint is usable
+            saved_at = parse_candle_ts(payload.get('saved_at'))
+            max_age = float(self.config.get('state_checkpoint_max_age_seconds', 300) or 0)
+            if saved_at is None or (datetime.now(timezone.utc) - saved_at).total_seconds() > max_age:
+                logger.info("[CHECKPOINT] Ignoring stale checkpoint")
+                return None
+
+        try:
+            self.graph.set_state(payload['graph'])
+            if self.score_engine:
+                if payload.get('score_engine') is None:
+                    raise ValueError("checkpoint has no ScoreEngine state")
+                self.score_engine.set_state(payload['score_engine'])
+            if self._htf_agg is not None:
+                self._htf_agg.set_state(payload['htf_agg'])
+        except Exception as e:
+            logger.warning(f"[CHECKPOINT] Restore failed: {e}")
+            self.reset_indicator()
+            return None
+
+        self.prev_st_direction = payload.get('prev_st_direction')
+        self.prev_macd_histogram = payload.get('prev_macd_histogram')
+        self._last_mds_candle_ts = payload.get('last_candle_ts')
+        for k, v in (payload.get('bot_state') or {}).items():
+            if k in _CHECKPOINT_STATE_KEYS:
+                self.state[k] = v
+
+        logger.info(f"[CHECKPOINT] Restored indicator state | LastCandle={payload.get('last_candle_ts') or payload.get('candle_time')}")
+        return payload
+
+    def _update_htf_node(self, high: float, low: float, close: float):
+        """Feed one closed HTF candle through the graph; returns the HTF SuperTrend (value, signal)."""
+        self.graph.on_candle(self._htf_node.timeframe, high, low, close)
+        return self._htf_node.value, self._htf_node.signal
+
+    async def _handle_closed_candle(self, **candle) -> None:
+        await self._process_closed_candle(**candle)
+        if self._checkpoint_enabled:
+            self._checkpoint_pending = candle['current_candle_time']
+            if time.monotonic() >= self._checkpoint_due:
+                await self._flush_checkpoint()
+
+    async def _flush_checkpoint(self) -> None:
+        """Write the checkpoint if candles closed since the last one (throttled by _handle_closed_candle)."""
+        if self._checkpoint_pending is None:
+            return
+        candle_time, self._checkpoint_pending = self._checkpoint_pending, None
+        await self._save_checkpoint(candle_time)
+        interval = float(self.config.get('state_checkpoint_interval_seconds', 60.0) or 0.0)
+        self._checkpoint_due = time.monotonic() + max(0.0, interval)
+
+    async def _process_closed_candle(
         self,
         *,
         index_name: str,
@@ -273,64 +538,68 @@ class TradingBot:
         low: float,
         close: float,
         current_candle_time: datetime,
+        candle_ts: Optional[float] = None,
     ) -> None:
         if not (high > 0 and low < float('inf') and close > 0):
             return
 
-        indicator_value, signal = self.indicator.add_candle(high, low, close)
+        # Every subscribed base-TF node (SuperTrend, MACD, ScoreEngine's, ADX) updates once here.
+        self.graph.on_candle(self._graph_base_tf, high, low, close)
+        indicator_value, signal = self._st_node.value, self._st_node.signal
 
         # MACD: keep both line and histogram; entry spec uses histogram.
         macd_line_value: Optional[float] = None
         macd_hist_value: Optional[float] = None
         if self.macd:
-            _macd_line, _macd_cross = self.macd.add_candle(high, low, close)
             if self.macd.last_macd is not None:
                 macd_line_value = float(self.macd.last_macd)
             if self.macd.last_histogram is not None:
                 macd_hist_value = float(self.macd.last_histogram)
 
+        # The engine itself carries the published values (score, slope, ..., tf_scores);
+        # no per-candle snapshot is built.
         mds_snapshot = None
-        if config.get('indicator_type') == 'score_mds' and self.score_engine:
+        if self.config.get('indicator_type') == 'score_mds' and self.score_engine:
             try:
-                mds_snapshot = self.score_engine.on_base_candle(Candle(high=float(high), low=float(low), close=float(close)))
-
-                bot_state['mds_score'] = float(mds_snapshot.score)
-                bot_state['mds_slope'] = float(mds_snapshot.slope)
-                bot_state['mds_acceleration'] = float(mds_snapshot.acceleration)
-                bot_state['mds_stability'] = float(mds_snapshot.stability)
-                bot_state['mds_confidence'] = float(mds_snapshot.confidence)
-                bot_state['mds_is_choppy'] = bool(mds_snapshot.is_choppy)
-                bot_state['mds_direction'] = str(mds_snapshot.direction)
+                if self.score_engine.update(
+                    Candle(high=float(high), low=float(low), close=float(close), ts=candle_ts)
+                ):
+                    mds_snapshot = self.score_engine
+                    self._publish_mds_state()
             except Exception as e:
                 logger.error(f"[MDS] ScoreEngine update failed: {e}", exc_info=True)
                 mds_snapshot = None
 
         # Update state if indicator is ready
         if indicator_value:
-            bot_state['supertrend_value'] = indicator_value if isinstance(indicator_value, (int, float)) else str(indicator_value)
+            self.state['supertrend_value'] = indicator_value if isinstance(indicator_value, (int, float)) else str(indicator_value)
 
         # ADX update (optional; used by regime detector when enabled)
         if self.adx:
             try:
-                adx_val, _adx_sig = self.adx.add_candle(high, low, close)
-                bot_state['adx_value'] = None if adx_val is None else float(adx_val)
+                adx_val = self._adx_node.value
+                self.state['adx_value'] = None if adx_val is None else float(adx_val)
+                self.state['adx_plus_di'] = None if self.adx.plus_di is None else float(self.adx.plus_di)
+                self.state['adx_minus_di'] = None if self.adx.minus_di is None else float(self.adx.minus_di)
             except Exception:
-                bot_state['adx_value'] = None
+                self.state['adx_value'] = None
+                self.state['adx_plus_di'] = None
+                self.state['adx_minus_di'] = None
         if macd_line_value is not None:
-            bot_state['macd_value'] = float(macd_line_value)
+            self.state['macd_value'] = float(macd_line_value)
         else:
-            bot_state['macd_value'] = 0.0
+            self.state['macd_value'] = 0.0
 
         # Expose histogram as telemetry (used by v2 logic)
-        bot_state['macd_histogram'] = 0.0 if macd_hist_value is None else float(macd_hist_value)
+        self.state['macd_histogram'] = 0.0 if macd_hist_value is None else float(macd_hist_value)
 
         # Update signal status (GREEN="buy", RED="sell", None="waiting")
         if signal == "GREEN":
-            bot_state['signal_status'] = "buy"
+            self.state['signal_status'] = "buy"
         elif signal == "RED":
-            bot_state['signal_status'] = "sell"
+            self.state['signal_status'] = "sell"
         else:
-            bot_state['signal_status'] = "waiting"
+            self.state['signal_status'] = "waiting"
 
         # Always log candle close (even while indicators warm up)
         st_txt = f"{indicator_value:.2f}" if isinstance(indicator_value, (int, float)) else "NA"
@@ -343,7 +612,7 @@ class TradingBot:
         )
 
         # Save candle data for analysis (optional; disabled by default to keep DB small)
-        if indicator_value and config.get('store_candle_data', False):
+        if indicator_value and self.config.get('store_candle_data', False):
             from database import save_candle_data
 
             await save_candle_data(
@@ -353,14 +622,14 @@ class TradingBot:
                 low=low,
                 close=close,
                 supertrend_value=indicator_value,
-                macd_value=macd_value,
-                signal_status=bot_state['signal_status'],
-                interval_seconds=int(config.get('candle_interval', candle_interval) or candle_interval),
+                macd_value=macd_line_value,
+                signal_status=self.state['signal_status'],
+                interval_seconds=int(self.config.get('candle_interval', candle_interval) or candle_interval),
             )
 
         # Candle-close trailing SL/target check regardless of signal readiness
         if self.current_position:
-            option_ltp = bot_state['current_option_ltp']
+            option_ltp = self.state['current_option_ltp']
             sl_hit = await self.check_trailing_sl_on_close(option_ltp)
             if sl_hit:
                 self.last_exit_candle_time = current_candle_time
@@ -371,10 +640,10 @@ class TradingBot:
         
         # v2 logic is always-on for SuperTrend-based modes.
         # In score_mds mode, ScoreEngine has its own trade decisions; avoid double-trading.
-        use_v2_logic = str(config.get('indicator_type') or '').strip().lower() != 'score_mds'
+        use_v2_logic = str(self.config.get('indicator_type') or '').strip().lower() != 'score_mds'
 
         if indicator_value and isinstance(indicator_value, (int, float)) and use_v2_logic:
-            current_price = float(bot_state.get('index_ltp') or 0.0)
+            current_price = float(self.state.get('index_ltp') or 0.0)
 
             # Track candle range history for volatility expansion
             candle_range = float(high) - float(low)
@@ -387,15 +656,15 @@ class TradingBot:
             regime, regime_info = self.regime_detector.detect(
                 current_price=current_price,
                 supertrend_value=float(indicator_value),
-                adx=float(bot_state.get('adx_value')) if bot_state.get('adx_value') is not None else None,
+                adx=float(self.state.get('adx_value')) if self.state.get('adx_value') is not None else None,
             )
-            bot_state['market_regime'] = regime.value
+            self.state['market_regime'] = regime.value
 
             # Cooldown advances on every candle
             self.cooldown_mgr.advance()
             cd_state = self.cooldown_mgr.get_state()
-            bot_state['cooldown_active'] = bool(cd_state.active)
-            bot_state['cooldown_candles_remaining'] = int(cd_state.candles_remaining)
+            self.state['cooldown_active'] = bool(cd_state.active)
+            self.state['cooldown_candles_remaining'] = int(cd_state.candles_remaining)
 
             # Candle body% (spec)
             body_pct = 0.0
@@ -414,17 +683,17 @@ class TradingBot:
                     candles_held=int(self.candles_in_position),
                 )
                 self.runtime_confidence = float(new_conf)
-                bot_state['runtime_confidence'] = float(self.runtime_confidence)
+                self.state['runtime_confidence'] = float(self.runtime_confidence)
 
                 # Risk-first exits (spec order)
-                option_ltp = float(bot_state.get('current_option_ltp') or 0.0)
+                option_ltp = float(self.state.get('current_option_ltp') or 0.0)
                 position_type = str(self.current_position.get('option_type') or '').upper()
                 qty = int(self.current_position.get('qty') or 0)
                 if qty <= 0:
                     index_config = get_index_config(index_name)
-                    qty = int(config.get('order_qty', 1) or 1) * int(index_config['lot_size'])
+                    qty = int(self.config.get('order_qty', 1) or 1) * int(index_config['lot_size'])
 
-                initial_sl = float(config.get('initial_stoploss', 0) or 0.0)
+                initial_sl = float(self.config.get('initial_stoploss', 0) or 0.0)
                 hard_sl = (float(self.entry_price) - initial_sl) if initial_sl > 0 else None
 
                 exit_signal = self.exit_logic.check_exit(
@@ -433,12 +702,12 @@ class TradingBot:
                     hard_sl=hard_sl,
                     trailing_sl=self.trailing_sl,
                     runtime_confidence=float(self.runtime_confidence),
-                    min_runtime_confidence=float(config.get('min_runtime_confidence', 40.0) or 40.0),
+                    min_runtime_confidence=float(self.config.get('min_runtime_confidence', 40.0) or 40.0),
                     st_direction=int(self.indicator.direction) if self.indicator else None,
                     prev_st_direction=int(self.prev_st_direction) if self.prev_st_direction is not None else None,
                     position_type=position_type,
                     current_time_ist=get_ist_time().time(),
-                    bypass_eod_exit=bool(config.get('bypass_market_hours', False)),
+                    bypass_eod_exit=bool(self.config.get('bypass_market_hours', False)),
                 )
 
                 if exit_signal.should_exit and exit_signal.reason is not None:
@@ -456,7 +725,7 @@ class TradingBot:
                     logger.debug("[V2_ENTRY] Skipped (SIDEWAYS regime)")
                 elif not self.cooldown_mgr.can_enter():
                     logger.debug("[V2_ENTRY] Skipped (cooldown active)")
-                elif not self.is_within_trading_hours() or bool(bot_state.get('daily_max_loss_triggered', False)):
+                elif not self.is_within_trading_hours() or bool(self.state.get('daily_max_loss_triggered', False)):
                     logger.debug("[V2_ENTRY] Skipped (hours/maxloss gate)")
                 else:
                     st_distance_pct = (abs(current_price - float(indicator_value)) / current_price * 100.0) if current_price > 0 else 0.0
@@ -470,7 +739,7 @@ class TradingBot:
                         macd_histogram=macd_hist_value,
                         recent_ranges=list(self._recent_candle_ranges),
                     )
-                    bot_state['confidence_entry'] = float(confidence_bd.total)
+                    self.state['confidence_entry'] = float(confidence_bd.total)
                     logger.info(f"[V2_ENTRY_CONF] {confidence_bd}")
 
                     entry_decision = self.entry_logic.check_entry(
@@ -481,7 +750,7 @@ class TradingBot:
                         candle_close=float(close),
                         macd_histogram=macd_hist_value,
                         entry_confidence=float(confidence_bd.total),
-                        min_entry_confidence=float(config.get('min_entry_confidence', 65.0) or 65.0),
+                        min_entry_confidence=float(self.config.get('min_entry_confidence', 65.0) or 65.0),
                     )
 
                     if entry_decision.should_enter and entry_decision.direction is not None:
@@ -504,7 +773,7 @@ class TradingBot:
         # ═══════════════════════════════════════════════════════════════════
 
         # Score-engine trading path (independent of SuperTrend signal emission)
-        if config.get('indicator_type') == 'score_mds' and mds_snapshot is not None:
+        if self.config.get('indicator_type') == 'score_mds' and mds_snapshot is not None:
             can_trade = True
             if self.last_exit_candle_time:
                 time_since_exit = (current_candle_time - self.last_exit_candle_time).total_seconds()
@@ -516,13 +785,13 @@ class TradingBot:
                     self.last_exit_candle_time = current_candle_time
         else:
             # Prevent double-trading: v2 is authoritative for SuperTrend-based modes.
-            if str(config.get('indicator_type') or '').strip().lower() != 'score_mds':
+            if str(self.config.get('indicator_type') or '').strip().lower() != 'score_mds':
                 return
 
-            prev_signal = bot_state.get('last_supertrend_signal')
+            prev_signal = self.state.get('last_supertrend_signal')
             flipped = bool(signal) and (prev_signal is None or signal != prev_signal)
             if signal:
-                bot_state['last_supertrend_signal'] = signal
+                self.state['last_supertrend_signal'] = signal
 
             # Trading logic - entries/exits based on SuperTrend signal
             can_trade = True
@@ -539,31 +808,31 @@ class TradingBot:
                     self.last_exit_candle_time = current_candle_time
 
     def _can_place_new_entry_order(self) -> bool:
-        cooldown = int(config.get('min_order_cooldown_seconds', 0) or 0)
+        cooldown = int(self.config.get('min_order_cooldown_seconds', 0) or 0)
         if cooldown <= 0 or self.last_order_time_utc is None:
             return True
-        elapsed = (datetime.now(timezone.utc) - self.last_order_time_utc).total_seconds()
+        elapsed = (utc_now() - self.last_order_time_utc).total_seconds()
         return elapsed >= cooldown
 
     def _remaining_entry_cooldown(self) -> float:
-        cooldown = int(config.get('min_order_cooldown_seconds', 0) or 0)
+        cooldown = int(self.config.get('min_order_cooldown_seconds', 0) or 0)
         if cooldown <= 0 or self.last_order_time_utc is None:
             return 0.0
-        elapsed = (datetime.now(timezone.utc) - self.last_order_time_utc).total_seconds()
+        elapsed = (utc_now() - self.last_order_time_utc).total_seconds()
         return max(0.0, cooldown - elapsed)
 
     def _min_hold_active(self) -> bool:
-        min_hold = int(config.get('min_hold_seconds', 0) or 0)
+        min_hold = int(self.config.get('min_hold_seconds', 0) or 0)
         if min_hold <= 0 or self.entry_time_utc is None or not self.current_position:
             return False
-        held = (datetime.now(timezone.utc) - self.entry_time_utc).total_seconds()
+        held = (utc_now() - self.entry_time_utc).total_seconds()
         return held < min_hold
     
     def initialize_dhan(self):
         """Initialize Dhan API connection"""
-        if config['dhan_access_token'] and config['dhan_client_id']:
+        if self.config['dhan_access_token'] and self.config['dhan_client_id']:
             try:
-                self.dhan = DhanAPI(config['dhan_access_token'], config['dhan_client_id'])
+                self.dhan = DhanAPI(self.config['dhan_access_token'], self.config['dhan_client_id'])
                 logger.info("[MARKET] Dhan API initialized")
                 return True
             except Exception as e:
@@ -576,12 +845,12 @@ class TradingBot:
     async def _init_paper_replay(self) -> None:
         """Load candle data from DB for after-hours paper replay."""
         try:
-            index_name = config.get('selected_index', 'NIFTY')
-            interval = int(config.get('candle_interval', 5) or 5)
-            date_ist = str(config.get('paper_replay_date_ist', '') or '').strip() or None
+            index_name = self.config.get('selected_index', 'NIFTY')
+            interval = int(self.config.get('candle_interval', 5) or 5)
+            date_ist = str(self.config.get('paper_replay_date_ist', '') or '').strip() or None
 
-            provider = str(config.get('market_data_provider', 'dhan') or 'dhan').strip().lower()
-            base_url = str(config.get('mds_base_url', '') or '').strip()
+            provider = str(self.config.get('market_data_provider', 'dhan') or 'dhan').strip().lower()
+            base_url = str(self.config.get('mds_base_url', '') or '').strip()
 
             candles = []
             if provider == 'mds' and base_url and date_ist:
@@ -609,106 +878,134 @@ class TradingBot:
 
             self._paper_replay_candles = candles or []
             self._paper_replay_pos = 0
-            self._paper_replay_htf_elapsed = 0
 
             src = "MDS" if (provider == 'mds' and base_url and date_ist) else "SQLITE"
             logger.info(f"[REPLAY] Loaded {len(self._paper_replay_candles)} candles | Source={src} | Index={index_name} Interval={interval}s DateIST={date_ist or 'latest'}")
         except Exception as e:
             self._paper_replay_candles = []
             self._paper_replay_pos = 0
-            self._paper_replay_htf_elapsed = 0
             logger.error(f"[REPLAY] Failed to load candles: {e}")
     
     def _initialize_indicator(self):
         """Initialize indicators (SuperTrend + optional MACD confirmation)"""
         try:
-            self.indicator = SuperTrend(
-                period=config['supertrend_period'],
-                multiplier=config['supertrend_multiplier']
-            )
-            # HTF indicator uses same parameters; timeframe aggregation handled in run_loop
-            self.htf_indicator = SuperTrend(
-                period=config['supertrend_period'],
-                multiplier=config['supertrend_multiplier']
+            self._build_indicator_graph(
+                st_period=int(self.config['supertrend_period']),
+                st_multiplier=float(self.config['supertrend_multiplier']),
+                macd_fast=int(self.config.get('macd_fast', 12)),
+                macd_slow=int(self.config.get('macd_slow', 26)),
+                macd_signal=int(self.config.get('macd_signal', 9)),
             )
-            # MACD used for entry confirmation (if enabled)
-            self.macd = MACD(
-                fast=int(config.get('macd_fast', 12)),
-                slow=int(config.get('macd_slow', 26)),
-                signal=int(config.get('macd_signal', 9)),
-            )
-
-            # Optional: ADX for market regime detection
-            self.adx = ADX(period=14) if bool(config.get('use_adx_for_regime', False)) else None
-
-            self.score_engine = ScoreEngine(
-                st_period=int(config.get('supertrend_period', 7)),
-                st_multiplier=float(config.get('supertrend_multiplier', 4)),
-                macd_fast=int(config.get('macd_fast', 12)),
-                macd_slow=int(config.get('macd_slow', 26)),
-                macd_signal=int(config.get('macd_signal', 9)),
-                base_timeframe_seconds=int(config.get('candle_interval', 5) or 5),
-                bonus_macd_triple=float(config.get('mds_bonus_macd_triple', 1.0) or 0.0),
-                bonus_macd_momentum=float(config.get('mds_bonus_macd_momentum', 0.5) or 0.0),
-                bonus_macd_cross=float(config.get('mds_bonus_macd_cross', 0.5) or 0.0),
-            )
-            logger.info(f"[SIGNAL] SuperTrend initialized")
+            logger.info(f"[SIGNAL] SuperTrend initialized | Nodes={len(self.graph.nodes())}")
         except Exception as e:
             logger.error(f"[ERROR] Failed to initialize indicator: {e}")
             # Fallback to SuperTrend
-            self.indicator = SuperTrend(period=7, multiplier=4)
-            self.htf_indicator = SuperTrend(period=7, multiplier=4)
-            self.macd = MACD(fast=12, slow=26, signal=9)
-            self.adx = ADX(period=14) if bool(config.get('use_adx_for_regime', False)) else None
-            self.score_engine = ScoreEngine(
-                st_period=7,
-                st_multiplier=4,
-                macd_fast=12,
-                macd_slow=26,
-                macd_signal=9,
-                base_timeframe_seconds=int(config.get('candle_interval', 5) or 5),
-                bonus_macd_triple=float(config.get('mds_bonus_macd_triple', 1.0) or 0.0),
-                bonus_macd_momentum=float(config.get('mds_bonus_macd_momentum', 0.5) or 0.0),
-                bonus_macd_cross=float(config.get('mds_bonus_macd_cross', 0.5) or 0.0),
-            )
+            self._build_indicator_graph(st_period=7, st_multiplier=4.0, macd_fast=12, macd_slow=26, macd_signal=9)
             logger.info(f"[SIGNAL] SuperTrend (fallback) initialized")
+
+    def _build_indicator_graph(
+        self,
+        *,
+        st_period: int,
+        st_multiplier: float,
+        macd_fast: int,
+        macd_slow: int,
+        macd_signal: int,
+    ) -> None:
+        """Subscribe every consumer to shared (kind, params, timeframe) nodes.
+
+        The bot's SuperTrend/MACD and ScoreEngine's base-TF SuperTrend/MACD resolve
+        to the same nodes, so each series is computed once per candle. ADX is only
+        subscribed when the v2 regime detector will read it.
+        """
+        base_tf = int(self.config.get('candle_interval', 5) or 5)
+        use_v2_logic = str(self.config.get('indicator_type') or '').strip().lower() != 'score_mds'
+        st_params = {'period': st_period, 'multiplier': st_multiplier}
+        graph = IndicatorGraph()
+
+        self._st_node = graph.subscribe('bot', 'supertrend', base_tf, **st_params)
+        # MACD used for entry confirmation / v2 confidence (if enabled)
+        self._macd_node = graph.subscribe('bot', 'macd', base_tf, fast=macd_fast, slow=macd_slow, signal=macd_signal)
+        # HTF filter uses same parameters on htf_filter_timeframe candles aggregated from the base candles
+        htf_tf = int(self.config.get('htf_filter_timeframe', 60) or 60)
+        self._htf_node = graph.subscribe('htf_filter', 'supertrend', htf_tf, **st_params)
+        self._htf_agg = CandleAggregator.chain(base_tf, (htf_tf,)) if htf_tf > base_tf and htf_tf % base_tf == 0 else None
+        # Optional: ADX for market regime detection
+        self._adx_node = None
+        if bool(self.config.get('use_adx_for_regime', False)) and use_v2_logic:
+            self._adx_node = graph.subscribe('regime', 'adx', base_tf, period=14)
+
+        self.indicator = self._st_node.indicator
+        self.macd = self._macd_node.indicator
+        self.htf_indicator = self._htf_node.indicator
+        self.adx = self._adx_node.indicator if self._adx_node else None
+
+        score_args = dict(
+            st_period=st_period,
+            st_multiplier=st_multiplier,
+            macd_fast=macd_fast,
+            macd_slow=macd_slow,
+            macd_signal=macd_signal,
+            base_timeframe_seconds=base_tf,
+            bonus_macd_triple=float(self.config.get('mds_bonus_macd_triple', 1.0) or 0.0),
+            bonus_macd_momentum=float(self.config.get('mds_bonus_macd_momentum', 0.5) or 0.0),
+            bonus_macd_cross=float(self.config.get('mds_bonus_macd_cross', 0.5) or 0.0),
+            full_chain=bool(self.config.get('mds_full_chain', False)),
+            tf_weights=self.config.get('mds_tf_weights') or None,
+            history=int(self.config.get('mds_history_size', 720) or 0),
+        )
+        self._score_engine_args = score_args
+        try:
+            self.score_engine = ScoreEngine(**score_args, graph=graph)
+        except Exception as e:
+            logger.warning(f"[MDS] ScoreEngine unavailable for {base_tf}s candles: {e}")
+            self.score_engine = None
+
+        if self.score_engine:
+            self.score_engine.add_listener(self._on_mds_event)
+
+        self.graph = graph
+        self._graph_base_tf = base_tf
+
+    def _publish_mds_state(self):
+        engine = self.score_engine
+        self.state['mds_score'] = float(engine.score)
+        self.state['mds_slope'] = float(engine.slope)
+        self.state['mds_acceleration'] = float(engine.acceleration)
+        self.state['mds_stability'] = float(engine.stability)
+        self.state['mds_confidence'] = float(engine.confidence)
+        self.state['mds_is_choppy'] = bool(engine.is_choppy)
+        self.state['mds_direction'] = str(engine.direction)
+
+    def _on_mds_event(self, event):
+        """Log ScoreEngine transitions once, instead of a skip line on every candle."""
+        if self._mds_events_muted:
+            return
+        if event.kind == MDSEventKind.READY:
+            what = "Engine ready" if event.new else "Engine warming up"
+        elif event.kind == MDSEventKind.CHOP:
+            what = "Market choppy - entries paused" if event.new else "Market no longer choppy"
+        else:
+            what = f"Direction {event.old} -> {event.new}"
+        logger.info(f"[MDS] {what} | Score={event.score:.2f} Slope={event.slope:.2f} Conf={event.confidence:.2f}")
     
     def reset_indicator(self):
         """Reset the selected indicator"""
-        if self.indicator:
-            self.indicator.reset()
-        if self.htf_indicator:
-            self.htf_indicator.reset()
-        if self.macd:
-            self.macd.reset()
-        if self.adx:
-            self.adx.reset()
-        if self.score_engine:
-            self.score_engine.reset()
+        interval = int(self.config.get('candle_interval', 5) or 5)
+        htf_tf = int(self.config.get('htf_filter_timeframe', 60) or 60)
+        if self.graph is None or self._graph_base_tf != interval or self._htf_node.timeframe != htf_tf:
+            # Base or HTF timeframe changed: node keys change, so rebuild the subscriptions
+            self._initialize_indicator()
         else:
-            # If score_engine wasn't initialized for some reason, try to initialize now.
-            try:
-                self.score_engine = ScoreEngine(
-                    st_period=int(config.get('supertrend_period', 7)),
-                    st_multiplier=float(config.get('supertrend_multiplier', 4)),
-                    macd_fast=int(config.get('macd_fast', 12)),
-                    macd_slow=int(config.get('macd_slow', 26)),
-                    macd_signal=int(config.get('macd_signal', 9)),
-                    base_timeframe_seconds=int(config.get('candle_interval', 5) or 5),
-                    bonus_macd_triple=float(config.get('mds_bonus_macd_triple', 1.0) or 0.0),
-                    bonus_macd_momentum=float(config.get('mds_bonus_macd_momentum', 0.5) or 0.0),
-                    bonus_macd_cross=float(config.get('mds_bonus_macd_cross', 0.5) or 0.0),
-                )
-            except Exception:
-                self.score_engine = None
+            self.graph.reset()
+            if self.score_engine:
+                self.score_engine.reset()
+            if self._htf_agg is not None:
+                self._htf_agg.reset()
 
         self._mds_last_direction = None
         self._mds_confirm_count = 0
         self._last_mds_candle_ts = None
-        self._mds_htf_count = 0
-        self._mds_htf_high = 0.0
-        self._mds_htf_low = float('inf')
-        self._mds_htf_close = 0.0
         
         # NEW: Reset Trading Logic v2 State
         self.runtime_confidence = 100.0
@@ -718,17 +1015,84 @@ class TradingBot:
         self.prev_macd_histogram = None
         self.cooldown_mgr.reset()
         
-        logger.info(f"[SIGNAL] Indicator reset: {config.get('indicator_type', 'supertrend')}")
+        logger.info(f"[SIGNAL] Indicator reset: {self.config.get('indicator_type', 'supertrend')}")
         logger.info("[SIGNAL] Trading Logic v2 state reset")
     
+    def _build_multi_score_engine(self) -> Optional[MultiScoreEngine]:
+        symbols = [str(s).strip().upper() for s in (self.config.get('mds_symbols') or []) if str(s).strip()]
+        symbols = list(dict.fromkeys(symbols))
+        interval = int(self.config.get('candle_interval', 5) or 5)
+        min_vectorized = int(self.config.get('mds_vectorize_min_symbols', VECTORIZE_MIN_SYMBOLS) or 0)
+        try:
+            return MultiScoreEngine(
+                symbols,
+                st_period=int(self.config.get('supertrend_period', 7) or 7),
+                st_multiplier=float(self.config.get('supertrend_multiplier', 4) or 4),
+                macd_fast=int(self.config.get('macd_fast', 12) or 12),
+                macd_slow=int(self.config.get('macd_slow', 26) or 26),
+                macd_signal=int(self.config.get('macd_signal', 9) or 9),
+                base_timeframe_seconds=interval,
+                bonus_macd_triple=float(self.config.get('mds_bonus_macd_triple', 1.0) or 0.0),
+                bonus_macd_momentum=float(self.config.get('mds_bonus_macd_momentum', 0.5) or 0.0),
+                bonus_macd_cross=float(self.config.get('mds_bonus_macd_cross', 0.5) or 0.0),
+                full_chain=bool(self.config.get('mds_full_chain', False)),
+                tf_weights=self.config.get('mds_tf_weights') or None,
+                vectorize=len(symbols) >= min_vectorized,
+            )
+        except Exception as e:
+            logger.warning(f"[MDS] Multi-symbol scoring unavailable ({symbols}, {interval}s): {e}")
+            return None
+
+    async def _run_multi_symbol_scores(self) -> None:
+        """Score every index in mds_symbols on the selected timeframe, side by side.
+
+        Warms the engine up from MDS history once, then rides market_feed's
+        candle poller. Publishes self.state['mds_symbols'] and
+        self.state['mds_strongest'] whenever a bucket was scored.
+        """
+        from mds_client import fetch_last_candles
+
+        engine = self._build_multi_score_engine()
+        if engine is None:
+            return
+        self.multi_score_engine = engine
+
+        def publish() -> None:
+            self.state['mds_symbols'] = engine.scores()
+            self.state['mds_strongest'] = engine.strongest()
+
+        source = MdsSymbolsSource(engine, publish)
+        base_url = str(self.config.get('mds_base_url', '') or '').strip()
+
+        async def history(stream: tuple, limit: int) -> list:
+            try:
+                return await fetch_last_candles(base_url=base_url, symbol=stream[0], timeframe_seconds=stream[1], limit=limit)
+            except Exception as e:
+                logger.debug(f"[MDS] Multi-symbol history fetch failed for {stream[0]}: {e}")
+                return []
+
+        # Warm up from history so every scored timeframe is ready
+        per_tf = max(
+            int(self.config.get('supertrend_period', 7) or 7) + 1,
+            int(self.config.get('macd_slow', 26) or 26) + int(self.config.get('macd_signal', 9) or 9),
+        )
+        limit = engine.timeframes[-1] // max(1, engine.base_tf) * per_tf + 5
+        streams = source.streams()
+        rows = await asyncio.gather(*(history(stream, limit) for stream in streams))
+        source.offer(dict(zip(streams, rows)), wait_for_newest=False)
+        publish()
+        logger.info(f"[MDS] Multi-symbol scoring started for {', '.join(engine.symbols)} ({engine.base_tf}s)")
+
+        await market_feed.candle_streams(source, self)
+
     def is_within_trading_hours(self) -> bool:
         """Check if current time allows new entries
         
         Returns:
             bool: True if within allowed trading hours, False otherwise
         """
-        if config.get('bypass_market_hours', False) or (
-            bot_state.get('mode') == 'paper' and config.get('paper_replay_enabled', False)
+        if self.config.get('bypass_market_hours', False) or (
+            self.state.get('mode') == 'paper' and self.config.get('paper_replay_enabled', False)
         ):
             return True
 
@@ -757,49 +1121,56 @@ class TradingBot:
             return {"status": "error", "message": "Bot already running"}
         
         # Only require Dhan in live mode. Paper mode can run without broker SDK.
-        if bot_state.get('mode') != 'paper':
+        if self.state.get('mode') != 'paper':
             if not self.initialize_dhan():
                 return {"status": "error", "message": "Dhan API not available (credentials/SDK)"}
 
         # Prepare replay candles for after-hours (or bypass-hours) paper simulation
-        replay_enabled = bool(bot_state.get('mode') == 'paper' and config.get('paper_replay_enabled', False))
+        replay_enabled = bool(self.state.get('mode') == 'paper' and self.config.get('paper_replay_enabled', False))
         if replay_enabled:
             await self._init_paper_replay()
             if not self._paper_replay_candles:
                 return {"status": "error", "message": "Paper replay enabled but no candles found (MDS/DB)"}
         
         self.running = True
-        bot_state['is_running'] = True
+        self.state['is_running'] = True
         self.reset_indicator()
         self.last_signal = None
 
         # Do not seed from "latest" history when running a dated replay.
         # Also skip MDS prefetch when running synthetic-only paper testing.
         synthetic_only = (
-            bot_state.get('mode') == 'paper'
-            and bool(config.get('bypass_market_hours', False))
-            and not bool(config.get('paper_replay_enabled', False))
+            self.state.get('mode') == 'paper'
+            and bool(self.config.get('bypass_market_hours', False))
+            and not bool(self.config.get('paper_replay_enabled', False))
         )
+        self._checkpoint_enabled = (not replay_enabled) and (not synthetic_only) and bool(self.config.get('state_checkpoint_enabled', True))
+        self._checkpoint_pending = None
+        self._checkpoint_due = 0.0
         if (not replay_enabled) and (not synthetic_only):
-            # Prefetch and seed indicators from Timescale via market-data-service so we don't
-            # spend the first N candles "warming up" after each restart.
-            await self._seed_indicators_from_mds_history()
+            # Resume from the last checkpoint when possible, then prefetch and seed indicators from
+            # Timescale via market-data-service so we don't spend the first N candles "warming up".
+            checkpoint = self._restore_checkpoint() if self._checkpoint_enabled else None
+            await self._seed_indicators_from_mds_history(checkpoint)
 
         self.task = asyncio.create_task(self.run_loop())
         
-        index_name = config['selected_index']
-        interval = format_timeframe(config['candle_interval'])
-        indicator_name = config.get('indicator_type', 'supertrend')
-        logger.info(f"[BOT] Started - Index: {index_name}, Timeframe: {interval}, Indicator: {indicator_name}, Mode: {bot_state['mode']}")
+        index_name = self.config['selected_index']
+        interval = format_timeframe(self.config['candle_interval'])
+        indicator_name = self.config.get('indicator_type', 'supertrend')
+        logger.info(f"[BOT] Started - Index: {index_name}, Timeframe: {interval}, Indicator: {indicator_name}, Mode: {self.state['mode']}")
         
         return {"status": "success", "message": f"Bot started for {index_name} ({interval})"}
     
     async def stop(self):
         """Stop the trading bot"""
         self.running = False
-        bot_state['is_running'] = False
+        self.state['is_running'] = False
         if self.task:
             self.task.cancel()
+        # Final checkpoint once any candle in flight is done
+        async with self._trade_lock:
+            await self._flush_checkpoint()
         logger.info("[BOT] Stopped")
         return {"status": "success", "message": "Bot stopped"}
     
@@ -808,19 +1179,19 @@ class TradingBot:
         if not self.current_position:
             return {"status": "error", "message": "No open position"}
         
-        index_name = config['selected_index']
+        index_name = self.config['selected_index']
         qty = int(self.current_position.get('qty') or 0)
         if qty <= 0:
             index_config = get_index_config(index_name)
-            qty = config['order_qty'] * index_config['lot_size']
+            qty = self.config['order_qty'] * index_config['lot_size']
         
         logger.info(f"[ORDER] Force squareoff initiated for {index_name}")
         
-        exit_price = bot_state['current_option_ltp']
+        exit_price = self.state['current_option_ltp']
         pnl = (exit_price - self.entry_price) * qty
         closed = await self.close_position(exit_price, pnl, "Force Square-off")
         if closed:
-            suffix = "(Paper)" if bot_state['mode'] == 'paper' else ""
+            suffix = "(Paper)" if self.state['mode'] == 'paper' else ""
             return {"status": "success", "message": f"Position squared off {suffix}. PnL: {pnl:.2f}"}
         return {"status": "error", "message": "Squareoff order not filled (position still open)"}
     
@@ -830,19 +1201,19 @@ class TradingBot:
             return False
         
         trade_id = self.current_position.get('trade_id', '')
-        index_name = self.current_position.get('index_name', config['selected_index'])
+        index_name = self.current_position.get('index_name', self.config['selected_index'])
         option_type = self.current_position.get('option_type', '')
         strike = self.current_position.get('strike', 0)
         security_id = self.current_position.get('security_id', '')
         qty = int(self.current_position.get('qty') or 0)
         if qty <= 0:
             index_config = get_index_config(index_name)
-            qty = config['order_qty'] * index_config['lot_size']
+            qty = self.config['order_qty'] * index_config['lot_size']
         
         exit_order_placed = False
         filled_exit_price = exit_price
 
-        if bot_state['mode'] != 'paper' and self.dhan and security_id:
+        if self.state['mode'] != 'paper' and self.dhan and security_id:
             existing_exit_order_id = self.current_position.get('exit_order_id')
 
             try:
@@ -853,9 +1224,9 @@ class TradingBot:
                     if result.get('status') == 'success' and result.get('orderId'):
                         existing_exit_order_id = result.get('orderId')
                         self.current_position['exit_order_id'] = existing_exit_order_id
-                        bot_state['current_position'] = self.current_position
+                        self.state['current_position'] = self.current_position
                         exit_order_placed = True
-                        self.last_order_time_utc = datetime.now(timezone.utc)
+                        self.last_order_time_utc = utc_now()
                         logger.info(f"[ORDER] ✓ EXIT order PLACED | OrderID: {existing_exit_order_id} | Security: {security_id} | Qty: {qty}")
                     else:
                         logger.error(f"[ORDER] ✗ EXIT order FAILED | Trade: {trade_id} | Result: {result}")
@@ -875,7 +1246,7 @@ class TradingBot:
                     )
                     if status in {"REJECTED", "CANCELLED", "ERROR"}:
                         self.current_position.pop('exit_order_id', None)
-                        bot_state['current_position'] = self.current_position
+                        self.state['current_position'] = self.current_position
                     return False
 
                 avg_price = float(verify.get('average_price') or 0)
@@ -891,53 +1262,54 @@ class TradingBot:
             logger.warning(f"[WARNING] Cannot send exit order - security_id missing for {index_name} {option_type} | Trade: {trade_id}")
             logger.info(f"[EXIT] ✓ Position closed | {index_name} {option_type} {strike} | Reason: {reason} | PnL: {pnl} | Order Placed: False")
             # Update DB in background - don't wait
-            asyncio.create_task(update_trade_exit(
+            self._record_trade_exit(
                 trade_id=trade_id,
-                exit_time=datetime.now(timezone.utc).isoformat(),
+                exit_time=utc_now().isoformat(),
                 exit_price=exit_price,
                 pnl=pnl,
                 exit_reason=reason
-            ))
+            )
             # Track last order timestamp (treated as an exit action even if no broker order)
-            self.last_order_time_utc = datetime.now(timezone.utc)
-        elif bot_state['mode'] == 'paper':
+            self.last_order_time_utc = utc_now()
+        elif self.state['mode'] == 'paper':
             logger.info(f"[ORDER] Paper mode - EXIT order not placed to Dhan (simulated) | Trade: {trade_id}")
             logger.info(f"[EXIT] ✓ Position closed | {index_name} {option_type} {strike} | Reason: {reason} | PnL: {pnl} | Order Placed: False")
             # Update DB in background - don't wait
-            asyncio.create_task(update_trade_exit(
+            self._record_trade_exit(
                 trade_id=trade_id,
-                exit_time=datetime.now(timezone.utc).isoformat(),
+                exit_time=utc_now().isoformat(),
                 exit_price=exit_price,
                 pnl=pnl,
                 exit_reason=reason
-            ))
+            )
             # Track last order timestamp (paper exit)
-            self.last_order_time_utc = datetime.now(timezone.utc)
+            self.last_order_time_utc = utc_now()
 
         # If we reached here in LIVE mode, the exit is filled. Use filled price for P&L if available.
-        if bot_state['mode'] != 'paper' and self.dhan and security_id:
+        if self.state['mode'] != 'paper' and self.dhan and security_id:
             pnl = (filled_exit_price - self.entry_price) * qty
 
-            asyncio.create_task(update_trade_exit(
+            self._record_trade_exit(
                 trade_id=trade_id,
-                exit_time=datetime.now(timezone.utc).isoformat(),
+                exit_time=utc_now().isoformat(),
                 exit_price=filled_exit_price,
                 pnl=pnl,
                 exit_reason=reason
-            ))
+            )
         
         # Update state
-        bot_state['daily_pnl'] += pnl
-        bot_state['current_position'] = None
-        bot_state['trailing_sl'] = None
-        bot_state['entry_price'] = 0
+        self.state['daily_pnl'] += pnl
+        self.state['current_position'] = None
+        self.state['trailing_sl'] = None
+        self.state['entry_price'] = 0
         
-        if bot_state['daily_pnl'] < -config['daily_max_loss']:
-            bot_state['daily_max_loss_triggered'] = True
-            logger.warning(f"[EXIT] Daily max loss triggered! PnL: {bot_state['daily_pnl']:.2f}")
+        account_pnl = self.account_daily_pnl()
+        if account_pnl < -self.config['daily_max_loss']:
+            self._trip_daily_max_loss()
+            logger.warning(f"[EXIT] Daily max loss triggered! PnL: {account_pnl:.2f}")
         
-        if pnl < 0 and abs(pnl) > bot_state['max_drawdown']:
-            bot_state['max_drawdown'] = abs(pnl)
+        if pnl < 0 and abs(pnl) > self.state['max_drawdown']:
+            self.state['max_drawdown'] = abs(pnl)
         
         # Track the signal at exit - require signal change before next entry
         # If we exited CE position, last signal was GREEN
@@ -957,466 +1329,305 @@ class TradingBot:
         try:
             self.cooldown_mgr.activate(reason=CooldownReason.EXIT)
             state = self.cooldown_mgr.get_state()
-            bot_state['cooldown_active'] = bool(state.active)
-            bot_state['cooldown_candles_remaining'] = int(state.candles_remaining)
+            self.state['cooldown_active'] = bool(state.active)
+            self.state['cooldown_candles_remaining'] = int(state.candles_remaining)
         except Exception:
             pass
 
         logger.info(f"[EXIT] ✓ Position closed | {index_name} {option_type} {strike} | Reason: {reason} | PnL: {pnl:.2f} | Order Placed: {exit_order_placed}")
         return True
     
+    def _record_trade_entry(self, trade: dict) -> None:
+        """Persist a new trade (in the background; orders never wait on the DB)."""
+        asyncio.create_task(save_trade(trade))
+
+    def _record_trade_exit(self, **exit_data) -> None:
+        """Persist a trade's exit (in the background)."""
+        asyncio.create_task(update_trade_exit(**exit_data))
+
     async def run_loop(self):
-        """Main trading loop"""
+        """Event-driven trading loop.
+
+        Market-data sources (market_events) push closed candles and quotes onto
+        queues; separate tasks make the candle-close decisions, watch ticks for
+        SL/target exits and broadcast state when it changed. Nothing here polls
+        on a fixed cadence, so a decision fires as soon as its candle arrives.
+        """
         logger.info("[BOT] Trading loop started")
-        candle_start_time = datetime.now()
-        candle_open = 0.0
-        high, low, close = 0, float('inf'), 0
-        candle_number = 0
+        replay_enabled = self.state.get('mode') == 'paper' and bool(self.config.get('paper_replay_enabled', False))
+        provider = market_data_provider(self.config, self.state)
+        self._candle_queue = asyncio.Queue()
+        self._tick_queue = asyncio.Queue(maxsize=_TICK_QUEUE_SIZE)
+        self._candle_number = 0
+        self._htf_candle_number = 0
+
+        replay_source = None
+        if replay_enabled:
+            replay_source = ReplayCandleSource(
+                self._candle_queue, self.config, self._paper_replay_candles, self._paper_replay_pos
+            )
+            sources = {'replay': replay_source.run}
+        else:
+            if provider == 'synthetic':
+                sources = {'quotes': SyntheticTickSource(self._tick_queue, self.config, self.state).run}
+            else:
+                sources = {'quotes': lambda: market_feed.quotes(self, provider)}
+            if provider == 'mds':
+                sources['mds'] = lambda: market_feed.candles(self, self._last_mds_candle_ts)
+                if bool(self.config.get('mds_multi_symbol_enabled', False)):
+                    sources['mds_symbols'] = self._run_multi_symbol_scores
+
+        tasks = {name: asyncio.create_task(self._keep_running(name, run)) for name, run in sources.items()}
+        tasks['candles'] = asyncio.create_task(self._keep_running('candles', self._consume_candles))
+        tasks['broadcast'] = asyncio.create_task(self._keep_running('broadcast', self._broadcast_on_change))
+        tasks['housekeeping'] = asyncio.create_task(
+            self._keep_running('housekeeping', lambda: self._run_housekeeping(replay_enabled))
+        )
+        if not replay_enabled:
+            # Non-MDS providers only deliver quotes: candles are built from them on the clock
+            tasks['ticks'] = asyncio.create_task(
+                self._keep_running('ticks', lambda: self._consume_ticks(build_candles=provider != 'mds'))
+            )
+            tasks['risk'] = asyncio.create_task(self._keep_running('risk', self.risk.run))
 
-        # Higher timeframe (HTF) candle aggregation (default: 1 minute)
-        htf_candle_start_time = datetime.now()
-        htf_high, htf_low, htf_close = 0, float('inf'), 0
-        htf_candle_number = 0
-        
-        while self.running:
+        try:
+            if replay_source is not None:
+                await tasks['replay']
+                logger.info("[REPLAY] Completed candle replay")
+                self.running = False
+                self.state['is_running'] = False
+                await self.broadcast_state()
+            else:
+                await asyncio.gather(*tasks.values())
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            if replay_source is not None:
+                self._paper_replay_pos = replay_source.pos
+
+    async def _keep_running(self, name: str, run) -> None:
+        """Run one loop task, restarting it after an unexpected error."""
+        while True:
+            try:
+                await run()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[ERROR] Trading loop {name} exception: {e}", exc_info=True)
+                await asyncio.sleep(5)
+
+    async def _consume_candles(self) -> None:
+        """Decision path: one _handle_closed_candle() per closed base candle."""
+        while True:
+            event = await self._candle_queue.get()
             try:
-                index_name = config['selected_index']
-                candle_interval = config['candle_interval']
+                async with self._trade_lock:
+                    await self._on_candle_event(event)
+            except Exception as e:
+                logger.error(f"[ERROR] Candle handling failed: {e}", exc_info=True)
+            finally:
+                self._candle_queue.task_done()
 
-                replay_enabled = (
-                    bot_state.get('mode') == 'paper' and bool(config.get('paper_replay_enabled', False))
-                )
-                
-                # Check daily reset (9:15 AM IST)
-                ist = get_ist_time()
-                if ist.hour == 9 and ist.minute == 15:
-                    bot_state['daily_trades'] = 0
-                    bot_state['daily_pnl'] = 0.0
-                    bot_state['daily_max_loss_triggered'] = False
-                    bot_state['max_drawdown'] = 0.0
-                    self.last_exit_candle_time = None
-                    self.last_trade_time = None
-                    self.last_signal = None
-                    candle_number = 0
-                    htf_candle_number = 0
-                    self.reset_indicator()
-                    logger.info("[BOT] Daily reset at 9:15 AM")
-                
-                # Force square-off at 3:25 PM (skip during paper replay)
-                if (not replay_enabled) and should_force_squareoff() and self.current_position:
-                    logger.info("[EXIT] Auto squareoff at 3:25 PM")
+    async def _on_candle_event(self, event) -> None:
+        if self.state['daily_max_loss_triggered'] and not self.current_position:
+            return
+        high, low, close = event.high, event.low, event.close
+        if not (high > 0 and low < float('inf') and close > 0):
+            return
+
+        self.state['index_ltp'] = float(close)
+        if event.ts_key is not None:
+            self._last_mds_candle_ts = event.ts_key
+        self._aggregate_htf(high, low, close, event.ts)
+
+        self._candle_number += 1
+        await self._handle_closed_candle(
+            index_name=self.config['selected_index'],
+            candle_number=self._candle_number,
+            candle_interval=int(self.config.get('candle_interval', 5) or 5),
+            candle_open=float(event.open or close),
+            high=high,
+            low=low,
+            close=close,
+            current_candle_time=utc_now(),
+            candle_ts=event.ts,
+        )
+        self.last_decision_latency_ms = (time.monotonic() - event.received) * 1000.0
+        logger.debug(f"[BOT] Candle #{self._candle_number} handled {self.last_decision_latency_ms:.1f} ms after arrival")
+
+        self._simulate_option_ltp()
+        self._state_changed.set()
+
+    async def _consume_ticks(self, build_candles: bool) -> None:
+        """Apply quotes, feed the risk watcher and (non-MDS) close clock-aligned candles."""
+        self._tick_candles = None
+        while True:
+            interval = int(self.config.get('candle_interval', 5) or 5)
+            builder = self._tick_candles
+            if build_candles and (builder is None or builder.interval != interval):
+                builder = self._tick_candles = TickCandleBuilder(interval)
+            deadline = builder.deadline() if builder is not None else None
+            try:
+                if deadline is None:
+                    tick = await self._tick_queue.get()
+                else:
+                    # Wake at the candle boundary even if no tick arrives
+                    tick = await asyncio.wait_for(self._tick_queue.get(), max(0.0, deadline - time.time()))
+            except asyncio.TimeoutError:
+                tick = None
+            try:
+                await self._on_tick(tick, builder)
+            except Exception as e:
+                logger.error(f"[ERROR] Tick handling failed: {e}", exc_info=True)
+
+    async def _on_tick(self, tick, builder: Optional[TickCandleBuilder]) -> None:
+        if self.state['daily_max_loss_triggered'] and not self.current_position:
+            return
+        now = time.time()
+        if tick is None:
+            closed = builder.flush(now)
+            if closed is not None:
+                self._candle_queue.put_nowait(closed)
+            return
+
+        if tick.index_ltp and tick.index_ltp > 0:
+            self.state['index_ltp'] = float(tick.index_ltp)
+        if tick.option_ltp and tick.option_ltp > 0:
+            option_ltp = round(float(tick.option_ltp) / 0.05) * 0.05
+            self.state['current_option_ltp'] = round(option_ltp, 2)
+        if builder is not None:
+            closed = builder.on_tick(float(self.state.get('index_ltp') or 0.0), now)
+            if closed is not None:
+                self._candle_queue.put_nowait(closed)
+
+        self._simulate_option_ltp()
+        if self.current_position and self.state['current_option_ltp'] > 0:
+            # SL/Target on EVERY TICK, in the risk task (does not wait for candle handling)
+            self.risk.on_option_ltp(self.state['current_option_ltp'])
+        self._state_changed.set()
+
+    def account_daily_pnl(self) -> float:
+        """Realized P&L today across every bot on the account (daily_max_loss caps the sum)."""
+        if self.peers is None:
+            return self.state['daily_pnl']
+        return self.state['daily_pnl'] + sum(bot.state['daily_pnl'] for bot in self.peers() if bot is not self)
+
+    def _trip_daily_max_loss(self) -> None:
+        """Stop new entries on every bot of the account for the rest of the day."""
+        for bot in [self] + [bot for bot in (self.peers() if self.peers else ()) if bot is not self]:
+            bot.state['daily_max_loss_triggered'] = True
+            bot._state_changed.set()
+
+    def _on_tick_exit(self) -> None:
+        """Position exited on a tick: the next entry starts from a fresh candle."""
+        if self._tick_candles is not None:
+            self._tick_candles.reset()
+        self._candle_number = 0
+        self._state_changed.set()
+
+    async def _broadcast_on_change(self) -> None:
+        """Broadcast state after it changed, at most once per _BROADCAST_MIN_INTERVAL_SECONDS."""
+        while True:
+            await self._state_changed.wait()
+            self._state_changed.clear()
+            await self.broadcast_state()
+            await asyncio.sleep(_BROADCAST_MIN_INTERVAL_SECONDS)
+
+    async def _run_housekeeping(self, replay_enabled: bool) -> None:
+        """Daily reset at 9:15 AM IST and auto square-off at 3:25 PM, checked once a minute."""
+        last_reset_date = None
+        while True:
+            ist = get_ist_time()
+            if ist.hour == 9 and ist.minute == 15 and last_reset_date != ist.date():
+                last_reset_date = ist.date()
+                async with self._trade_lock:
+                    self._daily_reset()
+
+            # Force square-off at 3:25 PM (skip during paper replay)
+            if (not replay_enabled) and should_force_squareoff(self.config) and self.current_position:
+                logger.info("[EXIT] Auto squareoff at 3:25 PM")
+                async with self._trade_lock:
                     await self.squareoff()
+                self._state_changed.set()
 
-                # Check if trading is allowed (skip during paper replay)
-                if (not replay_enabled) and (not is_market_open()):
-                    await asyncio.sleep(5)
-                    continue
-                
-                if bot_state['daily_max_loss_triggered'] and not self.current_position:
-                    await asyncio.sleep(5)
-                    continue
-                
-                # Paper replay: drive candles from DB (after-hours simulation)
-                if replay_enabled:
-                    if self._paper_replay_pos >= len(self._paper_replay_candles):
-                        logger.info("[REPLAY] Completed candle replay")
-                        self.running = False
-                        bot_state['is_running'] = False
-                        break
-
-                    row = self._paper_replay_candles[self._paper_replay_pos]
-                    self._paper_replay_pos += 1
+            await asyncio.sleep(60.0 - ist.second - ist.microsecond / 1e6 + 0.05)
 
-                    try:
-                        candle_open = float(row.get('open') or row.get('close') or 0.0)
-                        high = float(row.get('high') or 0.0)
-                        low = float(row.get('low') or float('inf'))
-                        close = float(row.get('close') or 0.0)
-                    except Exception:
-                        candle_open, high, low, close = 0.0, 0.0, float('inf'), 0.0
-
-                    # Treat candle close price as current LTP
-                    if close > 0:
-                        bot_state['index_ltp'] = close
-
-                    # Update HTF (replay-time based, not wall-clock)
-                    if config.get('htf_filter_enabled', True) and int(candle_interval) < 60 and close > 0:
-                        if close > htf_high:
-                            htf_high = close
-                        if close < htf_low:
-                            htf_low = close
-                        htf_close = close
-
-                        htf_seconds = int(config.get('htf_filter_timeframe', 60) or 60)
-                        if htf_seconds != 60:
-                            htf_seconds = 60
-
-                        self._paper_replay_htf_elapsed += int(candle_interval)
-                        if self._paper_replay_htf_elapsed >= htf_seconds:
-                            htf_candle_number += 1
-                            if htf_high > 0 and htf_low < float('inf'):
-                                htf_value, htf_signal = self.htf_indicator.add_candle(htf_high, htf_low, htf_close)
-                                if htf_value:
-                                    bot_state['htf_supertrend_value'] = htf_value if isinstance(htf_value, (int, float)) else str(htf_value)
-                                    if htf_signal == "GREEN":
-                                        bot_state['htf_signal_status'] = "buy"
-                                    elif htf_signal == "RED":
-                                        bot_state['htf_signal_status'] = "sell"
-                                    else:
-                                        bot_state['htf_signal_status'] = "waiting"
-                                    if htf_signal:
-                                        bot_state['htf_supertrend_signal'] = htf_signal
-
-                            htf_high, htf_low, htf_close = 0, float('inf'), 0
-                            self._paper_replay_htf_elapsed = 0
-
-                    # Unified candle-close logic (v2 regime/entry/exit/cooldown)
-                    candle_number += 1
-                    if high > 0 and low < float('inf'):
-                        current_candle_time = datetime.now()
-                        await self._handle_closed_candle(
-                            index_name=index_name,
-                            candle_number=candle_number,
-                            candle_interval=int(config.get('candle_interval', candle_interval) or candle_interval),
-                            candle_open=float(candle_open or close or 0.0),
-                            high=high,
-                            low=low,
-                            close=close,
-                            current_candle_time=current_candle_time,
-                        )
-
-                    # Update simulated option pricing if needed
-                    if self.current_position:
-                        security_id = self.current_position.get('security_id', '')
-                        if security_id.startswith('SIM_'):
-                            strike = self.current_position.get('strike', 0)
-                            option_type = self.current_position.get('option_type', '')
-                            index_ltp = bot_state['index_ltp']
-                            if strike and index_ltp:
-                                distance_from_atm = abs(index_ltp - strike)
-                                if option_type == 'CE':
-                                    intrinsic = max(0, index_ltp - strike)
-                                else:
-                                    intrinsic = max(0, strike - index_ltp)
-                                atm_time_value = 150
-                                time_decay_factor = max(0, 1 - (distance_from_atm / 500))
-                                time_value = atm_time_value * time_decay_factor
-                                simulated_ltp = intrinsic + time_value
-                                tick_movement = random.choice([-0.10, -0.05, 0, 0.05, 0.10])
-                                simulated_ltp += tick_movement
-                                simulated_ltp = round(simulated_ltp / 0.05) * 0.05
-                                simulated_ltp = max(0.05, round(simulated_ltp, 2))
-                                bot_state['current_option_ltp'] = simulated_ltp
-
-                    await self.broadcast_state()
-                    speed = float(config.get('paper_replay_speed', 10.0) or 10.0)
-                    speed = max(0.1, min(100.0, speed))
-                    await asyncio.sleep(max(0.05, float(candle_interval) / speed))
-                    continue
+    def _daily_reset(self) -> None:
+        self.state['daily_trades'] = 0
+        self.state['daily_pnl'] = 0.0
+        self.state['daily_max_loss_triggered'] = False
+        self.state['max_drawdown'] = 0.0
+        self.last_exit_candle_time = None
+        self.last_trade_time = None
+        self.last_signal = None
+        self._candle_number = 0
+        self._htf_candle_number = 0
+        self.reset_indicator()
+        logger.info("[BOT] Daily reset at 9:15 AM")
 
-                # Fetch market data (skip if MarketDataService is active)
-                provider = str(config.get('market_data_provider', 'dhan') or 'dhan').strip().lower()
+    def _htf_timeframe(self) -> Optional[int]:
+        """HTF filter timeframe when it is enabled and can be aggregated from the base candles."""
+        if not bool(self.config.get('htf_filter_enabled', True)) or self._htf_agg is None:
+            return None
+        return self._htf_node.timeframe
 
-                # In paper mode, when bypass_market_hours is enabled and paper replay is OFF,
-                # run fully synthetic candles even if docker env defaults provider to 'mds'.
-                # This enables strategy testing outside market hours.
-                if (
-                    bot_state.get('mode') == 'paper'
-                    and bool(config.get('bypass_market_hours', False))
-                    and not replay_enabled
-                ):
-                    provider = 'synthetic'
+    def _aggregate_htf(self, high: float, low: float, close: float, ts: Optional[float] = None) -> None:
+        """Feed one base candle into the HTF filter; a completed HTF candle updates its SuperTrend."""
+        if not self._htf_timeframe() or close <= 0:
+            return
+        for _, candle in self._htf_agg.push(high, low, close, ts):
+            self._htf_candle_number += 1
+            htf_value, htf_signal = self._update_htf_node(candle.high, candle.low, candle.close)
+            if htf_value:
+                self.state['htf_supertrend_value'] = htf_value if isinstance(htf_value, (int, float)) else str(htf_value)
+                if htf_signal == 'GREEN':
+                    self.state['htf_signal_status'] = 'buy'
+                elif htf_signal == 'RED':
+                    self.state['htf_signal_status'] = 'sell'
+                else:
+                    self.state['htf_signal_status'] = 'waiting'
+                if htf_signal:
+                    self.state['htf_supertrend_signal'] = htf_signal
+                logger.debug(
+                    f"[HTF CANDLE CLOSE #{self._htf_candle_number}] {self.config['selected_index']} | "
+                    f"H={candle.high:.2f} L={candle.low:.2f} C={candle.close:.2f} | "
+                    f"HTF_ST={htf_value:.2f} | Signal={htf_signal or 'None'}"
+                )
+
+    def _simulate_option_ltp(self) -> None:
+        """Paper positions (SIM_*): price the option off the index (intrinsic + decaying time value)."""
+        if not self.current_position:
+            return
+        security_id = self.current_position.get('security_id', '')
+        if not security_id.startswith('SIM_'):
+            return
+        strike = self.current_position.get('strike', 0)
+        option_type = self.current_position.get('option_type', '')
+        index_ltp = self.state['index_ltp']
+        if not (strike and index_ltp):
+            return
 
-                mds_new_candle = None
-                mds_new_candle_ts = None
+        distance_from_atm = abs(index_ltp - strike)
+        if option_type == 'CE':
+            intrinsic = max(0, index_ltp - strike)
+        else:
+            intrinsic = max(0, strike - index_ltp)
 
-                # Prefer consuming candles from market-data-service (Timescale-backed)
-                if provider == 'mds':
-                    try:
-                        from mds_client import fetch_latest_candle
-
-                        base_url = str(config.get('mds_base_url', '') or '').strip()
-                        poll_s = float(config.get('mds_poll_seconds', 1.0) or 1.0)
-                        candle = await fetch_latest_candle(
-                            base_url=base_url,
-                            symbol=index_name,
-                            timeframe_seconds=int(config.get('candle_interval', candle_interval) or candle_interval),
-                            min_poll_seconds=poll_s,
-                        )
-                        if isinstance(candle, dict) and (candle.get('close') is not None):
-                            try:
-                                close_price = float(candle.get('close') or 0.0)
-                            except Exception:
-                                close_price = 0.0
-
-                            if close_price > 0:
-                                bot_state['index_ltp'] = float(close_price)
-
-                                mds_new_candle_ts = str(candle.get('ts') or '') or None
-                                if mds_new_candle_ts and mds_new_candle_ts != self._last_mds_candle_ts:
-                                    mds_new_candle = candle
-                                    self._last_mds_candle_ts = mds_new_candle_ts
-                        elif self.dhan:
-                            # If MDS has no candles yet, fall back to direct quote.
-                            try:
-                                index_ltp = await asyncio.to_thread(self.dhan.get_index_ltp, index_name)
-                                if index_ltp and index_ltp > 0:
-                                    bot_state['index_ltp'] = float(index_ltp)
-                            except Exception:
-                                pass
-                    except Exception:
-                        # If MDS is unavailable, fall back to any other provider.
-                        pass
-
-                    # Option LTP is only needed when a real position is open.
-                    # MDS currently does not expose option quotes, so we use Dhan (if configured) in that case.
-                    if self.dhan and self.current_position is not None:
-                        security_id = self.current_position.get('security_id', '')
-                        if security_id and not security_id.startswith('SIM_'):
-                            try:
-                                option_security_id = int(security_id)
-                                _index_ltp, option_ltp = await asyncio.to_thread(
-                                    self.dhan.get_index_and_option_ltp, index_name, option_security_id
-                                )
-                                if option_ltp and option_ltp > 0:
-                                    option_ltp = round(option_ltp / 0.05) * 0.05
-                                    bot_state['current_option_ltp'] = round(option_ltp, 2)
-                            except Exception:
-                                pass
-
-                    # If we received a new candle from MDS, process it as the authoritative candle close.
-                    if isinstance(mds_new_candle, dict):
-                        try:
-                            high = float(mds_new_candle.get('high') or 0.0)
-                            low = float(mds_new_candle.get('low') or float('inf'))
-                            close = float(mds_new_candle.get('close') or 0.0)
-                        except Exception:
-                            high, low, close = 0.0, float('inf'), 0.0
-
-                        # Update HTF aggregation from base candles (fixed to 60s in current code).
-                        interval = int(config.get('candle_interval', candle_interval) or candle_interval)
-                        if bool(config.get('htf_filter_enabled', True)) and interval < 60 and (60 % max(1, interval) == 0) and close > 0:
-                            multiple_1m = 60 // max(1, interval)
-                            self._mds_htf_count += 1
-                            self._mds_htf_high = max(self._mds_htf_high, high)
-                            self._mds_htf_low = min(self._mds_htf_low, low)
-                            self._mds_htf_close = close
-                            if self._mds_htf_count >= multiple_1m:
-                                htf_candle_number += 1
-                                if self._mds_htf_high > 0 and self._mds_htf_low < float('inf'):
-                                    htf_value, htf_signal = self.htf_indicator.add_candle(
-                                        self._mds_htf_high, self._mds_htf_low, self._mds_htf_close
-                                    )
-                                    if htf_value:
-                                        bot_state['htf_supertrend_value'] = htf_value if isinstance(htf_value, (int, float)) else str(htf_value)
-                                        if htf_signal == 'GREEN':
-                                            bot_state['htf_signal_status'] = 'buy'
-                                        elif htf_signal == 'RED':
-                                            bot_state['htf_signal_status'] = 'sell'
-                                        else:
-                                            bot_state['htf_signal_status'] = 'waiting'
-                                        if htf_signal:
-                                            bot_state['htf_supertrend_signal'] = htf_signal
-
-                                self._mds_htf_count = 0
-                                self._mds_htf_high = 0.0
-                                self._mds_htf_low = float('inf')
-                                self._mds_htf_close = 0.0
-
-                        # Only advance candle number / trading decisions when the candle is valid.
-                        if high > 0 and low < float('inf') and close > 0:
-                            current_candle_time = datetime.now()
-                            candle_number += 1
-                            await self._handle_closed_candle(
-                                index_name=index_name,
-                                candle_number=candle_number,
-                                candle_interval=int(config.get('candle_interval', candle_interval) or candle_interval),
-                                candle_open=float(mds_new_candle.get('open') or close or 0.0) if isinstance(mds_new_candle, dict) else float(close or 0.0),
-                                high=high,
-                                low=low,
-                                close=close,
-                                current_candle_time=current_candle_time,
-                            )
-
-                # Legacy mode: fetch quotes directly via Dhan
-                elif self.dhan and not bot_state.get('market_data_service_active', False):
-                    has_position = self.current_position is not None
-                    option_security_id = None
-                    
-                    if has_position:
-                        security_id = self.current_position.get('security_id', '')
-                        if security_id and not security_id.startswith('SIM_'):
-                            option_security_id = int(security_id)
-                    
-                    # Fetch Index + Option LTP (Dhan SDK is sync; run in thread)
-                    if option_security_id:
-                        index_ltp, option_ltp = await asyncio.to_thread(
-                            self.dhan.get_index_and_option_ltp, index_name, option_security_id
-                        )
-                        if index_ltp > 0:
-                            bot_state['index_ltp'] = index_ltp
-                        if option_ltp > 0:
-                            option_ltp = round(option_ltp / 0.05) * 0.05
-                            bot_state['current_option_ltp'] = round(option_ltp, 2)
-                    else:
-                        index_ltp = await asyncio.to_thread(self.dhan.get_index_ltp, index_name)
-                        if index_ltp > 0:
-                            bot_state['index_ltp'] = index_ltp
-                
-                # Paper testing: simulate index movement when bypass_market_hours is enabled.
-                # This keeps candles moving even if the API returns stale/flat prices outside market hours.
-                if bot_state.get('mode') == 'paper' and config.get('bypass_market_hours', False):
-                    if bot_state.get('simulated_base_price') is None:
-                        # Prefer any existing index_ltp as starting point; else fall back to a realistic base.
-                        if bot_state.get('index_ltp', 0) > 0:
-                            bot_state['simulated_base_price'] = float(bot_state['index_ltp'])
-                        else:
-                            if index_name == 'NIFTY':
-                                bot_state['simulated_base_price'] = 23500.0
-                            elif index_name == 'BANKNIFTY':
-                                bot_state['simulated_base_price'] = 51500.0
-                            elif index_name == 'FINNIFTY':
-                                bot_state['simulated_base_price'] = 22000.0
-                            elif index_name == 'MIDCPNIFTY':
-                                bot_state['simulated_base_price'] = 12500.0
-                            else:
-                                bot_state['simulated_base_price'] = 70000.0  # SENSEX
-
-                    tick_change = random.choice([-15, -10, -5, -2, 0, 2, 5, 10, 15])
-                    bot_state['simulated_base_price'] += tick_change
-                    bot_state['index_ltp'] = round(bot_state['simulated_base_price'], 2)
-                    logger.debug(f"[TEST] Simulated {index_name} LTP: {bot_state['index_ltp']}")
-                
-                # Update candle data
-                index_ltp = bot_state['index_ltp']
-                if provider != 'mds' and index_ltp > 0:
-                    if candle_open <= 0:
-                        candle_open = float(index_ltp)
-                    if index_ltp > high:
-                        high = index_ltp
-                    if index_ltp < low:
-                        low = index_ltp
-                    close = index_ltp
-
-                    # Update HTF candle data (for sub-1m trading intervals)
-                    if config.get('htf_filter_enabled', True) and config.get('candle_interval', 60) < 60:
-                        if index_ltp > htf_high:
-                            htf_high = index_ltp
-                        if index_ltp < htf_low:
-                            htf_low = index_ltp
-                        htf_close = index_ltp
-
-                # Check if HTF candle is complete
-                if provider != 'mds' and config.get('htf_filter_enabled', True) and config.get('candle_interval', 60) < 60:
-                    htf_seconds = int(config.get('htf_filter_timeframe', 60))
-                    if htf_seconds != 60:
-                        htf_seconds = 60
-
-                    htf_elapsed = (datetime.now() - htf_candle_start_time).total_seconds()
-                    if htf_elapsed >= htf_seconds:
-                        htf_candle_number += 1
-                        if htf_high > 0 and htf_low < float('inf'):
-                            htf_value, htf_signal = self.htf_indicator.add_candle(htf_high, htf_low, htf_close)
-
-                            if htf_value:
-                                bot_state['htf_supertrend_value'] = htf_value if isinstance(htf_value, (int, float)) else str(htf_value)
-
-                                if htf_signal == "GREEN":
-                                    bot_state['htf_signal_status'] = "buy"
-                                elif htf_signal == "RED":
-                                    bot_state['htf_signal_status'] = "sell"
-                                else:
-                                    bot_state['htf_signal_status'] = "waiting"
-
-                                if htf_signal:
-                                    bot_state['htf_supertrend_signal'] = htf_signal
-
-                                logger.info(
-                                    f"[HTF CANDLE CLOSE #{htf_candle_number}] {index_name} | "
-                                    f"H={htf_high:.2f} L={htf_low:.2f} C={htf_close:.2f} | "
-                                    f"HTF_ST={htf_value:.2f} | "
-                                    f"Signal={htf_signal or 'None'}"
-                                )
-
-                        htf_candle_start_time = datetime.now()
-                        htf_high, htf_low, htf_close = 0, float('inf'), 0
-                
-                # Check SL/Target on EVERY TICK (responsive protection)
-                if self.current_position and bot_state['current_option_ltp'] > 0:
-                    option_ltp = bot_state['current_option_ltp']
-                    tick_exit = await self.check_tick_sl(option_ltp)
-                    if tick_exit:
-                        # Position exited on tick, reset candle for next entry
-                        candle_start_time = datetime.now()
-                        candle_open = 0.0
-                        high, low, close = 0, float('inf'), 0
-                        candle_number = 0
-                        await asyncio.sleep(1)
-                        continue
-                
-                # Check if candle is complete
-                elapsed = (datetime.now() - candle_start_time).total_seconds()
-                if provider != 'mds' and elapsed >= candle_interval:
-                    current_candle_time = datetime.now()
-                    candle_number += 1
-
-                    await self._handle_closed_candle(
-                        index_name=index_name,
-                        candle_number=candle_number,
-                        candle_interval=int(config.get('candle_interval', candle_interval) or candle_interval),
-                        candle_open=float(candle_open or close or bot_state.get('index_ltp') or 0.0),
-                        high=high,
-                        low=low,
-                        close=close,
-                        current_candle_time=current_candle_time,
-                    )
+        atm_time_value = 150
+        time_decay_factor = max(0, 1 - (distance_from_atm / 500))
+        time_value = atm_time_value * time_decay_factor
+
+        simulated_ltp = intrinsic + time_value
+        tick_movement = self.rng.choice([-0.10, -0.05, 0, 0.05, 0.10])
+        simulated_ltp += tick_movement
+
+        simulated_ltp = round(simulated_ltp / 0.05) * 0.05
+        simulated_ltp = max(0.05, round(simulated_ltp, 2))
+        self.state['current_option_ltp'] = simulated_ltp
 
-                    # Reset candle for next period
-                    candle_start_time = datetime.now()
-                    candle_open = 0.0
-                    high, low, close = 0, float('inf'), 0
-                
-                # Handle paper mode simulation
-                if self.current_position:
-                    security_id = self.current_position.get('security_id', '')
-                    
-                    if security_id.startswith('SIM_'):
-                        strike = self.current_position.get('strike', 0)
-                        option_type = self.current_position.get('option_type', '')
-                        index_ltp = bot_state['index_ltp']
-                        
-                        if strike and index_ltp:
-                            distance_from_atm = abs(index_ltp - strike)
-                            
-                            if option_type == 'CE':
-                                intrinsic = max(0, index_ltp - strike)
-                            else:
-                                intrinsic = max(0, strike - index_ltp)
-                            
-                            atm_time_value = 150
-                            time_decay_factor = max(0, 1 - (distance_from_atm / 500))
-                            time_value = atm_time_value * time_decay_factor
-                            
-                            simulated_ltp = intrinsic + time_value
-                            tick_movement = random.choice([-0.10, -0.05, 0, 0.05, 0.10])
-                            simulated_ltp += tick_movement
-                            
-                            simulated_ltp = round(simulated_ltp / 0.05) * 0.05
-                            simulated_ltp = max(0.05, round(simulated_ltp, 2))
-                            
-                            bot_state['current_option_ltp'] = simulated_ltp
-                
-                # Broadcast state update
-                await self.broadcast_state()
-                
-                await asyncio.sleep(1)
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"[ERROR] Trading loop exception: {e}")
-                await asyncio.sleep(5)
-    
     async def broadcast_state(self):
         """Broadcast current state to WebSocket clients"""
         from server import manager
@@ -1424,54 +1635,61 @@ class TradingBot:
         # GET cooldown state for broadcast
         cooldown_state = self.cooldown_mgr.get_state()
         
+        data = {
+            "index_ltp": self.state['index_ltp'],
+            "supertrend_signal": self.state['last_supertrend_signal'],
+            "supertrend_value": self.state['supertrend_value'],
+            "htf_supertrend_signal": self.state.get('htf_supertrend_signal'),
+            "htf_supertrend_value": self.state.get('htf_supertrend_value', 0.0),
+            "position": self.state['current_position'],
+            "entry_price": self.state['entry_price'],
+            "current_option_ltp": self.state['current_option_ltp'],
+            "trailing_sl": self.state['trailing_sl'],
+            "daily_pnl": self.state['daily_pnl'],
+            "daily_trades": self.state['daily_trades'],
+            "is_running": self.state['is_running'],
+            "mode": self.state['mode'],
+            "mds_score": self.state.get('mds_score', 0.0),
+            "mds_slope": self.state.get('mds_slope', 0.0),
+            "mds_acceleration": self.state.get('mds_acceleration', 0.0),
+            "mds_stability": self.state.get('mds_stability', 0.0),
+            "mds_confidence": self.state.get('mds_confidence', 0.0),
+            "mds_is_choppy": self.state.get('mds_is_choppy', False),
+            "mds_direction": self.state.get('mds_direction', 'NONE'),
+            "trading_enabled": bool(self.config.get('trading_enabled', True)),
+            "selected_index": self.config['selected_index'],
+            "candle_interval": self.config['candle_interval'],
+            "htf_filter_enabled": bool(self.config.get('htf_filter_enabled', True)),
+            "htf_filter_timeframe": int(self.config.get('htf_filter_timeframe', 60)),
+
+            # NEW: Trading Logic v2 Metrics
+            "market_regime": self.state.get('market_regime', 'UNKNOWN'),
+            "entry_confidence": self.entry_confidence_recorded,
+            "runtime_confidence": self.runtime_confidence,
+            "cooldown_active": cooldown_state.is_active,
+            "cooldown_candles_remaining": cooldown_state.candles_remaining,
+            "cooldown_reason": cooldown_state.reason.value if cooldown_state.reason else None,
+        }
+        # Nothing changed since the last broadcast (timestamp aside) and no new client: skip it
+        key = (manager.connects, data)
+        if key == self._last_broadcast:
+            return
+        self._last_broadcast = copy.deepcopy(key)  # position is mutated in place
+
+        # Keyed by index: every traded index has its own bot and broadcasts its own state
         await manager.broadcast({
             "type": "state_update",
-            "data": {
-                "index_ltp": bot_state['index_ltp'],
-                "supertrend_signal": bot_state['last_supertrend_signal'],
-                "supertrend_value": bot_state['supertrend_value'],
-                "htf_supertrend_signal": bot_state.get('htf_supertrend_signal'),
-                "htf_supertrend_value": bot_state.get('htf_supertrend_value', 0.0),
-                "position": bot_state['current_position'],
-                "entry_price": bot_state['entry_price'],
-                "current_option_ltp": bot_state['current_option_ltp'],
-                "trailing_sl": bot_state['trailing_sl'],
-                "daily_pnl": bot_state['daily_pnl'],
-                "daily_trades": bot_state['daily_trades'],
-                "is_running": bot_state['is_running'],
-                "mode": bot_state['mode'],
-                "mds_score": bot_state.get('mds_score', 0.0),
-                "mds_slope": bot_state.get('mds_slope', 0.0),
-                "mds_acceleration": bot_state.get('mds_acceleration', 0.0),
-                "mds_stability": bot_state.get('mds_stability', 0.0),
-                "mds_confidence": bot_state.get('mds_confidence', 0.0),
-                "mds_is_choppy": bot_state.get('mds_is_choppy', False),
-                "mds_direction": bot_state.get('mds_direction', 'NONE'),
-                "trading_enabled": bool(config.get('trading_enabled', True)),
-                "selected_index": config['selected_index'],
-                "candle_interval": config['candle_interval'],
-                "htf_filter_enabled": bool(config.get('htf_filter_enabled', True)),
-                "htf_filter_timeframe": int(config.get('htf_filter_timeframe', 60)),
-                
-                # NEW: Trading Logic v2 Metrics
-                "market_regime": bot_state.get('market_regime', 'UNKNOWN'),
-                "entry_confidence": self.entry_confidence_recorded,
-                "runtime_confidence": self.runtime_confidence,
-                "cooldown_active": cooldown_state.is_active,
-                "cooldown_candles_remaining": cooldown_state.candles_remaining,
-                "cooldown_reason": cooldown_state.reason.value if cooldown_state.reason else None,
-                
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            }
+            "index": self.config['selected_index'],
+            "data": {**data, "timestamp": datetime.now(timezone.utc).isoformat()}
         })
 
     async def process_mds_on_close(self, mds_snapshot, index_ltp: float) -> bool:
-        """Process score-engine snapshot on candle close.
+        """Process score-engine state on candle close (a ScoreEngine or an MDSnapshot).
 
         Entry/exit are driven purely by MDS + safety gates.
         """
         exited = False
-        index_name = config['selected_index']
+        index_name = self.config['selected_index']
         index_config = get_index_config(index_name)
 
         # Exit logic first
@@ -1479,7 +1697,7 @@ class TradingBot:
             position_type = self.current_position.get('option_type', '')
             qty = int(self.current_position.get('qty') or 0)
             if qty <= 0:
-                qty = int(config.get('order_qty', 1)) * index_config['lot_size']
+                qty = int(self.config.get('order_qty', 1)) * index_config['lot_size']
 
             # Respect min-hold to avoid churn
             if self._min_hold_active():
@@ -1494,7 +1712,9 @@ class TradingBot:
             try:
                 tf_scores = getattr(mds_snapshot, 'tf_scores', {}) or {}
                 if isinstance(tf_scores, dict) and tf_scores:
-                    slow_tf = max(int(k) for k in tf_scores.keys())
+                    # The TF right above base (the slowest one unless mds_full_chain is on)
+                    tfs = sorted(int(k) for k in tf_scores.keys())
+                    slow_tf = tfs[1] if len(tfs) > 1 else tfs[0]
                     slow = tf_scores.get(slow_tf)
                     slow_mom = float(getattr(slow, 'macd_score', 0.0) or 0.0) + float(getattr(slow, 'hist_score', 0.0) or 0.0)
             except Exception:
@@ -1533,7 +1753,7 @@ class TradingBot:
                         reason = "MDS Momentum Loss (slow confirm)"
 
             if should_exit:
-                exit_price = bot_state['current_option_ltp']
+                exit_price = self.state['current_option_ltp']
                 pnl = (exit_price - self.entry_price) * qty
                 logger.warning(f"[MDS] ✗ EXIT | {position_type} | Score={score:.2f} Slope={slope:.2f} SlowMom={slow_mom:.1f} | Reason={reason} | P&L=₹{pnl:.2f}")
                 closed = await self.close_position(exit_price, pnl, reason)
@@ -1551,29 +1771,28 @@ class TradingBot:
             logger.info(f"[MDS] Entry blocked - Order cooldown active ({remaining:.1f}s remaining)")
             return False
 
-        if not can_take_new_trade():
+        if not can_take_new_trade(self.config):
             logger.info("[ENTRY_DECISION] NO | Reason=after_cutoff (MDS)")
             return False
 
-        if bot_state['daily_trades'] >= config['max_trades_per_day']:
-            logger.info(f"[MDS] Max daily trades reached ({config['max_trades_per_day']})")
+        if self.state['daily_trades'] >= self.config['max_trades_per_day']:
+            logger.info(f"[MDS] Max daily trades reached ({self.config['max_trades_per_day']})")
             return False
 
         # Check min_trade_gap protection (optional)
-        min_gap = config.get('min_trade_gap', 0)
+        min_gap = self.config.get('min_trade_gap', 0)
         if min_gap > 0 and self.last_trade_time:
-            time_since_last = (datetime.now() - self.last_trade_time).total_seconds()
+            time_since_last = (utc_now() - self.last_trade_time).total_seconds()
             if time_since_last < min_gap:
                 logger.info(f"[ENTRY_DECISION] NO | Reason=min_trade_gap (MDS) ({time_since_last:.1f}s < {min_gap}s)")
                 return False
 
         # Score-engine gates
+        # Not-ready / choppy / neutral are logged once per transition by _on_mds_event()
         if not getattr(mds_snapshot, 'ready', False):
-            logger.info("[MDS] Skipping - Engine not ready yet (warming up)")
             return False
 
         if bool(getattr(mds_snapshot, 'is_choppy', False)):
-            logger.info("[MDS] Skipping - Market is choppy")
             return False
 
         direction = str(getattr(mds_snapshot, 'direction', 'NONE') or 'NONE')
@@ -1583,7 +1802,6 @@ class TradingBot:
 
         # Require meaningful score + slope
         if direction == 'NONE':
-            logger.info(f"[ENTRY_DECISION] NO | Reason=neutral_band (MDS) | Score={score:.2f} Slope={slope:.2f}")
             self._mds_last_direction = direction
             self._mds_confirm_count = 0
             return False
@@ -1603,7 +1821,7 @@ class TradingBot:
         # Multi-candle confirmation
         # In paper mode, use a looser confirm requirement so simulations can actually place trades
         # under the synthetic price generator (which tends to be choppy).
-        confirm_needed = 1 if bot_state.get('mode') == 'paper' else 2
+        confirm_needed = 1 if self.state.get('mode') == 'paper' else 2
         if self._mds_last_direction == direction:
             self._mds_confirm_count += 1
         else:
@@ -1618,12 +1836,12 @@ class TradingBot:
             return False
 
         # Confidence sizing (capped by risk-per-trade)
-        max_lots = int(config.get('order_qty', 1) or 1)
+        max_lots = int(self.config.get('order_qty', 1) or 1)
         sizer = PositionSizingAgent(max_lots=max_lots)
         sizing = sizer.size(
             confidence=confidence,
-            risk_per_trade_rupees=float(config.get('risk_per_trade', 0) or 0),
-            sl_points=float(config.get('initial_stoploss', 0) or 0),
+            risk_per_trade_rupees=float(self.config.get('risk_per_trade', 0) or 0),
+            sl_points=float(self.config.get('initial_stoploss', 0) or 0),
             lot_size=int(index_config['lot_size']),
         )
 
@@ -1640,15 +1858,15 @@ class TradingBot:
             f"Index={index_name} LTP={index_ltp:.2f} ATM={atm_strike}"
         )
 
-        before = bot_state.get('current_position')
+        before = self.state.get('current_position')
         await self.enter_position(option_type, atm_strike, index_ltp, override_lots=int(sizing.final_lots))
-        after = bot_state.get('current_position')
+        after = self.state.get('current_position')
         if before is None and after is not None:
             logger.info(f"[ENTRY_DECISION] YES | Confirmed (MDS) | {option_type} {atm_strike}")
         else:
             logger.info(f"[ENTRY_DECISION] NO | Entry blocked downstream (MDS) | {option_type} {atm_strike}")
 
-        self.last_trade_time = datetime.now()
+        self.last_trade_time = utc_now()
         self._mds_confirm_count = 0
         return False
     
@@ -1658,8 +1876,8 @@ class TradingBot:
             return
         
         # Check if trailing is completely disabled
-        trail_start = config.get('trail_start_profit', 0)
-        trail_step = config.get('trail_step', 0)
+        trail_start = self.config.get('trail_start_profit', 0)
+        trail_step = self.config.get('trail_step', 0)
         
         if trail_start == 0 or trail_step == 0:
             # Trailing disabled - don't set any SL
@@ -1672,10 +1890,10 @@ class TradingBot:
             self.highest_profit = profit_points
         
         # Step 1: Set initial fixed stoploss (if enabled)
-        initial_sl = config.get('initial_stoploss', 0)
+        initial_sl = self.config.get('initial_stoploss', 0)
         if initial_sl > 0 and self.trailing_sl is None:
             self.trailing_sl = self.entry_price - initial_sl
-            bot_state['trailing_sl'] = self.trailing_sl
+            self.state['trailing_sl'] = self.trailing_sl
             logger.info(f"[SL] Initial SL set: {self.trailing_sl:.2f} ({initial_sl} pts below entry)")
             return
         
@@ -1700,7 +1918,7 @@ class TradingBot:
         if self.trailing_sl is None or new_sl > self.trailing_sl:
             old_sl = self.trailing_sl
             self.trailing_sl = new_sl
-            bot_state['trailing_sl'] = self.trailing_sl
+            self.state['trailing_sl'] = self.trailing_sl
             
             if old_sl and old_sl > (self.entry_price - initial_sl):
                 # This is a trailing update (not initial trigger)
@@ -1715,14 +1933,14 @@ class TradingBot:
         if not self.current_position:
             return False
         
-        index_config = get_index_config(config['selected_index'])
+        index_config = get_index_config(self.config['selected_index'])
         qty = int(self.current_position.get('qty') or 0)
         if qty <= 0:
-            qty = config['order_qty'] * index_config['lot_size']
+            qty = self.config['order_qty'] * index_config['lot_size']
         profit_points = current_ltp - self.entry_price
         
         # Check target first (if enabled)
-        target_points = config.get('target_points', 0)
+        target_points = self.config.get('target_points', 0)
         if target_points > 0 and profit_points >= target_points:
             pnl = profit_points * qty
             logger.info(
@@ -1748,26 +1966,27 @@ class TradingBot:
         if not self.current_position:
             return False
         
-        index_config = get_index_config(config['selected_index'])
+        index_config = get_index_config(self.config['selected_index'])
         qty = int(self.current_position.get('qty') or 0)
         if qty <= 0:
-            qty = config['order_qty'] * index_config['lot_size']
+            qty = self.config['order_qty'] * index_config['lot_size']
         profit_points = current_ltp - self.entry_price
         pnl = profit_points * qty
         
         # Check DAILY max loss FIRST (highest priority)
-        daily_max_loss = config.get('daily_max_loss', 0)
-        if daily_max_loss > 0 and bot_state['daily_pnl'] + pnl < -daily_max_loss:
+        daily_max_loss = self.config.get('daily_max_loss', 0)
+        account_pnl = self.account_daily_pnl() if daily_max_loss > 0 else 0.0
+        if daily_max_loss > 0 and account_pnl + pnl < -daily_max_loss:
             logger.warning(
-                f"[EXIT] ✗ Daily max loss BREACHED! | Current Daily P&L=₹{bot_state['daily_pnl']:.2f} | This trade P&L=₹{pnl:.2f} | Limit=₹{-daily_max_loss:.2f} | FORCE SQUAREOFF"
+                f"[EXIT] ✗ Daily max loss BREACHED! | Current Daily P&L=₹{account_pnl:.2f} | This trade P&L=₹{pnl:.2f} | Limit=₹{-daily_max_loss:.2f} | FORCE SQUAREOFF"
             )
             closed = await self.close_position(current_ltp, pnl, "Daily Max Loss")
             if closed:
-                bot_state['daily_max_loss_triggered'] = True
+                self._trip_daily_max_loss()
             return bool(closed)
         
         # Check max loss per trade (if enabled)
-        max_loss_per_trade = config.get('max_loss_per_trade', 0)
+        max_loss_per_trade = self.config.get('max_loss_per_trade', 0)
         if max_loss_per_trade > 0 and pnl < -max_loss_per_trade:
             logger.info(
                 f"[EXIT] Max loss per trade hit | LTP={current_ltp:.2f} | Entry={self.entry_price:.2f} | Loss=₹{abs(pnl):.2f} | Limit=₹{max_loss_per_trade:.2f}"
@@ -1776,7 +1995,7 @@ class TradingBot:
             return bool(closed)
 
         # Check target (if enabled)
-        target_points = config.get('target_points', 0)
+        target_points = self.config.get('target_points', 0)
         if target_points > 0 and profit_points >= target_points:
             logger.info(
                 f"[EXIT] Target hit (tick) | LTP={current_ltp:.2f} | Entry={self.entry_price:.2f} | Profit={profit_points:.2f} pts | Target={target_points:.2f} pts"
@@ -1799,13 +2018,13 @@ class TradingBot:
     async def process_signal_on_close(self, signal: str, index_ltp: float, flipped: bool = False) -> bool:
         """Process SuperTrend signal on candle close"""
         exited = False
-        index_name = config['selected_index']
+        index_name = self.config['selected_index']
         index_config = get_index_config(index_name)
         qty = 0
         if self.current_position:
             qty = int(self.current_position.get('qty') or 0)
         if qty <= 0:
-            qty = config['order_qty'] * index_config['lot_size']
+            qty = self.config['order_qty'] * index_config['lot_size']
         
         # Check for exit on SuperTrend direction reversal (PRIMARY exit trigger)
         # Exit based on SuperTrend direction change - this is the critical signal
@@ -1819,7 +2038,7 @@ class TradingBot:
                 if self._min_hold_active():
                     logger.info("[SIGNAL] Reversal detected but min-hold active - exit blocked")
                 else:
-                    exit_price = bot_state['current_option_ltp']
+                    exit_price = self.state['current_option_ltp']
                     pnl = (exit_price - self.entry_price) * qty
                     logger.warning(f"[SIGNAL] ✗ REVERSAL: SuperTrend flipped RED - Exiting CE position IMMEDIATELY | P&L=₹{pnl:.2f}")
                     closed = await self.close_position(exit_price, pnl, "SuperTrend Reversal")
@@ -1833,7 +2052,7 @@ class TradingBot:
                 if self._min_hold_active():
                     logger.info("[SIGNAL] Reversal detected but min-hold active - exit blocked")
                 else:
-                    exit_price = bot_state['current_option_ltp']
+                    exit_price = self.state['current_option_ltp']
                     pnl = (exit_price - self.entry_price) * qty
                     logger.warning(f"[SIGNAL] ✗ REVERSAL: SuperTrend flipped GREEN - Exiting PE position IMMEDIATELY | P&L=₹{pnl:.2f}")
                     closed = await self.close_position(exit_price, pnl, "SuperTrend Reversal")
@@ -1855,19 +2074,19 @@ class TradingBot:
             logger.info("[ENTRY_DECISION] NO | Reason=order_cooldown")
             return exited
         
-        if not can_take_new_trade():
+        if not can_take_new_trade(self.config):
             logger.info("[ENTRY_DECISION] NO | Reason=after_cutoff")
             return exited
         
-        if bot_state['daily_trades'] >= config['max_trades_per_day']:
-            logger.info(f"[SIGNAL] Max daily trades reached ({config['max_trades_per_day']})")
+        if self.state['daily_trades'] >= self.config['max_trades_per_day']:
+            logger.info(f"[SIGNAL] Max daily trades reached ({self.config['max_trades_per_day']})")
             logger.info("[ENTRY_DECISION] NO | Reason=max_daily_trades")
             return exited
         
         # Check min_trade_gap protection (optional)
-        min_gap = config.get('min_trade_gap', 0)
+        min_gap = self.config.get('min_trade_gap', 0)
         if min_gap > 0 and self.last_trade_time:
-            time_since_last = (datetime.now() - self.last_trade_time).total_seconds()
+            time_since_last = (utc_now() - self.last_trade_time).total_seconds()
             if time_since_last < min_gap:
                 logger.info(f"[ENTRY_DECISION] NO | Reason=min_trade_gap ({time_since_last:.1f}s < {min_gap}s)")
                 return exited
@@ -1878,13 +2097,13 @@ class TradingBot:
             return exited
 
         # Trade only on SuperTrend FLIP (candle-to-candle), not based on previous trade state
-        if config.get('trade_only_on_flip', False) and not flipped:
+        if self.config.get('trade_only_on_flip', False) and not flipped:
             logger.info(f"[ENTRY] ✗ Skipping - No SuperTrend flip this candle | Signal={signal}")
             logger.info("[ENTRY_DECISION] NO | Reason=no_flip")
             return exited
 
         # MACD CONFIRMATION: require MACD line to confirm direction at candle close
-        if config.get('macd_confirmation_enabled', True):
+        if self.config.get('macd_confirmation_enabled', True):
             if not self.macd or self.macd.last_macd is None or self.macd.last_signal_line is None:
                 logger.info("[ENTRY] ✗ Skipping - MACD not ready yet")
                 logger.info("[ENTRY_DECISION] NO | Reason=macd_not_ready")
@@ -1908,13 +2127,13 @@ class TradingBot:
                 logger.info("[ENTRY_DECISION] NO | Reason=macd_not_confirming_sell")
                 return exited
 
-        # MTF FILTER: If trading below 1m, only take entries aligned with 1m SuperTrend direction
-        if config.get('htf_filter_enabled', True) and config.get('candle_interval', 60) < 60:
+        # MTF FILTER: only take entries aligned with the HTF SuperTrend direction
+        if self._htf_timeframe():
             htf_direction = getattr(self.htf_indicator, 'direction', 0) if self.htf_indicator else 0
 
             required = 1 if signal == 'GREEN' else -1
             if htf_direction == 0:
-                logger.info("[ENTRY] ✗ Skipping - HTF SuperTrend not ready yet (need 1m candles)")
+                logger.info(f"[ENTRY] ✗ Skipping - HTF SuperTrend not ready yet (need {format_timeframe(self._htf_node.timeframe)} candles)")
                 logger.info("[ENTRY_DECISION] NO | Reason=htf_not_ready")
                 return exited
 
@@ -1936,25 +2155,25 @@ class TradingBot:
             f"Index: {index_name} | "
             f"LTP: {index_ltp:.2f} | "
             f"ATM Strike: {atm_strike} | "
-            f"SuperTrend: {bot_state['supertrend_value']:.2f}"
+            f"SuperTrend: {self.state['supertrend_value']:.2f}"
         )
 
-        before = bot_state.get('current_position')
+        before = self.state.get('current_position')
         await self.enter_position(option_type, atm_strike, index_ltp)
-        after = bot_state.get('current_position')
+        after = self.state.get('current_position')
         if before is None and after is not None:
             logger.info(f"[ENTRY_DECISION] YES | Confirmed | {option_type} {atm_strike}")
         else:
             logger.info(f"[ENTRY_DECISION] NO | Entry blocked downstream | {option_type} {atm_strike}")
-        self.last_trade_time = datetime.now()
+        self.last_trade_time = utc_now()
         
         return exited
     
     async def enter_position(self, option_type: str, strike: int, index_ltp: float, override_lots: int | None = None):
         """Enter a new position with market validation"""
         # Soft pause: keep bot running (prices/indicators/exits), but block new entries
-        if not config.get('trading_enabled', True):
-            now = datetime.now(timezone.utc)
+        if not self.config.get('trading_enabled', True):
+            now = utc_now()
             if (
                 self._last_entries_paused_log_time is None
                 or (now - self._last_entries_paused_log_time).total_seconds() >= 10
@@ -1966,7 +2185,7 @@ class TradingBot:
             return
 
         # CRITICAL: Double-check market is open before entering
-        if not is_market_open():
+        if not is_market_open(self.config):
             logger.warning(f"[ENTRY] ✗ BLOCKED - Market is CLOSED | Cannot enter {option_type} position")
             return
         
@@ -1981,16 +2200,16 @@ class TradingBot:
             logger.info(f"[ENTRY] ✗ BLOCKED - Order cooldown active ({remaining:.1f}s remaining)")
             return
         
-        index_name = config['selected_index']
+        index_name = self.config['selected_index']
         index_config = get_index_config(index_name)
 
-        lots = int(config.get('order_qty', 1) or 1)
+        lots = int(self.config.get('order_qty', 1) or 1)
         if override_lots is not None:
             lots = max(1, int(override_lots))
 
         # Calculate position size based on risk (if enabled)
-        risk_per_trade = float(config.get('risk_per_trade', 0) or 0)
-        sl_points = float(config.get('initial_stoploss', 0) or 0)
+        risk_per_trade = float(self.config.get('risk_per_trade', 0) or 0)
+        sl_points = float(self.config.get('initial_stoploss', 0) or 0)
         if risk_per_trade > 0 and sl_points > 0:
             max_lots = int(risk_per_trade / (sl_points * index_config['lot_size']))
             if max_lots < 1:
@@ -2006,7 +2225,7 @@ class TradingBot:
         else:
             qty = lots * index_config['lot_size']
         
-        trade_id = f"T{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        trade_id = f"T{utc_now().strftime('%Y%m%d%H%M%S')}"
         
         # Get expiry
         expiry = await self.dhan.get_nearest_expiry(index_name) if self.dhan else None
@@ -2023,7 +2242,7 @@ class TradingBot:
         security_id = ""
         
         # Paper mode (fully simulated pricing; avoids mixing simulated index candles with live option quotes)
-        if bot_state['mode'] == 'paper':
+        if self.state['mode'] == 'paper':
             security_id = f"SIM_{index_name}_{strike}_{option_type}"
             
             if entry_price <= 0:
@@ -2076,7 +2295,7 @@ class TradingBot:
             order_id = result.get('orderId')
 
             # Track last order timestamp (entry order) right after placing the order
-            self.last_order_time_utc = datetime.now(timezone.utc)
+            self.last_order_time_utc = utc_now()
 
             verify = await self.dhan.verify_order_filled(
                 order_id=str(order_id),
@@ -2100,8 +2319,8 @@ class TradingBot:
             )
 
         # Track last order timestamp (paper mode entry)
-        if bot_state['mode'] == 'paper':
-            self.last_order_time_utc = datetime.now(timezone.utc)
+        if self.state['mode'] == 'paper':
+            self.last_order_time_utc = utc_now()
         
         # Save position
         self.current_position = {
@@ -2112,33 +2331,34 @@ class TradingBot:
             'security_id': security_id,
             'index_name': index_name,
             'qty': qty,
-            'entry_time': datetime.now(timezone.utc).isoformat()
+            'entry_time': utc_now().isoformat()
         }
         self.entry_price = entry_price
         self.trailing_sl = None
         self.highest_profit = 0
-        self.entry_time_utc = datetime.now(timezone.utc)
+        self.entry_time_utc = utc_now()
         
-        bot_state['current_position'] = self.current_position
-        bot_state['entry_price'] = self.entry_price
-        bot_state['daily_trades'] += 1
-        bot_state['current_option_ltp'] = entry_price
+        self.state['current_position'] = self.current_position
+        self.state['entry_price'] = self.entry_price
+        self.state['daily_trades'] += 1
+        self._position_opened.set()
+        self.state['current_option_ltp'] = entry_price
         
         # ONLY set last_signal AFTER position is successfully confirmed open
         self.last_signal = option_type[0].upper() + 'E'  # 'CE' -> 'C', 'PE' -> 'P'
         self.last_signal = 'GREEN' if option_type == 'CE' else 'RED'
         
         # Save to database in background - don't wait for DB commit
-        asyncio.create_task(save_trade({
+        self._record_trade_entry({
             'trade_id': trade_id,
-            'entry_time': datetime.now(timezone.utc).isoformat(),
+            'entry_time': utc_now().isoformat(),
             'option_type': option_type,
             'strike': strike,
             'expiry': expiry,
             'entry_price': self.entry_price,
             'qty': qty,
-            'mode': bot_state['mode'],
+            'mode': self.state['mode'],
             'index_name': index_name,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        }))
+            'created_at': utc_now().isoformat()
+        })
 
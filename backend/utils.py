@@ -1,17 +1,30 @@
 # Utility functions
+from contextvars import ContextVar
 from datetime import datetime, timezone, timedelta
 
+# Set by set_clock(): backtests run on candle time instead of the wall clock. A context
+# variable, so a backtest in a worker thread never moves the live bot's clock.
+_clock = ContextVar('clock', default=None)
+
+def set_clock(now_utc=None):
+    """Make utc_now() (and every market-hours helper) return now_utc() in this context; None restores the wall clock"""
+    _clock.set(now_utc)
+
+def utc_now():
+    """Get current UTC time (the pinned clock during a backtest)"""
+    clock = _clock.get()
+    return clock() if clock is not None else datetime.now(timezone.utc)
+
 def get_ist_time():
     """Get current IST time"""
-    utc_now = datetime.now(timezone.utc)
-    ist = utc_now + timedelta(hours=5, minutes=30)
+    ist = utc_now() + timedelta(hours=5, minutes=30)
     return ist
 
-def is_market_open():
-    """Check if market is open (9:15 AM - 3:30 PM IST, Monday-Friday)"""
+def is_market_open(settings=None):
+    """Check if market is open (9:15 AM - 3:30 PM IST, Monday-Friday); `settings` defaults to config"""
     try:
         from config import config as _config
-        if _config.get('bypass_market_hours', False):
+        if (_config if settings is None else settings).get('bypass_market_hours', False):
             return True
     except Exception:
         pass
@@ -26,11 +39,11 @@ def is_market_open():
     market_close = ist.replace(hour=15, minute=30, second=0, microsecond=0)
     return market_open <= ist <= market_close
 
-def can_take_new_trade():
+def can_take_new_trade(settings=None):
     """Check if new trades are allowed (before 3:10 PM IST, weekday only)"""
     try:
         from config import config as _config
-        if _config.get('bypass_market_hours', False):
+        if (_config if settings is None else settings).get('bypass_market_hours', False):
             return True
     except Exception:
         pass
@@ -44,11 +57,11 @@ def can_take_new_trade():
     cutoff_time = ist.replace(hour=15, minute=10, second=0, microsecond=0)
     return ist < cutoff_time
 
-def should_force_squareoff():
+def should_force_squareoff(settings=None):
     """Check if it's time to force square off (3:25 PM IST, weekday only)"""
     try:
         from config import config as _config
-        if _config.get('bypass_market_hours', False):
+        if (_config if settings is None else settings).get('bypass_market_hours', False):
             return False
     except Exception:
         pass
@@ -163,7 +163,8 @@ function App() {
       ws.onmessage = (event) => {
         try {
           const data = JSON.parse(event.data);
-          if (data.type === "state_update") {
+          // state_update is keyed by index; the dashboard follows the selected index only
+          if (data.type === "state_update" && (!data.index || !configRef.current.selected_index || data.index === configRef.current.selected_index)) {
             const update = data.data;
             const currentConfig = configRef.current;
             setMarketData({
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Backtest the bot over a range of IST days of market-data-service candles.
+
+Every trading day runs headless (backend/backtest.py) in its own worker
+process; per-day and aggregate metrics are printed at the end.
+
+    python scripts/backtest.py --start 2026-01-01 --end 2026-03-31 \\
+        --mds-base-url http://localhost:8002/v1 --indicator-type score_mds \\
+        --set target_points=20 --set initial_stoploss=15
+
+Settings start from the backend defaults (config.py / environment); --set
+overrides any config key (values are parsed as JSON when possible).
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from backtest import run_backtest_range  # noqa: E402
+
+
+def _parse_set(items: list) -> dict:
+    overrides = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--set expects KEY=VALUE, got {item!r}")
+        try:
+            overrides[key.strip()] = json.loads(value)
+        except ValueError:
+            overrides[key.strip()] = value
+    return overrides
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--start", required=True, help="first IST date (YYYY-MM-DD)")
+    ap.add_argument("--end", help="last IST date, inclusive (default: --start)")
+    ap.add_argument("--index", help="selected_index, e.g. NIFTY")
+    ap.add_argument("--interval", type=int, help="candle_interval in seconds")
+    ap.add_argument("--indicator-type", choices=("supertrend", "supertrend_macd", "score_mds"))
+    ap.add_argument("--mds-base-url", help="market-data-service URL (default: MDS_BASE_URL)")
+    ap.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="config override (repeatable)")
+    ap.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    ap.add_argument("--seed", type=int, default=0, help="paper option-price noise seed")
+    ap.add_argument("--json", metavar="PATH", help="also write the full report (trades included) as JSON")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    overrides = _parse_set(args.set)
+    for key, value in (
+        ("selected_index", args.index),
+        ("candle_interval", args.interval),
+        ("indicator_type", args.indicator_type),
+        ("mds_base_url", args.mds_base_url),
+    ):
+        if value is not None:
+            overrides[key] = value
+
+    report = run_backtest_range(args.start, args.end or args.start, overrides, workers=args.workers, seed=args.seed)
+
+    for day in report["daily"]:
+        if "error" in day:
+            print(f"{day['date']}  ERROR {day['error']}")
+            continue
+        print(
+            f"{day['date']}  candles={day['candles']:>6}  trades={day['total_trades']:>3}  "
+            f"pnl={day['total_pnl']:>10.2f}  max_dd={day['max_drawdown']:>9.2f}  {day['elapsed_ms']:>7.0f} ms"
+        )
+    m = report["metrics"]
+    print(
+        f"\n{report['days']} days ({m['trading_days']} with candles) | {report['candles']} candles | "
+        f"{report['workers']} workers | {report['elapsed_ms'] / 1000:.1f} s"
+    )
+    print(
+        f"trades={m['total_trades']} win_rate={m['win_rate']}% pnl={m['total_pnl']} "
+        f"profit_factor={m['profit_factor']} max_drawdown={m['max_drawdown']} "
+        f"winning_days={m['winning_days']} avg_pnl_per_day={m['avg_pnl_per_day']}"
+    )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Per-candle cost benchmark for backend/indicators.py.
+
+Drives a synthetic random-walk session through each indicator and reports the
+average update cost in consecutive blocks of candles. Streaming indicators
+should show a flat profile: the last block costs about the same as the first.
+
+    python scripts/bench_indicators.py --candles 200000 --blocks 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from indicators import (  # noqa: E402
+    ADX, ATR, MACD, RSI, BollingerBands, DonchianChannel, HeikinAshi, KeltnerChannel, MovingAverage, Stochastic,
+    SuperTrend,
+)
+
+
+def _synthetic_candles(n: int, seed: int = 7, start: float = 23500.0):
+    rnd = random.Random(seed)
+    px = start
+    out = []
+    for _ in range(n):
+        px += rnd.gauss(0, 6)
+        high = px + abs(rnd.gauss(0, 3))
+        low = px - abs(rnd.gauss(0, 3))
+        out.append((high, low, rnd.uniform(low, high)))
+    return out
+
+
+def _indicators():
+    return {
+        "SuperTrend(7,4)": lambda: SuperTrend(period=7, multiplier=4),
+        "RSI(14) wilder": lambda: RSI(period=14),
+        "RSI(14) simple": lambda: RSI(period=14, smoothing="simple"),
+        "EMA cross(5,20)": lambda: MovingAverage(fast_period=5, slow_period=20),
+        "MACD(12,26,9)": lambda: MACD(fast=12, slow=26, signal=9),
+        "Bollinger(20,2)": lambda: BollingerBands(period=20, num_std=2),
+        "Stochastic(14,3)": lambda: Stochastic(k_period=14, d_period=3),
+        "ADX(14)": lambda: ADX(period=14),
+        "ATR(14)": lambda: ATR(period=14),
+        "Donchian(20)": lambda: DonchianChannel(period=20),
+        "Keltner(20,10,2)": lambda: KeltnerChannel(period=20, atr_period=10, multiplier=2),
+        "HeikinAshi": lambda: HeikinAshi(),
+    }
+
+
+def bench(candles, blocks: int) -> None:
+    block = max(1, len(candles) // blocks)
+    for name, factory in _indicators().items():
+        ind = factory()
+        costs = []
+        for b in range(blocks):
+            chunk = candles[b * block:(b + 1) * block]
+            t0 = time.perf_counter()
+            for high, low, close in chunk:
+                ind.add_candle(high, low, close)
+            costs.append((time.perf_counter() - t0) / max(1, len(chunk)) * 1e6)
+        ratio = costs[-1] / costs[0] if costs[0] > 0 else float("nan")
+        profile = " ".join(f"{c:6.2f}" for c in costs)
+        print(f"{name:<18} us/candle per block: {profile} | last/first={ratio:.2f}")
+
+
+def bench_batch(candles) -> None:
+    highs, lows, closes = (np.array(col) for col in zip(*candles))
+    for name, factory in _indicators().items():
+        ind = factory()
+        t0 = time.perf_counter()
+        ind.add_candles(highs, lows, closes)
+        elapsed = time.perf_counter() - t0
+        print(f"{name:<18} add_candles: {elapsed * 1e3:8.2f} ms for {len(candles)} candles")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--candles", type=int, default=100000)
+    ap.add_argument("--blocks", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    candles = _synthetic_candles(args.candles, seed=args.seed)
+    print(f"candles={len(candles)} blocks={args.blocks}")
+    bench(candles, args.blocks)
+    bench_batch(candles)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Numerical parity check: streaming indicators vs the legacy list-based code.
+
+The legacy implementations below are the pre-streaming versions from
+backend/indicators.py, kept verbatim in spirit (history lists, slices and
+full rescans) so the streaming kernels can be checked candle by candle.
+It also checks that every vectorized add_candles() produces the same
+per-candle output and end state as streaming the same candles.
+
+    python scripts/check_indicator_parity.py --candles 20000 --seeds 10
+
+Exits non-zero on the first mismatch.
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import numpy as np  # noqa: E402
+
+import indicators  # noqa: E402
+
+
+class LegacyBollingerBands:
+    def __init__(self, period=20, num_std=2):
+        self.period = period
+        self.num_std = num_std
+        self.closes = []
+
+    def add_candle(self, high, low, close):
+        self.closes.append(close)
+        if len(self.closes) < self.period:
+            return None, None
+        sma = sum(self.closes[-self.period:]) / self.period
+        variance = sum((c - sma) ** 2 for c in self.closes[-self.period:]) / self.period
+        std_dev = variance ** 0.5
+        upper = sma + (std_dev * self.num_std)
+        lower = sma - (std_dev * self.num_std)
+        if close < lower:
+            signal = "GREEN"
+        elif close > upper:
+            signal = "RED"
+        else:
+            signal = None
+        return {'upper': upper, 'lower': lower, 'middle': sma}, signal
+
+
+class LegacyStochastic:
+    def __init__(self, k_period=14, d_period=3):
+        self.k_period = k_period
+        self.d_period = d_period
+        self.highs = []
+        self.lows = []
+        self.closes = []
+        self.k_values = []
+
+    def add_candle(self, high, low, close):
+        self.highs.append(high)
+        self.lows.append(low)
+        self.closes.append(close)
+        if len(self.closes) < self.k_period:
+            return None, None
+        highest = max(self.highs[-self.k_period:])
+        lowest = min(self.lows[-self.k_period:])
+        k = ((close - lowest) / (highest - lowest) * 100) if (highest - lowest) > 0 else 50
+        self.k_values.append(k)
+        if len(self.k_values) < self.d_period:
+            return k, None
+        if k < 20:
+            signal = "GREEN"
+        elif k > 80:
+            signal = "RED"
+        else:
+            signal = None
+        return k, signal
+
+
+def _candles(n, seed):
+    rnd = random.Random(seed)
+    px = rnd.uniform(10000.0, 80000.0)
+    for i in range(n):
+        # Mix trending, noisy and perfectly flat stretches.
+        if (i // 500) % 4 == 3:
+            yield px, px, px
+            continue
+        px += rnd.gauss(0, 8)
+        high = px + abs(rnd.gauss(0, 4))
+        low = px - abs(rnd.gauss(0, 4))
+        yield high, low, rnd.uniform(low, high)
+
+
+def _close(a, b, rel=1e-9, abs_tol=1e-6):
+    return abs(a - b) <= max(abs_tol, rel * max(abs(a), abs(b)))
+
+
+def check_bollinger(candles, period, num_std):
+    new, old = indicators.BollingerBands(period, num_std), LegacyBollingerBands(period, num_std)
+    worst = 0.0
+    for i, (h, l, c) in enumerate(candles):
+        (bn, _sn), (bo, _so) = new.add_candle(h, l, c), old.add_candle(h, l, c)
+        if (bn is None) != (bo is None):
+            raise AssertionError(f"BollingerBands readiness mismatch at candle {i}")
+        if bn is None:
+            continue
+        for key in ('upper', 'lower', 'middle'):
+            if not _close(bn[key], bo[key]):
+                raise AssertionError(f"BollingerBands {key} mismatch at candle {i}: {bn[key]} != {bo[key]}")
+            worst = max(worst, abs(bn[key] - bo[key]))
+    return worst
+
+
+def check_stochastic(candles, k_period, d_period):
+    new, old = indicators.Stochastic(k_period, d_period), LegacyStochastic(k_period, d_period)
+    for i, (h, l, c) in enumerate(candles):
+        rn, ro = new.add_candle(h, l, c), old.add_candle(h, l, c)
+        if rn != ro:
+            raise AssertionError(f"Stochastic mismatch at candle {i}: {rn} != {ro}")
+    return 0.0
+
+
+# (factory, add_candles output key compared against the add_candle value)
+_BATCH_CASES = {
+    "SuperTrend": (lambda: indicators.SuperTrend(7, 3, history=16), "value"),
+    "RSI": (lambda: indicators.RSI(14), "rsi"),
+    "RSI simple": (lambda: indicators.RSI(5, smoothing="simple"), "rsi"),
+    "MACD": (lambda: indicators.MACD(12, 26, 9), "macd"),
+    "MACD ring": (lambda: indicators.MACD(12, 26, 9, history=32), "macd"),
+    "MovingAverage": (lambda: indicators.MovingAverage(5, 20), "fast_ema"),
+    "MovingAverage cross": (lambda: indicators.MovingAverage(3, 8, signal_on_cross=True), "fast_ema"),
+    "BollingerBands": (lambda: indicators.BollingerBands(20, 2), "middle"),
+    "Stochastic": (lambda: indicators.Stochastic(14, 3), "k"),
+    "ADX": (lambda: indicators.ADX(14), "adx"),
+    "ATR": (lambda: indicators.ATR(14), "atr"),
+    "DonchianChannel": (lambda: indicators.DonchianChannel(20), "upper"),
+    "KeltnerChannel": (lambda: indicators.KeltnerChannel(20, 10, 2), "lower"),
+    "HeikinAshi": (lambda: indicators.HeikinAshi(), "close"),
+}
+
+_SIGNAL_KEY = {"SuperTrend": "direction", "MACD": "cross", "MACD ring": "cross"}
+
+
+def _state(obj):
+    names = getattr(type(obj), "__slots__", None) or sorted(vars(obj))
+    out = {}
+    for name in names:
+        value = getattr(obj, name)
+        if type(value).__module__ == "indicators":
+            value = _state(value)
+        elif not isinstance(value, (int, float, str, dict, type(None))):
+            value = list(value)
+        out[name] = value
+    return out
+
+
+def check_batch(candles, rnd):
+    n = len(candles)
+    cuts = [0] + sorted(rnd.sample(range(1, n), 4)) + [n]
+    cols = np.array(candles).T
+    for name, (factory, key) in _BATCH_CASES.items():
+        stream, batch = factory(), factory()
+        values, signals = [], []
+        for h, l, c in candles:
+            v, sig = stream.add_candle(h, l, c)
+            if isinstance(v, dict):
+                v = v[key]
+            values.append(np.nan if v is None else v)
+            signals.append(indicators.SIGNAL_CODES[sig])
+        b_values, b_signals = [], []
+        for lo, hi in zip(cuts, cuts[1:]):
+            out = batch.add_candles(cols[0][lo:hi], cols[1][lo:hi], cols[2][lo:hi])
+            b_values.extend(out[key].tolist())
+            sig_out = out.get(_SIGNAL_KEY.get(name, "signal"))
+            b_signals.extend([0] * (hi - lo) if sig_out is None else sig_out.tolist())
+        if not np.array_equal(np.array(values), np.array(b_values), equal_nan=True):
+            raise AssertionError(f"{name}: add_candles values differ from streaming")
+        if signals != b_signals:
+            raise AssertionError(f"{name}: add_candles signals differ from streaming")
+        if repr(_state(stream)) != repr(_state(batch)):
+            raise AssertionError(f"{name}: add_candles end state differs from streaming")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--candles", type=int, default=20000)
+    ap.add_argument("--seeds", type=int, default=5)
+    args = ap.parse_args()
+
+    for seed in range(args.seeds):
+        rnd = random.Random(1000 + seed)
+        candles = list(_candles(args.candles, seed))
+        bb_period, stoch_k = rnd.randint(2, 40), rnd.randint(1, 30)
+        bb_err = check_bollinger(candles, bb_period, rnd.choice([1, 2, 2.5]))
+        check_stochastic(candles, stoch_k, rnd.randint(1, 5))
+        check_batch(candles[:5000], rnd)
+        print(
+            f"seed={seed} BollingerBands({bb_period}) max_abs_err={bb_err:.3e} | "
+            f"Stochastic({stoch_k}) exact | add_candles == streaming"
+        )
+    print("parity OK")
+
+
+if __name__ == "__main__":
+    main()
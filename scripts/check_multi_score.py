@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Parity check: MultiScoreEngine vs one ScoreEngine per symbol.
+
+Feeds several synthetic symbols through MultiScoreEngine in lockstep (with
+randomly missing candles) and through independent ScoreEngines, and
+requires every published field and per-TF score to match exactly, for both
+the vectorized path and the per-symbol path MultiScoreEngine uses below
+VECTORIZE_MIN_SYMBOLS. Also reports the per-step cost of each.
+
+    python scripts/check_multi_score.py --steps 20000 --symbols 4
+    python scripts/check_multi_score.py --steps 2000 --seeds 1 --symbols 16
+
+Exits non-zero on the first mismatch.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import numpy as np  # noqa: E402
+
+from multi_score_engine import VECTORIZE_MIN_SYMBOLS, MultiScoreEngine  # noqa: E402
+from score_engine import DIRECTION_CODES, Candle, ScoreEngine  # noqa: E402
+
+_FIELDS = ("score", "slope", "acceleration", "stability", "confidence", "is_choppy", "ready")
+_TF_FIELDS = ("macd_score", "hist_score", "st_score", "bonus_score", "raw_score", "weighted_score", "st_direction")
+
+_CONFIGS = (
+    {"base_timeframe_seconds": 5},
+    {"base_timeframe_seconds": 5, "full_chain": True},
+    {"base_timeframe_seconds": 15, "bonus_macd_triple": 0.3, "bonus_macd_cross": 0.7},
+)
+
+
+def _paths(steps, n, seed, missing):
+    rnd = random.Random(seed)
+    px = [rnd.uniform(20000.0, 80000.0) for _ in range(n)]
+    rows = []
+    for i in range(steps):
+        row = []
+        for s in range(n):
+            px[s] += rnd.gauss(0, 6) if (i // 1500 + s) % 2 else rnd.gauss(0, 1.5)
+            high = px[s] + abs(rnd.gauss(0, 3))
+            low = px[s] - abs(rnd.gauss(0, 3))
+            close = rnd.uniform(low, high) if rnd.random() >= missing else float("nan")
+            row.append((high, low, close))
+        rows.append(row)
+    return rows
+
+
+def check(rows, params, symbols, vectorize):
+    kwargs = dict(st_period=7, st_multiplier=4, macd_fast=12, macd_slow=26, macd_signal=9, **params)
+    multi = MultiScoreEngine(symbols, vectorize=vectorize, **kwargs)
+    singles = [ScoreEngine(**kwargs) for _ in symbols]
+    name = ", ".join(f"{k}={v}" for k, v in params.items()) + (" [vectorized]" if multi.vectorized else " [per-symbol]")
+    multi_s = single_s = 0.0
+
+    for step, row in enumerate(rows):
+        highs, lows, closes = (np.array(col) for col in zip(*row))
+        t0 = time.perf_counter()
+        out = multi.on_base_candles(highs, lows, closes)
+        multi_s += time.perf_counter() - t0
+        tf_scores = multi.tf_scores()
+
+        for i, (engine, (h, l, c)) in enumerate(zip(singles, row)):
+            if c != c:
+                if out["updated"][i]:
+                    raise AssertionError(f"{name}: step {step} symbol {i} updated without a candle")
+                continue
+            t0 = time.perf_counter()
+            snap = engine.on_base_candle(Candle(h, l, c))
+            single_s += time.perf_counter() - t0
+            for field in _FIELDS:
+                if out[field][i] != getattr(snap, field):
+                    raise AssertionError(f"{name}: step {step} symbol {i} {field} {out[field][i]} != {getattr(snap, field)}")
+            if out["direction"][i] != DIRECTION_CODES[snap.direction]:
+                raise AssertionError(f"{name}: step {step} symbol {i} direction differs")
+            for tf, score in snap.tf_scores.items():
+                for field in _TF_FIELDS:
+                    if tf_scores[tf][field][i] != getattr(score, field):
+                        raise AssertionError(f"{name}: step {step} symbol {i} {tf}s {field} differs")
+    return name, multi_s, single_s
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--steps", type=int, default=20000)
+    ap.add_argument("--symbols", type=int, default=4)
+    ap.add_argument("--missing", type=float, default=0.01, help="probability a symbol misses a candle")
+    ap.add_argument("--seeds", type=int, default=2)
+    args = ap.parse_args()
+
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    for seed in range(args.seeds):
+        rows = _paths(args.steps, args.symbols, seed, args.missing)
+        for params in _CONFIGS:
+            for vectorize in (True, False):
+                name, multi_s, single_s = check(rows, params, symbols, vectorize)
+                print(
+                    f"seed={seed} {name:<75} multi={multi_s / args.steps * 1e6:6.1f} us/step  "
+                    f"separate engines={single_s / args.steps * 1e6:6.1f} us/step"
+                )
+    auto = MultiScoreEngine(symbols, st_period=7, st_multiplier=4, macd_fast=12, macd_slow=26, macd_signal=9)
+    print(f"{args.symbols} symbols (VECTORIZE_MIN_SYMBOLS={VECTORIZE_MIN_SYMBOLS}): default path is "
+          f"{'vectorized' if auto.vectorized else 'per-symbol'}")
+    print("parity OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Parity check: ParamSweepScoreEngine vs one ScoreEngine per parameter set.
+
+Scores a synthetic session under K random parameter sets in one
+ParamSweepScoreEngine pass and with ScoreEngine.evaluate_series() per set,
+and requires every column to match exactly. Also reports the sweep cost
+against scalar streaming runs (200 sets: about 3-4 runs).
+
+    python scripts/check_param_sweep.py --candles 4500 --sets 200
+
+Exits non-zero on the first mismatch.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import numpy as np  # noqa: E402
+
+from multi_score_engine import ParamSweepScoreEngine  # noqa: E402
+from score_engine import Candle, ScoreEngine  # noqa: E402
+
+_FIELDS = ("score", "slope", "acceleration", "stability", "confidence", "direction", "is_choppy", "ready")
+
+_CONFIGS = (
+    {"base_timeframe_seconds": 5},
+    {"base_timeframe_seconds": 5, "full_chain": True},
+    {"base_timeframe_seconds": 60},
+)
+
+
+def _session(n, seed):
+    rnd = random.Random(seed)
+    px = 23500.0
+    out = []
+    for i in range(n):
+        px += rnd.gauss(0, 6) if (i // 2000) % 2 else rnd.gauss(0, 1.5)
+        high = px + abs(rnd.gauss(0, 3))
+        low = px - abs(rnd.gauss(0, 3))
+        out.append((high, low, rnd.uniform(low, high)))
+    return out
+
+
+def _param_sets(k, seed):
+    rnd = random.Random(seed)
+    sets = []
+    for _ in range(k):
+        fast = rnd.choice((8, 10, 12, 16))
+        sets.append({
+            "st_period": rnd.choice((5, 7, 10, 14)),
+            "st_multiplier": rnd.choice((2.0, 3.0, 3.5, 4.0)),
+            "macd_fast": fast,
+            "macd_slow": fast + rnd.choice((8, 14, 20)),
+            "macd_signal": rnd.choice((5, 7, 9)),
+            "bonus_macd_triple": rnd.choice((0.0, 0.5, 1.0)),
+            "bonus_macd_momentum": rnd.choice((0.0, 0.25, 0.5)),
+            "bonus_macd_cross": rnd.choice((0.0, 0.5, 0.7)),
+        })
+    return sets
+
+
+def check(candles, sets, params):
+    highs, lows, closes = (np.array(col) for col in zip(*candles))
+    name = ", ".join(f"{k}={v}" for k, v in params.items())
+
+    t0 = time.perf_counter()
+    sweep = ParamSweepScoreEngine(sets, **params).evaluate_series(highs, lows, closes)
+    sweep_s = time.perf_counter() - t0
+
+    for i, p in enumerate(sets):
+        ref = ScoreEngine(**p, **params).evaluate_series(highs, lows, closes)
+        for field in _FIELDS:
+            if not np.array_equal(sweep[field][:, i], ref[field]):
+                raise AssertionError(f"{name}: set {i} {p} {field} differs")
+
+    # Scalar streaming cost, sampled on a few sets
+    sample = sets[:3]
+    t0 = time.perf_counter()
+    for p in sample:
+        engine = ScoreEngine(**p, **params)
+        for c in candles:
+            engine.on_base_candle(Candle(*c))
+    scalar_s = (time.perf_counter() - t0) / len(sample)
+    return name, sweep_s, scalar_s
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--candles", type=int, default=4500, help="base candles in the session (4500 = one day of 5s)")
+    ap.add_argument("--sets", type=int, default=200, help="parameter sets per sweep")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    candles = _session(args.candles, args.seed)
+    sets = _param_sets(args.sets, args.seed)
+    for params in _CONFIGS:
+        name, sweep_s, scalar_s = check(candles, sets, params)
+        print(
+            f"{name:<45} sweep of {len(sets)} sets={sweep_s:6.2f} s  "
+            f"one streaming ScoreEngine={scalar_s:5.2f} s  (sweep = {sweep_s / scalar_s:4.1f} scalar runs)"
+        )
+    print("parity OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Parity check: ScoreEngine.evaluate_series() vs streaming on_base_candle().
+
+Scores the same synthetic sessions both ways (the batch side split into
+uneven chunks), count-aggregated and timestamped with random gaps, and
+requires every snapshot field, every per-TF score and the final engine state
+to match exactly. Also reports the cost per session.
+
+    python scripts/check_score_series.py --candles 4500 --sessions 3
+
+Exits non-zero on the first mismatch.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+import numpy as np  # noqa: E402
+
+from score_engine import DIRECTION_CODES, Candle, ScoreEngine  # noqa: E402
+
+_SNAPSHOT_FIELDS = ("score", "slope", "acceleration", "stability", "confidence", "is_choppy", "ready")
+_TF_FIELDS = ("macd_score", "hist_score", "st_score", "bonus_score", "raw_score", "weighted_score", "st_direction")
+
+_CONFIGS = (
+    {"base_timeframe_seconds": 5},
+    {"base_timeframe_seconds": 5, "full_chain": True},
+    {"base_timeframe_seconds": 15, "bonus_macd_triple": 0.3},
+    {"base_timeframe_seconds": 60},
+)
+
+
+def _session(n, seed):
+    rnd = random.Random(seed)
+    px = 23500.0
+    out = []
+    for i in range(n):
+        # Alternate calm and trending stretches so chop detection flips both ways
+        px += rnd.gauss(0, 6) if (i // 2000) % 2 else rnd.gauss(0, 1.5)
+        high = px + abs(rnd.gauss(0, 3))
+        low = px - abs(rnd.gauss(0, 3))
+        out.append((high, low, rnd.uniform(low, high)))
+    return out
+
+
+def _timestamps(n, base_tf, rnd, missing=0.02):
+    # 09:15 IST session start plus a mid-bucket offset; ~2% of candles missing
+    ts = 1767000000 - 1767000000 % 900 + 3 * 3600 + 45 * 60 + base_tf * rnd.randrange(1, 6)
+    out = []
+    for _ in range(n):
+        ts += base_tf * (2 if rnd.random() < missing else 1)
+        out.append(float(ts))
+    return out
+
+
+def check(candles, params, rnd, timestamps=None):
+    kwargs = dict(st_period=7, st_multiplier=4, macd_fast=12, macd_slow=26, macd_signal=9, **params)
+    stream, batch = ScoreEngine(**kwargs), ScoreEngine(**kwargs)
+    ts = timestamps or [None] * len(candles)
+
+    t0 = time.perf_counter()
+    snaps = [stream.on_base_candle(Candle(*c, ts=t)) for c, t in zip(candles, ts)]
+    stream_s = time.perf_counter() - t0
+
+    n = len(candles)
+    highs, lows, closes = (np.array(col) for col in zip(*candles))
+    stamps = None if timestamps is None else np.array(timestamps)
+    cuts = [0] + sorted(rnd.sample(range(1, n), 4)) + [n]
+    t0 = time.perf_counter()
+    outs = [
+        batch.evaluate_series(highs[lo:hi], lows[lo:hi], closes[lo:hi], None if stamps is None else stamps[lo:hi])
+        for lo, hi in zip(cuts, cuts[1:])
+    ]
+    batch_s = time.perf_counter() - t0
+
+    name = ", ".join(f"{k}={v}" for k, v in params.items()) + (", timestamped" if timestamps else "")
+    for field in _SNAPSHOT_FIELDS:
+        got = np.concatenate([o[field] for o in outs])
+        if not np.array_equal(got, np.array([getattr(s, field) for s in snaps])):
+            raise AssertionError(f"{name}: {field} differs from streaming")
+    got = np.concatenate([o["direction"] for o in outs])
+    if not np.array_equal(got, np.array([DIRECTION_CODES[s.direction] for s in snaps])):
+        raise AssertionError(f"{name}: direction differs from streaming")
+    for tf in stream.timeframes:
+        for field in _TF_FIELDS:
+            got = np.concatenate([o["tf_scores"][tf][field] for o in outs])
+            if not np.array_equal(got, np.array([getattr(s.tf_scores[tf], field) for s in snaps])):
+                raise AssertionError(f"{name}: {tf}s {field} differs from streaming")
+        got = np.concatenate([o["tf_scores"][tf]["ready"] for o in outs])
+        if not np.array_equal(got, np.array([tf in s.ready_timeframes for s in snaps])):
+            raise AssertionError(f"{name}: {tf}s ready differs from streaming")
+    if json.dumps(stream.get_state()) != json.dumps(batch.get_state()):
+        raise AssertionError(f"{name}: end state differs from streaming")
+    return name, stream_s, batch_s
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--candles", type=int, default=4500, help="base candles per session (4500 = one day of 5s)")
+    ap.add_argument("--sessions", type=int, default=3)
+    args = ap.parse_args()
+
+    for seed in range(args.sessions):
+        rnd = random.Random(2000 + seed)
+        candles = _session(args.candles, seed)
+        for params in _CONFIGS:
+            for timestamps in (None, _timestamps(args.candles, params["base_timeframe_seconds"], rnd)):
+                name, stream_s, batch_s = check(candles, params, rnd, timestamps)
+                print(f"seed={seed} {name:<62} stream={stream_s * 1e3:7.1f} ms  evaluate_series={batch_s * 1e3:7.1f} ms")
+    print("parity OK")
+
+
+if __name__ == "__main__":
+    main()
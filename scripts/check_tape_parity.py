@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Parity check: IndicatorTape replays vs full backtests over the sweep space.
+
+Samples candidates from optimizer.DEFAULT_PARAM_SPACE under each indicator
+setup, plus siblings that each change one swept value (so groups mix entry /
+risk and indicator changes), groups them by backtest.indicator_key() the way
+the optimizer does and requires, for every candidate:
+- its own recorded tape to equal the group's shared tape (the key captures
+  everything the indicator series depend on), and
+- the run on the shared tape to give the same trades, equity curve and
+  metrics as the full run.
+
+    python scripts/check_tape_parity.py --candles 4500 --samples 6 --siblings 3 --sessions 2
+
+Exits non-zero on the first mismatch.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from backtest import IndicatorTape, indicator_key, run_backtest  # noqa: E402
+from optimizer import DEFAULT_PARAM_SPACE, random_candidates  # noqa: E402
+
+_SETUPS = (
+    {"indicator_type": "supertrend"},
+    {"indicator_type": "supertrend", "use_adx_for_regime": True, "htf_filter_enabled": False},
+    {"indicator_type": "supertrend_macd", "htf_filter_enabled": True, "htf_filter_timeframe": 60},
+    {"indicator_type": "score_mds"},
+    {"indicator_type": "score_mds", "mds_full_chain": True, "htf_filter_timeframe": 300},
+)
+
+
+def _session(n, seed, interval=5):
+    # 09:15 IST start; alternating up / down drifts so every setup trades
+    rnd = random.Random(seed)
+    start = datetime(2026, 1, 5, 3, 45, tzinfo=timezone.utc)
+    px = 23500.0
+    rows = []
+    for i in range(n):
+        candle_open = px
+        px += rnd.gauss(0, 4) + 0.3 * ((i // 300) % 2 * 2 - 1)
+        rows.append({
+            "ts": (start + timedelta(seconds=i * interval)).isoformat(),
+            "open": candle_open,
+            "high": max(candle_open, px) + abs(rnd.gauss(0, 2)),
+            "low": min(candle_open, px) - abs(rnd.gauss(0, 2)),
+            "close": px,
+        })
+    return rows
+
+
+def _with_siblings(candidates, siblings, rnd):
+    out = []
+    for params in candidates:
+        out.append(params)
+        for key in rnd.sample(sorted(DEFAULT_PARAM_SPACE), siblings):
+            values = [v for v in DEFAULT_PARAM_SPACE[key] if v != params[key]]
+            if values:
+                out.append({**params, key: rnd.choice(values)})
+    return out
+
+
+def check(candles, setup, candidates, seed):
+    groups = {}
+    for params in candidates:
+        groups.setdefault(indicator_key({**setup, **params}), []).append(params)
+
+    name = ", ".join(f"{k}={v}" for k, v in setup.items())
+    full_s = tape_s = 0.0
+    for key, group in groups.items():
+        shared = IndicatorTape.record(candles, {**setup, **group[0]})
+        if shared.key != key:
+            raise AssertionError(f"{name}: recorded tape key differs from indicator_key()")
+        for params in group:
+            settings = {**setup, **params}
+            own = IndicatorTape.record(candles, settings)
+            if own.key != key or repr(own.rows) != repr(shared.rows):
+                raise AssertionError(f"{name}: {params} computes other indicator series than its key group")
+
+            t0 = time.perf_counter()
+            full = run_backtest(candles, settings, seed=seed)
+            full_s += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            taped = run_backtest(candles, settings, seed=seed, tape=shared)
+            tape_s += time.perf_counter() - t0
+            for field in ("candles", "trades", "equity", "metrics"):
+                if full[field] != taped[field]:
+                    raise AssertionError(f"{name}: {params} {field} differ between tape and full run")
+    return name, len(groups), full_s, tape_s
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--candles", type=int, default=4500, help="base candles per session (4500 = one day of 5s)")
+    ap.add_argument("--samples", type=int, default=6, help="sampled candidates per setup")
+    ap.add_argument("--siblings", type=int, default=3, help="one-value variations of each sampled candidate")
+    ap.add_argument("--sessions", type=int, default=2)
+    args = ap.parse_args()
+
+    for seed in range(args.sessions):
+        candles = _session(args.candles, seed)
+        for setup in _SETUPS:
+            rnd = random.Random(seed)
+            candidates = _with_siblings(random_candidates(DEFAULT_PARAM_SPACE, args.samples, seed, setup), args.siblings, rnd)
+            candidates = [c for c in candidates if int(c["macd_fast"]) < int(c["macd_slow"])]
+            name, groups, full_s, tape_s = check(candles, setup, candidates, seed)
+            print(
+                f"seed={seed} {name:<70} {len(candidates)} candidates / {groups} tapes  "
+                f"full={full_s:6.2f} s  tape={tape_s:6.2f} s"
+            )
+    print("parity OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Sweep strategy parameters over a range of IST days of market-data-service candles.
+
+Candidates come from --param ranges (default: backend/optimizer.py
+DEFAULT_PARAM_SPACE) and are backtested in worker processes; the best --top
+are printed and, with --save NAME, stored as strategies 'NAME (1)', 'NAME (2)', ...
+
+    python scripts/optimize.py --start 2026-01-01 --end 2026-03-31 \\
+        --mds-base-url http://localhost:8002/v1 --method halving --samples 200 \\
+        --param supertrend_period=7,10,14 --param target_points=0,20,40 --save "ST sweep Q1"
+
+--set fixes any other config key for every candidate (values parsed as JSON).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from optimizer import OBJECTIVES, SEARCH_METHODS, optimize, save_top_strategies  # noqa: E402
+
+
+def _parse_value(value: str):
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def _parse_set(items: list) -> dict:
+    overrides = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--set expects KEY=VALUE, got {item!r}")
+        overrides[key.strip()] = _parse_value(value)
+    return overrides
+
+
+def _parse_params(items: list) -> dict:
+    space = {}
+    for item in items:
+        key, sep, values = item.partition("=")
+        if not sep or not values.strip():
+            raise SystemExit(f"--param expects KEY=V1,V2,..., got {item!r}")
+        space[key.strip()] = [_parse_value(v.strip()) for v in values.split(",")]
+    return space
+
+
+async def _save(result: dict, name: str, overrides: dict, start: str, end: str) -> list:
+    from database import init_db
+
+    await init_db()
+    return await save_top_strategies(result, name, overrides, start_date=start, end_date=end)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--start", required=True, help="first IST date (YYYY-MM-DD)")
+    ap.add_argument("--end", help="last IST date, inclusive (default: --start)")
+    ap.add_argument("--index", help="selected_index, e.g. NIFTY")
+    ap.add_argument("--interval", type=int, help="candle_interval in seconds")
+    ap.add_argument("--indicator-type", choices=("supertrend", "supertrend_macd", "score_mds"))
+    ap.add_argument("--mds-base-url", help="market-data-service URL (default: MDS_BASE_URL)")
+    ap.add_argument("--param", action="append", default=[], metavar="KEY=V1,V2", help="swept values (repeatable)")
+    ap.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="fixed config override (repeatable)")
+    ap.add_argument("--method", choices=SEARCH_METHODS, default="grid")
+    ap.add_argument("--samples", type=int, default=50, help="candidates for random / halving")
+    ap.add_argument("--eta", type=int, default=3, help="halving: keep 1/eta per rung")
+    ap.add_argument("--objective", choices=OBJECTIVES, default="total_pnl", help="metric to rank by")
+    ap.add_argument("--top", type=int, default=5, help="winners to report / save")
+    ap.add_argument("--save", metavar="NAME", help="store the winners as strategies 'NAME (rank)'")
+    ap.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    ap.add_argument("--seed", type=int, default=0, help="paper option-price noise / sampling seed")
+    ap.add_argument("--json", metavar="PATH", help="also write the full result as JSON")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    overrides = _parse_set(args.set)
+    for key, value in (
+        ("selected_index", args.index),
+        ("candle_interval", args.interval),
+        ("indicator_type", args.indicator_type),
+        ("mds_base_url", args.mds_base_url),
+    ):
+        if value is not None:
+            overrides[key] = value
+    start, end = args.start, args.end or args.start
+
+    result = optimize(
+        start,
+        end,
+        _parse_params(args.param) or None,
+        overrides,
+        method=args.method,
+        samples=args.samples,
+        eta=args.eta,
+        objective=args.objective,
+        top=args.top,
+        workers=args.workers,
+        seed=args.seed,
+    )
+
+    print(
+        f"\n{result['candidates']} candidates x {result['days']} days | {result['evaluations']} day runs | "
+        f"{result['workers']} workers | {result['elapsed_ms'] / 1000:.1f} s"
+    )
+    for rank, entry in enumerate(result["ranking"], start=1):
+        m = entry["metrics"]
+        print(
+            f"#{rank} {args.objective}={m.get(args.objective)} pnl={m['total_pnl']} trades={m['total_trades']} "
+            f"win_rate={m['win_rate']}% max_drawdown={m['max_drawdown']} | {json.dumps(entry['params'])}"
+        )
+
+    if args.save:
+        fixed = {k: v for k, v in overrides.items() if k != "mds_base_url"}
+        for strategy in asyncio.run(_save(result, args.save, fixed, start, end)):
+            print(f"saved strategy {strategy['name']!r}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
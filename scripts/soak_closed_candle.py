@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Memory soak test for TradingBot._handle_closed_candle.
+
+Drives synthetic candles through the full per-candle indicator path (shared
+graph nodes, ScoreEngine, ADX, 1m HTF SuperTrend) and samples process RSS.
+Exits non-zero if RSS keeps growing after the warm-up phase.
+
+    python scripts/soak_closed_candle.py --candles 1000000 --indicator-type score_mds
+
+Order placement is stubbed out; the bot stays in paper mode with no position.
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import random
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from config import bot_state, config  # noqa: E402
+
+
+def _rss_kb() -> int:
+    """Current RSS in KiB (Linux /proc); falls back to peak RSS elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+async def _no_trade(*_args, **_kwargs):
+    return False
+
+
+async def soak(n: int, samples: int, interval: int, seed: int):
+    from trading_bot import TradingBot
+
+    bot = TradingBot()
+    bot._checkpoint_enabled = False
+    bot.enter_position = _no_trade
+    bot.process_mds_on_close = _no_trade
+    bot.is_within_trading_hours = lambda: True
+
+    rnd = random.Random(seed)
+    px = 23500.0
+    t = datetime(2026, 1, 5, 9, 15)
+    htf_every = max(1, 60 // interval)
+    htf = None
+    every = max(1, n // samples)
+    points = []
+    t0 = time.perf_counter()
+
+    for i in range(n):
+        px += rnd.gauss(0, 6)
+        high = px + abs(rnd.gauss(0, 3))
+        low = px - abs(rnd.gauss(0, 3))
+        close = rnd.uniform(low, high)
+        t += timedelta(seconds=interval)
+        bot_state['index_ltp'] = close
+
+        if htf is None:
+            htf = [high, low, close, 0]
+        htf = [max(htf[0], high), min(htf[1], low), close, htf[3] + 1]
+        if htf[3] >= htf_every:
+            bot._update_htf_node(htf[0], htf[1], htf[2])
+            htf = None
+
+        await bot._handle_closed_candle(
+            index_name='NIFTY',
+            candle_number=i + 1,
+            candle_interval=interval,
+            candle_open=px,
+            high=high,
+            low=low,
+            close=close,
+            current_candle_time=t,
+        )
+
+        if (i + 1) % every == 0:
+            gc.collect()
+            points.append((i + 1, _rss_kb(), time.perf_counter() - t0))
+    return points
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--candles", type=int, default=1_000_000)
+    ap.add_argument("--samples", type=int, default=20)
+    ap.add_argument("--indicator-type", default="score_mds", choices=("supertrend", "supertrend_macd", "score_mds"))
+    ap.add_argument("--interval", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=11)
+    ap.add_argument("--max-growth-kb", type=int, default=2048,
+                    help="allowed RSS growth between the first post-warm-up sample and the last")
+    args = ap.parse_args()
+
+    logging.disable(logging.WARNING)
+    config.update(
+        indicator_type=args.indicator_type,
+        candle_interval=args.interval,
+        use_adx_for_regime=True,
+        store_candle_data=False,
+    )
+
+    points = asyncio.run(soak(args.candles, args.samples, args.interval, args.seed))
+    for n, rss, elapsed in points:
+        print(f"candles={n:>9} rss={rss / 1024:8.1f} MiB  us/candle={elapsed / n * 1e6:7.1f}")
+
+    # Skip the first quarter: allocator arenas, caches and rings fill up there.
+    base = points[len(points) // 4][1]
+    growth = points[-1][1] - base
+    print(f"RSS growth after warm-up: {growth} KiB (limit {args.max_growth_kb} KiB)")
+    if growth > args.max_growth_kb:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
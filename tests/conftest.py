@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The backend is a flat module tree (see scripts/*.py): import it from backend/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
@@ -0,0 +1,110 @@
+"""Headless backtests: determinism, isolation from the live bot's config / bot_state, IndicatorTape replays."""
+
+import copy
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backtest import BacktestBot, IndicatorTape, _TapeGraph, indicator_key, run_backtest, run_backtest_range
+from config import bot_state, config
+from utils import utc_now
+
+
+def _day(seed, n=4500):
+    """One 09:15 IST session of 5s candles."""
+    rnd = random.Random(seed)
+    start = datetime(2026, 3, 2, 3, 45, tzinfo=timezone.utc)
+    px = 23500.0
+    rows = []
+    for i in range(n):
+        candle_open = px
+        px += rnd.gauss(0, 4) + 0.3 * ((i // 300) % 2 * 2 - 1)
+        rows.append({
+            'ts': (start + timedelta(seconds=5 * i)).isoformat(),
+            'open': candle_open,
+            'high': max(candle_open, px) + abs(rnd.gauss(0, 2)),
+            'low': min(candle_open, px) - abs(rnd.gauss(0, 2)),
+            'close': px,
+        })
+    return rows
+
+
+_OVERRIDES = {'indicator_type': 'score_mds', 'candle_interval': 5, 'target_points': 20, 'initial_stoploss': 15}
+
+
+def test_backtest_is_deterministic():
+    a = run_backtest(_day(1), _OVERRIDES, seed=3)
+    b = run_backtest(_day(1), _OVERRIDES, seed=3)
+    assert a['candles'] == 4500
+    assert a['trades'] and a['trades'] == b['trades']
+    assert a['equity'] == b['equity'] and a['metrics'] == b['metrics']
+    assert all(t.get('exit_price') is not None for t in a['trades'])
+
+
+def test_backtest_leaves_live_state_alone():
+    saved_config, saved_state = copy.deepcopy(config), copy.deepcopy(bot_state)
+
+    def candles():
+        for row in _day(2):
+            # The live bot's settings, state and clock are never touched mid-run
+            assert config == saved_config and bot_state == saved_state
+            yield row
+
+    result = run_backtest(candles(), _OVERRIDES, seed=3)
+    assert result['candles'] == 4500
+    assert config == saved_config and bot_state == saved_state
+    assert abs((utc_now() - datetime.now(timezone.utc)).total_seconds()) < 60
+
+
+def test_indicator_key_follows_the_built_pipeline():
+    base = {**config, **_OVERRIDES}
+    assert indicator_key(base) == indicator_key({**base, 'target_points': 40, 'min_entry_confidence': 75.0})
+    assert indicator_key(base) != indicator_key({**base, 'mds_bonus_macd_cross': 0.7})
+    assert indicator_key(base) != indicator_key({**base, 'htf_filter_enabled': False})
+    # ScoreEngine arguments only matter while score_mds updates it
+    supertrend = {**base, 'indicator_type': 'supertrend'}
+    assert indicator_key(supertrend) == indicator_key({**supertrend, 'mds_bonus_macd_cross': 0.7})
+    assert indicator_key(supertrend) != indicator_key({**supertrend, 'use_adx_for_regime': True})
+
+
+@pytest.mark.parametrize('indicator_type', ['supertrend_macd', 'score_mds'])
+def test_tape_replay_matches_full_run(indicator_type):
+    candles = _day(3, n=2500)
+    base = {**_OVERRIDES, 'indicator_type': indicator_type, 'htf_filter_enabled': True}
+    tape = IndicatorTape.record(candles, base)
+    for overrides in (base, {**base, 'target_points': 40, 'initial_stoploss': 25}):
+        assert IndicatorTape.record(candles, overrides).rows == tape.rows
+        full = run_backtest(candles, overrides, seed=5)
+        taped = run_backtest(candles, overrides, seed=5, tape=tape)
+        for field in ('trades', 'equity', 'metrics'):
+            assert taped[field] == full[field]
+
+    with pytest.raises(ValueError):
+        run_backtest(candles, {**base, 'supertrend_period': 10}, tape=tape)
+
+
+def test_tape_graph_rejects_unknown_timeframe():
+    tape = IndicatorTape.record(_day(4, n=50), _OVERRIDES)
+    graph = _TapeGraph(tape, BacktestBot(_OVERRIDES))
+    with pytest.raises(ValueError):
+        graph.on_candle(15, 1.0, 1.0, 1.0)
+
+
+def _synthetic_day(date_ist, settings):
+    # run_backtest_range() candle loader (module level: spawned workers import it by name)
+    return _day(int(date_ist.replace('-', '')))
+
+
+def test_backtest_range_merge_does_not_depend_on_workers():
+    reports = [
+        run_backtest_range('2026-03-05', '2026-03-09', _OVERRIDES, workers=workers, seed=3, fetch=_synthetic_day)
+        for workers in (1, 2)
+    ]
+    assert [r['workers'] for r in reports] == [1, 2]
+    one, two = ({k: v for k, v in r.items() if k not in ('workers', 'elapsed_ms')} for r in reports)
+    for report in (one, two):
+        for day in report['daily']:
+            day.pop('elapsed_ms')
+    assert one['days'] == 3 and one['candles'] == 3 * 4500  # Thu, Fri, Mon
+    assert one['trades'] and one == two
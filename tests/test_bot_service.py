@@ -0,0 +1,78 @@
+"""Per-index status / position views and index settings of bot_service."""
+
+import asyncio
+
+import bot_service
+from config import bot_state, config
+
+
+def test_position_is_reported_per_index(monkeypatch):
+    monkeypatch.setitem(config, 'selected_index', 'NIFTY')
+    monkeypatch.setitem(config, 'trade_indices', 'BANKNIFTY')
+    monkeypatch.setitem(bot_state, 'current_position', None)
+    monkeypatch.setattr(bot_service, '_index_bots', {})
+    bank = bot_service.get_trading_bot('BANKNIFTY')
+    bank.state.update(
+        current_position={'option_type': 'CE', 'strike': 51500, 'qty': 30, 'index_name': 'BANKNIFTY'},
+        entry_price=100.0, current_option_ltp=104.0, daily_trades=1,
+    )
+
+    position = bot_service.get_position()
+    assert position['has_position'] is False  # selected_index's own view
+    assert position['indices']['NIFTY'] == {'has_position': False}
+    assert position['indices']['BANKNIFTY']['unrealized_pnl'] == 120.0
+
+    assert bot_service.get_position('BANKNIFTY')['strike'] == 51500
+    assert bot_service.get_daily_summary('BANKNIFTY')['total_trades'] == 1
+    assert set(bot_service.get_bot_status()['indices']) == {'NIFTY', 'BANKNIFTY'}
+    assert bot_service.get_position('FINNIFTY')['status'] == 'error'
+
+
+def test_index_settings_are_locked_while_any_bot_runs(monkeypatch):
+    async def save_config():
+        pass
+
+    monkeypatch.setattr(bot_service, 'save_config', save_config)
+    monkeypatch.setitem(config, 'selected_index', 'NIFTY')
+    monkeypatch.setitem(config, 'trade_indices', 'BANKNIFTY')
+    monkeypatch.setitem(bot_state, 'is_running', False)
+    monkeypatch.setitem(bot_state, 'selected_index', 'NIFTY')
+    monkeypatch.setattr(bot_service, '_index_bots', {})
+    bank = bot_service.get_trading_bot('BANKNIFTY')
+    bank.running = True  # extra bot still running (or stopping) after the primary stopped
+
+    for updates in ({'selected_index': 'BANKNIFTY'}, {'selected_index': 'FINNIFTY'}, {'trade_indices': 'FINNIFTY'}):
+        result = asyncio.run(bot_service.update_config_values(updates))
+        assert result['updated'] == []
+    assert config['selected_index'] == 'NIFTY' and config['trade_indices'] == 'BANKNIFTY'
+    assert bot_service.get_trading_bots()['BANKNIFTY'] is bank
+
+    bank.running = False
+    result = asyncio.run(bot_service.update_config_values({'selected_index': 'BANKNIFTY', 'trade_indices': 'NIFTY'}))
+    assert result['updated'] == ['selected_index', 'trade_indices']
+
+
+def test_daily_max_loss_caps_the_account(monkeypatch):
+    monkeypatch.setitem(config, 'selected_index', 'NIFTY')
+    monkeypatch.setitem(config, 'trade_indices', 'BANKNIFTY,FINNIFTY')
+    for key, value in dict(daily_max_loss=3000, max_loss_per_trade=0, target_points=0, trail_start_profit=0).items():
+        monkeypatch.setitem(config, key, value)
+    monkeypatch.setitem(bot_state, 'daily_pnl', 0.0)
+    monkeypatch.setitem(bot_state, 'daily_max_loss_triggered', False)
+    monkeypatch.setattr(bot_service, '_index_bots', {})
+    bank, fin = bot_service.get_trading_bot('BANKNIFTY'), bot_service.get_trading_bot('FINNIFTY')
+    for bot, name in ((bank, 'BANKNIFTY'), (fin, 'FINNIFTY')):
+        bot._record_trade_exit = lambda **_exit: None
+        bot.current_position = {'option_type': 'CE', 'strike': 50000, 'qty': 75, 'index_name': name}
+        bot.entry_price = 100.0
+
+    assert asyncio.run(bank.close_position(76.0, -1800.0, "Max Loss Per Trade"))
+    assert not bank.state['daily_max_loss_triggered']
+
+    # FINNIFTY alone is 1200 away from its own cap: the account has 1200 left
+    fin.risk._arm()
+    assert abs(fin.risk._lower - 84.0) < 1e-5
+    assert not asyncio.run(fin.check_tick_sl(84.0))
+    assert asyncio.run(fin.check_tick_sl(83.9))
+    assert -3010.0 < bank.state['daily_pnl'] + fin.state['daily_pnl'] < -3000.0
+    assert all(bot.state['daily_max_loss_triggered'] for bot in bot_service.get_trading_bots().values())
@@ -0,0 +1,94 @@
+"""Indicator / ScoreEngine checkpoints: round trip and write throttling."""
+
+import asyncio
+import json
+import random
+from datetime import datetime, timezone
+
+from score_engine import Candle
+from trading_bot import TradingBot
+
+
+def _candles(n, seed):
+    rnd = random.Random(seed)
+    px = 23500.0
+    out = []
+    for _ in range(n):
+        px += rnd.gauss(0, 6)
+        high = px + abs(rnd.gauss(0, 3))
+        low = px - abs(rnd.gauss(0, 3))
+        out.append((high, low, rnd.uniform(low, high)))
+    return out
+
+
+def _bot(tmp_path):
+    # An extra-index bot keeps its own config layer and state, so nothing global changes
+    bot = TradingBot('NIFTY')
+    bot.config['market_data_provider'] = 'dhan'
+    bot.checkpoint_path = tmp_path / 'indicator_state.json'
+    return bot
+
+
+def _feed(bot, candles):
+    for high, low, close in candles:
+        bot.graph.on_candle(bot._graph_base_tf, high, low, close)
+        bot.score_engine.update(Candle(high=high, low=low, close=close))
+
+
+def test_checkpoint_round_trip(tmp_path):
+    candles = _candles(1500, seed=3)
+    saved = _bot(tmp_path)
+    _feed(saved, candles[:1000])
+    saved.prev_st_direction = saved._st_node.signal
+    asyncio.run(saved._save_checkpoint(datetime.now(timezone.utc)))
+
+    restored = _bot(tmp_path)
+    assert restored._restore_checkpoint() is not None
+    assert json.dumps(restored.graph.get_state()) == json.dumps(saved.graph.get_state())
+    assert json.dumps(restored.score_engine.get_state()) == json.dumps(saved.score_engine.get_state())
+    assert restored.prev_st_direction == saved.prev_st_direction
+
+    # Both continue identically from the restored state
+    for candle in candles[1000:]:
+        _feed(saved, [candle])
+        _feed(restored, [candle])
+        assert restored._st_node.value == saved._st_node.value
+        assert restored.score_engine.score == saved.score_engine.score
+    assert json.dumps(restored.score_engine.get_state()) == json.dumps(saved.score_engine.get_state())
+
+
+def test_checkpoint_rejects_other_setup(tmp_path):
+    saved = _bot(tmp_path)
+    _feed(saved, _candles(100, seed=4))
+    asyncio.run(saved._save_checkpoint(datetime.now(timezone.utc)))
+
+    other = _bot(tmp_path)
+    other.config['indicator_type'] = 'supertrend' if saved.config.get('indicator_type') == 'score_mds' else 'score_mds'
+    assert other._restore_checkpoint() is None
+
+
+def test_checkpoint_writes_are_throttled(tmp_path):
+    bot = _bot(tmp_path)
+    bot.config['state_checkpoint_interval_seconds'] = 60.0
+    bot._checkpoint_enabled = True
+    saves = []
+
+    async def process(**_candle):
+        pass
+
+    async def save(candle_time):
+        saves.append(candle_time)
+
+    bot._process_closed_candle = process
+    bot._save_checkpoint = save
+
+    async def run():
+        for i in range(10):
+            await bot._handle_closed_candle(current_candle_time=i)
+        assert saves == [0]  # first close writes, the rest wait for the interval
+        await bot.stop()
+        assert saves == [0, 9]  # stop writes the latest state once
+        await bot.stop()
+        assert saves == [0, 9]  # nothing new to write
+
+    asyncio.run(run())
@@ -0,0 +1,282 @@
+"""Batch add_candles() vs streaming add_candle(): per-candle output and end state."""
+
+import random
+
+import numpy as np
+import pytest
+
+import indicators
+
+
+def _candles(n, seed):
+    # Trending, noisy and perfectly flat stretches
+    rnd = random.Random(seed)
+    px = rnd.uniform(10000.0, 80000.0)
+    out = []
+    for i in range(n):
+        if (i // 500) % 4 == 3:
+            out.append((px, px, px))
+            continue
+        px += rnd.gauss(0, 8)
+        high = px + abs(rnd.gauss(0, 4))
+        low = px - abs(rnd.gauss(0, 4))
+        out.append((high, low, rnd.uniform(low, high)))
+    return out
+
+
+# name -> (factory, add_candles output key compared against the add_candle value)
+_BATCH_CASES = {
+    "SuperTrend": (lambda: indicators.SuperTrend(7, 3, history=16), "value"),
+    "RSI": (lambda: indicators.RSI(14), "rsi"),
+    "RSI simple": (lambda: indicators.RSI(5, smoothing="simple"), "rsi"),
+    "MACD": (lambda: indicators.MACD(12, 26, 9), "macd"),
+    "MACD ring": (lambda: indicators.MACD(12, 26, 9, history=32), "macd"),
+    "MovingAverage": (lambda: indicators.MovingAverage(5, 20), "fast_ema"),
+    "MovingAverage cross": (lambda: indicators.MovingAverage(3, 8, signal_on_cross=True), "fast_ema"),
+    "BollingerBands": (lambda: indicators.BollingerBands(20, 2), "middle"),
+    "Stochastic": (lambda: indicators.Stochastic(14, 3), "k"),
+    "ADX": (lambda: indicators.ADX(14), "adx"),
+    "ATR": (lambda: indicators.ATR(14), "atr"),
+    "DonchianChannel": (lambda: indicators.DonchianChannel(20), "upper"),
+    "KeltnerChannel": (lambda: indicators.KeltnerChannel(20, 10, 2), "lower"),
+    "HeikinAshi": (lambda: indicators.HeikinAshi(), "close"),
+}
+
+_SIGNAL_KEY = {"SuperTrend": "direction", "MACD": "cross", "MACD ring": "cross"}
+
+
+@pytest.mark.parametrize("name", sorted(_BATCH_CASES))
+def test_add_candles_matches_streaming(name):
+    factory, key = _BATCH_CASES[name]
+    candles = _candles(3000, seed=len(name))
+    cols = np.array(candles).T
+    cuts = [0] + sorted(random.Random(name).sample(range(1, len(candles)), 4)) + [len(candles)]
+
+    stream, batch = factory(), factory()
+    values, signals = [], []
+    for h, l, c in candles:
+        value, signal = stream.add_candle(h, l, c)
+        if isinstance(value, dict):
+            value = value[key]
+        values.append(np.nan if value is None else value)
+        signals.append(indicators.SIGNAL_CODES[signal])
+
+    b_values, b_signals = [], []
+    for lo, hi in zip(cuts, cuts[1:]):
+        out = batch.add_candles(cols[0][lo:hi], cols[1][lo:hi], cols[2][lo:hi])
+        b_values.extend(out[key].tolist())
+        sig_out = out.get(_SIGNAL_KEY.get(name, "signal"))
+        b_signals.extend([0] * (hi - lo) if sig_out is None else sig_out.tolist())
+
+    assert np.array_equal(np.array(values), np.array(b_values), equal_nan=True)
+    assert signals == b_signals
+    assert repr(batch.get_state()) == repr(stream.get_state())
+
+
+def test_donchian_is_window_extremes():
+    candles = _candles(2000, seed=11)
+    period = 20
+    channel = indicators.DonchianChannel(period)
+    prev = None
+    for i, (h, l, c) in enumerate(candles):
+        value, signal = channel.add_candle(h, l, c)
+        if i + 1 < period:
+            assert value is None
+            continue
+        window = candles[i + 1 - period:i + 1]
+        assert value['upper'] == max(x[0] for x in window)
+        assert value['lower'] == min(x[1] for x in window)
+        if prev is not None:
+            expected = "GREEN" if c > prev['upper'] else ("RED" if c < prev['lower'] else None)
+            assert signal == expected
+        prev = dict(value)
+
+
+def test_atr_and_keltner_match_wilder_recomputation():
+    candles = _candles(1500, seed=12)
+    atr_period, ema_period, mult = 10, 20, 2
+    atr, keltner = indicators.ATR(atr_period), indicators.KeltnerChannel(ema_period, atr_period, mult)
+    trs, closes = [], []
+    ref_atr = ref_ema = None
+    alpha = 2 / (ema_period + 1)
+    for i, (h, l, c) in enumerate(candles):
+        trs.append(h - l if i == 0 else max(h - l, abs(h - candles[i - 1][2]), abs(l - candles[i - 1][2])))
+        closes.append(c)
+        if len(trs) == atr_period:
+            ref_atr = sum(trs) / atr_period
+        elif len(trs) > atr_period:
+            ref_atr = (ref_atr * (atr_period - 1) + trs[-1]) / atr_period
+        if len(closes) == ema_period:
+            ref_ema = sum(closes) / ema_period
+        elif len(closes) > ema_period:
+            ref_ema = c * alpha + ref_ema * (1 - alpha)
+
+        value, _ = atr.add_candle(h, l, c)
+        if ref_atr is None:
+            assert value is None
+        else:
+            assert value == pytest.approx(ref_atr, rel=1e-12)
+        band, _ = keltner.add_candle(h, l, c)
+        if ref_atr is None or ref_ema is None:
+            assert band is None
+        else:
+            assert band['middle'] == pytest.approx(ref_ema, rel=1e-12)
+            assert band['upper'] - band['middle'] == pytest.approx(mult * ref_atr, rel=1e-9)
+
+
+
+def test_rsi_matches_wilder_recomputation():
+    candles = _candles(1500, seed=13)
+    period = 14
+    rsi = indicators.RSI(period)
+    changes = []
+    avg_gain = avg_loss = None
+    for i, (h, l, c) in enumerate(candles):
+        if i:
+            d = c - candles[i - 1][2]
+            changes.append(d)
+            if len(changes) == period:
+                avg_gain = sum(max(x, 0) for x in changes) / period
+                avg_loss = sum(max(-x, 0) for x in changes) / period
+            elif len(changes) > period:
+                avg_gain = (avg_gain * (period - 1) + max(d, 0)) / period
+                avg_loss = (avg_loss * (period - 1) + max(-d, 0)) / period
+
+        value, _ = rsi.add_candle(h, l, c)
+        if avg_gain is None:
+            assert value is None
+        elif avg_loss == 0:
+            assert value == (100 if avg_gain > 0 else 50)
+        else:
+            assert value == pytest.approx(100 - 100 / (1 + avg_gain / avg_loss), rel=1e-12)
+
+
+def test_simple_rsi_reproduces_the_legacy_values():
+    # The pre-Wilder RSI: plain average of the last `period` gains / losses over the full close history
+    candles = _candles(1500, seed=14)
+    period = 14
+    rsi = indicators.RSI(period, smoothing="simple")
+    closes = []
+    for h, l, c in candles:
+        closes.append(c)
+        value, signal = rsi.add_candle(h, l, c)
+        if len(closes) < period + 1:
+            assert (value, signal) == (None, None)
+            continue
+        gains = [max(0, closes[i] - closes[i - 1]) for i in range(1, len(closes))]
+        losses = [max(0, -(closes[i] - closes[i - 1])) for i in range(1, len(closes))]
+        avg_gain = sum(gains[-period:]) / period
+        avg_loss = sum(losses[-period:]) / period
+        rs = avg_gain / avg_loss if avg_loss > 0 else 0
+        legacy = 100 - (100 / (1 + rs)) if rs > 0 else 50
+        assert value == legacy
+        assert signal == ("GREEN" if legacy < 30 else "RED" if legacy > 70 else None)
+
+
+def test_adx_matches_wilder_recomputation():
+    # Textbook form: Wilder averages (not running sums) of TR / +DM / -DM, then of DX
+    candles = _candles(2000, seed=15)
+    period = 14
+    adx = indicators.ADX(period)
+    trs, plus_dms, minus_dms, dxs = [], [], [], []
+    atr = plus_avg = minus_avg = ref_adx = None
+    for i, (h, l, c) in enumerate(candles):
+        value, signal = adx.add_candle(h, l, c)
+        if i == 0:
+            assert value is None
+            continue
+        ph, pl, pc = candles[i - 1]
+        up, down = h - ph, pl - l
+        trs.append(max(h - l, abs(h - pc), abs(l - pc)))
+        plus_dms.append(up if up > down and up > 0 else 0.0)
+        minus_dms.append(down if down > up and down > 0 else 0.0)
+        if len(trs) == period:
+            atr, plus_avg, minus_avg = (sum(x) / period for x in (trs, plus_dms, minus_dms))
+        elif len(trs) > period:
+            atr = (atr * (period - 1) + trs[-1]) / period
+            plus_avg = (plus_avg * (period - 1) + plus_dms[-1]) / period
+            minus_avg = (minus_avg * (period - 1) + minus_dms[-1]) / period
+        if atr is None:
+            assert value is None
+            continue
+
+        plus_di = 100 * plus_avg / atr if atr > 0 else 0.0
+        minus_di = 100 * minus_avg / atr if atr > 0 else 0.0
+        assert adx.plus_di == pytest.approx(plus_di, rel=1e-9, abs=1e-9)
+        assert adx.minus_di == pytest.approx(minus_di, rel=1e-9, abs=1e-9)
+        dxs.append(100 * abs(plus_di - minus_di) / (plus_di + minus_di) if plus_di + minus_di > 0 else 0.0)
+        if len(dxs) == period:
+            ref_adx = sum(dxs) / period
+        elif len(dxs) > period:
+            ref_adx = (ref_adx * (period - 1) + dxs[-1]) / period
+        if ref_adx is None:
+            assert value is None
+        else:
+            assert value == pytest.approx(ref_adx, rel=1e-9)
+            assert signal == ("GREEN" if value > 25 else "RED")
+
+
+def _window_edge_candles():
+    # Repeated equal highs / lows, a flat stretch and single extreme candles that later leave the window
+    candles = _candles(1200, seed=16)
+    for i in range(100, 160):
+        candles[i] = (23510.0, 23490.0, 23500.0 + (i % 3))
+    for i in (300, 301, 650):
+        _h, _l, c = candles[i]
+        candles[i] = (c * 3, c / 3, c * 2.5 if i != 301 else c / 2.5)
+    return candles
+
+
+@pytest.mark.parametrize("period", (1, 5, 20))
+def test_bollinger_matches_window_recomputation(period):
+    candles = _window_edge_candles()
+    bands = indicators.BollingerBands(period, 2)
+    for i, (h, l, c) in enumerate(candles):
+        value, _ = bands.add_candle(h, l, c)
+        if i + 1 < period:
+            assert value is None
+            continue
+        window = [x[2] for x in candles[i + 1 - period:i + 1]]
+        mean = sum(window) / period
+        std = (sum((x - mean) ** 2 for x in window) / period) ** 0.5
+        assert value['middle'] == pytest.approx(mean, rel=1e-12)
+        assert value['upper'] - value['middle'] == pytest.approx(2 * std, rel=1e-6, abs=1e-6), i
+
+
+@pytest.mark.parametrize("k_period", (1, 5, 14))
+def test_stochastic_matches_window_recomputation(k_period):
+    candles = _window_edge_candles()
+    stoch = indicators.Stochastic(k_period, 3)
+    ks = []
+    for i, (h, l, c) in enumerate(candles):
+        k, _ = stoch.add_candle(h, l, c)
+        if i + 1 < k_period:
+            assert k is None
+            continue
+        window = candles[i + 1 - k_period:i + 1]
+        highest, lowest = max(x[0] for x in window), min(x[1] for x in window)
+        ks.append((c - lowest) / (highest - lowest) * 100 if highest > lowest else 50)
+        assert k == ks[-1], i
+        assert stoch.d == (sum(ks[-3:]) / 3 if len(ks) >= 3 else None)
+
+
+def _shape(state):
+    # State layout with the values left out: container sizes must not grow with the session
+    if isinstance(state, dict):
+        return {k: _shape(v) for k, v in state.items()}
+    if isinstance(state, (list, tuple)):
+        return [len(state)]
+    return None
+
+
+@pytest.mark.parametrize("history", (0, 32))
+def test_macd_state_is_bounded(history):
+    candles = np.array(_candles(60000, seed=17)).T
+    macd = indicators.MACD(12, 26, 9, history=history)
+    macd.add_candles(*(col[:200] for col in candles))
+    shape = _shape(macd.get_state())
+    macd.add_candles(*(col[200:-100] for col in candles))
+    for h, l, c in candles.T[-100:]:
+        macd.add_candle(h, l, c)
+    assert _shape(macd.get_state()) == shape
+    assert len(macd.recent()) == history
@@ -0,0 +1,148 @@
+"""MultiScoreEngine / ParamSweepScoreEngine vs one ScoreEngine per row, and MdsSymbolsSource bucket alignment."""
+
+import random
+
+import numpy as np
+import pytest
+
+from market_events import MdsSymbolsSource
+from multi_score_engine import VECTORIZE_MIN_SYMBOLS, MultiScoreEngine, ParamSweepScoreEngine
+from score_engine import DIRECTION_CODES, Candle, ScoreEngine
+from trading_bot import TradingBot
+
+_FIELDS = ("score", "slope", "acceleration", "stability", "confidence", "is_choppy", "ready")
+_TF_FIELDS = ("macd_score", "hist_score", "st_score", "bonus_score", "raw_score", "weighted_score", "st_direction")
+_KWARGS = dict(st_period=7, st_multiplier=4, macd_fast=12, macd_slow=26, macd_signal=9)
+
+
+def _paths(steps, n, seed, missing=0.02):
+    # One (high, low, close) per symbol and step; close NaN = missing candle
+    rnd = random.Random(seed)
+    px = [rnd.uniform(20000.0, 80000.0) for _ in range(n)]
+    rows = []
+    for i in range(steps):
+        row = []
+        for s in range(n):
+            px[s] += rnd.gauss(0, 6) if (i // 600 + s) % 2 else rnd.gauss(0, 1.5)
+            high = px[s] + abs(rnd.gauss(0, 3))
+            low = px[s] - abs(rnd.gauss(0, 3))
+            row.append((high, low, rnd.uniform(low, high) if rnd.random() >= missing else float("nan")))
+        rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("vectorize", (True, False))
+@pytest.mark.parametrize("params", (
+    {"base_timeframe_seconds": 5},
+    {"base_timeframe_seconds": 5, "full_chain": True},
+    {"base_timeframe_seconds": 15, "bonus_macd_triple": 0.3, "bonus_macd_cross": 0.7},
+), ids=("5s", "full_chain", "15s_bonus"))
+def test_multi_matches_separate_engines(params, vectorize):
+    symbols = ["NIFTY", "BANKNIFTY", "FINNIFTY", "SENSEX"]
+    multi = MultiScoreEngine(symbols, vectorize=vectorize, **_KWARGS, **params)
+    assert multi.vectorized is vectorize
+    singles = [ScoreEngine(**_KWARGS, **params) for _ in symbols]
+
+    for step, row in enumerate(_paths(1500, len(symbols), seed=3)):
+        out = multi.on_base_candles(*(np.array(col) for col in zip(*row)))
+        tf_scores = multi.tf_scores()
+        for i, (engine, (h, l, c)) in enumerate(zip(singles, row)):
+            if c != c:
+                assert not out["updated"][i]
+                continue
+            assert out["updated"][i]
+            snap = engine.on_base_candle(Candle(h, l, c))
+            for field in _FIELDS:
+                assert out[field][i] == getattr(snap, field), (step, i, field)
+            assert out["direction"][i] == DIRECTION_CODES[snap.direction]
+            for tf, score in snap.tf_scores.items():
+                for field in _TF_FIELDS:
+                    assert tf_scores[tf][field][i] == getattr(score, field), (step, i, tf, field)
+
+
+def test_vectorizes_from_the_crossover():
+    few = MultiScoreEngine([f"S{i}" for i in range(VECTORIZE_MIN_SYMBOLS - 1)], **_KWARGS)
+    many = MultiScoreEngine([f"S{i}" for i in range(VECTORIZE_MIN_SYMBOLS)], **_KWARGS)
+    assert not few.vectorized and many.vectorized
+
+
+def test_bot_vectorizes_from_the_configured_symbol_count():
+    bot = TradingBot('NIFTY')
+    bot.config['mds_symbols'] = ["NIFTY", "BANKNIFTY", "FINNIFTY", "SENSEX"]
+    assert not bot._build_multi_score_engine().vectorized  # default VECTORIZE_MIN_SYMBOLS
+    bot.config['mds_vectorize_min_symbols'] = 4
+    assert bot._build_multi_score_engine().vectorized
+
+
+def test_symbols_source_aligns_buckets_by_timestamp():
+    engine = MultiScoreEngine(["NIFTY", "BANKNIFTY"], **_KWARGS)
+    buckets, published = [], []
+    score = engine.on_base_candles
+    engine.on_base_candles = lambda h, l, c: buckets.append(list(c)) or score(h, l, c)
+    source = MdsSymbolsSource(engine, lambda: published.append(engine.strongest()))
+    nifty, bank = source.streams()
+    assert (nifty, bank) == (("NIFTY", 5), ("BANKNIFTY", 5))
+
+    def row(second, close):
+        return {"ts": f"2026-01-05T04:00:{second:02d}Z", "high": close + 1, "low": close - 1, "close": close}
+
+    # The newest bucket waits for the late symbol ...
+    source.offer({nifty: [row(0, 100.0), row(5, 101.0)], bank: [row(0, 200.0)]})
+    assert buckets == [[100.0, 200.0]]
+    # ... and is scored once it arrives; rows already scored are ignored
+    source.offer({nifty: [row(5, 101.0)], bank: [row(0, 200.0), row(5, 201.0)]})
+    source.offer({nifty: [row(5, 101.0)], bank: [row(5, 201.0)]})
+    assert buckets[1:] == [[101.0, 201.0]]
+    # A later candle flushes a bucket one symbol never delivered (that symbol skips it)
+    source.offer({nifty: [row(10, 102.0)], bank: []})
+    source.offer({nifty: [row(15, 103.0)], bank: [row(15, 203.0)]})
+    assert buckets[2][0] == 102.0 and buckets[2][1] != buckets[2][1]
+    assert buckets[3] == [103.0, 203.0]
+    assert len(published) == 3  # once per offer that scored something
+    assert source.due(0.25) == 1767585615.0 + 2 * 5 + 0.25
+
+
+def _param_sets(k, seed):
+    rnd = random.Random(seed)
+    sets = []
+    for _ in range(k):
+        fast = rnd.choice((8, 12, 16))
+        sets.append({
+            "st_period": rnd.choice((5, 7, 10)),
+            "st_multiplier": rnd.choice((2.0, 3.5)),
+            "macd_fast": fast,
+            "macd_slow": fast + rnd.choice((8, 14)),
+            "macd_signal": rnd.choice((5, 9)),
+            "bonus_macd_triple": rnd.choice((0.0, 1.0)),
+            "bonus_macd_cross": rnd.choice((0.0, 0.7)),
+        })
+    return sets + sets[:2]  # identical sets are scored once
+
+
+@pytest.mark.parametrize("params", (
+    {"base_timeframe_seconds": 5},
+    {"base_timeframe_seconds": 5, "full_chain": True, "tf_weights": {15: -1.0}},
+    {"base_timeframe_seconds": 60},
+), ids=("5s", "full_chain", "60s"))
+def test_param_sweep_matches_each_set(params):
+    row = _paths(2500, 1, seed=4, missing=0.0)
+    highs, lows, closes = (np.array([r[0][i] for r in row]) for i in range(3))
+    closes[[7, 900]] = 0.0
+    sets = _param_sets(24, seed=5)
+
+    sweep = ParamSweepScoreEngine(sets, **params).evaluate_series(highs, lows, closes)
+    for i, p in enumerate(sets):
+        ref = ScoreEngine(**p, **params).evaluate_series(highs, lows, closes)
+        for field in _FIELDS + ("direction",):
+            assert np.array_equal(sweep[field][:, i], ref[field]), (i, field)
+
+
+def test_param_sweep_streaming_matches_each_set():
+    sets = _param_sets(6, seed=6)
+    sweep = ParamSweepScoreEngine(sets, base_timeframe_seconds=5)
+    singles = [ScoreEngine(**p, base_timeframe_seconds=5) for p in sets]
+    for (h, l, c), in _paths(800, 1, seed=7, missing=0.0):
+        out = sweep.on_candle(h, l, c)
+        for i, engine in enumerate(singles):
+            snap = engine.on_base_candle(Candle(h, l, c))
+            assert [out[f][i] for f in _FIELDS] == [getattr(snap, f) for f in _FIELDS]
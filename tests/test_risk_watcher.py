@@ -0,0 +1,117 @@
+"""RiskWatcher quote band vs TradingBot.check_tick_sl()."""
+
+import asyncio
+import math
+import random
+
+import pytest
+
+from trading_bot import TradingBot
+
+
+def _bot(closed, **risk):
+    # Extra-index bot: its config layer and state are its own, nothing global changes
+    bot = TradingBot('NIFTY')
+    bot.config.update({
+        'daily_max_loss': 0, 'max_loss_per_trade': 0, 'target_points': 0,
+        'trail_start_profit': 0, 'trail_step': 0, 'initial_stoploss': 0, **risk,
+    })
+
+    async def close_position(exit_price, pnl, reason):
+        closed.append(reason)
+        return True
+
+    bot.close_position = close_position
+    return bot
+
+
+def _open(bot, entry, qty=75, trailing_sl=None, highest_profit=0.0, daily_pnl=0.0):
+    bot.current_position = {'option_type': 'CE', 'strike': 23500, 'qty': qty, 'index_name': 'NIFTY'}
+    bot.entry_price = entry
+    bot.trailing_sl = trailing_sl
+    bot.highest_profit = highest_profit
+    bot.state['daily_pnl'] = daily_pnl
+    bot.risk._arm()
+
+
+def _tick(bot, ltp):
+    # One quote on a fresh copy of the position state; returns (exited, new trailing SL)
+    saved = bot.trailing_sl, bot.highest_profit
+    exited = asyncio.run(bot.check_tick_sl(ltp))
+    sl = bot.trailing_sl
+    bot.trailing_sl, bot.highest_profit = saved
+    return exited, sl
+
+
+def test_quotes_inside_the_band_are_no_ops():
+    rnd = random.Random(5)
+    checked = 0
+    for _ in range(400):
+        closed = []
+        trail_start = rnd.choice((0, 10, 25))
+        bot = _bot(
+            closed,
+            daily_max_loss=rnd.choice((0, 3000, 8000)),
+            max_loss_per_trade=rnd.choice((0, 1500, 2500)),
+            target_points=rnd.choice((0, 20, 60)),
+            trail_start_profit=trail_start,
+            trail_step=rnd.choice((0, 2.5, 5)) if trail_start else 0,
+            initial_stoploss=rnd.choice((0, 15)),
+        )
+        entry = rnd.uniform(80.0, 300.0)
+        highest = rnd.choice((0.0, rnd.uniform(0.0, 50.0)))
+        sl = rnd.choice((None, entry - rnd.uniform(5.0, 20.0), entry + rnd.uniform(0.0, max(highest - 5.0, 0.0))))
+        _open(bot, entry, qty=rnd.choice((25, 75, 150)), trailing_sl=sl,
+              highest_profit=highest, daily_pnl=rnd.uniform(-6000.0, 4000.0))
+
+        lower = max(bot.risk._lower, 1.0)
+        upper = min(bot.risk._upper, entry + 100.0)
+        if not lower < upper:
+            continue
+        quotes = [rnd.uniform(lower, upper) for _ in range(20)] + [math.nextafter(lower, upper), math.nextafter(upper, lower)]
+        for ltp in quotes:
+            if not bot.risk._lower < ltp < bot.risk._upper:
+                continue
+            exited, new_sl = _tick(bot, ltp)
+            assert not exited and not closed, (ltp, dict(bot.config.maps[0]))
+            assert new_sl == sl, (ltp, sl, new_sl)
+            checked += 1
+    assert checked > 2000
+
+
+@pytest.mark.parametrize("risk, position, ltp, reason", (
+    ({"target_points": 20}, {"entry": 100.0}, 120.0, "Target Hit"),
+    ({"max_loss_per_trade": 1500}, {"entry": 100.0, "qty": 75}, 80.0 - 1e-9, "Max Loss Per Trade"),
+    ({"daily_max_loss": 3000}, {"entry": 100.0, "qty": 75, "daily_pnl": -1500.0}, 80.0 - 1e-9, "Daily Max Loss"),
+    ({"trail_start_profit": 10, "trail_step": 5}, {"entry": 100.0, "trailing_sl": 105.0, "highest_profit": 12.0},
+     105.0, "Trailing SL Hit"),
+), ids=("target", "max_loss_per_trade", "daily_max_loss", "trailing_sl"))
+def test_quotes_at_the_band_edge_exit(risk, position, ltp, reason):
+    closed = []
+    bot = _bot(closed, **risk)
+    _open(bot, **position)
+    assert not bot.risk._lower < ltp < bot.risk._upper
+    assert _tick(bot, ltp)[0] and closed == [reason]
+
+
+def test_trailing_sl_moves_at_the_upper_edge():
+    closed = []
+    bot = _bot(closed, trail_start_profit=10, trail_step=5, initial_stoploss=15)
+    _open(bot, 100.0)
+    assert bot.risk._lower == math.inf  # the first quote sets the initial SL
+    assert _tick(bot, 100.0) == (False, 85.0)
+
+    _open(bot, 100.0, trailing_sl=85.0, highest_profit=4.0)
+    assert bot.risk._upper == pytest.approx(110.0)
+    assert _tick(bot, 110.0) == (False, 105.0)
+
+    _open(bot, 100.0, trailing_sl=110.0, highest_profit=17.0)
+    assert bot.risk._upper == pytest.approx(120.0)
+    assert _tick(bot, 119.9)[1] == 110.0
+    assert _tick(bot, 120.0) == (False, 115.0)
+    assert not closed
+
+    # SL lagging highest_profit (trail_start lowered mid-trade): the next trailing quote raises it
+    _open(bot, 100.0, trailing_sl=85.0, highest_profit=17.0)
+    assert bot.risk._upper == pytest.approx(110.0)
+    assert _tick(bot, 110.0) == (True, 110.0) and closed == ["Trailing SL Hit"]
@@ -0,0 +1,162 @@
+"""ScoreEngine.evaluate_series() vs streaming on_base_candle(), chop-window stats and candle aggregation."""
+
+import json
+import random
+
+import numpy as np
+import pytest
+
+from score_engine import DIRECTION_CODES, Candle, CandleAggregator, ScoreEngine, _WindowStats
+from trading_bot import TradingBot
+
+_SNAPSHOT_FIELDS = ("score", "slope", "acceleration", "stability", "confidence", "is_choppy", "ready")
+_TF_FIELDS = ("macd_score", "hist_score", "st_score", "bonus_score", "raw_score", "weighted_score", "st_direction")
+
+_CONFIGS = (
+    {"base_timeframe_seconds": 5},
+    {"base_timeframe_seconds": 5, "full_chain": True},
+    {"base_timeframe_seconds": 15, "bonus_macd_triple": 0.3},
+    {"base_timeframe_seconds": 60},
+)
+
+
+def _session(n, seed):
+    # Calm and trending stretches so chop detection flips both ways
+    rnd = random.Random(seed)
+    px = 23500.0
+    out = []
+    for i in range(n):
+        px += rnd.gauss(0, 6) if (i // 800) % 2 else rnd.gauss(0, 1.5)
+        high = px + abs(rnd.gauss(0, 3))
+        low = px - abs(rnd.gauss(0, 3))
+        out.append((high, low, rnd.uniform(low, high)))
+    return out
+
+
+def _timestamps(n, base_tf, rnd, missing=0.02):
+    # 09:15 IST session start plus a mid-bucket offset; ~2% of candles missing
+    ts = 1767000000 - 1767000000 % 900 + 3 * 3600 + 45 * 60 + base_tf * rnd.randrange(1, 6)
+    out = []
+    for _ in range(n):
+        ts += base_tf * (2 if rnd.random() < missing else 1)
+        out.append(float(ts))
+    return out
+
+
+@pytest.mark.parametrize("timestamped", (False, True))
+@pytest.mark.parametrize("params", _CONFIGS, ids=lambda p: ",".join(f"{k}={v}" for k, v in p.items()))
+def test_evaluate_series_matches_streaming(params, timestamped):
+    rnd = random.Random(7)
+    candles = _session(2500, seed=1)
+    n = len(candles)
+    stamps = _timestamps(n, params["base_timeframe_seconds"], rnd) if timestamped else [None] * n
+    kwargs = dict(st_period=7, st_multiplier=4, macd_fast=12, macd_slow=26, macd_signal=9, **params)
+    stream, batch = ScoreEngine(**kwargs), ScoreEngine(**kwargs)
+
+    snaps = [stream.on_base_candle(Candle(*c, ts=t)) for c, t in zip(candles, stamps)]
+
+    highs, lows, closes = (np.array(col) for col in zip(*candles))
+    ts = np.array(stamps) if timestamped else None
+    cuts = [0] + sorted(rnd.sample(range(1, n), 4)) + [n]
+    outs = [
+        batch.evaluate_series(highs[lo:hi], lows[lo:hi], closes[lo:hi], None if ts is None else ts[lo:hi])
+        for lo, hi in zip(cuts, cuts[1:])
+    ]
+
+    for field in _SNAPSHOT_FIELDS:
+        got = np.concatenate([o[field] for o in outs])
+        assert np.array_equal(got, np.array([getattr(s, field) for s in snaps])), field
+    got = np.concatenate([o["direction"] for o in outs])
+    assert np.array_equal(got, np.array([DIRECTION_CODES[s.direction] for s in snaps]))
+    for tf in stream.timeframes:
+        for field in _TF_FIELDS:
+            got = np.concatenate([o["tf_scores"][tf][field] for o in outs])
+            assert np.array_equal(got, np.array([getattr(s.tf_scores[tf], field) for s in snaps])), (tf, field)
+        got = np.concatenate([o["tf_scores"][tf]["ready"] for o in outs])
+        assert np.array_equal(got, np.array([tf in s.ready_timeframes for s in snaps])), tf
+    assert json.dumps(batch.get_state()) == json.dumps(stream.get_state())
+
+
+def test_evaluate_series_skips_candles_without_a_close():
+    candles = _session(300, seed=2)
+    highs, lows, closes = (np.array(col) for col in zip(*candles))
+    closes[[10, 11, 150]] = 0.0
+    batch = ScoreEngine(7, 4, 12, 26, 9).evaluate_series(highs, lows, closes)
+
+    stream = ScoreEngine(7, 4, 12, 26, 9)
+    for i, snap in enumerate(stream.on_base_candle(Candle(*c)) for c in zip(highs, lows, closes)):
+        assert batch["score"][i] == snap.score
+        assert batch["ready"][i] == snap.ready
+    assert not batch["ready"][150] and batch["score"][150] == 0.0
+
+
+@pytest.mark.parametrize("size", (1, 3, 12))
+def test_window_stats_match_recomputed_window(size):
+    rnd = random.Random(size)
+    stats = _WindowStats(size)
+    pushed = []
+    for i in range(3000):
+        # Runs of zeros between signs, and a large outlier now and then that later leaves the window
+        x = 0.0 if rnd.random() < 0.3 else rnd.choice((-1, 1)) * (rnd.uniform(0, 1e4) if i % 97 == 0 else rnd.uniform(0, 3))
+        stats.push(x)
+        pushed.append(x)
+        window = pushed[-size:]
+        assert list(stats.window) == window
+        assert stats.total == pytest.approx(sum(window), abs=1e-6)
+        assert stats.total_abs == pytest.approx(sum(abs(v) for v in window), abs=1e-6)
+        signs = [1 if v > 0 else -1 for v in window if v != 0]
+        assert stats.flips == sum(a != b for a, b in zip(signs, signs[1:]))
+        mean = sum(window) / len(window)
+        std = (sum((v - mean) ** 2 for v in window) / len(window)) ** 0.5
+        assert stats.stddev() == pytest.approx(std, abs=1e-6)
+        assert stats.mean_abs() == pytest.approx(sum(abs(v) for v in window) / len(window), abs=1e-8)
+
+
+def test_aggregator_buckets_missing_and_late_candles():
+    agg = CandleAggregator((5, 15, 60))
+
+    def push(ts, close):
+        return [(tf, c.high, c.low, c.close, c.ts) for tf, c in agg.push(close + 1, close - 1, close, ts)]
+
+    t0 = 1767585600.0  # 04:00:00 UTC, a 60s boundary
+    assert push(t0, 100) == [] and push(t0 + 5, 101) == []
+    assert push(t0 + 10, 102) == [(15, 103, 99, 102, t0)]
+    # The first candle of the next bucket is missing: the candle covering the bucket end still closes it
+    assert push(t0 + 20, 104) == []
+    assert push(t0 + 25, 105) == [(15, 106, 103, 105, t0 + 15)]
+    # Two missing candles: a candle of a later bucket flushes the open one, at its own bucket time
+    assert push(t0 + 30, 106) == []
+    assert push(t0 + 50, 110) == [(15, 107, 105, 106, t0 + 30)]
+    # Late candles of emitted buckets are ignored
+    assert push(t0 + 35, 999) == [] and push(t0 + 10, 999) == []
+    assert push(t0 + 55, 111) == [(15, 112, 109, 111, t0 + 45), (60, 112, 99, 111, t0)]
+
+    # claim(): an outside candle supplies the 15s bucket; base candles of it and older are dropped
+    assert push(t0 + 60, 120) == []
+    assert agg.claim(0, t0 + 60)
+    assert push(t0 + 65, 999) == [] and push(t0 + 70, 999) == []
+    assert not agg.claim(0, t0 + 60)
+    assert push(t0 + 75, 121) == [] and push(t0 + 85, 123) == [(15, 124, 120, 123, t0 + 75)]
+
+
+def test_htf_filter_needs_a_multiple_of_the_base_timeframe():
+    with pytest.raises(ValueError):
+        CandleAggregator.chain(45, (60,))
+
+    bot = TradingBot('NIFTY')
+    bot.config.update({'htf_filter_enabled': True, 'htf_filter_timeframe': 60, 'candle_interval': 15})
+    bot.reset_indicator()
+    assert bot._htf_timeframe() == 60
+    for i, (h, l, c) in enumerate(_session(40, seed=3)):
+        bot._aggregate_htf(h, l, c, 1767585600.0 + 15 * i)
+    assert bot._htf_candle_number == 10
+
+    for interval in (45, 300):
+        bot.config['candle_interval'] = interval
+        bot.reset_indicator()
+        # No HTF aggregation: the filter is off rather than fed misaligned candles
+        assert bot._htf_agg is None and bot._htf_timeframe() is None
+        bot._htf_candle_number = 0
+        for i, (h, l, c) in enumerate(_session(40, seed=3)):
+            bot._aggregate_htf(h, l, c, 1767585600.0 + interval * i)
+        assert bot._htf_candle_number == 0 and not bot.htf_indicator.ready